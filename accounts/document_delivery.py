@@ -0,0 +1,201 @@
+# accounts/document_delivery.py
+"""
+Cached watermarked documents and buffered access logging for
+DocumentAccessMiddleware.
+
+Watermarked copies are cached on disk per (document, user, day) under
+DOCUMENT_WATERMARK_CACHE_DIR:
+
+    <day>/<sha256 of path, size, mtime, user and day><ext>
+
+so a user's repeat downloads on the same day are served from the cache
+without rendering again, and replacing the original document changes the
+key. The watermark is rendered in the watermark thread pool straight from
+the original into a temporary file next to its cache entry and moved into
+place (concurrent requests for the same entry wait for one render), and the
+entry is then streamed; nothing is read into memory. Hits refresh the entry's mtime, and
+once the cache grows past DOCUMENT_WATERMARK_CACHE_MAX_BYTES the least
+recently used entries (and earlier days, which can no longer be hit) are
+deleted.
+
+Access log rows are buffered in the process and written with bulk_create
+once DOCUMENT_ACCESS_LOG_BATCH_SIZE rows are waiting or the oldest has
+waited DOCUMENT_ACCESS_LOG_FLUSH_SECONDS, and when the process exits.
+
+Usage:
+    path = watermark_cache.get(original_path, request.user)   # None if it cannot be watermarked
+    access_log.add(DocumentAccessLog(...))
+"""
+import atexit
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from utils.document_watermark import DocumentWatermarker, render_pool
+from .models import DocumentAccessLog
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_WATERMARK_CACHE_DIR = getattr(
+    settings, 'DOCUMENT_WATERMARK_CACHE_DIR', os.path.join(settings.BASE_DIR, 'cache', 'watermarks')
+)
+DOCUMENT_WATERMARK_CACHE_MAX_BYTES = getattr(settings, 'DOCUMENT_WATERMARK_CACHE_MAX_BYTES', 512 * 1024 * 1024)
+DOCUMENT_ACCESS_LOG_BATCH_SIZE = getattr(settings, 'DOCUMENT_ACCESS_LOG_BATCH_SIZE', 100)
+DOCUMENT_ACCESS_LOG_FLUSH_SECONDS = getattr(settings, 'DOCUMENT_ACCESS_LOG_FLUSH_SECONDS', 5)
+
+WATERMARKED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.pdf'}
+# Evict down to this share of the limit so eviction does not run on every write
+EVICT_TO = 0.9
+
+
+class WatermarkCache:
+    """Size-bounded LRU cache of watermarked copies on local disk"""
+
+    def __init__(self, root=DOCUMENT_WATERMARK_CACHE_DIR, max_bytes=DOCUMENT_WATERMARK_CACHE_MAX_BYTES,
+                 watermarker=None):
+        self.root = str(root)
+        self.max_bytes = max_bytes
+        self.watermarker = watermarker or DocumentWatermarker()
+        self._lock = threading.Lock()
+        self._size = None  # bytes on disk as last scanned plus writes since; None until the first scan
+        self._day = None
+        self._rendering = {}  # entry path -> Future of its render
+
+    def entry_path(self, source_path, stat, user, day):
+        key = hashlib.sha256(
+            f'{source_path}|{stat.st_size}|{stat.st_mtime_ns}|{user.pk}|{day}'.encode('utf-8')
+        ).hexdigest()
+        return os.path.join(self.root, day, key + os.path.splitext(source_path)[1].lower())
+
+    def get(self, source_path, user, stat=None):
+        """Path of the user's watermarked copy of source_path, or None if it cannot be watermarked"""
+        if os.path.splitext(source_path)[1].lower() not in WATERMARKED_EXTENSIONS:
+            return None
+        stat = stat or os.stat(source_path)
+        day = timezone.localdate().isoformat()
+        path = self.entry_path(source_path, stat, user, day)
+
+        try:
+            os.utime(path)  # mark as recently used
+            return path
+        except FileNotFoundError:
+            pass
+
+        # Render in the watermark thread pool; concurrent requests for the same entry share one render
+        with self._lock:
+            future = self._rendering.get(path)
+            if future is None:
+                future = self._rendering[path] = render_pool().submit(self._render, source_path, user, path)
+                future.add_done_callback(lambda _future: self._rendering.pop(path, None))
+        if not future.result():
+            return None
+
+        self._added(path, day)
+        return path
+
+    def _render(self, source_path, user, path):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=os.path.splitext(path)[1])
+        os.close(fd)
+        try:
+            if not self.watermarker.watermark_document(source_path, user, temp_path):
+                return False
+            os.replace(temp_path, path)
+            return True
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    def _added(self, path, day):
+        with self._lock:
+            if self._size is not None:
+                self._size += os.path.getsize(path)
+            new_day = day != self._day
+            self._day = day
+            due = new_day or self._size is None or self._size > self.max_bytes
+        if due:
+            self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """Delete earlier days and the least recently used entries (other than keep) until under the limit"""
+        today = self._day or timezone.localdate().isoformat()
+        entries = []
+        if os.path.isdir(self.root):
+            for day_dir in os.scandir(self.root):
+                if not day_dir.is_dir():
+                    continue
+                if day_dir.name != today:
+                    shutil.rmtree(day_dir.path, ignore_errors=True)
+                    continue
+                for entry in os.scandir(day_dir.path):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _mtime, size, _path in entries)
+        if total > self.max_bytes:
+            target = self.max_bytes * EVICT_TO
+            for _mtime, size, path in sorted(entries):
+                if total <= target:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.unlink(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
+        with self._lock:
+            self._size = total
+        return total
+
+
+class AccessLogBuffer:
+    """DocumentAccessLog rows waiting to be written in one bulk_create"""
+
+    def __init__(self, batch_size=DOCUMENT_ACCESS_LOG_BATCH_SIZE, flush_seconds=DOCUMENT_ACCESS_LOG_FLUSH_SECONDS):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._rows = []
+        self._oldest = None
+
+    def add(self, row):
+        with self._lock:
+            self._rows.append(row)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            due = len(self._rows) >= self.batch_size or time.monotonic() - self._oldest >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows; returns how many were written"""
+        with self._lock:
+            rows, self._rows = self._rows, []
+            self._oldest = None
+        if rows:
+            DocumentAccessLog.objects.bulk_create(rows, batch_size=self.batch_size)
+        return len(rows)
+
+
+watermark_cache = WatermarkCache()
+access_log = AccessLogBuffer()
+
+
+@atexit.register
+def _flush_access_log():
+    try:
+        access_log.flush()
+    except Exception:
+        logger.exception("Writing buffered document access logs failed")
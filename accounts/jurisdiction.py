@@ -0,0 +1,273 @@
+"""
+Jurisdiction scoping for admin dashboards.
+
+An admin's scope (province, region, LFA or club) is turned into SQL filters
+instead of walking member.current_club.lfa.region.province in Python:
+
+* jurisdiction_clubs() - clubs within the scope;
+* jurisdiction_members() - members whose current club lies in the scope,
+  via an indexed subquery on the club hierarchy;
+* jurisdiction_users() - user accounts assigned to the scope;
+* jurisdiction_invoices() - invoices of the scope's members plus the
+  scope organisation's own invoices;
+* keyset_page() - one page of a scoped queryset in a fixed sort order,
+  continued from an opaque cursor rather than an OFFSET.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
+
+from geography.models import Club
+
+DEFAULT_PAGE_SIZE = 50
+
+# role -> (scope level, CustomUser field holding the admin's organisation)
+ADMIN_SCOPES = {
+    'ADMIN_PROVINCE': ('province', 'province'),
+    'ADMIN_REGION': ('region', 'region'),
+    'ADMIN_LOCAL_FED': ('lfa', 'local_federation'),
+    'CLUB_ADMIN': ('club', 'club'),
+}
+
+# Club filter for each scope level
+CLUB_SCOPE_LOOKUPS = {
+    'province': 'localfootballassociation__region__province',
+    'region': 'localfootballassociation__region',
+    'lfa': 'localfootballassociation',
+}
+
+# CustomUser filter for each scope level
+USER_SCOPE_LOOKUPS = {
+    'province': 'province',
+    'region': 'region',
+    'lfa': 'local_federation',
+    'club': 'club',
+}
+
+# Member sort orders: name -> fields (the last one must be unique)
+MEMBER_SORTS = {
+    'name': ('sort_last_name', 'sort_first_name', 'id'),
+    '-name': ('-sort_last_name', '-sort_first_name', '-id'),
+    'newest': ('-created', '-id'),
+    'oldest': ('created', 'id'),
+    'safa_id': ('safa_id', 'id'),
+}
+DEFAULT_MEMBER_SORT = 'name'
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded or does not fit the sort"""
+
+
+def get_admin_scope(user):
+    """
+    (level, organisation) for an admin user: (None, None) for national admins
+    and superusers, who see everything, and ('none', None) for everyone else.
+    """
+    if user.is_superuser or user.role == 'ADMIN_NATIONAL':
+        return None, None
+    if user.role in ADMIN_SCOPES:
+        level, field = ADMIN_SCOPES[user.role]
+        organisation = getattr(user, field)
+        if organisation is not None:
+            return level, organisation
+    return 'none', None
+
+
+def request_admin_scope(request):
+    """get_admin_scope() for request.user, resolved once per request"""
+    if not hasattr(request, '_admin_scope'):
+        request._admin_scope = get_admin_scope(request.user)
+    return request._admin_scope
+
+
+def jurisdiction_clubs(level, organisation, queryset=None):
+    """Clubs within the scope"""
+    if queryset is None:
+        queryset = Club.objects.all()
+    if level is None:
+        return queryset
+    if organisation is None or level == 'none':
+        return queryset.none()
+    if level == 'club':
+        return queryset.filter(pk=organisation.pk)
+    return queryset.filter(**{CLUB_SCOPE_LOOKUPS[level]: organisation})
+
+
+def jurisdiction_members(level, organisation, queryset=None):
+    """Members whose current club lies within the scope"""
+    from membership.models import Member
+
+    if queryset is None:
+        queryset = Member.objects.all()
+    if level is None:
+        return queryset
+    if organisation is None or level == 'none':
+        return queryset.none()
+    if level == 'club':
+        return queryset.filter(current_club=organisation)
+    return queryset.filter(current_club__in=jurisdiction_clubs(level, organisation).values('pk'))
+
+
+def jurisdiction_users(level, organisation, queryset=None):
+    """User accounts assigned to the scope"""
+    from .models import CustomUser
+
+    if queryset is None:
+        queryset = CustomUser.objects.all()
+    if level is None:
+        return queryset
+    if organisation is None or level == 'none':
+        return queryset.none()
+    return queryset.filter(**{USER_SCOPE_LOOKUPS[level]: organisation})
+
+
+def jurisdiction_invoices(level, organisation, queryset=None):
+    """Invoices of members in the scope and of the scope organisation itself"""
+    from membership.models import Invoice
+
+    if queryset is None:
+        queryset = Invoice.objects.all()
+    if level is None:
+        return queryset
+    if organisation is None or level == 'none':
+        return queryset.none()
+    if level == 'club':
+        members = Q(member__current_club=organisation)
+    else:
+        members = Q(member__current_club__in=jurisdiction_clubs(level, organisation).values('pk'))
+    own = Q(content_type=ContentType.objects.get_for_model(organisation), object_id=organisation.pk)
+    return queryset.filter(members | own)
+
+
+def with_member_sort_keys(queryset):
+    """Annotate the NULL-free name columns the member sorts use"""
+    return queryset.annotate(
+        sort_last_name=Coalesce('last_name', Value('')),
+        sort_first_name=Coalesce('first_name', Value('')),
+    )
+
+
+# ----------------------------------------------------------------------
+# Keyset pagination
+# ----------------------------------------------------------------------
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'dec': str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+        if 'dec' in value:
+            return Decimal(value['dec'])
+    return value
+
+
+def encode_cursor(values):
+    payload = json.dumps([_encode_value(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(str(e))
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursor('Cursor does not match the sort order')
+    try:
+        return [_decode_value(value) for value in values]
+    except (TypeError, ValueError) as e:
+        raise InvalidCursor(str(e))
+
+
+def _cursor_values(queryset, fields, values):
+    """Cursor values converted to the sort fields' types, so a tampered cursor never reaches the query"""
+    converted = []
+    for field, value in zip(fields, values):
+        if value is None:
+            raise InvalidCursor(f'Cursor has no value for {field}')
+        try:
+            converted.append(queryset.query.resolve_ref(field).output_field.to_python(value))
+        except (TypeError, ValueError, ValidationError) as e:
+            raise InvalidCursor(f'Cursor value for {field} is invalid: {e}')
+    return converted
+
+
+def _after(ordering, values):
+    """Q matching rows that sort after the row with the given values"""
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+class KeysetPage:
+    """One page of results plus the cursor for the next page"""
+
+    def __init__(self, items, next_cursor, sort):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.sort = sort
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=DEFAULT_PAGE_SIZE, sort=None):
+    """
+    Fetch the page after `cursor` from queryset ordered by `ordering`
+    (whose last field must be unique). Reads page_size + 1 rows.
+    """
+    fields = [field.lstrip('-') for field in ordering]
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = _cursor_values(queryset, fields, decode_cursor(cursor, len(ordering)))
+        queryset = queryset.filter(_after(ordering, values))
+
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, field) for field in fields])
+    return KeysetPage(items, next_cursor, sort)
+
+
+def member_page(queryset, sort=None, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """A keyset page of members in one of the MEMBER_SORTS orders"""
+    if sort not in MEMBER_SORTS:
+        sort = DEFAULT_MEMBER_SORT
+    try:
+        return keyset_page(with_member_sort_keys(queryset), MEMBER_SORTS[sort], cursor, page_size, sort)
+    except InvalidCursor:
+        # Stale or tampered cursor: start from the first page
+        return keyset_page(with_member_sort_keys(queryset), MEMBER_SORTS[sort], None, page_size, sort)
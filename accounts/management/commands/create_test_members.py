@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from geography.models import Province, Region, LocalFootballAssociation, Club
+from utils.bulk import bulk_operation
 import random
 
 User = get_user_model()
@@ -16,7 +17,7 @@ class Command(BaseCommand):
         
         # Get geography data
         provinces = list(Province.objects.all())
-        lfas = list(LocalFootballAssociation.objects.all())
+        lfas = list(LocalFootballAssociation.objects.select_related('region__province'))
         clubs = list(Club.objects.filter(status='ACTIVE'))
         
         if not provinces or not lfas:
@@ -25,46 +26,47 @@ class Command(BaseCommand):
             )
             return
         
-        roles = ['player', 'coach', 'official', 'administrator']
+        roles = ['PLAYER', 'OFFICIAL', 'MEMBER']
+        emails = [f'test.member.{i+1}@safa.co.za' for i in range(count)]
+        existing = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
         
         created_count = 0
-        for i in range(count):
-            try:
-                # Random geography selection
-                lfa = random.choice(lfas)
-                region = lfa.region
-                province = region.province
-                club = random.choice(clubs) if clubs else None
-                
-                # Create test user
-                email = f'test.member.{i+1}@safa.co.za'
-                if User.objects.filter(email=email).exists():
+        # Wallet, card and other per-user signal work is applied once at the end
+        with bulk_operation() as bulk:
+            for i, email in enumerate(emails):
+                if email in existing:
                     continue
-                
-                user = User.objects.create_user(
-                    email=email,
-                    password='TestPass123!',
-                    name=f'Test{i+1}',
-                    surname=f'Member{i+1}',
-                    role=random.choice(roles),
-                    province=province,
-                    region=region,
-                    lfa=lfa,
-                    club=club,
-                    membership_status='ACTIVE',
-                    phone_number=f'+27{random.randint(700000000, 799999999)}',
-                    id_number=f'{random.randint(8000000000000, 9999999999999)}'
-                )
-                
-                # Generate SAFA ID
-                user.generate_safa_id()
-                user.save()
-                
-                created_count += 1
-                self.stdout.write(f'✅ Created: {user.get_full_name()} ({user.safa_id})')
-                
-            except Exception as e:
-                self.stdout.write(f'❌ Error creating member {i+1}: {str(e)}')
+                try:
+                    # Random geography selection
+                    lfa = random.choice(lfas)
+                    region = lfa.region
+                    province = region.province
+                    club = random.choice(clubs) if clubs else None
+                    
+                    # Create test user (save() assigns the SAFA ID)
+                    user = User.objects.create_user(
+                        email=email,
+                        password='TestPass123!',
+                        first_name=f'Test{i+1}',
+                        last_name=f'Member{i+1}',
+                        role=random.choice(roles),
+                        province=province,
+                        region=region,
+                        local_federation=lfa,
+                        club=club,
+                        membership_status='ACTIVE',
+                        phone_number=f'+27{random.randint(700000000, 799999999)}',
+                        id_number=f'{random.randint(8000000000000, 9999999999999)}'
+                    )
+                    
+                    created_count += 1
+                    self.stdout.write(f'✅ Created: {user.get_full_name()} ({user.safa_id})')
+                    
+                except Exception as e:
+                    self.stdout.write(f'❌ Error creating member {i+1}: {str(e)}')
+        
+        for effect, items in bulk.summary().items():
+            self.stdout.write(f'   {effect}: applied for {items}')
         
         self.stdout.write(
             self.style.SUCCESS(f'🎉 Created {created_count} test members')
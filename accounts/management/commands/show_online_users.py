@@ -1,32 +1,37 @@
 from django.core.management.base import BaseCommand
-from django.contrib.sessions.models import Session
-from django.utils import timezone
-from accounts.models import CustomUser
+
+from accounts.presence import online_users, presence_counts
+
 
 class Command(BaseCommand):
     help = 'Displays users who are currently online.'
 
-    def handle(self, *args, **options):
-        # Get all non-expired sessions
-        sessions = Session.objects.filter(expire_date__gte=timezone.now())
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutes',
+            type=int,
+            default=15,
+            help='Count users seen within this many minutes as online (default 15)'
+        )
 
-        # Get user IDs from sessions
-        user_ids = []
-        for session in sessions:
-            session_data = session.get_decoded()
-            user_id = session_data.get('_auth_user_id')
-            if user_id:
-                user_ids.append(user_id)
+    def handle(self, *args, **options):
+        counts = presence_counts()
+        self.stdout.write(
+            f"Online: {counts['online_5']} in the last 5 minutes, {counts['online_15']} in the last 15 minutes; "
+            f"{counts['active_today']} active today"
+        )
 
-        if not user_ids:
+        users = online_users(minutes=options['minutes']).select_related('province', 'region', 'presence')
+        if not users:
             self.stdout.write(self.style.SUCCESS('No users are currently online.'))
             return
 
-        # Get user objects
-        online_users = CustomUser.objects.filter(id__in=user_ids).select_related('province', 'region')
-
-        self.stdout.write(self.style.SUCCESS(f'Found {len(online_users)} online user(s):'))
-        for user in online_users:
+        self.stdout.write(self.style.SUCCESS(f'Found {len(users)} online user(s):'))
+        for user in users:
             province = user.province.name if user.province else 'N/A'
             region = user.region.name if user.region else 'N/A'
-            self.stdout.write(f'- {user.get_full_name()} ({user.email}) - Province: {province}, Region: {region}')
+            last_seen = user.presence.last_seen.strftime('%H:%M:%S')
+            self.stdout.write(
+                f'- {user.get_full_name()} ({user.email}) - Province: {province}, Region: {region}, '
+                f'last seen {last_seen}'
+            )
@@ -1,14 +1,19 @@
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 from django.contrib import messages
 from django.http import HttpResponseRedirect
-from django.http import HttpResponse, Http404
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.urls import resolve
 from django.utils import timezone
+from accounts.document_delivery import access_log, watermark_cache
 from accounts.models import DocumentAccessLog
-from utils.document_watermark import DocumentWatermarker
+from utils.file_responses import ranged_file_response
+import logging
+import mimetypes
 import os
-import tempfile
+
+logger = logging.getLogger(__name__)
 
 class AdminFormErrorMiddleware(MiddlewareMixin):
     """
@@ -42,7 +47,6 @@ class DocumentAccessMiddleware(MiddlewareMixin):
     
     def __init__(self, get_response):
         self.get_response = get_response
-        self.watermarker = DocumentWatermarker()
         # Document paths that should be tracked and watermarked
         self.tracked_paths = [
             '/media/id_documents/',
@@ -71,12 +75,13 @@ class DocumentAccessMiddleware(MiddlewareMixin):
     def _handle_document_access(self, request):
         """Handle document access with logging and watermarking"""
         try:
-            # Get the file path from URL
-            file_path = request.path.replace('/media/', '')
-            full_path = os.path.join('media', file_path)
-            
-            if not os.path.exists(full_path):
+            # Get the file path from URL, refusing anything outside MEDIA_ROOT
+            file_path = request.path.replace('/media/', '', 1)
+            media_root = os.path.realpath(settings.MEDIA_ROOT)
+            full_path = os.path.realpath(os.path.join(media_root, file_path))
+            if not full_path.startswith(media_root + os.sep) or not os.path.isfile(full_path):
                 raise Http404("Document not found")
+            stat = os.stat(full_path)
             
             # Determine document type and owner
             doc_type, doc_owner = self._determine_document_info(request.path)
@@ -91,14 +96,17 @@ class DocumentAccessMiddleware(MiddlewareMixin):
                 )
                 raise Http404("Document not found")
             
+            # Watermarked copy from the per-user, per-day cache (rendered on a miss)
+            watermarked_path = self._get_watermarked_copy(request, full_path, stat)
+
             # Log successful access
             self._log_document_access(
                 request, file_path, doc_type, doc_owner,
-                action='download', success=True, watermarked=True
+                action='download', success=True, watermarked=watermarked_path is not None,
+                file_size=stat.st_size
             )
             
-            # Apply watermark and serve document
-            return self._serve_watermarked_document(request, full_path)
+            return self._serve_document(request, watermarked_path or full_path, full_path)
             
         except Exception as e:
             # Log failed access
@@ -151,14 +159,9 @@ class DocumentAccessMiddleware(MiddlewareMixin):
         return False
     
     def _log_document_access(self, request, file_path, doc_type, doc_owner, 
-                           action='view', success=True, watermarked=False, notes=''):
-        """Log document access to database"""
+                           action='view', success=True, watermarked=False, notes='', file_size=None):
+        """Queue a document access log row; rows are written in batches"""
         try:
-            # Get file size
-            file_size = None
-            if success and os.path.exists(os.path.join('media', file_path)):
-                file_size = os.path.getsize(os.path.join('media', file_path))
-            
             # Get client IP
             x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
             if x_forwarded_for:
@@ -166,7 +169,7 @@ class DocumentAccessMiddleware(MiddlewareMixin):
             else:
                 ip = request.META.get('REMOTE_ADDR', '127.0.0.1')
             
-            DocumentAccessLog.objects.create(
+            access_log.add(DocumentAccessLog(
                 user=request.user,
                 document_type=doc_type,
                 document_name=os.path.basename(file_path),
@@ -178,41 +181,24 @@ class DocumentAccessMiddleware(MiddlewareMixin):
                 watermarked=watermarked,
                 success=success,
                 notes=notes
-            )
+            ))
         except Exception as e:
             # Don't fail the request if logging fails
             print(f"Failed to log document access: {e}")
     
-    def _serve_watermarked_document(self, request, file_path):
-        """Serve document with watermark applied"""
+    def _get_watermarked_copy(self, request, file_path, stat):
+        """Cached watermarked copy for this user, or None to serve the original"""
         try:
-            # Create watermarked copy
-            watermarked_content = self.watermarker.create_watermarked_copy(
-                open(file_path, 'rb'), request.user
-            )
-            
-            # Determine content type
-            content_type = 'application/octet-stream'
-            if file_path.lower().endswith('.pdf'):
-                content_type = 'application/pdf'
-            elif file_path.lower().endswith(('.jpg', '.jpeg')):
-                content_type = 'image/jpeg'
-            elif file_path.lower().endswith('.png'):
-                content_type = 'image/png'
-            
-            # Create response with watermarked content
-            response = HttpResponse(watermarked_content, content_type=content_type)
-            
-            # Set filename for download
-            filename = os.path.basename(file_path)
-            response['Content-Disposition'] = f'inline; filename="{filename}"'
-            
-            return response
-            
-        except Exception as e:
-            print(f"Error serving watermarked document: {e}")
-            # Fall back to serving original file
-            with open(file_path, 'rb') as f:
-                response = HttpResponse(f.read(), content_type='application/octet-stream')
-                response['Content-Disposition'] = f'inline; filename="{os.path.basename(file_path)}"'
-                return response
+            return watermark_cache.get(file_path, request.user, stat=stat)
+        except Exception:
+            logger.exception(f"Error watermarking document {file_path}")
+            return None
+    
+    def _serve_document(self, request, path, original_path):
+        """Stream the document from disk, honouring Range requests"""
+        content_type, _encoding = mimetypes.guess_type(original_path)
+        return ranged_file_response(
+            request, path,
+            content_type=content_type or 'application/octet-stream',
+            filename=os.path.basename(original_path)
+        )
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_customuser_role'),
+        ('geography', '0005_boundaries_and_geocoded_address'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserPresence',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='presence', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('last_seen', models.DateTimeField(db_index=True)),
+                ('province', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='geography.province')),
+            ],
+            options={
+                'verbose_name': 'User Presence',
+                'verbose_name_plural': 'User Presence',
+                'indexes': [models.Index(fields=['province', 'last_seen'], name='accounts_us_provinc_c65706_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager, Permission
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.crypto import get_random_string
 from django.utils.functional import cached_property
@@ -244,21 +246,41 @@ class CustomUser(AbstractUser):
     association = models.ForeignKey('geography.Association', on_delete=models.SET_NULL, null=True, blank=True)
     mother_body = models.ForeignKey('geography.MotherBody', on_delete=models.SET_NULL, null=True, blank=True)
 
+    # Fields cached token authentication depends on (see accounts.token_auth)
+    TOKEN_AUTH_FIELDS = ('is_active', 'password')
+
+    # Their values as last read from / written to the database (see from_db)
+    _token_auth_state = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if set(cls.TOKEN_AUTH_FIELDS).issubset(field_names):
+            instance._token_auth_state = instance.get_token_auth_state()
+        return instance
+
+    def get_token_auth_state(self):
+        return tuple(getattr(self, field) for field in self.TOKEN_AUTH_FIELDS)
+
     def save(self, *args, **kwargs):
         # Only generate SAFA ID if none is provided and this is a new user
         if not self.safa_id and not self.pk:
             self.safa_id = self._generate_unique_safa_id()
+        elif self.safa_id and not self.pk:
+            # Manually entered (e.g. previous season) ID: keep it out of the pool
+            from utils.safa_ids import mark_safa_id_used
+            mark_safa_id_used(self.safa_id, self._meta.label)
         super().save(*args, **kwargs)
 
     def _generate_unique_safa_id(self):
-        """Generates a unique 5-character alphanumeric SAFA ID."""
-        import string
-        import random
-        while True:
-            chars = string.ascii_uppercase + string.digits
-            safa_id = ''.join(random.choices(chars, k=5))
-            if not CustomUser.objects.filter(safa_id=safa_id).exists():
-                return safa_id
+        """Claims a unique 5-character alphanumeric SAFA ID from the shared pool."""
+        from utils.safa_ids import claim_safa_id
+        return claim_safa_id(self._meta.label)
+
+    def generate_safa_id(self):
+        """Assign a SAFA ID if the user does not have one yet (caller saves)."""
+        if not self.safa_id:
+            self.safa_id = self._generate_unique_safa_id()
 
     # Specify the custom manager
     objects = CustomUserManager()
@@ -526,6 +548,26 @@ class RolePermissions:
 
 
 
+class UserPresence(models.Model):
+    """When each user was last seen, flushed in batches by accounts.presence"""
+    user = models.OneToOneField(
+        CustomUser, on_delete=models.CASCADE, primary_key=True, related_name='presence'
+    )
+    last_seen = models.DateTimeField(db_index=True)
+    # Copied from the user at flush time so province breakdowns need no join
+    province = models.ForeignKey(
+        Province, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=['province', 'last_seen'])]
+        verbose_name = 'User Presence'
+        verbose_name_plural = 'User Presence'
+
+    def __str__(self):
+        return f"{self.user_id} last seen {self.last_seen}"
+
+
 class DocumentAccessLog(models.Model):
     """Track all document downloads and access"""
     DOCUMENT_TYPES = [
@@ -582,5 +624,20 @@ class DocumentAccessLog(models.Model):
         return f"{size:.1f} TB"
 
 
+@receiver(post_save, sender=CustomUser)
+def revoke_cached_tokens_on_auth_change(sender, instance, created, update_fields=None, **kwargs):
+    """Drop cached token lookups once a user's is_active or password changes (see token_auth)"""
+    if update_fields is not None and not set(CustomUser.TOKEN_AUTH_FIELDS) & set(update_fields):
+        return  # e.g. update_last_login()
+    state = instance.get_token_auth_state()
+    if not created and state != instance._token_auth_state:
+        from .token_auth import revoke_user_tokens
+        revoke_user_tokens(instance.pk)
+    instance._token_auth_state = state
 
 
+@receiver(post_delete, sender='authtoken.Token')
+def revoke_cached_tokens(sender, instance, **kwargs):
+    """Drop cached token lookups once a token is deleted (see token_auth)"""
+    from .token_auth import revoke_user_tokens
+    revoke_user_tokens(instance.user_id)
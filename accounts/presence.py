@@ -0,0 +1,161 @@
+# accounts/presence.py
+"""
+Who is online, without decoding sessions.
+
+PresenceMiddleware records when each signed-in user was last seen. A user is
+recorded at most once every PRESENCE_THROTTLE_SECONDS: a per-process map
+answers most requests without I/O, and a key in the shared cache stops the
+other worker processes from recording the same user again. Recorded visits
+are buffered in the process and written to UserPresence with one bulk upsert
+every PRESENCE_FLUSH_SECONDS.
+
+"Online in the last 5/15 minutes" and "active today" are range queries on
+UserPresence.last_seen, and the per-province breakdown uses the
+(province, last_seen) index. Figures lag real activity by at most the
+throttle plus the flush interval.
+
+Usage:
+    counts = presence_counts()          # {'online_5': .., 'online_15': .., 'active_today': ..}
+    rows = province_breakdown()
+    users = online_users(minutes=15)
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from utils.shared_cache import get_shared_cache
+from .models import CustomUser, UserPresence
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_THROTTLE_SECONDS = getattr(settings, 'PRESENCE_THROTTLE_SECONDS', 60)
+PRESENCE_FLUSH_SECONDS = getattr(settings, 'PRESENCE_FLUSH_SECONDS', 30)
+PRESENCE_CACHE_KEY = 'accounts:presence:{}'
+ONLINE_MINUTES = (5, 15)
+
+
+class PresenceTracker:
+    """Throttled, buffered last-seen recording for one process"""
+
+    def __init__(self, throttle_seconds=PRESENCE_THROTTLE_SECONDS, flush_seconds=PRESENCE_FLUSH_SECONDS):
+        self.throttle_seconds = throttle_seconds
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._recorded = {}  # user id -> timestamp last recorded (here or by another process)
+        self._pending = {}   # user id -> (last seen, province id), waiting for the next flush
+        self._flushed_at = time.monotonic()
+
+    def touch(self, user, now=None):
+        """Note that user was seen; returns True if the visit was recorded"""
+        now = now or timezone.now()
+        seen = now.timestamp()
+        recorded = self._recorded.get(user.pk)
+        if recorded is not None and seen - recorded < self.throttle_seconds:
+            return False
+
+        cache = get_shared_cache()
+        key = PRESENCE_CACHE_KEY.format(user.pk)
+        recorded = cache.get(key)
+        if recorded is not None and seen - recorded < self.throttle_seconds:
+            self._recorded[user.pk] = recorded
+            return False
+        cache.set(key, seen, self.throttle_seconds)
+
+        with self._lock:
+            self._recorded[user.pk] = seen
+            self._pending[user.pk] = (now, user.province_id)
+        return True
+
+    def flush_if_due(self):
+        if time.monotonic() - self._flushed_at >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """Write buffered visits in one bulk upsert; returns the rows written"""
+        cutoff = time.time() - self.throttle_seconds
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed_at = time.monotonic()
+            self._recorded = {pk: seen for pk, seen in self._recorded.items() if seen >= cutoff}
+        if not pending:
+            return 0
+
+        UserPresence.objects.bulk_create(
+            [
+                UserPresence(user_id=user_id, last_seen=last_seen, province_id=province_id)
+                for user_id, (last_seen, province_id) in pending.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['last_seen', 'province'],
+            batch_size=500,
+        )
+        return len(pending)
+
+
+presence = PresenceTracker()
+
+
+class PresenceMiddleware:
+    """Records signed-in users' visits; place after AuthenticationMiddleware"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, 'user', None)
+        try:
+            if user is not None and user.is_authenticated:
+                presence.touch(user)
+            presence.flush_if_due()
+        except Exception:
+            # Presence is best effort and must never fail a request
+            logger.exception("Recording user presence failed")
+        return response
+
+
+# ----------------------------------------------------------------------
+# Queries
+# ----------------------------------------------------------------------
+
+def _windows(now=None):
+    """{label: since} for the online windows and today"""
+    now = now or timezone.now()
+    windows = {f'online_{minutes}': now - timedelta(minutes=minutes) for minutes in ONLINE_MINUTES}
+    windows['active_today'] = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    return windows
+
+
+def _counts(windows):
+    return {label: Count('pk', filter=Q(last_seen__gte=since)) for label, since in windows.items()}
+
+
+def presence_counts(now=None):
+    """Users online in each window and active today, in one query"""
+    windows = _windows(now)
+    return UserPresence.objects.filter(last_seen__gte=min(windows.values())).aggregate(**_counts(windows))
+
+
+def province_breakdown(now=None):
+    """presence_counts per province, as dicts with province_id and province_name"""
+    windows = _windows(now)
+    return list(
+        UserPresence.objects.filter(last_seen__gte=min(windows.values()))
+        .values('province_id', province_name=F('province__name'))
+        .annotate(**_counts(windows))
+        .order_by('province_name')
+    )
+
+
+def online_users(minutes=15, now=None):
+    """Users seen in the last `minutes`, most recent first"""
+    now = now or timezone.now()
+    return CustomUser.objects.filter(
+        presence__last_seen__gte=now - timedelta(minutes=minutes)
+    ).order_by('-presence__last_seen')
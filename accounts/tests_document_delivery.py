@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from utils.document_watermark import DocumentWatermarker
+from utils.file_responses import parse_range
+from .document_delivery import AccessLogBuffer, WatermarkCache, access_log, watermark_cache
+from .middleware import DocumentAccessMiddleware
+from .models import CustomUser, DocumentAccessLog
+
+
+class CountingWatermarker(DocumentWatermarker):
+
+    def __init__(self):
+        super().__init__()
+        self.renders = 0
+
+    def watermark_document(self, file_path, user, output_path=None):
+        self.renders += 1
+        return super().watermark_document(file_path, user, output_path)
+
+
+class ParseRangeTests(SimpleTestCase):
+
+    def test_single_ranges(self):
+        self.assertEqual(parse_range('bytes=0-9', 100), (0, 9))
+        self.assertEqual(parse_range('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-10', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=50-500', 100), (50, 99))
+        self.assertFalse(parse_range('bytes=100-', 100))
+        self.assertIsNone(parse_range('bytes=0-1,5-9', 100))
+        self.assertIsNone(parse_range(None, 100))
+
+
+class DocumentDeliveryTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        os.makedirs(os.path.join(self.media_root, 'id_documents'))
+        self.document = os.path.join(self.media_root, 'id_documents', 'player_id.png')
+        Image.new('RGB', (400, 300), 'white').save(self.document)
+
+        self.user = CustomUser.objects.create_superuser(
+            email='documents@example.com',
+            password='ComplexPassword123!',
+            first_name='Document',
+            last_name='Admin'
+        )
+
+    def cache(self, **kwargs):
+        return WatermarkCache(root=os.path.join(self.media_root, 'cache'), watermarker=CountingWatermarker(), **kwargs)
+
+    def test_repeat_downloads_are_served_from_the_cache(self):
+        cache = self.cache()
+        path = cache.get(self.document, self.user)
+        self.assertEqual(cache.get(self.document, self.user), path)
+        self.assertEqual(cache.watermarker.renders, 1)
+        with Image.open(path) as image:
+            self.assertEqual(image.size, (400, 300))
+
+        other = CustomUser.objects.create_user(email='other@example.com', password='ComplexPassword123!')
+        self.assertNotEqual(cache.get(self.document, other), path)
+        self.assertEqual(cache.watermarker.renders, 2)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = self.cache()
+        first = cache.get(self.document, self.user)
+        cache.max_bytes = os.path.getsize(first) + 1
+        second = cache.get(self.document, CustomUser.objects.create_user(email='next@example.com'))
+        self.assertFalse(os.path.exists(first))
+        self.assertTrue(os.path.exists(second))
+
+    def test_access_logs_are_written_in_batches(self):
+        buffer = AccessLogBuffer(batch_size=3, flush_seconds=60)
+        for _ in range(2):
+            buffer.add(DocumentAccessLog(user=self.user, document_type='other', document_name='a.pdf',
+                                         document_owner='a', ip_address='127.0.0.1'))
+        self.assertFalse(DocumentAccessLog.objects.exists())
+        with self.assertNumQueries(1):
+            buffer.add(DocumentAccessLog(user=self.user, document_type='other', document_name='a.pdf',
+                                         document_owner='a', ip_address='127.0.0.1'))
+        self.assertEqual(DocumentAccessLog.objects.count(), 3)
+
+    def test_middleware_streams_requested_range(self):
+        request = RequestFactory().get('/media/id_documents/player_id.png', HTTP_RANGE='bytes=0-9')
+        request.user = self.user
+        self.addCleanup(setattr, watermark_cache, 'root', watermark_cache.root)
+        watermark_cache.root = os.path.join(self.media_root, 'cache')
+        with override_settings(MEDIA_ROOT=self.media_root):
+            response = DocumentAccessMiddleware(lambda request: HttpResponse()).process_request(request)
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(len(b''.join(response.streaming_content)), 10)
+        self.assertTrue(response['Content-Range'].startswith('bytes 0-9/'))
+        response.close()
+
+        access_log.flush()
+        log = DocumentAccessLog.objects.get()
+        self.assertTrue(log.success and log.watermarked)
@@ -0,0 +1,84 @@
+from datetime import date
+
+from django.test import TestCase
+
+from geography.models import Club, Country, LocalFootballAssociation, NationalFederation, Province, Region
+from membership.models import Member
+from .jurisdiction import encode_cursor, get_admin_scope, jurisdiction_members, jurisdiction_users, member_page
+from .models import CustomUser
+
+
+class JurisdictionTests(TestCase):
+
+    def setUp(self):
+        country = Country.objects.create(name='South Africa', code='RSA')
+        self.federation = NationalFederation.objects.create(name='SAFA', country=country)
+        self.province = Province.objects.create(name='Gauteng', national_federation=self.federation)
+        other_province = Province.objects.create(name='Limpopo', national_federation=self.federation)
+        self.region = Region.objects.create(name='Region A', province=self.province)
+        other_region = Region.objects.create(name='Region B', province=other_province)
+        self.lfa = LocalFootballAssociation.objects.create(name='LFA A', region=self.region)
+        other_lfa = LocalFootballAssociation.objects.create(name='LFA B', region=other_region)
+        self.club = Club.objects.create(name='Club A', localfootballassociation=self.lfa)
+        other_club = Club.objects.create(name='Club B', localfootballassociation=other_lfa)
+
+        for number in range(7):
+            self.create_member(f'In{number}', 'Zulu' if number % 2 else 'Adams', self.club)
+        for number in range(3):
+            self.create_member(f'Out{number}', 'Botha', other_club)
+        self.create_member('Clubless', 'Nobody', None)
+
+    def create_member(self, first_name, last_name, club):
+        return Member.objects.create(
+            first_name=first_name, last_name=last_name, role='PLAYER', date_of_birth=date(1990, 1, 1),
+            current_club=club, national_federation=self.federation
+        )
+
+    def test_scope_is_filtered_in_sql(self):
+        for level, organisation in [('province', self.province), ('region', self.region),
+                                    ('lfa', self.lfa), ('club', self.club)]:
+            members = jurisdiction_members(level, organisation)
+            self.assertEqual(members.count(), 7, level)
+            self.assertFalse(members.exclude(current_club=self.club).exists())
+        self.assertEqual(jurisdiction_members(None, None).count(), 11)
+        self.assertEqual(jurisdiction_members('province', None).count(), 0)
+
+    def test_keyset_pages_walk_the_scope_in_order(self):
+        members = jurisdiction_members('province', self.province)
+        seen = []
+        cursor = None
+        while True:
+            with self.assertNumQueries(1):
+                page = member_page(members, 'name', cursor, page_size=3)
+            seen.extend(page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        expected = sorted(members, key=lambda member: (member.last_name, member.first_name, member.pk))
+        self.assertEqual(seen, expected)
+
+    def test_newest_sort_and_bad_cursor(self):
+        members = jurisdiction_members('club', self.club)
+        first = member_page(members, 'newest', page_size=4)
+        second = member_page(members, 'newest', first.next_cursor, page_size=4)
+        self.assertEqual(len(first) + len(second), 7)
+        self.assertFalse(set(first.items) & set(second.items))
+        # Undecodable cursors and cursors whose values do not fit the sort restart from the first page
+        for cursor in ('not-a-cursor', encode_cursor(['yesterday', 'abc']), encode_cursor([{'dt': 'nope'}, 1]),
+                       encode_cursor([{'dt': 5}, 1]), encode_cursor([None, 1])):
+            self.assertEqual(list(member_page(members, 'newest', cursor, page_size=4)), first.items, cursor)
+        name_cursor = encode_cursor(['Member', 'Test', 'not-an-id'])
+        self.assertEqual(list(member_page(members, 'name', name_cursor, page_size=4)),
+                         list(member_page(members, 'name', page_size=4)))
+
+    def test_admin_user_scope(self):
+        admin = CustomUser.objects.create_user(
+            email='province-admin@example.com', password='ComplexPassword123!',
+            first_name='Province', last_name='Admin', role='ADMIN_PROVINCE', province=self.province
+        )
+        self.assertEqual(get_admin_scope(admin), ('province', self.province))
+        self.assertEqual(list(jurisdiction_users(*get_admin_scope(admin))), [admin])
+
+        admin.province = None
+        self.assertEqual(jurisdiction_users(*get_admin_scope(admin)).count(), 0)
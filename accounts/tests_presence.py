@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from geography.models import Country, NationalFederation, Province
+from .models import CustomUser, UserPresence
+from .presence import PresenceTracker, online_users, presence_counts, province_breakdown
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'presence'},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PresenceTests(TestCase):
+
+    def setUp(self):
+        country = Country.objects.create(name='South Africa', code='RSA')
+        federation = NationalFederation.objects.create(name='SAFA', country=country)
+        self.gauteng = Province.objects.create(name='Gauteng', national_federation=federation)
+        self.limpopo = Province.objects.create(name='Limpopo', national_federation=federation)
+        self.users = [
+            CustomUser.objects.create_user(
+                email=f'online{number}@example.com',
+                password='ComplexPassword123!',
+                first_name='Online',
+                last_name=str(number),
+                province=self.gauteng if number < 2 else self.limpopo
+            )
+            for number in range(3)
+        ]
+
+    def test_visits_are_throttled_across_processes_and_flushed_in_one_query(self):
+        now = timezone.now()
+        tracker = PresenceTracker(throttle_seconds=60, flush_seconds=30)
+        self.assertTrue(tracker.touch(self.users[0], now=now))
+        self.assertFalse(tracker.touch(self.users[0], now=now + timedelta(seconds=10)))
+        # Another worker process sees the shared cache key
+        self.assertFalse(PresenceTracker().touch(self.users[0], now=now + timedelta(seconds=20)))
+        tracker.touch(self.users[1], now=now)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(tracker.flush(), 2)
+        self.assertEqual(UserPresence.objects.get(user=self.users[1]).province, self.gauteng)
+
+        later = now + timedelta(seconds=90)
+        self.assertTrue(tracker.touch(self.users[0], now=later))
+        tracker.flush()
+        self.assertEqual(UserPresence.objects.get(user=self.users[0]).last_seen, later)
+        self.assertEqual(tracker.flush(), 0)
+
+    def test_online_windows_and_province_breakdown(self):
+        now = timezone.now()
+        for user, minutes in zip(self.users, [1, 10, 3]):
+            UserPresence.objects.create(
+                user=user, last_seen=now - timedelta(minutes=minutes), province=user.province
+            )
+
+        counts = presence_counts(now=now)
+        self.assertEqual((counts['online_5'], counts['online_15']), (2, 3))
+        self.assertEqual(list(online_users(minutes=5, now=now)), [self.users[0], self.users[2]])
+
+        rows = {row['province_name']: row for row in province_breakdown(now=now)}
+        self.assertEqual((rows['Gauteng']['online_5'], rows['Gauteng']['online_15']), (1, 2))
+        self.assertEqual((rows['Limpopo']['online_5'], rows['Limpopo']['online_15']), (1, 1))
@@ -0,0 +1,106 @@
+from django.contrib.auth.models import update_last_login
+from django.test import TestCase, override_settings
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from utils.shared_cache import get_shared_cache
+from .api_views import MobileUserProfileView, mobile_change_password
+from .models import CustomUser
+from .token_auth import TOKEN_CACHE_KEY, CachedTokenAuthentication, TokenCache, token_cache
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'token-auth'},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedTokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        get_shared_cache().clear()
+        token_cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email='mobile@example.com',
+            password='ComplexPassword123!',
+            first_name='Mobile',
+            last_name='User'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+
+    def assertSameFailure(self, key):
+        with self.assertRaises(exceptions.AuthenticationFailed) as uncached:
+            TokenAuthentication().authenticate_credentials(key)
+        with self.assertRaises(exceptions.AuthenticationFailed) as cached:
+            self.auth.authenticate_credentials(key)
+        self.assertEqual(str(cached.exception.detail), str(uncached.exception.detail))
+
+    def test_repeat_lookups_skip_the_database(self):
+        self.auth.authenticate_credentials(self.token.key)
+        self.auth.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, token = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual((user, token), TokenAuthentication().authenticate_credentials(self.token.key))
+        self.assertIs(token.user, user)
+
+        # Another worker process finds the entry in the shared cache and only loads the user
+        other_process = TokenCache()
+        with self.assertNumQueries(1):
+            token = other_process.get(self.token.key, self.auth.load_token, self.auth.load_user_token)
+        self.assertEqual((token, token.user), (self.token, self.user))
+        self.assertEqual(other_process.stats.as_dict()['shared_hits'], 1)
+
+    def test_shared_cache_holds_no_credentials(self):
+        for _ in range(2):
+            self.auth.authenticate_credentials(self.token.key)
+        entry = get_shared_cache().get(TOKEN_CACHE_KEY.format(TokenCache.key_hash(self.token.key)))
+        self.assertEqual(entry, (self.user.pk, TokenCache.generation(self.user.pk)))
+
+    def test_unrelated_saves_keep_cached_tokens(self):
+        self.auth.authenticate_credentials(self.token.key)
+        revocations = token_cache.stats.revocations
+        update_last_login(None, self.user)
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertEqual(token_cache.stats.revocations, revocations)
+
+        self.user.set_password('EvenMoreComplex456!')
+        self.user.save()
+        self.assertGreater(token_cache.stats.revocations, revocations)
+
+    def test_deactivation_and_logout_revoke_immediately(self):
+        other_process = TokenCache()
+        for _ in range(2):
+            self.auth.authenticate_credentials(self.token.key)
+            other_process.get(self.token.key, self.auth.load_token, self.auth.load_user_token)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertSameFailure(self.token.key)
+        self.assertFalse(other_process.get(self.token.key, self.auth.load_token, self.auth.load_user_token).user.is_active)
+
+        self.user.is_active = True
+        self.user.save()
+        key = self.token.key
+        self.auth.authenticate_credentials(key)
+        self.token.delete()
+        self.assertSameFailure(key)
+
+    def test_password_change_refreshes_the_cached_user(self):
+        factory = APIRequestFactory()
+        headers = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        for _ in range(2):
+            response = MobileUserProfileView.as_view()(factory.get('/api/mobile/user/profile/', **headers))
+            self.assertEqual(response.status_code, 200)
+
+        response = mobile_change_password(factory.post('/api/mobile/user/change-password/', {
+            'old_password': 'ComplexPassword123!',
+            'new_password': 'EvenMoreComplex456!',
+        }, **headers))
+        self.assertEqual(response.status_code, 200)
+        user, _token = self.auth.authenticate_credentials(self.token.key)
+        self.assertTrue(user.check_password('EvenMoreComplex456!'))
+        self.assertGreater(token_cache.stats.hit_rate, 0)
@@ -0,0 +1,222 @@
+# accounts/token_auth.py
+"""
+Cached token authentication for the mobile API.
+
+DRF's TokenAuthentication loads the Token joined to its user on every request.
+CachedTokenAuthentication keeps that lookup in two tiers:
+
+- a per-process LRU of TOKEN_AUTH_LOCAL_SIZE entries holding the Token and its
+  user, and
+- the shared cache, for TOKEN_AUTH_CACHE_SECONDS, so a token looked up by one
+  worker process is a hit in the others. Only (user_id, generation) is
+  stored there - a shared hit loads the user by primary key - so neither
+  the token key nor the user (and its password hash) reaches the cache.
+
+Tokens are cached under a hash of their key, never the key itself.
+
+Every entry is stamped with its user's token generation, a number kept in the
+shared cache. revoke_user_tokens() gives the user a new generation, and an
+entry is only used while its generation is still current - one small shared
+cache read per request - so revocation takes effect immediately in every
+process. The generation is read before the database, so a revocation that
+races a fill leaves the fill stale rather than the revocation lost; that
+needs the token's user, so a token is only cached from its second lookup on.
+Saving a user with a changed is_active or password, and deleting a token
+(logout), revoke through the receivers in accounts.models, once immediately
+and again when the transaction commits. Other saves (last_login, profile
+edits) leave the cache alone.
+
+Cached users are copied before being returned and go through the same
+is_active check as the uncached path, so both raise the same errors.
+
+Usage:
+    REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] = ['accounts.token_auth.CachedTokenAuthentication', ...]
+    revoke_user_tokens(user.pk)
+    token_cache.stats.as_dict()     # {'local_hits': .., 'shared_hits': .., 'misses': .., 'hit_rate': ..}
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from utils.shared_cache import get_shared_cache
+
+TOKEN_AUTH_CACHE_SECONDS = getattr(settings, 'TOKEN_AUTH_CACHE_SECONDS', 300)
+TOKEN_AUTH_LOCAL_SIZE = getattr(settings, 'TOKEN_AUTH_LOCAL_SIZE', 1024)
+TOKEN_CACHE_KEY = 'accounts:token:{}'
+TOKEN_USER_KEY = 'accounts:token_user:{}'
+TOKEN_GENERATION_KEY = 'accounts:token_generation:{}'
+
+# The messages DRF's TokenAuthentication raises, so cached and uncached lookups fail alike
+INVALID_TOKEN = _('Invalid token.')
+USER_INACTIVE = _('User inactive or deleted.')
+
+
+class TokenCacheStats:
+    """Lookups served by each tier since the process started (or the last reset)"""
+
+    def __init__(self):
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.revocations = 0
+
+    @property
+    def lookups(self):
+        return self.local_hits + self.shared_hits + self.misses
+
+    @property
+    def hit_rate(self):
+        return (self.local_hits + self.shared_hits) / self.lookups if self.lookups else 0.0
+
+    def as_dict(self):
+        return {
+            'local_hits': self.local_hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'revocations': self.revocations,
+            'hit_rate': round(self.hit_rate, 3),
+        }
+
+
+class TokenCache:
+    """Two-tier token -> Token (with its user) cache, validated by per-user generations"""
+
+    def __init__(self, local_size=TOKEN_AUTH_LOCAL_SIZE, timeout=TOKEN_AUTH_CACHE_SECONDS):
+        self.local_size = local_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._local = OrderedDict()  # key hash -> (token, generation, expires at)
+        # Shared entries are key hash -> (user_id, generation)
+        self.stats = TokenCacheStats()
+
+    @staticmethod
+    def key_hash(key):
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def generation(user_id, create=False):
+        """The user's current token generation; with create, one is started if there is none"""
+        cache = get_shared_cache()
+        key = TOKEN_GENERATION_KEY.format(user_id)
+        generation = cache.get(key)
+        if generation is None and create:
+            # Entries never carry None, so an evicted generation invalidates them too
+            cache.add(key, time.time_ns(), None)
+            generation = cache.get(key)
+        return generation
+
+    def get(self, key, load, load_user):
+        """
+        The Token for key, with its user. load(key) fetches it from the
+        database on a miss; load_user(key, user_id) builds it from the user
+        on a shared-cache hit.
+        """
+        key_hash = self.key_hash(key)
+
+        with self._lock:
+            local = self._local.get(key_hash)
+            if local is not None:
+                self._local.move_to_end(key_hash)
+        if local is not None:
+            token, generation, expires = local
+            if time.monotonic() < expires and self.generation(token.user_id) == generation:
+                self.stats.local_hits += 1
+                return token
+            self._discard(key_hash)
+
+        shared = get_shared_cache().get(TOKEN_CACHE_KEY.format(key_hash))
+        if shared is not None:
+            user_id, generation = shared
+            if self.generation(user_id) == generation:
+                self.stats.shared_hits += 1
+                token = load_user(key, user_id)
+                self._remember(key_hash, token, generation)
+                return token
+
+        self.stats.misses += 1
+        # Read the generation before the database, so a revocation racing this
+        # fill leaves the entry stale instead of caching data it revoked. The
+        # user is not known until the token is first loaded, so a token's first
+        # lookup only records its user and is cached from the second onwards.
+        user_id = get_shared_cache().get(TOKEN_USER_KEY.format(key_hash))
+        generation = self.generation(user_id, create=True) if user_id is not None else None
+        token = load(key)
+        if generation is None or token.user_id != user_id:
+            get_shared_cache().set(TOKEN_USER_KEY.format(key_hash), token.user_id, None)
+            return token
+        get_shared_cache().set(TOKEN_CACHE_KEY.format(key_hash),
+                               (token.user_id, generation), self.timeout)
+        self._remember(key_hash, token, generation)
+        return token
+
+    def _remember(self, key_hash, token, generation):
+        with self._lock:
+            self._local[key_hash] = (token, generation, time.monotonic() + self.timeout)
+            self._local.move_to_end(key_hash)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def _discard(self, key_hash):
+        with self._lock:
+            self._local.pop(key_hash, None)
+
+    def revoke(self, user_id):
+        """Invalidate every cached token of the user, in all processes"""
+        get_shared_cache().set(TOKEN_GENERATION_KEY.format(user_id), time.time_ns(), None)
+        with self._lock:
+            for key_hash in [key_hash for key_hash, (token, _generation, _expires) in self._local.items()
+                             if token.user_id == user_id]:
+                del self._local[key_hash]
+        self.stats.revocations += 1
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+
+
+token_cache = TokenCache()
+
+
+def revoke_user_tokens(user_id):
+    """Revoke the user's cached tokens now and again once the current transaction commits"""
+    token_cache.revoke(user_id)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: token_cache.revoke(user_id))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication with token lookups served from token_cache"""
+
+    def load_token(self, key):
+        model = self.get_model()
+        try:
+            return model.objects.select_related('user').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(INVALID_TOKEN)
+
+    def load_user_token(self, key, user_id):
+        try:
+            user = get_user_model().objects.get(pk=user_id)
+        except get_user_model().DoesNotExist:
+            raise exceptions.AuthenticationFailed(INVALID_TOKEN)
+        return self.get_model()(key=key, user=user)
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key, self.load_token, self.load_user_token)
+        user = copy.copy(token.user)
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(USER_INACTIVE)
+
+        token = copy.copy(token)
+        token.user = user
+        return (user, token)
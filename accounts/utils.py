@@ -1,5 +1,3 @@
-import string
-import random
 from django.utils import timezone
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
@@ -42,18 +40,8 @@ def generate_unique_member_email(first_name, last_name, email_type='member'):
 
 def generate_unique_safa_id():
     """Generate a unique SAFA ID that is not in CustomUser or Member model"""
-    from .models import CustomUser
-    from membership.models import Member
-    
-    chars = string.ascii_uppercase + string.digits
-    
-    while True:
-        safa_id = ''.join(random.choices(chars, k=5))
-        
-        # Check if ID already exists in either model
-        if not CustomUser.objects.filter(safa_id=safa_id).exists() and \
-           not Member.objects.filter(safa_id=safa_id).exists():
-            return safa_id
+    from utils.safa_ids import claim_safa_id
+    return claim_safa_id('accounts.utils')
 
 
 def create_member_invoice(user, amount=None, invoice_type='REGISTRATION'):
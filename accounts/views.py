@@ -3,7 +3,10 @@ import logging
 from django.contrib import messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.db.models import Count, Q, Sum
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
@@ -17,15 +20,21 @@ from geography.models import (Association, Club, ClubStatus, Country,
                               LocalFootballAssociation, NationalFederation,
                               Province, Region)
 from membership.models import Invoice, Member, RegistrationWorkflow, InvoiceItem
+from membership.billed_to import resolve_organizations
+from membership.member_search import search_members
 from membership.safa_config_models import SAFASeasonConfig, SAFAFeeStructure
 from supporters.models import SupporterProfile, SupporterPreferences
 
+from . import presence
 from .decorators import role_required
+from .jurisdiction import (MEMBER_SORTS, get_admin_scope, jurisdiction_members,
+                           jurisdiction_users, member_page)
 from .forms import (
     AdvancedMemberSearchForm, ClubAdminAddPlayerForm,
     ClubAdminRegistrationForm, ModernContactForm, ProfileForm,
     RejectMemberForm, RegistrationForm, SettingsForm,
     UpdateProfilePhotoForm, EditPlayerForm, ConfirmPaymentForm, ProofOfPaymentForm)
+from geography.hierarchy import get_snapshot
 from geography.forms import (
     ProvinceComplianceForm,
     RegionComplianceForm,
@@ -274,23 +283,24 @@ def user_registration(request):
 
 # Placeholder functions for missing utilities
 def get_admin_jurisdiction_queryset(user):
-    if user.is_superuser or user.role == 'ADMIN_NATIONAL':
-        return CustomUser.objects.all()
-
-    if user.role == 'ADMIN_PROVINCE':
-        return CustomUser.objects.filter(province=user.province)
-
-    if user.role == 'ADMIN_REGION':
-        return CustomUser.objects.filter(region=user.region)
-
-    if user.role == 'ADMIN_LOCAL_FED':
-        return CustomUser.objects.filter(
-            local_federation=user.local_federation)
+    """User accounts within the admin's province, region, LFA or club"""
+    level, organisation = get_admin_scope(user)
+    return jurisdiction_users(level, organisation)
 
-    if user.role == 'CLUB_ADMIN':
-        return CustomUser.objects.filter(club=user.club)
 
-    return CustomUser.objects.none()
+def get_jurisdiction_member_context(request, level, organisation):
+    """
+    Template context for the members of a jurisdiction: the requested keyset
+    page (?sort=, ?cursor=) and the total member count.
+    """
+    members = jurisdiction_members(level, organisation).select_related('user', 'current_club')
+    page = member_page(members, request.GET.get('sort'), request.GET.get('cursor'))
+    return {
+        'members': page,
+        'member_count': members.count(),
+        'member_sort': page.sort,
+        'member_sorts': list(MEMBER_SORTS),
+    }
 
 
 def can_approve_member(user, member):
@@ -372,8 +382,7 @@ def club_admin_add_player(request):
 
 def get_regions_for_province(request, province_id):
     try:
-        regions = Region.objects.filter(province_id=province_id).order_by('name')
-        return JsonResponse(list(regions.values('id', 'name')), safe=False)
+        return JsonResponse(get_snapshot().regions(province_id), safe=False)
     except Exception as e:
         logger.error(f"Error in get_regions_for_province for province_id {province_id}: {e}")
         return JsonResponse({'error': str(e)}, status=500)
@@ -381,9 +390,7 @@ def get_regions_for_province(request, province_id):
 
 def get_lfas_for_region(request, region_id):
     try:
-        lfas = LocalFootballAssociation.objects.filter(
-            region_id=region_id).order_by('name')
-        return JsonResponse(list(lfas.values('id', 'name')), safe=False)
+        return JsonResponse(get_snapshot().lfas(region_id), safe=False)
     except Exception as e:
         logger.error(f"Error in get_lfas_for_region for region_id {region_id}: {e}")
         return JsonResponse({'error': str(e)}, status=500)
@@ -391,9 +398,7 @@ def get_lfas_for_region(request, region_id):
 
 def get_clubs_for_lfa(request, lfa_id):
     try:
-        clubs = Club.objects.filter(
-            localfootballassociation_id=lfa_id).order_by('name')
-        return JsonResponse(list(clubs.values('id', 'name')), safe=False)
+        return JsonResponse(get_snapshot().clubs(lfa_id=lfa_id), safe=False)
     except Exception as e:
         logger.error(f"Error in get_clubs_for_lfa for lfa_id {lfa_id}: {e}")
         return JsonResponse({'error': str(e)}, status=500)
@@ -991,17 +996,13 @@ def dashboard_stats_api(request):
 @login_required
 def search_members_api(request):
     query = request.GET.get('q', '')
-    members = Member.objects.filter(
-        Q(user__first_name__icontains=query) |
-        Q(user__last_name__icontains=query) |
-        Q(safa_id__icontains=query)
-    ).select_related('user', 'club')[:10]
+    members = search_members(query, Member.objects.select_related('current_club'))[:10]
 
     results = [{
         'id': member.id,
-        'name': member.user.get_full_name(),
+        'name': member.get_full_name(),
         'safa_id': member.safa_id,
-        'club': member.club.name if member.club else 'N/A'
+        'club': member.current_club.name if member.current_club else 'N/A'
     } for member in members]
 
     return JsonResponse(results, safe=False)
@@ -1172,10 +1173,13 @@ def club_invoices(request):
     invoices = []
     if club:
         # Get invoices for members belonging to this club
-        invoices = Invoice.objects.filter(
-            Q(member__current_club=club) | Q(organization=club), # Invoices for members or the club itself
+        # The generic relation cannot be filtered on directly, so match the club
+        # by content type and id
+        club_type = ContentType.objects.get_for_model(Club)
+        invoices = resolve_organizations(Invoice.objects.filter(
+            Q(member__current_club=club) | Q(content_type=club_type, object_id=club.pk), # Invoices for members or the club itself
             status__in=['PENDING', 'PARTIALLY_PAID', 'OVERDUE', 'PENDING_REVIEW'] # Only show relevant statuses
-        ).order_by('-issue_date')
+        ).select_related('member').order_by('-issue_date'))
 
     context = {
         'title': 'Club Invoices',
@@ -1265,6 +1269,8 @@ def national_admin_dashboard(request):
         'pending_clubs': pending_clubs,
         'members': all_members_list,
         'pending_members': pending_members,
+        'presence_metrics': presence.presence_counts(),
+        'presence_by_province': presence.province_breakdown(),
     }
     return render(request, 'accounts/national_admin_dashboard.html', context)
 
@@ -1566,27 +1572,8 @@ def provincial_admin_dashboard(request):
     if user_province:
         all_regions = user_province.region_set.all().order_by('name')
     
-    # Get members in this province (simplified query with error handling)
-    members = []
-    if user_province:
-        try:
-            # Get all members and filter by province in Python to avoid complex DB queries
-            all_members = Member.objects.select_related('user', 'current_club', 'current_club__localfootballassociation', 'current_club__localfootballassociation__region').all()
-            for member in all_members:
-                try:
-                    if (member.current_club and 
-                        member.current_club.lfa and 
-                        member.current_club.lfa.region and 
-                        member.current_club.lfa.region.province == user_province):
-                        members.append(member)
-                except Exception as e:
-                    # Skip members with broken relationships
-                    continue
-            # Sort by name
-            members.sort(key=lambda x: (x.user.first_name or '', x.user.last_name or ''))
-        except Exception as e:
-            # If there's an error getting members, just use empty list
-            members = []
+    # Members in this province, one page at a time
+    member_context = get_jurisdiction_member_context(request, 'province', user_province)
     
     # Get organization invoices for this province
     from django.contrib.contenttypes.models import ContentType
@@ -1606,8 +1593,8 @@ def provincial_admin_dashboard(request):
         'user_province': user_province,
         'pending_regions': pending_regions,
         'regions': all_regions,
-        'members': members,
         'organization_invoices': organization_invoices,
+        **member_context,
     }
     return render(request, 'accounts/provincial_admin_dashboard.html', context)
 
@@ -1634,26 +1621,8 @@ def regional_admin_dashboard(request):
         localfootballassociation__region=user_region
     ).order_by('name')
     
-    # Get members in this region (simplified query with error handling)
-    members = []
-    if user_region:
-        try:
-            # Get all members and filter by region in Python to avoid complex DB queries
-            all_members = Member.objects.select_related('user', 'current_club', 'current_club__localfootballassociation').all()
-            for member in all_members:
-                try:
-                    if (member.current_club and 
-                        member.current_club.lfa and 
-                        member.current_club.lfa.region == user_region):
-                        members.append(member)
-                except Exception as e:
-                    # Skip members with broken relationships
-                    continue
-            # Sort by name
-            members.sort(key=lambda x: (x.user.first_name or '', x.user.last_name or ''))
-        except Exception as e:
-            # If there's an error getting members, just use empty list
-            members = []
+    # Members in this region, one page at a time
+    member_context = get_jurisdiction_member_context(request, 'region', user_region)
 
     # Get organization invoices for this region
     from django.contrib.contenttypes.models import ContentType
@@ -1672,8 +1641,8 @@ def regional_admin_dashboard(request):
         'pending_lfas': pending_lfas,
         'lfas': all_lfas,
         'clubs': clubs,
-        'members': members,
         'organization_invoices': organization_invoices,
+        **member_context,
     }
     return render(request, 'accounts/regional_admin_dashboard.html', context)
 
@@ -1704,24 +1673,8 @@ def lfa_admin_dashboard(request):
         ).select_related('member__user', 'member__current_club')
         pending_members = [wf.member for wf in workflows]
     
-    # Get members in this LFA (simplified query with error handling)
-    members = []
-    if lfa:
-        try:
-            # Get all members and filter by LFA in Python to avoid complex DB queries
-            all_members = Member.objects.select_related('user', 'current_club').all()
-            for member in all_members:
-                try:
-                    if member.current_club and member.current_club.lfa == lfa:
-                        members.append(member)
-                except Exception as e:
-                    # Skip members with broken relationships
-                    continue
-            # Sort by name
-            members.sort(key=lambda x: (x.user.first_name or '', x.user.last_name or ''))
-        except Exception as e:
-            # If there's an error getting members, just use empty list
-            members = []
+    # Members in this LFA, one page at a time
+    member_context = get_jurisdiction_member_context(request, 'lfa', lfa)
 
     # Get organization invoices for this LFA
     from django.contrib.contenttypes.models import ContentType
@@ -1740,8 +1693,8 @@ def lfa_admin_dashboard(request):
         'pending_clubs': pending_clubs,
         'clubs': all_clubs,
         'pending_members': pending_members,
-        'members': members,
         'organization_invoices': organization_invoices,
+        **member_context,
     }
     return render(request, 'accounts/lfa_admin_dashboard.html', context)
 
@@ -1920,35 +1873,41 @@ def club_admin_add_person(request):
                     if region:
                         user.province = region.province
             
-            user.save()
-
             # Get active season configuration
             active_season = SAFASeasonConfig.get_active_season()
             if not active_season:
                 messages.error(request, 'No active season configuration found. Please contact support.')
                 return redirect('accounts:club_admin_add_person')
 
-            # Create the corresponding Member record
-            member = Member.objects.create(
-                user=user,
-                safa_id=user.safa_id,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                email=user.email,
-                role=form.cleaned_data.get('role'),
-                status='ACTIVE', # Players/Officials added by admins are auto-approved at club level
-                date_of_birth=user.date_of_birth,
-                gender=user.gender,
-                id_number=user.id_number,
-                passport_number=user.passport_number,
-                current_club=user.club,
-                province=user.province,
-                region=user.region,
-                lfa=user.local_federation,
-                current_season=active_season,  # Set the current season
-                registration_method='CLUB'    # Mark as club registration
-            )
-            
+            try:
+                # User and Member are created together so a full club quota rolls back both
+                with transaction.atomic():
+                    user.save()
+
+                    # Create the corresponding Member record
+                    member = Member.objects.create(
+                        user=user,
+                        safa_id=user.safa_id,
+                        first_name=user.first_name,
+                        last_name=user.last_name,
+                        email=user.email,
+                        role=form.cleaned_data.get('role'),
+                        status='ACTIVE', # Players/Officials added by admins are auto-approved at club level
+                        date_of_birth=user.date_of_birth,
+                        gender=user.gender,
+                        id_number=user.id_number,
+                        passport_number=user.passport_number,
+                        current_club=user.club,
+                        province=user.province,
+                        region=user.region,
+                        lfa=user.local_federation,
+                        current_season=active_season,  # Set the current season
+                        registration_method='CLUB'    # Mark as club registration
+                    )
+            except ValidationError as e:
+                messages.error(request, ' '.join(e.messages))
+                return redirect('accounts:club_admin_add_person')
+
             # Create invoice immediately using simple calculation for club-admin-created members
             try:
                 invoice = Invoice.create_simple_member_invoice(member)
@@ -2252,7 +2211,9 @@ def submit_proof_of_payment(request, invoice_uuid):
 @role_required(allowed_roles=['ADMIN_NATIONAL', 'ADMIN_NATIONAL_ACCOUNTS', 'SUPERUSER'])
 def national_admin_payment_review(request):
     # Filter invoices that are PENDING_REVIEW
-    invoices = Invoice.objects.filter(status='PENDING_REVIEW').order_by('-payment_submission_date')
+    invoices = resolve_organizations(
+        Invoice.objects.filter(status='PENDING_REVIEW').select_related('member').order_by('-payment_submission_date')
+    )
 
     context = {
         'invoices': invoices,
@@ -2358,7 +2319,7 @@ def national_admin_invoices(request):
         organization_counts[org_type.replace('localfootballassociation', 'lfa').title()] = count
     
     context = {
-        'invoices': invoices,
+        'invoices': resolve_organizations(invoices.select_related('content_type', 'season_config')),
         'seasons': seasons,
         'current_season': season_year,
         'current_organization_type': organization_type,
@@ -3,30 +3,38 @@ from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from decimal import Decimal
-from .models import SAFACoinWallet, SAFACoinReward
+from utils.bulk import defer as defer_bulk, in_bulk_operation, register_flush
+from .models import SAFACoinWallet, SAFACoinReward, SAFACoinTransaction
 
 User = get_user_model()
 
+WELCOME_BONUS = Decimal('100.0')
+DAILY_LOGIN_REWARD = Decimal('5.0')
+
+# Users created inside utils.bulk.bulk_operation(); their wallets are created together at the end
+BULK_WALLETS = 'digital_coins.wallets'
+
 @receiver(post_save, sender=User)
 def create_user_wallet(sender, instance, created, **kwargs):
     """Automatically create a SAFA Coin wallet for new users"""
-    if created:
+    if created and not defer_bulk(BULK_WALLETS, instance.pk):
         # Create wallet with welcome bonus
         wallet = SAFACoinWallet.objects.create(user=instance)
-        wallet.add_coins(Decimal('100.0'), "Welcome bonus - New SAFA member")
+        wallet.add_coins(WELCOME_BONUS, "Welcome bonus - New SAFA member")
         
         # Create first daily login reward
         SAFACoinReward.objects.create(
             user=instance,
             reward_type='DAILY_LOGIN',
-            amount=Decimal('5.0'),
+            amount=DAILY_LOGIN_REWARD,
             reason="First daily login bonus"
         )
 
 @receiver(post_save, sender=User)
 def award_daily_login_coins(sender, instance, created, **kwargs):
     """Award daily login coins to existing users"""
-    if not created:  # Only for existing users
+    # Only for existing users; saves made by imports and scripts are not logins
+    if not created and not in_bulk_operation():
         # Check if user has logged in today
         today = timezone.now().date()
         
@@ -42,6 +50,39 @@ def award_daily_login_coins(sender, instance, created, **kwargs):
             SAFACoinReward.objects.create(
                 user=instance,
                 reward_type='DAILY_LOGIN',
-                amount=Decimal('5.0'),
+                amount=DAILY_LOGIN_REWARD,
                 reason="Daily login bonus"
             )
+
+
+def create_bulk_wallets(user_ids):
+    """Wallets, welcome bonuses and first login rewards for users created in bulk"""
+    user_ids = list(
+        User.objects.filter(pk__in=user_ids, coin_wallet__isnull=True).values_list('pk', flat=True)
+    )
+    wallets = SAFACoinWallet.objects.bulk_create([
+        SAFACoinWallet(user_id=pk, balance=WELCOME_BONUS, total_earned=WELCOME_BONUS)
+        for pk in user_ids
+    ], batch_size=500)
+    SAFACoinTransaction.objects.bulk_create([
+        SAFACoinTransaction(
+            wallet=wallet,
+            transaction_type='EARNED',
+            amount=WELCOME_BONUS,
+            reason="Welcome bonus - New SAFA member",
+            balance_after=WELCOME_BONUS
+        )
+        for wallet in wallets
+    ], batch_size=500)
+    SAFACoinReward.objects.bulk_create([
+        SAFACoinReward(
+            user_id=pk,
+            reward_type='DAILY_LOGIN',
+            amount=DAILY_LOGIN_REWARD,
+            reason="First daily login bonus"
+        )
+        for pk in user_ids
+    ], batch_size=500)
+
+
+register_flush(BULK_WALLETS, create_bulk_wallets)
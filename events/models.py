@@ -5,6 +5,7 @@ from django.contrib.auth import get_user_model
 from geography.models import Region, Province
 from supporters.models import SupporterProfile
 from membership.models import Invoice
+from utils.numbering import next_number, reserve, seed_from_max
 import uuid
 import string
 import random
@@ -158,7 +159,10 @@ class InternationalMatch(models.Model):
         if not self.safa_id:
             # Generate SAFA ID: INTL-YYYY-XXX
             year = self.match_date.year
-            count = InternationalMatch.objects.filter(match_date__year=year).count() + 1
+            count = next_number(
+                f"international_match:{year}",
+                seed=lambda: seed_from_max(InternationalMatch.objects.all(), 'safa_id', f"INTL-{year}-")
+            )
             self.safa_id = f"INTL-{year}-{count:03d}"
         super().save(*args, **kwargs)
     
@@ -245,7 +249,10 @@ class Ticket(models.Model):
         if not self.ticket_number:
             # Generate ticket number: INTL-YYYY-XXXXXXX
             year = self.match.match_date.year
-            count = Ticket.objects.filter(match__match_date__year=year).count() + 1
+            count = next_number(
+                f"ticket:{year}",
+                seed=lambda: seed_from_max(Ticket.objects.all(), 'ticket_number', f"INTL-{year}-")
+            )
             self.ticket_number = f"INTL-{year}-{count:07d}"
         
         if not self.qr_code:
@@ -257,6 +264,26 @@ class Ticket(models.Model):
             self.barcode = f"BC{get_random_string(12, string.digits)}"
         
         super().save(*args, **kwargs)
+    
+    @classmethod
+    def assign_ticket_numbers(cls, tickets):
+        """
+        Number unsaved tickets before bulk_create, reserving one block per match year
+        """
+        by_year = {}
+        for ticket in tickets:
+            if not ticket.ticket_number:
+                by_year.setdefault(ticket.match.match_date.year, []).append(ticket)
+        
+        for year, year_tickets in by_year.items():
+            numbers = reserve(
+                f"ticket:{year}",
+                len(year_tickets),
+                seed=lambda: seed_from_max(cls.objects.all(), 'ticket_number', f"INTL-{year}-")
+            )
+            for ticket, count in zip(year_tickets, numbers):
+                ticket.ticket_number = f"INTL-{year}-{count:07d}"
+        return tickets
 
 
 class TicketGroup(models.Model):
@@ -302,7 +329,10 @@ class TicketGroup(models.Model):
         if not self.group_number:
             # Generate group number: GRP-YYYY-XXX
             year = self.match.match_date.year
-            count = TicketGroup.objects.filter(match__match_date__year=year).count() + 1
+            count = next_number(
+                f"ticket_group:{year}",
+                seed=lambda: seed_from_max(TicketGroup.objects.all(), 'group_number', f"GRP-{year}-")
+            )
             self.group_number = f"GRP-{year}-{count:03d}"
         super().save(*args, **kwargs)
 
@@ -108,25 +108,13 @@ class ProvinceAdmin(ModelWithLogoAdmin):
     
     def generate_safa_ids(self, request, queryset):
         """Generate unique SAFA IDs for selected provinces""" 
-        import string
-        import random
+        from utils.safa_ids import claim_safa_ids
         
-        updated_count = 0
-        
-        for province in queryset:
-            if not province.safa_id:  # Only generate if empty
-                while True:
-                    # Generate 5-digit random alphanumeric SAFA ID (A-Z, 0-9)
-                    chars = string.ascii_uppercase + string.digits
-                    safa_id = ''.join(random.choices(chars, k=5))
-                    
-                    # Check if this ID already exists across the system
-                    from .models import Province
-                    if not Province.objects.filter(safa_id=safa_id).exists():
-                        province.safa_id = safa_id
-                        province.save(update_fields=['safa_id'])
-                        updated_count += 1
-                        break
+        provinces = [province for province in queryset if not province.safa_id]  # Only generate if empty
+        for province, safa_id in zip(provinces, claim_safa_ids(len(provinces), 'geography.Province')):
+            province.safa_id = safa_id
+            province.save(update_fields=['safa_id'])
+        updated_count = len(provinces)
         
         messages.success(request, f'Generated SAFA IDs for {updated_count} provinces.')
     
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GeographyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'geography'
+
+    def ready(self):
+        from . import hierarchy, spatial  # noqa: F401  (snapshot and index invalidation receivers)
@@ -0,0 +1,95 @@
+# geography/geocoding.py
+"""
+Address geocoding behind a local cache.
+
+Addresses are normalized (case, punctuation, whitespace and common street
+abbreviations) and looked up in GeocodedAddress before the external
+geocoder is called; results, including misses, are stored so each distinct
+address reaches the geocoder once.
+
+    cached_coordinates(address)   # cache only, never calls out
+    geocode(address)              # cache, then the geocoder on a miss
+
+Both return (longitude, latitude) or None; geocode() raises GeocodingError
+when the geocoder itself fails. The external lookup is slow and can fail,
+so request paths use cached_coordinates() and leave misses to a background
+job (membership.tasks.geocode_member).
+"""
+import re
+
+try:
+    import geocoder
+    GEOCODER_AVAILABLE = True
+except ImportError:
+    GEOCODER_AVAILABLE = False
+
+GEOCODER_PROVIDER = 'google'
+
+ABBREVIATIONS = {
+    'st': 'street',
+    'str': 'street',
+    'rd': 'road',
+    'ave': 'avenue',
+    'av': 'avenue',
+    'dr': 'drive',
+    'cres': 'crescent',
+    'ln': 'lane',
+    'blvd': 'boulevard',
+    'ext': 'extension',
+}
+
+
+class GeocodingError(Exception):
+    """The geocoder could not be reached or refused the request"""
+
+
+def normalize_address(address):
+    """Canonical form used as the cache key"""
+    words = re.sub(r'[^\w]+', ' ', (address or '').casefold()).split()
+    return ' '.join(ABBREVIATIONS.get(word, word) for word in words)[:255]
+
+
+def _coordinates(entry):
+    if entry.found:
+        return float(entry.longitude), float(entry.latitude)
+    return None
+
+
+def cached_coordinates(address):
+    """Cached (longitude, latitude) for an address; None if unknown or not found"""
+    from .models import GeocodedAddress
+
+    key = normalize_address(address)
+    if not key:
+        return None
+    entry = GeocodedAddress.objects.filter(normalized_address=key).first()
+    return _coordinates(entry) if entry else None
+
+
+def geocode(address):
+    """(longitude, latitude) for an address, calling the geocoder only for addresses not seen before"""
+    from .models import GeocodedAddress
+
+    key = normalize_address(address)
+    if not key:
+        return None
+    entry = GeocodedAddress.objects.filter(normalized_address=key).first()
+    if entry:
+        return _coordinates(entry)
+    if not GEOCODER_AVAILABLE:
+        return None
+
+    # Failures are not cached, so the address is tried again next time
+    result = getattr(geocoder, GEOCODER_PROVIDER)(address)
+    if not result.ok and result.status != 'ZERO_RESULTS':
+        raise GeocodingError(f"Geocoding failed for {address!r}: {result.status}")
+
+    entry, _created = GeocodedAddress.objects.get_or_create(
+        normalized_address=key,
+        defaults={
+            'latitude': round(result.lat, 8) if result.ok else None,
+            'longitude': round(result.lng, 8) if result.ok else None,
+            'provider': GEOCODER_PROVIDER,
+        }
+    )
+    return _coordinates(entry)
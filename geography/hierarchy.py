@@ -0,0 +1,241 @@
+# geography/hierarchy.py
+"""
+Versioned snapshot of the province -> region -> LFA -> club hierarchy.
+
+The snapshot is built with one query per level and kept in the process. It
+holds the tree as compact JSON (one row per entity, columns listed under
+"fields"), pre-compressed with gzip and brotli, and per-level indexes that the
+cascading dropdown endpoints answer from without touching the database:
+
+    snapshot = get_snapshot()
+    snapshot.regions(province_id)            # [{'id': .., 'name': ..}, ...] ordered by name
+    snapshot.clubs(lfa_id=lfa_id, active_only=True)
+
+Its version is a hash of the JSON; hierarchy_response() uses it, suffixed with
+the content encoding, as the ETag.
+URLs carrying ?v=<version> never change and are cached for a year, so
+browsers and the mobile app can fetch the whole tree once and pick levels
+locally.
+
+Saving or deleting a Province, Region, LFA or Club bumps a version in the
+shared cache once the transaction commits. The changing process drops its
+snapshot at once and other processes within HIERARCHY_CHECK_SECONDS. The
+first process to notice rebuilds and stores the snapshot in the shared cache
+(for SNAPSHOT_CACHE_SECONDS) for the others. Until the change commits,
+lookups inside that transaction build a private, uncompressed snapshot that
+is not kept, since the transaction may roll back. The change counts as
+pending for as long as its commit callback is queued on the connection, so a
+rollback - which drops the callback - ends it too.
+"""
+import gzip
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+
+from utils.shared_cache import get_shared_cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HIERARCHY_CHECK_SECONDS = getattr(settings, 'GEOGRAPHY_HIERARCHY_CHECK_SECONDS', 5)
+HIERARCHY_MAX_AGE = getattr(settings, 'GEOGRAPHY_HIERARCHY_MAX_AGE', 300)
+VERSIONED_MAX_AGE = 365 * 24 * 60 * 60
+SNAPSHOT_CACHE_SECONDS = getattr(settings, 'GEOGRAPHY_HIERARCHY_CACHE_SECONDS', 24 * 60 * 60)
+
+VERSION_CACHE_KEY = 'geography:hierarchy_version'
+SNAPSHOT_CACHE_KEY = 'geography:hierarchy_snapshot:{}'
+
+FIELDS = {
+    'provinces': ['id', 'name', 'code', 'active'],
+    'regions': ['id', 'name', 'province_id', 'active'],
+    'lfas': ['id', 'name', 'region_id', 'active'],
+    'clubs': ['id', 'name', 'province_id', 'region_id', 'lfa_id', 'active'],
+}
+
+# Club saves that leave these alone do not change the hierarchy
+CLUB_FIELDS = {'name', 'province', 'region', 'localfootballassociation', 'status'}
+
+
+def load_rows():
+    """{level: [row, ...]} with rows as listed in FIELDS, each level ordered by name"""
+    from .models import Club, ClubStatus, LocalFootballAssociation, Province, Region
+
+    sources = {
+        'provinces': Province.objects.values_list('pk', 'name', 'code', 'status'),
+        'regions': Region.objects.values_list('pk', 'name', 'province_id', 'status'),
+        'lfas': LocalFootballAssociation.objects.values_list('pk', 'name', 'region_id', 'status'),
+        'clubs': Club.objects.values_list(
+            'pk', 'name', 'province_id', 'region_id', 'localfootballassociation_id', 'status'
+        ),
+    }
+    return {
+        level: [
+            [*row, status == ClubStatus.ACTIVE]
+            for *row, status in rows.order_by('name', 'pk')
+        ]
+        for level, rows in sources.items()
+    }
+
+
+class HierarchySnapshot:
+    """The hierarchy as JSON (plain and, if compressed, gzip and brotli) plus per-level indexes"""
+
+    def __init__(self, rows, compress=True):
+        self.json = json.dumps(
+            {'fields': FIELDS, **rows}, separators=(',', ':'), ensure_ascii=False
+        ).encode('utf-8')
+        self.version = hashlib.sha256(self.json).hexdigest()[:32]
+        self.encodings = {}
+        if compress:
+            self.encodings['gzip'] = gzip.compress(self.json, mtime=0)
+            if brotli is not None:
+                self.encodings['br'] = brotli.compress(self.json, mode=brotli.MODE_TEXT)
+
+        self.province_ids = {row[0] for row in rows['provinces']}
+        self.region_ids = {row[0] for row in rows['regions']}
+        self.lfa_ids = {row[0] for row in rows['lfas']}
+        # parent id -> [(id, name, active), ...] in name order
+        self._regions = self._group(rows['regions'], 2)
+        self._lfas = self._group(rows['lfas'], 2)
+        self._clubs = {
+            column: self._group(rows['clubs'], index)
+            for column, index in (('province_id', 2), ('region_id', 3), ('lfa_id', 4))
+        }
+        self._all_clubs = [(row[0], row[1], row[-1]) for row in rows['clubs']]
+
+    @staticmethod
+    def _group(rows, parent_index):
+        groups = {}
+        for row in rows:
+            groups.setdefault(row[parent_index], []).append((row[0], row[1], row[-1]))
+        return groups
+
+    @staticmethod
+    def _items(entries, active_only):
+        return [{'id': pk, 'name': name} for pk, name, active in entries if active or not active_only]
+
+    def regions(self, province_id, active_only=False):
+        return self._items(self._regions.get(province_id, ()), active_only)
+
+    def lfas(self, region_id, active_only=False):
+        return self._items(self._lfas.get(region_id, ()), active_only)
+
+    def clubs(self, province_id=None, region_id=None, lfa_id=None, active_only=False):
+        """Clubs of the most specific level given, or all clubs"""
+        for column, parent_id in (('lfa_id', lfa_id), ('region_id', region_id), ('province_id', province_id)):
+            if parent_id is not None:
+                return self._items(self._clubs[column].get(parent_id, ()), active_only)
+        return self._items(self._all_clubs, active_only)
+
+
+_snapshot = None
+_snapshot_version = None
+_checked_at = 0.0
+_snapshot_lock = threading.Lock()
+
+
+def _bump_version():
+    global _snapshot
+    get_shared_cache().set(VERSION_CACHE_KEY, time.time_ns(), None)
+    _snapshot = None
+
+
+def _change_pending():
+    """Whether this connection's open transaction changed the hierarchy"""
+    return connection.in_atomic_block and any(
+        callback is _bump_version for _sids, callback, *_rest in connection.run_on_commit
+    )
+
+
+def get_snapshot():
+    """The process-wide snapshot, rebuilt after any geography change"""
+    global _snapshot, _snapshot_version, _checked_at
+    if _change_pending():
+        # A change waiting to commit: this transaction may see it, other processes must not
+        return HierarchySnapshot(load_rows(), compress=False)
+
+    now = time.monotonic()
+    if _snapshot is not None and now - _checked_at < HIERARCHY_CHECK_SECONDS:
+        return _snapshot
+
+    with _snapshot_lock:
+        shared = get_shared_cache()
+        version = shared.get(VERSION_CACHE_KEY)
+        if version is None:
+            # Never fall back to a fixed version, whose stored snapshot may be out of date
+            shared.add(VERSION_CACHE_KEY, time.time_ns(), None)
+            version = shared.get(VERSION_CACHE_KEY)
+        if _snapshot is None or version != _snapshot_version:
+            snapshot = shared.get(SNAPSHOT_CACHE_KEY.format(version))
+            if snapshot is None:
+                snapshot = HierarchySnapshot(load_rows())
+                shared.set(SNAPSHOT_CACHE_KEY.format(version), snapshot, SNAPSHOT_CACHE_SECONDS)
+            _snapshot, _snapshot_version = snapshot, version
+        _checked_at = now
+        return _snapshot
+
+
+def reset_snapshot():
+    """Rebuild on next use here, and in other processes once the change commits"""
+    global _snapshot
+    _snapshot = None
+    if not _change_pending():
+        transaction.on_commit(_bump_version)
+
+
+def accepted_encoding(request, snapshot):
+    """'br', 'gzip' or None for the client's Accept-Encoding"""
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _sep, params = part.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(coding.strip().lower())
+    for coding in ('br', 'gzip'):
+        if coding in snapshot.encodings and (coding in accepted or '*' in accepted):
+            return coding
+    return None
+
+
+def hierarchy_response(request):
+    """The snapshot JSON, compressed if the client accepts it, with ETag and Cache-Control"""
+    snapshot = get_snapshot()
+    coding = accepted_encoding(request, snapshot)
+    etag = f'"{snapshot.version}-{coding}"' if coding else f'"{snapshot.version}"'
+    if request.GET.get('v') == snapshot.version:
+        cache_control = f'public, max-age={VERSIONED_MAX_AGE}, immutable'
+    else:
+        cache_control = f'public, max-age={HIERARCHY_MAX_AGE}'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+            snapshot.encodings[coding] if coding else snapshot.json, content_type='application/json'
+        )
+        if coding:
+            response['Content-Encoding'] = coding
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    response['X-Geography-Version'] = snapshot.version
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+@receiver([post_save, post_delete], sender='geography.Province')
+@receiver([post_save, post_delete], sender='geography.Region')
+@receiver([post_save, post_delete], sender='geography.LocalFootballAssociation')
+@receiver([post_save, post_delete], sender='geography.Club')
+def invalidate_snapshot(sender, update_fields=None, **kwargs):
+    """The hierarchy changed: rebuild on next use"""
+    if sender._meta.model_name == 'club' and update_fields and not CLUB_FIELDS.intersection(update_fields):
+        return
+    reset_snapshot()
@@ -0,0 +1,129 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from geography.spatial import LEVELS, Boundary, Placement, SpatialIndex, load_boundaries
+
+# Rough bounding box of South Africa (longitude, latitude)
+SYNTHETIC_BOUNDS = (16.0, -35.0, 33.0, -22.0)
+
+
+def square(min_x, min_y, max_x, max_y, vertices_per_side):
+    """Closed GeoJSON ring along the edges of a box, with extra vertices like a surveyed boundary"""
+    corners = [(min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y)]
+    ring = []
+    for (x1, y1), (x2, y2) in zip(corners, corners[1:] + corners[:1]):
+        for step in range(vertices_per_side):
+            fraction = step / vertices_per_side
+            ring.append([x1 + (x2 - x1) * fraction, y1 + (y2 - y1) * fraction])
+    ring.append(ring[0])
+    return {'type': 'Polygon', 'coordinates': [ring]}
+
+
+def synthetic_boundaries(provinces, regions, lfas, vertices_per_side):
+    """A provinces x provinces grid, each split into regions x regions, each into lfas x lfas"""
+    min_x, min_y, max_x, max_y = SYNTHETIC_BOUNDS
+    boundaries = []
+    next_id = iter(range(1, 10 ** 9))
+
+    def cells(box, count):
+        x0, y0, x1, y1 = box
+        width, height = (x1 - x0) / count, (y1 - y0) / count
+        for i in range(count):
+            for j in range(count):
+                yield (x0 + i * width, y0 + j * height, x0 + (i + 1) * width, y0 + (j + 1) * height)
+
+    for province_box in cells((min_x, min_y, max_x, max_y), provinces):
+        province_id = next(next_id)
+        boundaries.append(Boundary(
+            'province', Placement(province_id, None, None), square(*province_box, vertices_per_side)
+        ))
+        for region_box in cells(province_box, regions):
+            region_id = next(next_id)
+            boundaries.append(Boundary(
+                'region', Placement(province_id, region_id, None), square(*region_box, vertices_per_side)
+            ))
+            for lfa_box in cells(region_box, lfas):
+                boundaries.append(Boundary(
+                    'lfa', Placement(province_id, region_id, next(next_id)), square(*lfa_box, vertices_per_side)
+                ))
+    return boundaries
+
+
+class Command(BaseCommand):
+    help = (
+        'Time resolving random points to their LFA/region/province with the in-process grid index, '
+        'against testing every boundary level by level'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=int, default=100000, help='Points to resolve')
+        parser.add_argument(
+            '--database',
+            action='store_true',
+            help='Use the boundaries loaded in the database instead of a synthetic hierarchy'
+        )
+        parser.add_argument('--vertices', type=int, default=50, help='Synthetic vertices per polygon side')
+        parser.add_argument(
+            '--scan-points',
+            type=int,
+            default=1000,
+            help='Points resolved by the level-by-level scan (it is much slower)'
+        )
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if options['points'] < 1:
+            raise CommandError('--points must be positive')
+
+        if options['database']:
+            boundaries = load_boundaries()
+            if not boundaries:
+                raise CommandError('No boundaries loaded; see manage.py load_boundaries')
+        else:
+            # 9 provinces, 36 regions, 576 LFAs
+            boundaries = synthetic_boundaries(3, 2, 4, options['vertices'])
+
+        started = time.perf_counter()
+        index = SpatialIndex(boundaries)
+        build_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(
+            f'{len(boundaries)} boundaries indexed into {len(index.cells)} cells in {build_ms:.0f} ms'
+        )
+
+        min_x = min(boundary.bbox[0] for boundary in boundaries)
+        min_y = min(boundary.bbox[1] for boundary in boundaries)
+        max_x = max(boundary.bbox[2] for boundary in boundaries)
+        max_y = max(boundary.bbox[3] for boundary in boundaries)
+        rng = random.Random(options['seed'])
+        points = [
+            (rng.uniform(min_x, max_x), rng.uniform(min_y, max_y)) for _ in range(options['points'])
+        ]
+
+        started = time.perf_counter()
+        placements = [index.locate(x, y) for x, y in points]
+        elapsed = time.perf_counter() - started
+        resolved = sum(1 for placement in placements if placement)
+        self.stdout.write(
+            f'index: {len(points)} points in {elapsed * 1000:.0f} ms '
+            f'({len(points) / elapsed:,.0f} points/s, {resolved} inside a boundary)'
+        )
+
+        scan_points = points[:options['scan_points']]
+        if scan_points:
+            by_level = [[boundary for boundary in boundaries if boundary.level == level] for level in LEVELS]
+            started = time.perf_counter()
+            scanned = [
+                next((boundary.placement for level in by_level for boundary in level if boundary.contains(x, y)), None)
+                for x, y in scan_points
+            ]
+            scan_elapsed = time.perf_counter() - started
+            if scanned != placements[:len(scan_points)]:
+                raise CommandError('Index and scan disagree')
+            self.stdout.write(
+                f'scan:  {len(scan_points)} points in {scan_elapsed * 1000:.0f} ms '
+                f'({len(scan_points) / scan_elapsed:,.0f} points/s)'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completed'))
@@ -2,6 +2,8 @@ from django.core.management.base import BaseCommand
 from geography.models import Region, LocalFootballAssociation
 from django.db import transaction
 
+from utils.bulk import bulk_operation
+
 class Command(BaseCommand):
     help = 'Import Local Football Associations interactively'
 
@@ -57,13 +59,17 @@ class Command(BaseCommand):
         self.stdout.write(f"\nProcessing {len(lfa_names)} LFA names...")
         
         # 4. Create LFAs
-        with transaction.atomic():
+        with transaction.atomic(), bulk_operation():
             lfas_to_create = []
             existing_count = 0
+            existing_names = set(
+                LocalFootballAssociation.objects.filter(name__in=lfa_names, region=region)
+                .values_list('name', flat=True)
+            )
             
             for name in lfa_names:
                 # Check if LFA already exists
-                if LocalFootballAssociation.objects.filter(name=name, region=region).exists():
+                if name in existing_names:
                     existing_count += 1
                     self.stdout.write(f"LFA '{name}' already exists for this region")
                     continue
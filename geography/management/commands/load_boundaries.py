@@ -0,0 +1,74 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from geography.models import LocalFootballAssociation, Province, Region
+from geography.spatial import LEVELS, Boundary, InvalidBoundary, Placement, reset_index
+
+LEVEL_MODELS = {
+    'province': Province,
+    'region': Region,
+    'lfa': LocalFootballAssociation,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Load Province, Region and LFA boundaries from a GeoJSON FeatureCollection. '
+        'Each feature needs properties "level" (province, region or lfa) and "name" or "safa_id".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='GeoJSON file (longitude/latitude coordinates)')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate and match the features without saving'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path']) as file:
+                features = json.load(file).get('features', [])
+        except (OSError, ValueError, AttributeError) as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+
+        by_level = {level: {} for level in LEVELS}
+        for number, feature in enumerate(features, start=1):
+            properties = feature.get('properties') or {}
+            level = str(properties.get('level', '')).lower()
+            key = properties.get('safa_id') or properties.get('name')
+            if level not in by_level or not key:
+                raise CommandError(f'Feature {number}: needs a level ({", ".join(LEVELS)}) and a name or safa_id')
+            try:
+                Boundary(level, Placement(None, None, None), feature.get('geometry'))
+            except InvalidBoundary as e:
+                raise CommandError(f'Feature {number} ({key}): {e}')
+            by_level[level][key] = feature['geometry']
+
+        updated = 0
+        with transaction.atomic():
+            for level, geometries in by_level.items():
+                if not geometries:
+                    continue
+                model = LEVEL_MODELS[level]
+                objects = list(model.objects.filter(name__in=geometries) | model.objects.filter(safa_id__in=geometries))
+                matched = set()
+                for obj in objects:
+                    key = obj.safa_id if obj.safa_id in geometries else obj.name
+                    obj.boundary = geometries[key]
+                    matched.add(key)
+                for key in sorted(set(geometries) - matched):
+                    self.stdout.write(self.style.WARNING(f'  No {level} named {key}'))
+                if not options['dry_run']:
+                    model.objects.bulk_update(objects, ['boundary'], batch_size=500)
+                updated += len(objects)
+                self.stdout.write(f'  {level}: {len(objects)} of {len(geometries)} boundaries matched')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Dry run: {updated} boundaries would be loaded'))
+            return
+        # bulk_update sends no signals
+        reset_index()
+        self.stdout.write(self.style.SUCCESS(f'Loaded {updated} boundaries'))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:31
+
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geography', '0004_geographyupdatelog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodedAddress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('normalized_address', models.CharField(max_length=255, unique=True)),
+                ('latitude', models.DecimalField(blank=True, decimal_places=8, max_digits=10, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=8, max_digits=11, null=True)),
+                ('provider', models.CharField(blank=True, max_length=30)),
+            ],
+            options={
+                'verbose_name': 'Geocoded Address',
+                'verbose_name_plural': 'Geocoded Addresses',
+            },
+        ),
+        migrations.AddField(
+            model_name='localfootballassociation',
+            name='boundary',
+            field=models.JSONField(blank=True, help_text='GeoJSON Polygon or MultiPolygon in longitude/latitude (see geography.spatial)', null=True, verbose_name='Boundary'),
+        ),
+        migrations.AddField(
+            model_name='province',
+            name='boundary',
+            field=models.JSONField(blank=True, help_text='GeoJSON Polygon or MultiPolygon in longitude/latitude (see geography.spatial)', null=True, verbose_name='Boundary'),
+        ),
+        migrations.AddField(
+            model_name='region',
+            name='boundary',
+            field=models.JSONField(blank=True, help_text='GeoJSON Polygon or MultiPolygon in longitude/latitude (see geography.spatial)', null=True, verbose_name='Boundary'),
+        ),
+    ]
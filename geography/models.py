@@ -288,6 +288,12 @@ class Province(TimeStampedModel, ModelWithLogo):
         help_text=_('The national federation this province belongs to')
     )
     description = models.TextField(_('Description'), blank=True)
+    boundary = models.JSONField(
+        _('Boundary'),
+        null=True,
+        blank=True,
+        help_text=_('GeoJSON Polygon or MultiPolygon in longitude/latitude (see geography.spatial)')
+    )
     status = models.CharField(
         _('Status'),
         max_length=20,
@@ -367,6 +373,12 @@ class Region(TimeStampedModel, ModelWithLogo, SAFAIdentifiableMixin):
         on_delete=models.CASCADE
     )
     description = models.TextField(_('Description'), blank=True)
+    boundary = models.JSONField(
+        _('Boundary'),
+        null=True,
+        blank=True,
+        help_text=_('GeoJSON Polygon or MultiPolygon in longitude/latitude (see geography.spatial)')
+    )
     status = models.CharField(
         _('Status'),
         max_length=20,
@@ -518,6 +530,12 @@ class LocalFootballAssociation(TimeStampedModel, ModelWithLogo, SAFAIdentifiable
     website = models.URLField(_('Website'), max_length=200, blank=True)
     headquarters = models.CharField(_('Headquarters'), max_length=100, blank=True)
     description = models.TextField(_('Description'), blank=True)
+    boundary = models.JSONField(
+        _('Boundary'),
+        null=True,
+        blank=True,
+        help_text=_('GeoJSON Polygon or MultiPolygon in longitude/latitude (see geography.spatial)')
+    )
     status = models.CharField(
         _('Status'),
         max_length=20,
@@ -735,16 +753,7 @@ class Club(TimeStampedModel, ModelWithLogo, SAFAIdentifiableMixin):
         
         # Generate 5-digit random alphanumeric SAFA ID if payment confirmed
         if self.payment_confirmed and not self.safa_id:
-            import string
-            import random
-            
-            while True:
-                chars = string.ascii_uppercase + string.digits
-                safa_id = ''.join(random.choices(chars, k=5))
-                
-                if not Club.objects.filter(safa_id=safa_id).exists():
-                    self.safa_id = safa_id
-                    break
+            self.safa_id = self.generate_unique_safa_id(self._meta.label)
         
         # Generate FIFA ID if not set (7-digit alphanumeric)
         # Commented out FIFA ID generation
@@ -859,3 +868,26 @@ class GeographyUpdateLog(TimeStampedModel):
             self.approval_timestamp = timezone.now()
             self.notes = notes
             self.save()
+
+
+class GeocodedAddress(TimeStampedModel):
+    """
+    Geocoder result cached by normalized address (see geography.geocoding),
+    including addresses the geocoder could not place, so the same address is
+    never looked up twice.
+    """
+    normalized_address = models.CharField(max_length=255, unique=True)
+    latitude = models.DecimalField(max_digits=10, decimal_places=8, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=11, decimal_places=8, null=True, blank=True)
+    provider = models.CharField(max_length=30, blank=True)
+
+    class Meta:
+        verbose_name = _('Geocoded Address')
+        verbose_name_plural = _('Geocoded Addresses')
+
+    def __str__(self):
+        return self.normalized_address
+
+    @property
+    def found(self):
+        return self.latitude is not None and self.longitude is not None
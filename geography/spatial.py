@@ -0,0 +1,201 @@
+# geography/spatial.py
+"""
+In-process spatial index over Province, Region and LFA boundaries.
+
+Boundaries are GeoJSON Polygon/MultiPolygon values in longitude/latitude,
+kept in the `boundary` field of each model. The index puts the bounding box
+of every boundary into a uniform grid, so a point is resolved by looking up
+its grid cell and testing the few polygons listed there, most specific level
+first. One lookup gives the whole hierarchy:
+
+    placement = locate(lon, lat)
+    placement.lfa_id, placement.region_id, placement.province_id
+
+An LFA hit carries its region and province; a point outside every LFA falls
+back to the region, then the province that contains it.
+
+The index is built on first use. A change to any of the three models
+bumps a version in the shared cache; the changing process rebuilds on its next
+lookup and other processes within VERSION_CHECK_SECONDS. It needs no GIS
+database support.
+"""
+import math
+import threading
+import time
+from collections import namedtuple
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from utils.shared_cache import get_shared_cache
+
+Placement = namedtuple('Placement', ['province_id', 'region_id', 'lfa_id'])
+
+# Most specific first: an LFA inside a region inside a province
+LEVELS = ['lfa', 'region', 'province']
+
+# Grid cells per indexed boundary; more cells mean fewer candidates per lookup
+CELLS_PER_BOUNDARY = 4
+
+VERSION_CACHE_KEY = 'geography:spatial_index_version'
+VERSION_CHECK_SECONDS = 30
+
+
+class InvalidBoundary(ValueError):
+    """Raised for a boundary that is not a GeoJSON Polygon or MultiPolygon"""
+
+
+def boundary_polygons(geometry):
+    """GeoJSON Polygon/MultiPolygon -> [[ring, ...], ...] with rings as [(x, y), ...]"""
+    geometry_type = geometry.get('type') if isinstance(geometry, dict) else None
+    if geometry_type == 'Polygon':
+        polygons = [geometry['coordinates']]
+    elif geometry_type == 'MultiPolygon':
+        polygons = geometry['coordinates']
+    else:
+        raise InvalidBoundary(f"Expected a GeoJSON Polygon or MultiPolygon, got {geometry_type!r}")
+    return [
+        [[(float(point[0]), float(point[1])) for point in ring] for ring in polygon]
+        for polygon in polygons if polygon
+    ]
+
+
+def ring_contains(ring, x, y):
+    """Even-odd ray casting test"""
+    inside = False
+    x1, y1 = ring[-1]
+    for x2, y2 in ring:
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+class Boundary:
+    """One indexed boundary and the placement a point inside it resolves to"""
+    __slots__ = ('level', 'placement', 'polygons', 'bbox')
+
+    def __init__(self, level, placement, geometry):
+        self.level = level
+        self.placement = placement
+        self.polygons = boundary_polygons(geometry)
+        points = [point for polygon in self.polygons for point in polygon[0]]
+        if not points:
+            raise InvalidBoundary("Boundary has no coordinates")
+        xs = [x for x, _y in points]
+        ys = [y for _x, y in points]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+
+    def contains(self, x, y):
+        min_x, min_y, max_x, max_y = self.bbox
+        if not (min_x <= x <= max_x and min_y <= y <= max_y):
+            return False
+        for outer, *holes in self.polygons:
+            if ring_contains(outer, x, y) and not any(ring_contains(hole, x, y) for hole in holes):
+                return True
+        return False
+
+
+class SpatialIndex:
+    """Uniform grid over boundary bounding boxes"""
+
+    def __init__(self, boundaries):
+        boundaries = sorted(boundaries, key=lambda boundary: LEVELS.index(boundary.level))
+        self.size = len(boundaries)
+        self.cells = {}
+        if not boundaries:
+            self.origin = (0.0, 0.0)
+            self.cell_size = 1.0
+            return
+
+        min_x = min(boundary.bbox[0] for boundary in boundaries)
+        min_y = min(boundary.bbox[1] for boundary in boundaries)
+        max_x = max(boundary.bbox[2] for boundary in boundaries)
+        max_y = max(boundary.bbox[3] for boundary in boundaries)
+        area = max((max_x - min_x) * (max_y - min_y), 1e-12)
+        self.origin = (min_x, min_y)
+        self.cell_size = math.sqrt(area / (len(boundaries) * CELLS_PER_BOUNDARY)) or 1.0
+
+        # Boundaries are added most specific level first, so every cell lists them in that order
+        for boundary in boundaries:
+            x0, y0 = self._cell(boundary.bbox[0], boundary.bbox[1])
+            x1, y1 = self._cell(boundary.bbox[2], boundary.bbox[3])
+            for cell_x in range(x0, x1 + 1):
+                for cell_y in range(y0, y1 + 1):
+                    self.cells.setdefault((cell_x, cell_y), []).append(boundary)
+
+    def _cell(self, x, y):
+        return (
+            int((x - self.origin[0]) // self.cell_size),
+            int((y - self.origin[1]) // self.cell_size),
+        )
+
+    def locate(self, x, y):
+        """Placement of the most specific boundary containing (x, y), or None"""
+        for boundary in self.cells.get(self._cell(x, y), ()):
+            if boundary.contains(x, y):
+                return boundary.placement
+        return None
+
+
+def load_boundaries():
+    """Boundary objects for every Province, Region and LFA with a boundary set"""
+    from .models import LocalFootballAssociation, Province, Region
+
+    sources = [
+        ('lfa', LocalFootballAssociation.objects.values_list('boundary', 'region__province_id', 'region_id', 'pk')),
+        ('region', Region.objects.values_list('boundary', 'province_id', 'pk')),
+        ('province', Province.objects.values_list('boundary', 'pk')),
+    ]
+    boundaries = []
+    for level, rows in sources:
+        for geometry, *ids in rows.filter(boundary__isnull=False).order_by('pk'):
+            ids += [None] * (3 - len(ids))
+            boundaries.append(Boundary(level, Placement(*ids), geometry))
+    return boundaries
+
+
+_index = None
+_index_version = None
+_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """The process-wide index, built from the database on first use"""
+    global _index, _index_version, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < VERSION_CHECK_SECONDS:
+        return _index
+
+    with _index_lock:
+        version = get_shared_cache().get(VERSION_CACHE_KEY, 0)
+        if _index is None or version != _index_version:
+            _index = SpatialIndex(load_boundaries())
+            _index_version = version
+        _checked_at = now
+        return _index
+
+
+def reset_index():
+    """Rebuild on the next lookup here, and in other processes after their next version check"""
+    global _index
+    _index = None
+    shared = get_shared_cache()
+    try:
+        shared.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        shared.set(VERSION_CACHE_KEY, 1, None)
+
+
+def locate(longitude, latitude):
+    """Placement (province_id, region_id, lfa_id) of a point, or None outside every boundary"""
+    return get_index().locate(float(longitude), float(latitude))
+
+
+@receiver([post_save, post_delete], sender='geography.Province')
+@receiver([post_save, post_delete], sender='geography.Region')
+@receiver([post_save, post_delete], sender='geography.LocalFootballAssociation')
+def invalidate_index(sender, **kwargs):
+    """Boundaries or parents changed: rebuild on next use"""
+    reset_index()
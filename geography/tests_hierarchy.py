@@ -0,0 +1,103 @@
+import gzip
+import json
+
+import brotli
+from django.db import transaction
+from django.test import RequestFactory, TransactionTestCase, override_settings
+
+from accounts.views import get_clubs_for_lfa, get_regions_for_province
+from .hierarchy import get_snapshot, hierarchy_response
+from .models import Club, ClubStatus, Country, LocalFootballAssociation, NationalFederation, Province, Region
+from .views import regions_by_province
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'hierarchy'},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class HierarchySnapshotTests(TransactionTestCase):
+    """TransactionTestCase: changes reach the snapshot when they commit"""
+
+    def setUp(self):
+        country = Country.objects.create(name='South Africa', code='RSA')
+        federation = NationalFederation.objects.create(name='SAFA', country=country)
+        self.province = Province.objects.create(name='Hierarchy Province', national_federation=federation)
+        self.regions = [
+            Region.objects.create(name=name, province=self.province) for name in ('Zulu Region', 'Alpha Region')
+        ]
+        self.lfa = LocalFootballAssociation.objects.create(name='Hierarchy LFA', region=self.regions[0])
+        self.clubs = [
+            Club.objects.create(
+                name=name, province=self.province, region=self.regions[0],
+                localfootballassociation=self.lfa, status=status
+            )
+            for name, status in (('United FC', ClubStatus.ACTIVE), ('Rovers FC', ClubStatus.INACTIVE))
+        ]
+        self.factory = RequestFactory()
+
+    def test_level_endpoints_answer_from_the_snapshot(self):
+        get_snapshot()
+        with self.assertNumQueries(0):
+            regions = get_regions_for_province(self.factory.get('/'), self.province.pk)
+            clubs = get_clubs_for_lfa(self.factory.get('/'), self.lfa.pk)
+            missing = regions_by_province(self.factory.get('/'), 0)
+        self.assertEqual(json.loads(regions.content), [
+            {'id': self.regions[1].pk, 'name': 'Alpha Region'},
+            {'id': self.regions[0].pk, 'name': 'Zulu Region'},
+        ])
+        self.assertEqual([club['name'] for club in json.loads(clubs.content)], ['Rovers FC', 'United FC'])
+        self.assertEqual(missing.status_code, 400)
+        self.assertEqual(
+            [club['name'] for club in get_snapshot().clubs(lfa_id=self.lfa.pk, active_only=True)], ['United FC']
+        )
+
+    def test_saves_rebuild_the_snapshot(self):
+        version = get_snapshot().version
+        self.clubs[0].payment_confirmed = True
+        self.clubs[0].save(update_fields=['payment_confirmed'])
+        self.assertEqual(get_snapshot().version, version)
+
+        self.regions[1].name = 'Beta Region'
+        self.regions[1].save()
+        snapshot = get_snapshot()
+        self.assertNotEqual(snapshot.version, version)
+        self.assertIn('Beta Region', [region['name'] for region in snapshot.regions(self.province.pk)])
+
+    def test_compressed_response_with_etag(self):
+        snapshot = get_snapshot()
+        response = hierarchy_response(self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip, br'))
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(response['ETag'], f'"{snapshot.version}-br"')
+        tree = json.loads(brotli.decompress(response.content))
+        self.assertEqual(len(tree['clubs']), 2)
+        self.assertEqual(tree['fields']['clubs'][-1], 'active')
+
+        response = hierarchy_response(self.factory.get('/', {'v': snapshot.version}, HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(json.loads(gzip.decompress(response.content)), tree)
+        self.assertIn('immutable', response['Cache-Control'])
+
+        response = hierarchy_response(self.factory.get('/', HTTP_IF_NONE_MATCH=f'"{snapshot.version}"'))
+        self.assertEqual(response.status_code, 304)
+        response = hierarchy_response(
+            self.factory.get('/', HTTP_IF_NONE_MATCH=f'"{snapshot.version}"', HTTP_ACCEPT_ENCODING='gzip')
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], f'"{snapshot.version}-gzip"')
+
+    def test_rolled_back_change_is_no_longer_pending(self):
+        version = get_snapshot().version
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.regions[1].name = 'Beta Region'
+            self.regions[1].save()
+            private = get_snapshot()
+            self.assertEqual(private.encodings, {})
+            self.assertIn('Beta Region', [region['name'] for region in private.regions(self.province.pk)])
+            raise RuntimeError
+
+        with transaction.atomic():
+            snapshot = get_snapshot()
+            self.assertIs(get_snapshot(), snapshot)
+        self.assertEqual(snapshot.version, version)
+        self.assertIn('br', snapshot.encodings)
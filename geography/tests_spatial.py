@@ -0,0 +1,90 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+
+from membership.models import Member
+from utils.models import BackgroundJob
+from .geocoding import cached_coordinates, normalize_address
+from .models import Country, GeocodedAddress, LocalFootballAssociation, NationalFederation, Province, Region
+from .spatial import Boundary, Placement, SpatialIndex, get_index, locate
+
+
+def box(min_x, min_y, max_x, max_y, hole=None):
+    rings = [[[min_x, min_y], [max_x, min_y], [max_x, max_y], [min_x, max_y], [min_x, min_y]]]
+    if hole:
+        x0, y0, x1, y1 = hole
+        rings.append([[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]])
+    return {'type': 'Polygon', 'coordinates': rings}
+
+
+class SpatialIndexTests(SimpleTestCase):
+
+    def test_most_specific_boundary_wins(self):
+        index = SpatialIndex([
+            Boundary('province', Placement(1, None, None), box(0, 0, 10, 10)),
+            Boundary('region', Placement(1, 2, None), box(0, 0, 5, 10)),
+            Boundary('lfa', Placement(1, 2, 3), box(0, 0, 5, 5, hole=(1, 1, 2, 2))),
+        ])
+        self.assertEqual(index.locate(3, 3), Placement(1, 2, 3))
+        self.assertEqual(index.locate(1.5, 1.5), Placement(1, 2, None))  # in the LFA's hole
+        self.assertEqual(index.locate(3, 7), Placement(1, 2, None))
+        self.assertEqual(index.locate(8, 8), Placement(1, None, None))
+        self.assertIsNone(index.locate(11, 5))
+
+    def test_empty_index(self):
+        self.assertIsNone(SpatialIndex([]).locate(1, 1))
+
+
+class SelfRegistrationPlacementTests(TestCase):
+
+    def setUp(self):
+        country = Country.objects.create(name='South Africa', code='RSA')
+        federation = NationalFederation.objects.create(name='SAFA', country=country)
+        self.province = Province.objects.create(
+            name='Spatial Province', national_federation=federation, boundary=box(18, -35, 20, -33)
+        )
+        self.region = Region.objects.create(name='Spatial Region', province=self.province, boundary=box(18, -35, 19, -33))
+        self.lfa = LocalFootballAssociation.objects.create(
+            name='Spatial LFA', region=self.region, boundary=box(18, -34, 19, -33)
+        )
+
+    def test_index_follows_boundary_changes(self):
+        self.assertEqual(locate(18.5, -33.5), Placement(self.province.pk, self.region.pk, self.lfa.pk))
+        self.lfa.boundary = box(18, -33.4, 19, -33)
+        self.lfa.save()
+        self.assertEqual(locate(18.5, -33.5), Placement(self.province.pk, self.region.pk, None))
+        with self.assertNumQueries(0):
+            get_index()
+
+    def test_normalize_address(self):
+        self.assertEqual(normalize_address('  12 Long St,  CAPE TOWN. '), '12 long street cape town')
+
+    def test_cached_address_is_placed_without_the_geocoder(self):
+        GeocodedAddress.objects.create(
+            normalized_address='12 long street cape town',
+            longitude=Decimal('18.5'),
+            latitude=Decimal('-33.5'),
+            provider='google'
+        )
+        self.assertEqual(cached_coordinates('12 Long St, Cape Town'), (18.5, -33.5))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            member = Member.objects.create(
+                first_name='Self', last_name='Registered', role='PLAYER',
+                registration_method='SELF', registration_address='12 Long Street, Cape Town'
+            )
+        self.assertFalse(BackgroundJob.objects.exists())
+        self.assertEqual(member.get_coordinates(), (18.5, -33.5))
+        self.assertEqual((member.province_id, member.region_id, member.lfa_id),
+                         (self.province.pk, self.region.pk, self.lfa.pk))
+
+    def test_uncached_address_is_geocoded_in_the_background(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            member = Member.objects.create(
+                first_name='Self', last_name='Registered', role='PLAYER',
+                registration_method='SELF', registration_address='1 Unknown Road'
+            )
+        self.assertFalse(member.location)
+        job = BackgroundJob.objects.get()
+        self.assertEqual(job.task_path, 'membership.tasks.geocode_member')
+        self.assertEqual(job.args_kwargs['args'], [member.pk])
@@ -28,6 +28,7 @@ urlpatterns = [
     path('api/regions_by_province/<int:province_id>/', views.regions_by_province, name='api_regions_by_province'),
     path('api/lfas_by_region/<int:region_id>/', views.lfas_by_region, name='api_lfas_by_region'),
     path('api/clubs_by_lfa/<int:lfa_id>/', views.clubs_by_lfa, name='api_clubs_by_lfa'),
+    path('api/hierarchy/', views.geography_hierarchy, name='api_hierarchy'),
     
     # Debug endpoint
     path('api/debug/', views.debug_geography_data, name='debug_geography_data'),
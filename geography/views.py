@@ -18,6 +18,7 @@ from django.views.generic import (
 from rest_framework import viewsets
 
 # Local application imports
+from .hierarchy import get_snapshot, hierarchy_response
 from .forms import (
     AssociationForm, ClubForm, ContinentFederationForm, ContinentRegionForm,
     CountryForm, LocalFootballAssociationForm, NationalFederationForm,
@@ -813,52 +814,30 @@ def get_lfas(request):
 @csrf_exempt
 def regions_by_province(request, province_id):
     """Get regions for a specific province by ID"""
-    try:
-        print(f"DEBUG: regions_by_province called with province_id: {province_id}")
-        print(f"DEBUG: Request method: {request.method}")
-        print(f"DEBUG: Request path: {request.path}")
-        
-        province = get_object_or_404(Province, pk=province_id)
-        print(f"DEBUG: Found province: {province.name}")
-        
-        regions = Region.objects.filter(
-            province=province
-        ).values('id', 'name').order_by('name')
-        
-        print(f"DEBUG: Found {regions.count()} regions")
-        regions_list = list(regions)
-        print(f"DEBUG: Regions data: {regions_list}")
-        
-        return JsonResponse(regions_list, safe=False)
-    except Exception as e:
-        print(f"DEBUG: Error in regions_by_province: {str(e)}")
-        import traceback
-        print(f"DEBUG: Traceback: {traceback.format_exc()}")
-        return JsonResponse({'error': str(e)}, status=400)
+    snapshot = get_snapshot()
+    if province_id not in snapshot.province_ids:
+        return JsonResponse({'error': 'No Province matches the given query.'}, status=400)
+    return JsonResponse(snapshot.regions(province_id), safe=False)
 
 @csrf_exempt
 def lfas_by_region(request, region_id):
     """Get LFAs for a specific region by ID"""
-    try:
-        region = get_object_or_404(Region, pk=region_id)
-        lfas = LocalFootballAssociation.objects.filter(
-            region=region
-        ).values('id', 'name').order_by('name')
-        return JsonResponse(list(lfas), safe=False)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+    snapshot = get_snapshot()
+    if region_id not in snapshot.region_ids:
+        return JsonResponse({'error': 'No Region matches the given query.'}, status=400)
+    return JsonResponse(snapshot.lfas(region_id), safe=False)
 
 @csrf_exempt
 def clubs_by_lfa(request, lfa_id):
     """Get clubs for a specific LFA by ID"""
-    try:
-        lfa = get_object_or_404(LocalFootballAssociation, pk=lfa_id)
-        clubs = Club.objects.filter(
-            localfootballassociation=lfa
-        ).values('id', 'name').order_by('name')
-        return JsonResponse(list(clubs), safe=False)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+    snapshot = get_snapshot()
+    if lfa_id not in snapshot.lfa_ids:
+        return JsonResponse({'error': 'No LocalFootballAssociation matches the given query.'}, status=400)
+    return JsonResponse(snapshot.clubs(lfa_id=lfa_id), safe=False)
+
+def geography_hierarchy(request):
+    """The whole province/region/LFA/club tree as one cached, compressed snapshot"""
+    return hierarchy_response(request)
 
 # Debug view to test data
 @csrf_exempt
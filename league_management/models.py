@@ -2,6 +2,8 @@ from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from geography.models import LocalFootballAssociation, Region
 from accounts.models import CustomUser
+from utils.numbering import next_number, seed_from_max
+from utils.safa_ids import claim_safa_id
 import uuid
 
 class CompetitionCategory(models.Model):
@@ -89,17 +91,8 @@ class Competition(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.safa_id:
-            # Generate 5-digit random alphanumeric SAFA ID (A-Z, 0-9)
-            import string
-            import random
-            
-            while True:
-                chars = string.ascii_uppercase + string.digits
-                safa_id = ''.join(random.choices(chars, k=5))
-                
-                if not Competition.objects.filter(safa_id=safa_id).exists():
-                    self.safa_id = safa_id
-                    break
+            # 5-character SAFA ID (A-Z, 0-9) from the shared pool
+            self.safa_id = claim_safa_id(self._meta.label)
         super().save(*args, **kwargs)
 
 class CompetitionGroup(models.Model):
@@ -167,19 +160,8 @@ class Team(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.safa_id:
-            # Generate 5-digit random alphanumeric SAFA ID (A-Z, 0-9)
-            import string
-            import random
-            
-            while True:
-                # Generate 5-character random string with capitals and numbers
-                chars = string.ascii_uppercase + string.digits
-                safa_id = ''.join(random.choices(chars, k=5))
-                
-                # Check if this ID already exists
-                if not Team.objects.filter(safa_id=safa_id).exists():
-                    self.safa_id = safa_id
-                    break
+            # 5-character SAFA ID (A-Z, 0-9) from the shared pool
+            self.safa_id = claim_safa_id(self._meta.label)
         
         super().save(*args, **kwargs)
 
@@ -291,8 +273,13 @@ class Match(models.Model):
         if not self.match_number:
             # Generate sequential match number for the competition
             year = self.competition.season_year.split('/')[0] if '/' in self.competition.season_year else self.competition.season_year
-            count = Match.objects.filter(competition=self.competition).count() + 1
-            self.match_number = f"M{year}-{count:04d}"  # e.g., M2024-0001
+            # match_number is unique across competitions, so the sequence runs per year
+            prefix = f"M{year}-"
+            count = next_number(
+                f"match:{year}",
+                seed=lambda: seed_from_max(Match.objects.all(), 'match_number', prefix)
+            )
+            self.match_number = f"{prefix}{count:04d}"  # e.g., M2024-0001
         super().save(*args, **kwargs)
 
 class MatchEvent(models.Model):
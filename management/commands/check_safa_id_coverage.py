@@ -3,6 +3,7 @@ from django.db.models import Q
 from geography.models import NationalFederation, Association, Region, LocalFootballAssociation, Club
 from accounts.models import CustomUser
 from membership.models import Member, Player
+from utils.safa_ids import POOL_LOW_WATER, get_safa_id_space_usage
 import os
 
 class Command(BaseCommand):
@@ -84,3 +85,14 @@ class Command(BaseCommand):
             self.stdout.write("\nRecommendation:")
             self.stdout.write(self.style.WARNING("  Run the following command to generate all missing SAFA IDs:"))
             self.stdout.write("  python manage.py generate_safa_ids --model all")
+        
+        # ID space usage: how much of the 36^5 space is taken by assigned and pooled IDs
+        usage = get_safa_id_space_usage()
+        self.stdout.write("\n=== SAFA ID Space ===")
+        self.stdout.write(f"  ID space:           {usage['space']:,}")
+        self.stdout.write(f"  Assigned IDs:       {usage['assigned']:,}")
+        self.stdout.write(f"  Pool available:     {usage['pool_available']:,}")
+        self.stdout.write(f"  Pool claimed:       {usage['pool_claimed']:,}")
+        self.stdout.write(f"  Space used:         {usage['used_fraction'] * 100:.4f}%")
+        if usage['pool_available'] < POOL_LOW_WATER:
+            self.stdout.write(self.style.WARNING("  Pool is running low. Run: python manage.py refill_safa_id_pool"))
@@ -1,6 +1,8 @@
 from django.core.management.base import BaseCommand
 from django.core.management import call_command
 
+from utils.bulk import bulk_operation
+
 class Command(BaseCommand):
     help = 'Load all core fixtures for SAFA Connect system in the correct order.'
 
@@ -14,7 +16,9 @@ class Command(BaseCommand):
             'geography/fixtures/geography_motherbody.json',
             # Add more fixture paths as needed
         ]
-        for fixture in fixture_list:
-            self.stdout.write(self.style.NOTICE(f'Loading {fixture}...'))
-            call_command('loaddata', fixture)
+        # Signal side effects of the loaded rows are applied once, after the last fixture
+        with bulk_operation():
+            for fixture in fixture_list:
+                self.stdout.write(self.style.NOTICE(f'Loading {fixture}...'))
+                call_command('loaddata', fixture)
         self.stdout.write(self.style.SUCCESS('All core fixtures loaded successfully!'))
@@ -389,9 +389,10 @@ class InvoiceAdmin(SAFAAccountsAdminMixin, admin.ModelAdmin):
         'status', 'due_date', 'is_overdue_display'
     )
     search_fields = (
-        'invoice_number', 'member__first_name', 'member__last_name'
+        'invoice_number', 'billed_to_name', 'member__first_name', 'member__last_name'
     )
-    list_filter = ('status', 'invoice_type', 'season_config__season_year', 'due_date')
+    list_filter = ('status', 'invoice_type', 'billed_to_type', 'season_config__season_year', 'due_date')
+    list_select_related = ('season_config',)
     date_hierarchy = 'issue_date'
     readonly_fields = (
         'uuid', 'invoice_number', 'vat_amount', 'total_amount', 
@@ -430,6 +431,9 @@ class InvoiceAdmin(SAFAAccountsAdminMixin, admin.ModelAdmin):
     season_year.short_description = "Season"
     
     def billed_to(self, obj):
+        if obj.billed_to_name:
+            prefix = "Member" if obj.billed_to_type == "Member" else "Org"
+            return f"{prefix}: {obj.billed_to_name}"
         if obj.member:
             return f"Member: {obj.member.get_full_name()}"
         elif obj.organization:
@@ -14,6 +14,8 @@ from .models import (
     Member, Transfer, Invoice, SAFASeasonConfig, SAFAFeeStructure,
     RegistrationWorkflow, ClubMemberQuota, MemberSeasonHistory
 )
+from .member_search import search_members
+from accounts.token_auth import token_cache
 
 # Try to import existing models if they exist
 
@@ -702,7 +704,9 @@ def system_health_check(request):
         'avg_response_time': 'N/A',
         'memory_usage': 'N/A',
         'database_connections': 'N/A',
-        'cache_hit_rate': 'N/A',
+        # Token lookups of the mobile API served from cache, in this process (accounts.token_auth)
+        'cache_hit_rate': f"{token_cache.stats.hit_rate:.0%}" if token_cache.stats.lookups else 'N/A',
+        'token_cache': token_cache.stats.as_dict(),
     }
     
     context = {
@@ -729,12 +733,7 @@ def ajax_member_search(request):
     if len(query) < 3:
         return JsonResponse({'results': []})
     
-    members = Member.objects.filter(
-        Q(first_name__icontains=query) |
-        Q(last_name__icontains=query) |
-        Q(safa_id__icontains=query) |
-        Q(email__icontains=query)
-    )[:10]
+    members = search_members(query, Member.objects.select_related('current_club'))[:10]
     
     results = []
     for member in members:
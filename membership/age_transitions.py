@@ -0,0 +1,149 @@
+# membership/age_transitions.py
+"""
+Incremental junior-to-senior age transitions.
+
+A player is junior until the ClubMemberQuota senior cut-off (18 years before
+the day). Nothing on the member row changes at 18, but the club quota
+counters recorded the player as a junior when they were last saved, so the
+job moves every player who turned 18 since the last run from the junior to
+the senior counter.
+
+Each run covers players born in [cutoff(since), cutoff(as_of)), found with a
+date range on the (role, date_of_birth) index rather than by loading every
+junior. They are processed in pk order in chunks; each chunk commits its
+counter updates (one UPDATE per club and season) together with the run's
+progress, so an interrupted run resumes where it stopped. The as_of date of
+the latest complete run is the watermark for the next.
+
+The first run has no watermark and recounts the active season's quotas
+instead (ClubMemberQuota.reconcile_season).
+
+Usage:
+    stats = run_age_transitions()                 # up to today
+    stats = run_age_transitions(dry_run=True)     # report only
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from utils.run_stats import RunStats
+from .models import AgeTransitionRun, ClubMemberQuota, Member, SAFASeasonConfig
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class TransitionStats(RunStats):
+    """Members moved and quota rows updated by a transition run over [since, as_of)"""
+    counters = ('quota_members', 'quota_rows')
+
+    def __init__(self, since, as_of, dry_run):
+        super().__init__()
+        self.since = since
+        self.as_of = as_of
+        self.dry_run = dry_run
+        self.full_reconcile = since is None
+
+    def as_dict(self):
+        return {
+            'since': self.since,
+            'as_of': self.as_of,
+            'dry_run': self.dry_run,
+            **super().as_dict(),
+            'full_reconcile': self.full_reconcile,
+        }
+
+
+def newly_senior_players(since, as_of):
+    """Players who count as junior on `since` and as senior on `as_of`"""
+    return Member.objects.filter(
+        role='PLAYER',
+        date_of_birth__gte=ClubMemberQuota.get_senior_cutoff_date(since),
+        date_of_birth__lt=ClubMemberQuota.get_senior_cutoff_date(as_of),
+    )
+
+
+def move_to_senior_counters(groups):
+    """
+    Move {(club_id, season_id): players} from the junior to the senior
+    counters with one UPDATE per quota row. Returns the rows updated.
+    """
+    updated = 0
+    for (club_id, season_id), players in groups.items():
+        updated += ClubMemberQuota.objects.filter(club_id=club_id, season_config_id=season_id).update(
+            current_junior_players=Greatest(F('current_junior_players') - players, 0),
+            current_senior_players=F('current_senior_players') + players,
+        )
+    return updated
+
+
+def run_age_transitions(as_of=None, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, progress=None):
+    """Apply transitions up to as_of (default today) from the last watermark; returns TransitionStats"""
+    as_of = as_of or timezone.now().date()
+
+    run = AgeTransitionRun.objects.filter(is_complete=False).order_by('-pk').first()
+    if run is None:
+        watermark = AgeTransitionRun.objects.filter(is_complete=True).order_by('-as_of', '-pk').first()
+        since = watermark.as_of if watermark else None
+        if since is not None and since >= as_of:
+            return TransitionStats(since, as_of, dry_run)
+        if not dry_run:
+            run = AgeTransitionRun.objects.create(since=since, as_of=as_of)
+    else:
+        # Resume the interrupted run with its own bounds
+        since, as_of = run.since, run.as_of
+
+    stats = TransitionStats(since, as_of, dry_run)
+
+    if since is None:
+        season = SAFASeasonConfig.get_active_season()
+        if season:
+            stats.quota_rows = ClubMemberQuota.reconcile_season(season, dry_run=dry_run)
+        if run:
+            run.quota_rows_updated = stats.quota_rows
+            run.is_complete = True
+            run.save(update_fields=['quota_rows_updated', 'is_complete', 'updated_at'])
+        return stats
+
+    queryset = newly_senior_players(since, as_of).order_by('pk').values_list(
+        'pk', 'status', 'current_club_id', 'current_season_id'
+    )
+    last_id = run.last_member_id if run else 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+
+        groups = Counter(
+            (club_id, season_id)
+            for _pk, status, club_id, season_id in chunk
+            if status == 'ACTIVE' and club_id and season_id
+        )
+        stats.processed += len(chunk)
+        stats.quota_members += sum(groups.values())
+        last_id = chunk[-1][0]
+
+        if dry_run:
+            stats.quota_rows += len(groups)
+        else:
+            with transaction.atomic():
+                rows = move_to_senior_counters(groups)
+                stats.quota_rows += rows
+                run.last_member_id = last_id
+                run.members_converted += len(chunk)
+                run.quota_rows_updated += rows
+                run.save(update_fields=[
+                    'last_member_id', 'members_converted', 'quota_rows_updated', 'updated_at'
+                ])
+
+        if progress:
+            progress(stats)
+        if len(chunk) < chunk_size:
+            break
+
+    if run:
+        run.is_complete = True
+        run.save(update_fields=['is_complete', 'updated_at'])
+    return stats
@@ -3,16 +3,17 @@
 
 from django.shortcuts import get_object_or_404
 from django.http import JsonResponse
-from django.db.models import Q, Count, Sum, Avg
+from django.db.models import Q, Count, Sum
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
 from django.core.exceptions import ValidationError
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
 from django.core.paginator import Paginator
+from django.urls import reverse
 from django.db import transaction
-from django.core.mail import send_mail
 from django.conf import settings
 
 from rest_framework import status, generics, permissions
@@ -21,6 +22,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
 
+import hashlib
 import json
 from decimal import Decimal
 from datetime import datetime, timedelta, date
@@ -32,7 +34,14 @@ from .models import (
     InvoiceItem, MemberDocument, RegistrationWorkflow, MemberSeasonHistory,
     ClubMemberQuota, OrganizationSeasonRegistration
 )
-from geography.models import Province, Region, LocalFootballAssociation, Club, Association
+from .fee_quotes import FeeQuoteEngine, quote_as_dict
+from .member_search import search_members
+from .season_cache import season_cache
+from .season_stats import get_season_snapshot
+from . import season_rollups, tasks
+from geography.hierarchy import get_snapshot, hierarchy_response
+from geography.models import Club, Association
+from accounts.jurisdiction import jurisdiction_members, request_admin_scope
 
 # Import serializers
 from .serializers import (
@@ -45,6 +54,9 @@ from .serializers import (
 
 logger = logging.getLogger(__name__)
 
+# Longest monthly trend dashboard_charts will chart (?months=)
+MAX_CHART_MONTHS = 36
+
 
 # ============================================================================
 # FEE CALCULATION API
@@ -95,12 +107,8 @@ def calculate_fees(request):
         entity_type = 'OFFICIAL_GENERAL'
     
     # Get fee structure
-    try:
-        fee_structure = SAFAFeeStructure.objects.get(
-            season_config=season,
-            entity_type=entity_type
-        )
-    except SAFAFeeStructure.DoesNotExist:
+    fee_structure = season_cache.get_fee_structure(season, entity_type)
+    if not fee_structure:
         return Response({
             'success': False,
             'message': f'No fee structure found for {entity_type} in {season.season_year}'
@@ -111,20 +119,9 @@ def calculate_fees(request):
     vat_amount = base_fee * season.vat_rate
     total_fee = base_fee + vat_amount
     
-    # Check for pro-rata calculation
-    pro_rata_fee = None
-    if fee_structure.is_pro_rata:
-        today = timezone.now().date()
-        if today > season.season_start_date:
-            season_days = (season.season_end_date - season.season_start_date).days
-            remaining_days = (season.season_end_date - today).days
-            
-            if remaining_days > 0:
-                pro_rata_base = base_fee * (remaining_days / season_days)
-                if fee_structure.minimum_fee:
-                    pro_rata_base = max(pro_rata_base, fee_structure.minimum_fee)
-                pro_rata_vat = pro_rata_base * season.vat_rate
-                pro_rata_fee = pro_rata_base + pro_rata_vat
+    # Pro-rata fee for registering today, priced like the invoice would be
+    quote = FeeQuoteEngine(season).quote([(entity_type, None)])[0]
+    pro_rata_fee = quote.total if quote.is_pro_rata else None
     
     return Response({
         'success': True,
@@ -144,10 +141,106 @@ def calculate_fees(request):
     })
 
 
+# Largest number of quotes priced in one request
+MAX_FEE_QUOTES = 5000
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def quote_fees(request):
+    """
+    Price many registrations in one call:
+        {"season_id": 3,
+         "member_ids": [12, 13],
+         "items": [{"entity_type": "PLAYER_JUNIOR", "registration_date": "2025-03-01"}]}
+    Returns one itemized quote per member (within the admin's jurisdiction)
+    and per item, in request order.
+    """
+    member_ids = request.data.get('member_ids') or []
+    items = request.data.get('items') or []
+    if not isinstance(items, list) or not isinstance(member_ids, list) or not all(
+        isinstance(member_id, int) for member_id in member_ids
+    ):
+        return Response({
+            'success': False,
+            'message': 'member_ids must be a list of ids and items a list of objects'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(member_ids) + len(items) > MAX_FEE_QUOTES:
+        return Response({
+            'success': False,
+            'message': f'At most {MAX_FEE_QUOTES} quotes per request'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    season_id = request.data.get('season_id')
+    if season_id:
+        season = SAFASeasonConfig.objects.filter(pk=season_id).first()
+        if not season:
+            return Response({
+                'success': False,
+                'message': 'Season not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+    else:
+        season = SAFASeasonConfig.get_active_season()
+        if not season:
+            return Response({
+                'success': False,
+                'message': 'No active season found'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    entity_types = {entity_type for entity_type, _label in SAFAFeeStructure.ENTITY_TYPES}
+    requests = []
+    errors = []
+    for number, item in enumerate(items):
+        entity_type = item.get('entity_type') if isinstance(item, dict) else None
+        registration_date = None
+        if entity_type not in entity_types:
+            errors.append({'item': number, 'error': f'Unknown entity type {entity_type!r}'})
+            continue
+        if item.get('registration_date'):
+            try:
+                registration_date = datetime.strptime(item['registration_date'], '%Y-%m-%d').date()
+            except (TypeError, ValueError):
+                errors.append({'item': number, 'error': 'registration_date must be YYYY-MM-DD'})
+                continue
+        requests.append((entity_type, registration_date))
+    if errors:
+        return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    members = {}
+    if member_ids:
+        members = jurisdiction_members(
+            *request_admin_scope(request),
+            Member.objects.select_related('profile__official_position')
+        ).in_bulk(member_ids)
+        missing = [member_id for member_id in member_ids if member_id not in members]
+        if missing:
+            return Response({
+                'success': False,
+                'message': f'Members not found: {missing}'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+    engine = FeeQuoteEngine(season)
+    member_quotes = engine.quote_members(members[member_id] for member_id in member_ids)
+    item_quotes = engine.quote(requests)
+    return Response({
+        'success': True,
+        'season_year': season.season_year,
+        'members': [
+            {'member_id': member_id, **quote_as_dict(quote)}
+            for member_id, quote in zip(member_ids, member_quotes)
+        ],
+        'items': [quote_as_dict(quote) for quote in item_quotes],
+        'total': str(sum((quote.total for quote in member_quotes + item_quotes), Decimal('0.00'))),
+    })
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def dashboard_stats(request):
-    """Get dashboard statistics"""
+    """
+    Get dashboard statistics from the season snapshot.
+    ?fresh=1 forces a recompute; responses carry an ETag so pollers get 304s.
+    """
     current_season = SAFASeasonConfig.get_active_season()
     
     if not current_season:
@@ -156,175 +249,103 @@ def dashboard_stats(request):
             'message': 'No active season found'
         }, status=status.HTTP_404_NOT_FOUND)
     
-    # Member statistics
-    members_qs = Member.objects.filter(current_season=current_season)
-    
-    member_stats = {
-        'total_members': members_qs.count(),
-        'active_members': members_qs.filter(status='ACTIVE').count(),
-        'pending_members': members_qs.filter(status='PENDING').count(),
-        'rejected_members': members_qs.filter(status='REJECTED').count(),
-        'inactive_members': members_qs.filter(status='INACTIVE').count(),
-    }
-    
-    # Role breakdown
-    role_stats = {
-        'total_players': members_qs.filter(role='PLAYER').count(),
-        'total_officials': members_qs.filter(role='OFFICIAL').count(),
-        'total_admins': members_qs.filter(role='ADMIN').count(),
-    }
-    
-    # Invoice statistics
-    invoices_qs = Invoice.objects.filter(season_config=current_season)
-    
-    invoice_stats = {
-        'total_invoices': invoices_qs.count(),
-        'paid_invoices': invoices_qs.filter(status='PAID').count(),
-        'pending_invoices': invoices_qs.filter(status='PENDING').count(),
-        'overdue_invoices': invoices_qs.filter(status='OVERDUE').count(),
-    }
-    
-    # Financial statistics
-    financial_stats = {
-        'total_revenue': float(invoices_qs.filter(status='PAID').aggregate(
-            total=Sum('total_amount')
-        )['total'] or 0),
-        'outstanding_revenue': float(invoices_qs.filter(
-            status__in=['PENDING', 'OVERDUE', 'PARTIALLY_PAID']
-        ).aggregate(
-            total=Sum('outstanding_amount')
-        )['total'] or 0),
-    }
-    
-    # Calculate collection rate
-    total_invoiced = float(invoices_qs.aggregate(total=Sum('total_amount'))['total'] or 0)
-    if total_invoiced > 0:
-        financial_stats['collection_rate'] = round(
-            (financial_stats['total_revenue'] / total_invoiced) * 100, 2
-        )
-    else:
-        financial_stats['collection_rate'] = 0.0
-    
-    # Transfer statistics
-    transfers_qs = Transfer.objects.filter(
-        member__current_season=current_season
-    )
-    
-    transfer_stats = {
-        'pending_transfers': transfers_qs.filter(status='PENDING').count(),
-        'approved_transfers': transfers_qs.filter(status='APPROVED').count(),
-        'rejected_transfers': transfers_qs.filter(status='REJECTED').count(),
-    }
-    
-    # Growth rate calculation (last 30 days)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    recent_members = members_qs.filter(created__gte=thirty_days_ago).count()
-    previous_total = members_qs.filter(created__lt=thirty_days_ago).count()
-    
-    if previous_total > 0:
-        growth_rate = round(((recent_members / previous_total) * 100), 2)
-    else:
-        growth_rate = 0.0
-    
-    # Average invoice value
-    avg_invoice = invoices_qs.aggregate(avg=Avg('total_amount'))['avg']
-    avg_invoice_value = float(avg_invoice) if avg_invoice else 0.0
+    fresh = request.query_params.get('fresh') == '1'
+    snapshot = get_season_snapshot(current_season, fresh=fresh)
     
     stats = {
-        **member_stats,
-        **role_stats,
-        **invoice_stats,
-        **financial_stats,
-        **transfer_stats,
+        **snapshot.as_stats(),
         'active_season': SAFASeasonConfigSerializer(current_season).data,
-        'member_growth_rate': growth_rate,
-        'average_invoice_value': round(avg_invoice_value, 2),
     }
-    
-    return Response({
+    payload = {
         'success': True,
         'data': stats
-    })
+    }
+    
+    etag = '"%s"' % hashlib.sha1(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    
+    not_modified = None if fresh else get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        for header, value in headers.items():
+            not_modified[header] = value
+        return not_modified
+    
+    return Response(payload, headers=headers)
 
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def dashboard_charts(request):
-    """Get dashboard chart data"""
-    current_season = SAFASeasonConfig.get_active_season()
-    
-    if not current_season:
+    """
+    Get dashboard chart data from the daily rollups (see season_rollups).
+    ?season=<year> charts another season, ?season=all charts every season and
+    ?months=N (1 to MAX_CHART_MONTHS) widens the monthly trends (default 12).
+    """
+    season_param = request.GET.get('season')
+    if season_param == 'all':
+        seasons = list(SAFASeasonConfig.objects.values_list('pk', flat=True))
+    elif season_param:
+        try:
+            season_year = int(season_param)
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'season must be a year or "all"'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        seasons = list(SAFASeasonConfig.objects.filter(season_year=season_year).values_list('pk', flat=True))
+    else:
+        current_season = SAFASeasonConfig.get_active_season()
+        seasons = [current_season.pk] if current_season else []
+
+    if not seasons:
         return Response({
             'success': False,
             'message': 'No active season found'
         }, status=status.HTTP_404_NOT_FOUND)
-    
+
+    try:
+        months = int(request.GET.get('months', 12))
+    except ValueError:
+        months = 0
+    if not 1 <= months <= MAX_CHART_MONTHS:
+        return Response({
+            'success': False,
+            'message': f'months must be between 1 and {MAX_CHART_MONTHS}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    today = timezone.localdate()
+    thirty_days_ago = today - timedelta(days=30)
+    month_index = today.year * 12 + today.month - months
+    first_month = date(month_index // 12, month_index % 12 + 1, 1)
+
     # Member registration over time (last 30 days)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    
-    daily_registrations = Member.objects.filter(
-        current_season=current_season,
-        created__gte=thirty_days_ago
-    ).extra(
-        select={'day': 'date(created)'}
-    ).values('day').annotate(
-        count=Count('id')
-    ).order_by('day')
-    
-    # Status distribution
-    status_distribution = Member.objects.filter(
-        current_season=current_season
-    ).values('status').annotate(
-        count=Count('id')
-    )
-    
-    # Role distribution
-    role_distribution = Member.objects.filter(
-        current_season=current_season
-    ).values('role').annotate(
-        count=Count('id')
-    )
-    
-    # Monthly registration trends (last 12 months)
-    twelve_months_ago = timezone.now() - timedelta(days=365)
-    
-    monthly_registrations = Member.objects.filter(
-        current_season=current_season,
-        created__gte=twelve_months_ago
-    ).extra(
-        select={'month': "DATE_FORMAT(created, '%%Y-%%m')"}
-    ).values('month').annotate(
-        count=Count('id')
-    ).order_by('month')
-    
+    daily_registrations = season_rollups.registrations_by_day(seasons, thirty_days_ago)
+
+    # Status and role distribution
+    status_distribution = season_rollups.registrations_by(seasons, 'status')
+    role_distribution = season_rollups.registrations_by(seasons, 'role')
+
+    # Monthly registration trends
+    monthly_registrations = season_rollups.registrations_by_month(seasons, first_month)
+
     # Invoice status distribution
-    invoice_status_distribution = Invoice.objects.filter(
-        season_config=current_season
-    ).values('status').annotate(
-        count=Count('id'),
-        total_amount=Sum('total_amount')
-    )
-    
+    invoice_status_distribution = season_rollups.invoices_by_status(seasons)
+
     # Club membership distribution (top 10 clubs by member count)
     club_distribution = Member.objects.filter(
-        current_season=current_season,
+        current_season__in=seasons,
         status='ACTIVE'
     ).values(
         'current_club__name'
     ).annotate(
         count=Count('id')
     ).order_by('-count')[:10]
-    
-    # Revenue over time (monthly)
-    monthly_revenue = Invoice.objects.filter(
-        season_config=current_season,
-        status='PAID'
-    ).extra(
-        select={'month': "DATE_FORMAT(payment_date, '%%Y-%%m')"}
-    ).values('month').annotate(
-        revenue=Sum('total_amount')
-    ).order_by('month')
-    
+
+    # Revenue over time (monthly, by payment date)
+    monthly_revenue = season_rollups.revenue_by_month(seasons, first_month)
+
     charts = {
         'daily_registrations': [
             {
@@ -346,7 +367,7 @@ def dashboard_charts(request):
         ],
         'monthly_registrations': [
             {
-                'month': item['month'],
+                'month': item['month'].strftime('%Y-%m') if item['month'] else '',
                 'count': item['count']
             } for item in monthly_registrations
         ],
@@ -365,7 +386,7 @@ def dashboard_charts(request):
         ],
         'monthly_revenue': [
             {
-                'month': item['month'],
+                'month': item['month'].strftime('%Y-%m') if item['month'] else '',
                 'revenue': float(item['revenue'] or 0)
             } for item in monthly_revenue
         ]
@@ -395,75 +416,46 @@ class StandardResultsSetPagination(PageNumberPagination):
 @permission_classes([permissions.AllowAny])
 def regions_by_province(request, province_id):
     """Get regions for a given province"""
-    try:
-        province = get_object_or_404(Province, pk=province_id)
-        regions = Region.objects.filter(
-            province=province, 
-            is_active=True
-        ).values('id', 'name').order_by('name')
-        return Response(list(regions))
-    except Exception as e:
-        return Response(
-            {'error': str(e)}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
+    snapshot = get_snapshot()
+    if province_id not in snapshot.province_ids:
+        return Response({'error': 'No Province matches the given query.'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(snapshot.regions(province_id, active_only=True))
 
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def lfas_by_region(request, region_id):
     """Get LFAs for a given region"""
-    try:
-        region = get_object_or_404(Region, pk=region_id)
-        lfas = LocalFootballAssociation.objects.filter(
-            region=region, 
-            is_active=True
-        ).values('id', 'name').order_by('name')
-        return Response(list(lfas))
-    except Exception as e:
-        return Response(
-            {'error': str(e)}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
+    snapshot = get_snapshot()
+    if region_id not in snapshot.region_ids:
+        return Response({'error': 'No Region matches the given query.'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(snapshot.lfas(region_id, active_only=True))
 
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def clubs_by_lfa(request, lfa_id):
     """Get clubs for a given LFA"""
-    try:
-        lfa = get_object_or_404(LocalFootballAssociation, pk=lfa_id)
-        clubs = Club.objects.filter(
-            lfa=lfa, 
-            is_active=True
-        ).values('id', 'name').order_by('name')
-        return Response(list(clubs))
-    except Exception as e:
+    snapshot = get_snapshot()
+    if lfa_id not in snapshot.lfa_ids:
         return Response(
-            {'error': str(e)}, 
+            {'error': 'No LocalFootballAssociation matches the given query.'},
             status=status.HTTP_400_BAD_REQUEST
         )
+    return Response(snapshot.clubs(lfa_id=lfa_id, active_only=True))
 
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def get_clubs_by_geography(request):
     """Get clubs filtered by geographic parameters"""
-    province_id = request.GET.get('province_id')
-    region_id = request.GET.get('region_id')
-    lfa_id = request.GET.get('lfa_id')
-    
-    clubs_qs = Club.objects.filter(is_active=True)
-    
-    if lfa_id:
-        clubs_qs = clubs_qs.filter(lfa_id=lfa_id)
-    elif region_id:
-        clubs_qs = clubs_qs.filter(region_id=region_id)
-    elif province_id:
-        clubs_qs = clubs_qs.filter(province_id=province_id)
-    
-    clubs = clubs_qs.values('id', 'name', 'short_name').order_by('name')
-    return Response(list(clubs))
+    ids = {}
+    for param in ('province_id', 'region_id', 'lfa_id'):
+        try:
+            ids[param] = int(request.GET[param]) if request.GET.get(param) else None
+        except ValueError:
+            return Response({'error': f'Invalid {param}'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(get_snapshot().clubs(**ids, active_only=True))
 
 
 @api_view(['GET'])
@@ -481,36 +473,11 @@ def get_associations_by_type(request):
 
 
 class GeographicHierarchyAPIView(APIView):
-    """Get complete geographic hierarchy data"""
+    """Get complete geographic hierarchy data (the versioned snapshot, see geography.hierarchy)"""
     permission_classes = [permissions.AllowAny]
-    
+
     def get(self, request):
-        # Get all active geographic entities
-        provinces = Province.objects.filter(is_active=True).values(
-            'id', 'name', 'code'
-        ).order_by('name')
-        
-        regions = Region.objects.filter(is_active=True).values(
-            'id', 'name', 'province_id', 'province__name'
-        ).order_by('province__name', 'name')
-        
-        lfas = LocalFootballAssociation.objects.filter(is_active=True).values(
-            'id', 'name', 'region_id', 'region__name', 'region__province__name'
-        ).order_by('region__province__name', 'region__name', 'name')
-        
-        clubs = Club.objects.filter(is_active=True).values(
-            'id', 'name', 'short_name', 'lfa_id', 'region_id', 'province_id'
-        ).order_by('province__name', 'region__name', 'lfa__name', 'name')
-        
-        return Response({
-            'success': True,
-            'data': {
-                'provinces': list(provinces),
-                'regions': list(regions),
-                'lfas': list(lfas),
-                'clubs': list(clubs),
-            }
-        })
+        return hierarchy_response(request)
 
 
 # ============================================================================
@@ -547,13 +514,7 @@ def member_search(request):
     
     # Apply search filters
     if query:
-        members_qs = members_qs.filter(
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query) |
-            Q(email__icontains=query) |
-            Q(safa_id__icontains=query) |
-            Q(id_number__icontains=query)
-        )
+        members_qs = search_members(query, members_qs)
     
     if status_filter:
         members_qs = members_qs.filter(status=status_filter)
@@ -775,39 +736,10 @@ class MemberRegistrationAPIView(generics.CreateAPIView):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     def send_registration_email(self, member, invoice):
-        """Send registration confirmation email"""
-        try:
-            subject = f'SAFA Registration Confirmation - {member.safa_id}'
-            message = f"""
-Dear {member.get_full_name()},
-
-Your SAFA registration has been submitted successfully.
-
-Registration Details:
-- SAFA ID: {member.safa_id}
-- Club: {member.current_club.name if member.current_club else 'N/A'}
-- Season: {member.current_season.season_year if member.current_season else 'N/A'}
-
-Payment Information:
-- Invoice Number: {invoice.invoice_number}
-- Amount Due: R{invoice.total_amount}
-- Due Date: {invoice.due_date}
-
-Please complete payment to activate your membership.
-
-Thank you,
-SAFA Registration Team
-            """
-            
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email='noreply@safa.org.za',
-                recipient_list=[member.email],
-                fail_silently=True
-            )
-        except Exception as e:
-            logger.warning(f"Failed to send registration email to {member.email}: {e}")
+        """Queue the registration confirmation email (sent once the registration commits)"""
+        if not member.email:
+            return None
+        return tasks.send_registration_email.enqueue(member.pk, invoice.pk)
 
 
 # ============================================================================
@@ -926,9 +858,11 @@ class MemberViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Apply permissions and filtering"""
-        qs = Member.objects.select_related(
-            'current_club', 'current_season', 'province', 'region', 'lfa', 'user'
-        ).prefetch_related('associations', 'documents')
+        if self.get_serializer_class() is MemberSerializer:
+            # Batched loading for the per-member fields MemberSerializer computes
+            qs = MemberSerializer.setup_queryset(Member.objects.all())
+        else:
+            qs = Member.objects.select_related('current_club')
         
         # Apply user permissions
         user = self.request.user
@@ -961,12 +895,8 @@ class MemberViewSet(viewsets.ModelViewSet):
         
         search = self.request.query_params.get('search')
         if search:
-            qs = qs.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(email__icontains=search) |
-                Q(safa_id__icontains=search)
-            )
+            # Ranked by relevance
+            return search_members(search, qs)
         
         return qs.order_by('-created')
     
@@ -1279,65 +1209,20 @@ class InvoiceViewSet(viewsets.ModelViewSet):
                 'message': 'Payment reminder can only be sent for unpaid invoices'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        try:
-            recipient_email = None
-            recipient_name = None
-            
-            if invoice.member:
-                recipient_email = invoice.member.email
-                recipient_name = invoice.member.get_full_name()
-            elif invoice.organization:
-                recipient_name = getattr(invoice.organization, 'name', str(invoice.organization))
-                # Try to find admin email for organizations
-                # This would need to be implemented based on your organization structure
-            
-            if recipient_email and recipient_name:
-                subject = f'Payment Reminder - Invoice #{invoice.invoice_number}'
-                message = f"""
-Dear {recipient_name},
-
-This is a reminder that your invoice #{invoice.invoice_number} for R{invoice.total_amount:.2f} is outstanding.
-
-Invoice Details:
-- Amount Due: R{invoice.outstanding_amount:.2f}
-- Due Date: {invoice.due_date}
-- Status: {invoice.get_status_display()}
-
-Please log in to the SAFA system to view and pay this invoice.
-
-Thank you,
-SAFA Finance Team
-                """
-                
-                success = send_mail(
-                    subject=subject,
-                    message=message,
-                    from_email='finance@safa.org.za',
-                    recipient_list=[recipient_email],
-                    fail_silently=False
-                )
-                
-                if success:
-                    return Response({
-                        'success': True,
-                        'message': f'Payment reminder sent to {recipient_name}'
-                    })
-                else:
-                    return Response({
-                        'success': False,
-                        'message': 'Failed to send payment reminder'
-                    }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            else:
-                return Response({
-                    'success': False,
-                    'message': 'No valid email address found for this invoice'
-                }, status=status.HTTP_400_BAD_REQUEST)
-                
-        except Exception as e:
+        # Organisation invoices have no contact address on record yet
+        if not invoice.member or not invoice.member.email:
             return Response({
                 'success': False,
-                'message': f'Error sending reminder: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                'message': 'No valid email address found for this invoice'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        job = tasks.send_invoice_reminder.enqueue_for(request.user, invoice.pk)
+        return Response({
+            'success': True,
+            'message': f'Payment reminder to {invoice.member.get_full_name()} queued',
+            'job_id': job.id,
+            'status_url': reverse('jobs:job_status', kwargs={'job_id': job.id})
+        }, status=status.HTTP_202_ACCEPTED)
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def overdue(self, request):
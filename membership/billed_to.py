@@ -0,0 +1,82 @@
+# membership/billed_to.py
+"""
+Who an invoice is billed to.
+
+Member invoices point at a Member; organisation invoices point at a Province,
+Region, LFA, Club or Association through the generic `organization`
+relation, which Django resolves with one query per invoice. To keep invoice
+lists from doing that:
+
+* the billed party's name and kind are stored on the invoice itself
+  (billed_to_name / billed_to_type) when it is created, so lists, the admin
+  and the API read them without touching the relation;
+* resolve_organizations() fills the relation for a page of invoices with one
+  query per organisation type, for the views that need the organisation
+  itself and for rows created before the columns existed;
+* backfill_billed_to() fills the columns on existing rows
+  (management command backfill_billed_to).
+"""
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+
+MEMBER_TYPE = 'Member'
+UNKNOWN = 'Unknown'
+
+
+def describe_billed_to(entity):
+    """(name, type) for a member or organisation, e.g. ('Soweto FC', 'Club')"""
+    if entity is None:
+        return '', ''
+    if hasattr(entity, 'get_full_name'):
+        return entity.get_full_name() or '', MEMBER_TYPE
+    if hasattr(entity, 'get_model_name'):
+        kind = entity.get_model_name()
+    else:
+        kind = entity._meta.verbose_name.title()
+    return getattr(entity, 'name', None) or str(entity), kind
+
+
+def resolve_organizations(invoices):
+    """
+    Fill the cached `organization` of each organisation invoice in invoices
+    with one query per organisation type. Invoices whose relation is already
+    cached are left alone. Returns invoices as a list.
+    """
+    from .models import Invoice
+
+    invoices = list(invoices)
+    field = Invoice._meta.get_field('organization')
+    pending = defaultdict(list)
+    for invoice in invoices:
+        if invoice.content_type_id and invoice.object_id and not field.is_cached(invoice):
+            pending[invoice.content_type_id].append(invoice)
+
+    for content_type_id, group in pending.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        found = model._base_manager.in_bulk({invoice.object_id for invoice in group}) if model else {}
+        for invoice in group:
+            # Cache misses too, so a deleted organisation is not looked up again
+            field.set_cached_value(invoice, found.get(invoice.object_id))
+    return invoices
+
+
+def backfill_billed_to(queryset, batch_size=500):
+    """Fill billed_to_name/billed_to_type on invoices in queryset that lack them"""
+    from .models import Invoice
+
+    queryset = queryset.filter(billed_to_type='').select_related('member').order_by('pk')
+    updated = 0
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return updated
+        last_pk = batch[-1].pk
+        resolve_organizations(batch)
+        for invoice in batch:
+            invoice.set_billed_to()
+        # Rows whose member or organisation is gone keep the Unknown marker,
+        # so they are not picked up again
+        Invoice.objects.bulk_update(batch, ['billed_to_name', 'billed_to_type'])
+        updated += len(batch)
@@ -0,0 +1,121 @@
+# membership/fee_quotes.py
+"""
+Batch registration fee quotes.
+
+FeeQuoteEngine prices many members, or (entity_type, registration_date)
+pairs, against one season. The fee table is read once, and each distinct
+(entity_type, registration_date) is priced once however many members share
+it, so quoting a squad of hundreds touches only a handful of fee rules.
+
+The amounts follow Member.calculate_registration_fee (pro-rata on remaining
+days with the minimum fee, rounded half-up to cents, built-in defaults when
+the season has no fee structure for the type) and VAT is rounded like
+Invoice.calculate_totals, so a quote equals the invoice it would produce.
+
+Usage:
+    engine = FeeQuoteEngine(season_config)
+    quotes = engine.quote_members(members)
+    quotes = engine.quote([('PLAYER_JUNIOR', date(2025, 3, 1)), ...])
+"""
+from collections import namedtuple
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.utils import timezone
+
+from .season_cache import season_cache
+
+CENT = Decimal('0.01')
+
+# Charged when the season has no fee structure for the entity type
+DEFAULT_FEES = {
+    'PLAYER_JUNIOR': Decimal('100.00'),
+    'PLAYER_SENIOR': Decimal('200.00'),
+}
+DEFAULT_OFFICIAL_FEE = Decimal('250.00')
+DEFAULT_FEE = Decimal('200.00')
+
+FeeQuote = namedtuple('FeeQuote', [
+    'entity_type', 'registration_date', 'annual_fee', 'subtotal', 'vat_rate', 'vat_amount', 'total',
+    'is_pro_rata', 'remaining_days', 'minimum_fee_applied', 'default_fee',
+])
+
+
+def default_fee(entity_type):
+    if entity_type in DEFAULT_FEES:
+        return DEFAULT_FEES[entity_type]
+    if 'OFFICIAL' in entity_type:
+        return DEFAULT_OFFICIAL_FEE
+    return DEFAULT_FEE
+
+
+def quote_as_dict(quote):
+    """JSON-friendly quote; amounts as strings so cents are exact"""
+    data = quote._asdict()
+    data['registration_date'] = quote.registration_date.isoformat()
+    for field in ('annual_fee', 'subtotal', 'vat_rate', 'vat_amount', 'total'):
+        data[field] = str(data[field])
+    return data
+
+
+class FeeQuoteEngine:
+    """Registration fee quotes for one season"""
+
+    def __init__(self, season_config, fee_table=None):
+        self.season_config = season_config
+        self.fees = fee_table if fee_table is not None else season_cache.get_fee_table(season_config)
+        self._quotes = {}
+
+    def quote(self, requests):
+        """[FeeQuote] for (entity_type, registration_date or None for today) pairs, in order"""
+        today = timezone.now().date()
+        keys = [(entity_type, registration_date or today) for entity_type, registration_date in requests]
+        for key in set(keys).difference(self._quotes):
+            self._quotes[key] = self._price(*key)
+        return [self._quotes[key] for key in keys]
+
+    def quote_members(self, members, registration_date=None):
+        """
+        [FeeQuote] for members, in order. Officials' entity type depends on
+        their profile position, so load members with
+        select_related('profile__official_position').
+        """
+        return self.quote([(member.get_entity_type_for_fees(), registration_date) for member in members])
+
+    def _price(self, entity_type, registration_date):
+        season = self.season_config
+        vat_rate = season.vat_rate
+        fee_structure = self.fees.get(entity_type)
+        remaining_days = None
+        minimum_fee_applied = False
+        is_pro_rata = False
+
+        if fee_structure is None:
+            annual_fee = subtotal = default_fee(entity_type)
+        else:
+            annual_fee = subtotal = fee_structure.annual_fee
+            if fee_structure.is_pro_rata and registration_date > season.season_start_date:
+                season_days = (season.season_end_date - season.season_start_date).days
+                remaining_days = (season.season_end_date - registration_date).days
+                if remaining_days > 0:
+                    # Same operation order as Member.calculate_registration_fee
+                    subtotal = annual_fee * (Decimal(remaining_days) / Decimal(season_days))
+                    if fee_structure.minimum_fee and fee_structure.minimum_fee > subtotal:
+                        subtotal = fee_structure.minimum_fee
+                        minimum_fee_applied = True
+                    subtotal = subtotal.quantize(CENT, rounding=ROUND_HALF_UP)
+                    is_pro_rata = True
+
+        vat_amount = (subtotal * vat_rate).quantize(CENT, rounding=ROUND_HALF_UP)
+        return FeeQuote(
+            entity_type=entity_type,
+            registration_date=registration_date,
+            annual_fee=annual_fee,
+            subtotal=subtotal,
+            vat_rate=vat_rate,
+            vat_amount=vat_amount,
+            total=subtotal + vat_amount,
+            is_pro_rata=is_pro_rata,
+            remaining_days=remaining_days,
+            minimum_fee_applied=minimum_fee_applied,
+            default_fee=fee_structure is None,
+        )
@@ -0,0 +1,232 @@
+# membership/invoice_export.py
+"""
+Invoice exports that run in bounded memory.
+
+CSV rows are streamed to the client as they are read, Excel workbooks are
+written row by row with xlsxwriter's constant_memory mode into a temporary
+file, and large PDF exports are rendered in batches of PDF_BATCH_SIZE
+invoices by the build_invoice_pdf_export job (membership.tasks), which
+appends each batch to the export file on disk and stores the result on an
+InvoiceExport record for later download. The job rebuilds the invoice list
+from the export's requesting user and filters, so it can be retried or
+requeued after a worker restart.
+"""
+import csv
+import os
+import shutil
+import tempfile
+from itertools import islice
+
+from django.core.files import File
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from accounts.jurisdiction import get_admin_scope, jurisdiction_invoices
+
+EXPORT_CHUNK_SIZE = 2000
+PDF_BATCH_SIZE = 200
+PDF_TEMPLATE = 'membership/invoices/invoice_export_pdf.html'
+
+EXPORT_HEADERS = [
+    'Invoice Number', 'Member', 'Club', 'Issue Date',
+    'Due Date', 'Amount', 'Status', 'Payment Date'
+]
+
+
+def user_invoices(user, filters, scope=None):
+    """
+    The invoices the invoice list shows user, narrowed by its filters (the
+    list's GET parameters). scope is the user's get_admin_scope(), if known.
+    """
+    from .models import Invoice
+
+    if user is None or not user.is_authenticated:
+        return Invoice.objects.none()
+
+    queryset = Invoice.objects.all().select_related(
+        'member__user',
+        'member__current_club',
+        'season_config'
+    ).prefetch_related(
+        'content_type'
+    )
+
+    status = filters.get('status')
+    if status:
+        queryset = queryset.filter(status=status)
+
+    club_id = filters.get('club')
+    if club_id:
+        # Filter by club for both member and organization invoices
+        queryset = queryset.filter(
+            Q(member__current_club_id=club_id) |  # Member invoices
+            Q(content_type__model='club', object_id=club_id)  # Organization invoices
+        )
+
+    date_from = filters.get('date_from')
+    if date_from:
+        queryset = queryset.filter(created__date__gte=date_from)
+
+    date_to = filters.get('date_to')
+    if date_to:
+        queryset = queryset.filter(created__date__lte=date_to)
+
+    # SAFA Admin can see all
+    if user.is_staff or user.is_superuser:
+        return queryset
+
+    # Province, region, LFA and club admins see their jurisdiction's invoices
+    level, organisation = scope or get_admin_scope(user)
+    if level != 'none':
+        return jurisdiction_invoices(level, organisation, queryset)
+
+    # Others can only see their own invoices
+    return queryset.filter(member__user=user)
+
+
+def exported_invoices(user, filters, scope=None):
+    """user_invoices() with the export's own filters applied on top"""
+    queryset = user_invoices(user, filters, scope)
+
+    status = filters.get('status')
+    if status:
+        queryset = queryset.filter(status=status)
+
+    club_id = filters.get('club')
+    if club_id:
+        queryset = queryset.filter(member__current_club_id=club_id)
+
+    date_from = filters.get('date_from')
+    if date_from:
+        queryset = queryset.filter(issue_date__gte=date_from)
+
+    date_to = filters.get('date_to')
+    if date_to:
+        queryset = queryset.filter(issue_date__lte=date_to)
+    return queryset
+
+
+def export_queryset(queryset):
+    """Invoices with the member and club each row needs, without per-row queries"""
+    return queryset.select_related('member__current_club')
+
+
+def invoice_rows(queryset):
+    """Yield one export row per invoice, reading the queryset in chunks"""
+    for invoice in export_queryset(queryset).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        member = invoice.member
+        yield [
+            invoice.invoice_number,
+            member.get_full_name() if member else 'N/A',
+            member.current_club.name if member and member.current_club else 'N/A',
+            invoice.issue_date.strftime('%Y-%m-%d') if invoice.issue_date else '',
+            invoice.due_date.strftime('%Y-%m-%d') if invoice.due_date else '',
+            invoice.total_amount,
+            invoice.get_status_display(),
+            invoice.payment_date.strftime('%Y-%m-%d') if invoice.payment_date else ''
+        ]
+
+
+class Echo:
+    """File-like object that hands back what csv.writer writes to it"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset):
+    """Generator of CSV lines for a StreamingHttpResponse"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_HEADERS)
+    for row in invoice_rows(queryset):
+        yield writer.writerow(row)
+
+
+def write_excel(queryset):
+    """
+    Write the export workbook to a temporary file and return it, rewound.
+    The file is removed when closed.
+    """
+    import xlsxwriter
+
+    output = tempfile.TemporaryFile()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    worksheet = workbook.add_worksheet('Invoices')
+    worksheet.write_row(0, 0, EXPORT_HEADERS)
+    for row_num, row in enumerate(invoice_rows(queryset), 1):
+        row[5] = float(row[5])
+        worksheet.write_row(row_num, 0, row)
+    workbook.close()
+    output.seek(0)
+    return output
+
+
+# ----------------------------------------------------------------------
+# PDF
+# ----------------------------------------------------------------------
+
+def pdf_batches(queryset, batch_size=PDF_BATCH_SIZE):
+    """Lists of invoices (items and billed organisation prefetched) per PDF batch"""
+    invoices = (
+        export_queryset(queryset)
+        .prefetch_related('items', 'organization')
+        .iterator(chunk_size=batch_size)
+    )
+    while True:
+        batch = list(islice(invoices, batch_size))
+        if not batch:
+            return
+        for invoice in batch:
+            invoice.vat_percentage = invoice.vat_rate * 100
+        yield batch
+
+
+def render_pdf(invoices, context, target):
+    """Render one batch of invoices with the export template into target"""
+    from weasyprint import HTML
+
+    html_string = render_to_string(PDF_TEMPLATE, {**context, 'invoices': invoices})
+    HTML(string=html_string).write_pdf(target=target)
+
+
+def append_pdf(merged_path, batch_path):
+    """Append the pages of batch_path to merged_path, writing only the new objects"""
+    import fitz
+
+    if not os.path.exists(merged_path):
+        shutil.copyfile(batch_path, merged_path)
+        return
+    with fitz.open(merged_path) as merged, fitz.open(batch_path) as batch:
+        merged.insert_pdf(batch)
+        merged.save(merged_path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+
+
+def build_pdf_export(export, context):
+    """
+    Render the export's invoices batch by batch, appending each batch to one
+    file on disk, and attach the result to export
+    """
+    export.status = 'RUNNING'
+    export.error = ''
+    export.save(update_fields=['status', 'error', 'modified'])
+
+    queryset = exported_invoices(export.requested_by, export.filters).order_by('pk')
+    count = 0
+    with tempfile.TemporaryDirectory() as workdir:
+        merged_path = os.path.join(workdir, 'export.pdf')
+        batch_path = os.path.join(workdir, 'batch.pdf')
+        for batch in pdf_batches(queryset):
+            render_pdf(batch, context, batch_path)
+            append_pdf(merged_path, batch_path)
+            count += len(batch)
+
+        if count:
+            with open(merged_path, 'rb') as merged:
+                export.file.save(f'invoices_export_{export.uuid}.pdf', File(merged), save=False)
+
+    export.invoice_count = count
+    export.status = 'COMPLETED'
+    export.completed_at = timezone.now()
+    export.save(update_fields=['file', 'invoice_count', 'status', 'completed_at', 'modified'])
+    return export
@@ -0,0 +1,178 @@
+# membership/invoice_pdfs.py
+"""
+Content-addressed cache of rendered invoice PDFs.
+
+Rendering the invoice template to HTML is cheap; turning it into a PDF with
+WeasyPrint is not. The HTML is therefore rendered on every request and its
+hash (together with RENDERER_VERSION) names the cached PDF in storage:
+
+    invoice_pdfs/<invoice uuid>/<sha256>.pdf
+
+Any change to what the PDF shows - the invoice, its items, the member or
+billed organisation, or the template itself - gives a new name, so a stale
+PDF is never served. Older renders of an invoice are deleted when it is
+saved or deleted, and when a new render replaces them.
+
+The digest doubles as the download's ETag.
+
+Usage:
+    pdf = get_invoice_pdf(invoice)             # renders on a miss
+    default_storage.open(pdf.name, 'rb')
+    stats = prerender_invoice_pdfs(Invoice.objects.filter(...), workers=4)
+"""
+import hashlib
+import logging
+import posixpath
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from django.template.loader import render_to_string
+
+from utils.run_stats import RunStats
+from .invoice_export import PDF_TEMPLATE, export_queryset
+
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_DIR = 'invoice_pdfs'
+# Bump when the rendering changes in a way the HTML does not show (fonts, WeasyPrint options)
+RENDERER_VERSION = '1'
+LOGO = 'images/safa_logo.png'
+DEFAULT_CHUNK_SIZE = 50
+
+InvoicePDF = namedtuple('InvoicePDF', ['name', 'digest', 'rendered'])
+
+
+@lru_cache(maxsize=1)
+def logo_url():
+    """The logo as a file URI, so renders do not depend on the requesting host"""
+    path = finders.find(LOGO)
+    return Path(path).as_uri() if path else staticfiles_storage.url(LOGO)
+
+
+def pdf_queryset(queryset):
+    """Invoices with everything the PDF template shows"""
+    return export_queryset(queryset).prefetch_related('items', 'organization')
+
+
+def render_html(invoice):
+    invoice.vat_percentage = invoice.vat_rate * 100
+    return render_to_string(PDF_TEMPLATE, {'invoices': [invoice], 'safa_logo_url': logo_url()})
+
+
+def pdf_digest(html):
+    return hashlib.sha256(f'{RENDERER_VERSION}\n{html}'.encode('utf-8')).hexdigest()
+
+
+def invoice_pdf_dir(invoice_uuid):
+    return posixpath.join(PDF_CACHE_DIR, str(invoice_uuid))
+
+
+def discard_invoice_pdfs(invoice_uuid, keep=None):
+    """Delete the cached PDFs of an invoice, except the render named keep"""
+    directory = invoice_pdf_dir(invoice_uuid)
+    try:
+        _dirs, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for filename in files:
+        name = posixpath.join(directory, filename)
+        if name != keep:
+            default_storage.delete(name)
+
+
+def get_invoice_pdf(invoice):
+    """InvoicePDF for the invoice's current content, rendered and stored on a miss"""
+    html = render_html(invoice)
+    digest = pdf_digest(html)
+    name = posixpath.join(invoice_pdf_dir(invoice.uuid), f'{digest}.pdf')
+    if default_storage.exists(name):
+        return InvoicePDF(name, digest, False)
+
+    from weasyprint import HTML
+
+    pdf = HTML(string=html).write_pdf()
+    # A concurrent render of the same content may have won; either copy will do
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(pdf))
+    discard_invoice_pdfs(invoice.uuid, keep=name)
+    return InvoicePDF(name, digest, True)
+
+
+# ----------------------------------------------------------------------
+# Batch pre-rendering
+# ----------------------------------------------------------------------
+
+class PrerenderStats(RunStats):
+    """Invoices rendered, already cached or failed in a pre-render run"""
+    counters = ('rendered', 'cached')
+
+    def __init__(self):
+        super().__init__()
+        self.failed = []
+
+    def add(self, result):
+        rendered, cached, failed = result
+        self.rendered += rendered
+        self.cached += cached
+        self.failed.extend(failed)
+        self.processed += rendered + cached + len(failed)
+
+    def as_dict(self):
+        return {**super().as_dict(), 'failed': len(self.failed)}
+
+
+def render_chunk(invoice_ids):
+    """Make sure each invoice's PDF is cached; returns (rendered, cached, [failed invoice numbers])"""
+    from .models import Invoice
+
+    rendered = cached = 0
+    failed = []
+    for invoice in pdf_queryset(Invoice.objects.filter(pk__in=invoice_ids)):
+        try:
+            if get_invoice_pdf(invoice).rendered:
+                rendered += 1
+            else:
+                cached += 1
+        except Exception:
+            logger.exception(f"Rendering the PDF of invoice {invoice.invoice_number} failed")
+            failed.append(invoice.invoice_number)
+    return rendered, cached, failed
+
+
+def _render_chunk_worker(invoice_ids):
+    """Render one chunk in a worker process"""
+    # Connections inherited from the parent process must not be shared
+    connections.close_all()
+    return render_chunk(invoice_ids)
+
+
+def prerender_invoice_pdfs(queryset, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Cache the PDFs of the queryset's invoices, chunk_size invoices per task,
+    across worker processes. Returns PrerenderStats.
+    """
+    invoice_ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+    chunks = [invoice_ids[i:i + chunk_size] for i in range(0, len(invoice_ids), chunk_size)]
+    stats = PrerenderStats()
+
+    if workers <= 1:
+        for result in map(render_chunk, chunks):
+            stats.add(result)
+            if progress:
+                progress(stats)
+        return stats
+
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(_render_chunk_worker, chunks):
+            stats.add(result)
+            if progress:
+                progress(stats)
+    return stats
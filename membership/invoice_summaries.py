@@ -0,0 +1,140 @@
+# membership/invoice_summaries.py
+"""
+Invoice summaries computed in the database.
+
+invoice_totals() returns the invoice list's count and amount per status with
+one conditional aggregate. outstanding_balances() groups unpaid member
+invoices by club, LFA, region or province with one GROUP BY over the level
+and its parents, and derives the parents' subtotals from the grouped rows,
+so the work done in Python depends on the number of organisations rather
+than the number of invoices.
+"""
+from collections import OrderedDict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+OUTSTANDING_STATUSES = ['PENDING', 'OVERDUE']
+
+SUMMARY_STATUSES = {
+    'paid': 'PAID',
+    'pending': 'PENDING',
+    'overdue': 'OVERDUE',
+}
+
+# Report levels, top down, and the invoice lookup of each one's organisation
+REPORT_LEVELS = OrderedDict([
+    ('province', 'member__current_club__localfootballassociation__region__province'),
+    ('region', 'member__current_club__localfootballassociation__region'),
+    ('lfa', 'member__current_club__localfootballassociation'),
+    ('club', 'member__current_club'),
+])
+
+AMOUNT_FIELDS = ['total_amount', 'days_30_amount', 'days_90_amount', 'days_90_plus_amount']
+COUNT_FIELDS = ['invoice_count', 'player_count', 'days_30_count', 'days_90_count', 'days_90_plus_count']
+
+REPORT_SORTS = {
+    'total_desc': (lambda item: item['total_amount'], True),
+    'total_asc': (lambda item: item['total_amount'], False),
+    'name_asc': (lambda item: item['name'], False),
+    'days_desc': (lambda item: item['days_90_plus_amount'], True),
+}
+
+
+def invoice_totals(queryset):
+    """Count and amount of all, paid, pending and overdue invoices in one query"""
+    aggregates = {'total_count': Count('pk')}
+    for key, status in SUMMARY_STATUSES.items():
+        aggregates[f'{key}_count'] = Count('pk', filter=Q(status=status))
+        aggregates[f'{key}_amount'] = Sum('total_amount', filter=Q(status=status))
+    totals = queryset.order_by().aggregate(**aggregates)
+    for key in SUMMARY_STATUSES:
+        totals[f'{key}_amount'] = totals[f'{key}_amount'] or Decimal('0.00')
+    return totals
+
+
+def _age_buckets(today):
+    """Due-date filters for the 1-30, 31-90 and over-90 day columns"""
+    day_30 = today - timedelta(days=30)
+    day_90 = today - timedelta(days=90)
+    return {
+        'days_30': Q(due_date__gt=day_30),
+        'days_90': Q(due_date__lte=day_30, due_date__gt=day_90),
+        'days_90_plus': Q(due_date__lte=day_90),
+    }
+
+
+def _blank_item(level, pk, name):
+    item = {
+        'entity_type': level,
+        'id': pk,
+        'name': name or 'Unassigned',
+        'filter_params': f'{level}={pk}&status=PENDING,OVERDUE',
+    }
+    item.update({field: Decimal('0.00') for field in AMOUNT_FIELDS})
+    item.update({field: 0 for field in COUNT_FIELDS})
+    return item
+
+
+def _add(item, row):
+    for field in AMOUNT_FIELDS:
+        # The grouped total is named 'amount' to avoid Invoice.total_amount
+        item[field] += row['amount' if field == 'total_amount' else field] or Decimal('0.00')
+    for field in COUNT_FIELDS:
+        # A member's invoices all fall under their current club, so distinct
+        # player counts add up across organisations
+        item[field] += row[field]
+
+
+def outstanding_balances(queryset, level='club', today=None, sort_by='total_desc'):
+    """
+    Unpaid invoices in queryset grouped by `level`, plus subtotals for each
+    parent level and grand totals, from a single GROUP BY query.
+
+    Returns (items, subtotals, totals): items and each subtotals[parent] are
+    lists of report rows; totals is one row without entity fields.
+    """
+    if level not in REPORT_LEVELS:
+        level = 'club'
+    levels = list(REPORT_LEVELS)[:list(REPORT_LEVELS).index(level) + 1]
+    buckets = _age_buckets(today or timezone.now().date())
+
+    columns = {}
+    for name in levels:
+        columns[f'{name}_id'] = F(REPORT_LEVELS[name])
+        columns[f'{name}_name'] = F(f'{REPORT_LEVELS[name]}__name')
+    aggregates = {
+        'invoice_count': Count('pk'),
+        'player_count': Count('member', distinct=True),
+        'amount': Sum('total_amount'),
+    }
+    for bucket, condition in buckets.items():
+        aggregates[f'{bucket}_amount'] = Sum('total_amount', filter=condition)
+        aggregates[f'{bucket}_count'] = Count('pk', filter=condition)
+
+    rows = (
+        queryset.filter(status__in=OUTSTANDING_STATUSES, member__current_club__isnull=False)
+        .values(**columns).annotate(**aggregates).order_by()
+    )
+
+    grouped = {name: OrderedDict() for name in levels}
+    totals = _blank_item(None, None, None)
+    for row in rows:
+        _add(totals, row)
+        for name in levels:
+            pk = row[f'{name}_id']
+            if pk not in grouped[name]:
+                grouped[name][pk] = _blank_item(name, pk, row[f'{name}_name'])
+            _add(grouped[name][pk], row)
+
+    key, reverse = REPORT_SORTS.get(sort_by, REPORT_SORTS['total_desc'])
+    items = sorted(grouped[level].values(), key=key, reverse=reverse)
+    subtotals = OrderedDict(
+        (name, sorted(grouped[name].values(), key=key, reverse=reverse))
+        for name in levels[:-1]
+    )
+    for field in ('entity_type', 'id', 'name', 'filter_params'):
+        del totals[field]
+    return items, subtotals, totals
@@ -5,27 +5,31 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import ListView, DetailView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.utils import timezone
-from django.db.models import Sum, Count, Q, F, ExpressionWrapper, DurationField, DateTimeField
-from django.http import HttpResponse, JsonResponse
+from django.db.models import Count, F, ExpressionWrapper, DurationField, DateTimeField
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib import messages
 from django.contrib.contenttypes.models import ContentType
 from django.urls import reverse
+from django.core.files.storage import default_storage
 from django.core.paginator import Paginator
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.utils.translation import gettext_lazy as _
 
-import csv
 import io
-# Import xlsxwriter with proper error handling
-try:
-    import xlsxwriter
-    XLSXWRITER_AVAILABLE = True
-except ImportError:
-    XLSXWRITER_AVAILABLE = False
-    
+import os
+from importlib.util import find_spec
+
+# Excel exports are written by invoice_export.write_excel()
+XLSXWRITER_AVAILABLE = find_spec('xlsxwriter') is not None
+
 from datetime import timedelta, date
-from decimal import Decimal
 
-from membership.models import Invoice, InvoiceItem
+from membership.models import Invoice, InvoiceExport, InvoiceItem
+from membership import invoice_export, invoice_pdfs, tasks
+from membership.billed_to import resolve_organizations
+from membership.invoice_summaries import invoice_totals, outstanding_balances
+from accounts.jurisdiction import jurisdiction_clubs, jurisdiction_invoices, request_admin_scope
 from geography.models import Club, LocalFootballAssociation, Region, Province
 from .models import SAFASeasonConfig, SAFAFeeStructure, Member
 from django.contrib.contenttypes.models import ContentType
@@ -87,12 +91,8 @@ def generate_invoices(request):
     return render(request, 'membership/invoices/generate_invoices.html')
 
 
-# Import for PDF generation
-try:
-    from weasyprint import HTML, CSS
-    WEASYPRINT_AVAILABLE = True
-except ImportError:
-    WEASYPRINT_AVAILABLE = False
+# PDFs are rendered by invoice_pdfs and invoice_export
+WEASYPRINT_AVAILABLE = find_spec('weasyprint') is not None
 
 class InvoiceListView(LoginRequiredMixin, ListView):
     """List all invoices with filtering options"""
@@ -102,115 +102,26 @@ class InvoiceListView(LoginRequiredMixin, ListView):
     paginate_by = 20
     
     def get_queryset(self):
-        """Filter invoices based on query parameters"""
-        # Get both member and organization invoices
-        queryset = Invoice.objects.all().select_related(
-            'member__user', 
-            'member__current_club',
-            'season_config'
-        ).prefetch_related(
-            'content_type'
-        )
-        
-        # Apply filters from GET parameters
-        status = self.request.GET.get('status')
-        if status:
-            queryset = queryset.filter(status=status)
-            
-        club_id = self.request.GET.get('club')
-        if club_id:
-            # Filter by club for both member and organization invoices
-            queryset = queryset.filter(
-                Q(member__current_club_id=club_id) |  # Member invoices
-                Q(content_type__model='club', object_id=club_id)  # Organization invoices
-            )
-            
-        date_from = self.request.GET.get('date_from')
-        if date_from:
-            queryset = queryset.filter(created_at__gte=date_from)
-            
-        date_to = self.request.GET.get('date_to')
-        if date_to:
-            queryset = queryset.filter(created_at__lte=date_to)
-            
-        # Filter by user permissions
-        user = self.request.user
-        if not user.is_authenticated:
-            return Invoice.objects.none()
-
-        # SAFA Admin can see all
-        if user.is_staff or user.is_superuser:
-            return queryset
-
-        # Other roles
-        if hasattr(user, 'member_profile') and user.member_profile:
-            member = user.member_profile
-            if member.current_club:
-                if hasattr(member.current_club, 'club_admins') and member.current_club.club_admins.filter(pk=user.pk).exists():
-                    # Club admin can see invoices for their club
-                    return queryset.filter(
-                        Q(member__current_club=member.current_club) |  # Member invoices
-                        Q(content_type__model='club', object_id=member.current_club.id)  # Club organization invoices
-                    )
-                if hasattr(member.current_club, 'lfa') and member.current_club.lfa and hasattr(member.current_club.lfa, 'lfa_admins') and member.current_club.lfa.lfa_admins.filter(pk=user.pk).exists():
-                    # LFA admin can see invoices for their LFA
-                    return queryset.filter(
-                        Q(member__current_club__lfa=member.current_club.lfa) |  # Member invoices
-                        Q(content_type__model='localfootballassociation', object_id=member.current_club.lfa.id)  # LFA organization invoices
-                    )
-                if hasattr(member.current_club, 'region') and member.current_club.region and hasattr(member.current_club.region, 'region_admins') and member.current_club.region.region_admins.filter(pk=user.pk).exists():
-                    # Region admin can see invoices for their region
-                    return queryset.filter(
-                        Q(member__current_club__region=member.current_club.region) |  # Member invoices
-                        Q(content_type__model='region', object_id=member.current_club.region.id)  # Region organization invoices
-                    )
-                if hasattr(member.current_club, 'province') and member.current_club.province and hasattr(member.current_club.province, 'province_admins') and member.current_club.province.province_admins.filter(pk=user.pk).exists():
-                    # Province admin can see invoices for their province
-                    return queryset.filter(
-                        Q(member__current_club__province=member.current_club.province) |  # Member invoices
-                        Q(content_type__model='province', object_id=member.current_club.province.id)  # Province organization invoices
-                    )
-
-        # Others can only see their own invoices
-        return queryset.filter(member__user=user)
+        """Filter invoices based on query parameters and the user's jurisdiction"""
+        scope = request_admin_scope(self.request) if self.request.user.is_authenticated else None
+        return invoice_export.user_invoices(self.request.user, self.request.GET, scope)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        queryset = self.get_queryset()
-        
+        # Organisations of the page's invoices, one query per organisation type
+        context['object_list'] = context['invoices'] = resolve_organizations(context['object_list'])
+
         # Add clubs for dropdown
         user = self.request.user
         if not user.is_authenticated:
             context['clubs'] = Club.objects.none()
         elif user.is_staff or user.is_superuser:
             context['clubs'] = Club.objects.all()
-        elif hasattr(user, 'member_profile') and user.member_profile:
-            member = user.member_profile
-            if member.current_club:
-                if hasattr(member.current_club, 'club_admins') and member.current_club.club_admins.filter(pk=user.pk).exists():
-                    context['clubs'] = Club.objects.filter(pk=member.current_club.pk)
-                elif hasattr(member.current_club, 'lfa') and member.current_club.lfa and hasattr(member.current_club.lfa, 'lfa_admins') and member.current_club.lfa.lfa_admins.filter(pk=user.pk).exists():
-                    context['clubs'] = Club.objects.filter(lfa=member.current_club.lfa)
-                elif hasattr(member.current_club, 'region') and member.current_club.region and hasattr(member.current_club.region, 'region_admins') and member.current_club.region.region_admins.filter(pk=user.pk).exists():
-                    context['clubs'] = Club.objects.filter(region=member.current_club.region)
-                elif hasattr(member.current_club, 'province') and member.current_club.province and hasattr(member.current_club.province, 'province_admins') and member.current_club.province.province_admins.filter(pk=user.pk).exists():
-                    context['clubs'] = Club.objects.filter(province=member.current_club.province)
-                else:
-                    context['clubs'] = Club.objects.none()
-            else:
-                context['clubs'] = Club.objects.none()
         else:
-            # Fallback for users without member profile or club, show all clubs
-            context['clubs'] = Club.objects.all()
-            
-        # Calculate summary stats
-        context['total_count'] = queryset.count()
-        context['paid_count'] = queryset.filter(status='PAID').count()
-        context['paid_amount'] = queryset.filter(status='PAID').aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')
-        context['pending_count'] = queryset.filter(status='PENDING').count()
-        context['pending_amount'] = queryset.filter(status='PENDING').aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')
-        context['overdue_count'] = queryset.filter(status='OVERDUE').count()
-        context['overdue_amount'] = queryset.filter(status='OVERDUE').aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')
+            context['clubs'] = jurisdiction_clubs(*request_admin_scope(self.request))
+
+        # Summary stats over the filtered invoices, in one query
+        context.update(invoice_totals(self.object_list))
         
         return context
 
@@ -266,24 +177,33 @@ class InvoicePDFView(LoginRequiredMixin, DetailView):
     slug_field = 'uuid'
     slug_url_kwarg = 'uuid'
     
+    def get_queryset(self):
+        return invoice_pdfs.pdf_queryset(Invoice.objects.all())
+
     def get(self, request, *args, **kwargs):
         invoice = self.get_object()
-        
+
         # Check if weasyprint is available
         if not WEASYPRINT_AVAILABLE:
             messages.error(request, _("PDF generation is not available. Please install WeasyPrint."))
             return redirect('membership:invoice_detail', uuid=invoice.uuid)
-        
-        # Render the template to HTML
-        html_string = render(request, self.template_name, {'invoice': invoice}).content.decode('utf-8')
-        
-        # Generate PDF
-        pdf_file = HTML(string=html_string).write_pdf()
-        
-        # Create HTTP response with PDF
-        response = HttpResponse(pdf_file, content_type='application/pdf')
-        response['Content-Disposition'] = f'inline; filename="invoice_{invoice.invoice_number}.pdf"'
-        
+
+        # Cached render of the invoice's current content, rendered on a miss
+        pdf = invoice_pdfs.get_invoice_pdf(invoice)
+        etag = f'"{pdf.digest}"'
+        last_modified = default_storage.get_modified_time(pdf.name).timestamp()
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = FileResponse(
+                default_storage.open(pdf.name, 'rb'),
+                filename=f'invoice_{invoice.invoice_number}.pdf',
+                content_type='application/pdf'
+            )
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Revalidate on every download; unchanged invoices get a 304
+        patch_cache_control(response, private=True, no_cache=True)
         return response
 
 
@@ -301,9 +221,7 @@ class OutstandingReportView(LoginRequiredMixin, PermissionRequiredMixin, Templat
         sort_by = self.request.GET.get('sort_by', 'total_desc')
         
         # Base queryset for unpaid invoices
-        unpaid_invoices = Invoice.objects.filter(
-            Q(status='PENDING') | Q(status='OVERDUE')
-        ).select_related('member__current_club')
+        unpaid_invoices = Invoice.objects.filter(status__in=['PENDING', 'OVERDUE'])
         
         # Apply days overdue filter
         today = timezone.now().date()
@@ -314,143 +232,19 @@ class OutstandingReportView(LoginRequiredMixin, PermissionRequiredMixin, Templat
         
         # Apply user permission filters
         user = self.request.user
-        if hasattr(user, 'member_profile') and user.member_profile:
-            member = user.member_profile
-            if member.current_club:
-                if hasattr(member.current_club, 'club_admins') and member.current_club.club_admins.filter(pk=user.pk).exists():
-                    unpaid_invoices = unpaid_invoices.filter(member__current_club=member.current_club)
-                elif hasattr(member.current_club, 'lfa') and member.current_club.lfa and hasattr(member.current_club.lfa, 'lfa_admins') and member.current_club.lfa.lfa_admins.filter(pk=user.pk).exists():
-                    unpaid_invoices = unpaid_invoices.filter(member__current_club__lfa=member.current_club.lfa)
-                elif hasattr(member.current_club, 'region') and member.current_club.region and hasattr(member.current_club.region, 'region_admins') and member.current_club.region.region_admins.filter(pk=user.pk).exists():
-                    unpaid_invoices = unpaid_invoices.filter(member__current_club__region=member.current_club.region)
-                elif hasattr(member.current_club, 'province') and member.current_club.province and hasattr(member.current_club.province, 'province_admins') and member.current_club.province.province_admins.filter(pk=user.pk).exists():
-                    unpaid_invoices = unpaid_invoices.filter(member__current_club__province=member.current_club.province)
-        
-        # Calculate report items based on grouping level
-        report_items = []
-        
-        if level == 'club':
-            # The related name from Member to Club is 'current_members'
-            clubs = Club.objects.filter(current_members__invoices__in=unpaid_invoices).distinct()
-            
-            for club in clubs:
-                club_invoices = unpaid_invoices.filter(member__current_club=club)
-                days_30 = club_invoices.filter(due_date__gt=today-timedelta(days=30))
-                days_90 = club_invoices.filter(due_date__lte=today-timedelta(days=30), 
-                                             due_date__gt=today-timedelta(days=90))
-                days_90_plus = club_invoices.filter(due_date__lte=today-timedelta(days=90))
-                
-                report_items.append({
-                    'entity_type': 'club',
-                    'id': club.id,
-                    'name': club.name,
-                    'invoice_count': club_invoices.count(),
-                    'player_count': club_invoices.values('member').distinct().count(),
-                    'days_30_amount': days_30.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'days_90_amount': days_90.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'days_90_plus_amount': days_90_plus.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'total_amount': club_invoices.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'filter_params': f'club={club.id}&status=PENDING,OVERDUE'
-                })
+        if not (user.is_staff or user.is_superuser):
+            level_scope, organisation = request_admin_scope(self.request)
+            if level_scope != 'none':
+                unpaid_invoices = jurisdiction_invoices(level_scope, organisation, unpaid_invoices)
         
-        elif level == 'lfa':
-            lfas = LocalFootballAssociation.objects.filter(
-                clubs__current_members__invoices__in=unpaid_invoices
-            ).distinct()
-            
-            for lfa in lfas:
-                lfa_invoices = unpaid_invoices.filter(member__current_club__lfa=lfa)
-                days_30 = lfa_invoices.filter(due_date__gt=today-timedelta(days=30))
-                days_90 = lfa_invoices.filter(due_date__lte=today-timedelta(days=30), 
-                                            due_date__gt=today-timedelta(days=90))
-                days_90_plus = lfa_invoices.filter(due_date__lte=today-timedelta(days=90))
-                
-                report_items.append({
-                    'entity_type': 'lfa',
-                    'id': lfa.id,
-                    'name': lfa.name,
-                    'invoice_count': lfa_invoices.count(),
-                    'player_count': lfa_invoices.values('member').distinct().count(),
-                    'days_30_amount': days_30.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'days_90_amount': days_90.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'days_90_plus_amount': days_90_plus.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'total_amount': lfa_invoices.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'filter_params': f'lfa={lfa.id}&status=PENDING,OVERDUE'
-                })
-        
-        elif level == 'region':
-            regions = Region.objects.filter(
-                clubs__current_members__invoices__in=unpaid_invoices
-            ).distinct()
-            
-            for region in regions:
-                region_invoices = unpaid_invoices.filter(member__current_club__region=region)
-                days_30 = region_invoices.filter(due_date__gt=today-timedelta(days=30))
-                days_90 = region_invoices.filter(due_date__lte=today-timedelta(days=30), 
-                                              due_date__gt=today-timedelta(days=90))
-                days_90_plus = region_invoices.filter(due_date__lte=today-timedelta(days=90))
-                
-                report_items.append({
-                    'entity_type': 'region',
-                    'id': region.id,
-                    'name': region.name,
-                    'invoice_count': region_invoices.count(),
-                    'player_count': region_invoices.values('member').distinct().count(),
-                    'days_30_amount': days_30.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'days_90_amount': days_90.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'days_90_plus_amount': days_90_plus.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'total_amount': region_invoices.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'filter_params': f'region={region.id}&status=PENDING,OVERDUE'
-                })
-        
-        elif level == 'province':
-            provinces = Province.objects.filter(
-                clubs__current_members__invoices__in=unpaid_invoices
-            ).distinct()
-            
-            for province in provinces:
-                province_invoices = unpaid_invoices.filter(member__current_club__province=province)
-                days_30 = province_invoices.filter(due_date__gt=today-timedelta(days=30))
-                days_90 = province_invoices.filter(due_date__lte=today-timedelta(days=30), 
-                                               due_date__gt=today-timedelta(days=90))
-                days_90_plus = province_invoices.filter(due_date__lte=today-timedelta(days=90))
-                
-                report_items.append({
-                    'entity_type': 'province',
-                    'id': province.id,
-                    'name': province.name,
-                    'invoice_count': province_invoices.count(),
-                    'player_count': province_invoices.values('member').distinct().count(),
-                    'days_30_amount': days_30.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'days_90_amount': days_90.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'days_90_plus_amount': days_90_plus.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'total_amount': province_invoices.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00'),
-                    'filter_params': f'province={province.id}&status=PENDING,OVERDUE'
-                })
-        
-        # Sort report items
-        if sort_by == 'total_desc':
-            report_items.sort(key=lambda x: x['total_amount'], reverse=True)
-        elif sort_by == 'total_asc':
-            report_items.sort(key=lambda x: x['total_amount'])
-        elif sort_by == 'name_asc':
-            report_items.sort(key=lambda x: x['name'])
-        elif sort_by == 'days_desc':
-            report_items.sort(key=lambda x: x['days_90_plus_amount'], reverse=True)
+        # Report rows for the grouping level, subtotals for the levels above it
+        # and the summary cards, all from one grouped query
+        report_items, subtotals, totals = outstanding_balances(unpaid_invoices, level, today, sort_by)
         
-        # Add summary statistics
         context['report_items'] = report_items
-        context['total_amount'] = sum(item['total_amount'] for item in report_items)
-        context['total_count'] = sum(item['invoice_count'] for item in report_items)
-        context['days_30_amount'] = sum(item['days_30_amount'] for item in report_items)
-        context['days_30_count'] = unpaid_invoices.filter(due_date__gt=today-timedelta(days=30)).count()
-        context['days_90_amount'] = sum(item['days_90_amount'] for item in report_items)
-        context['days_90_count'] = unpaid_invoices.filter(
-            due_date__lte=today-timedelta(days=30),
-            due_date__gt=today-timedelta(days=90)
-        ).count()
-        context['days_90_plus_amount'] = sum(item['days_90_plus_amount'] for item in report_items)
-        context['days_90_plus_count'] = unpaid_invoices.filter(due_date__lte=today-timedelta(days=90)).count()
+        context['report_subtotals'] = subtotals
+        context.update(totals)
+        context['total_count'] = totals['invoice_count']
         context['today'] = today
         
         return context
@@ -481,55 +275,18 @@ def mark_invoice_paid(request, uuid):
 
 def export_invoices(request, format='csv'):
     """Export invoices to CSV, Excel or PDF"""
-    # Get the queryset based on filters
-    # Instantiating the view to call get_queryset is not ideal, but works for now.
-    list_view = InvoiceListView()
-    list_view.request = request
-    queryset = list_view.get_queryset()
-    
-    # Apply any additional filters from GET parameters
-    status = request.GET.get('status')
-    if status:
-        queryset = queryset.filter(status=status)
-        
-    club_id = request.GET.get('club')
-    if club_id:
-        queryset = queryset.filter(member__current_club_id=club_id)
-        
-    date_from = request.GET.get('date_from')
-    if date_from:
-        queryset = queryset.filter(issue_date__gte=date_from)
-        
-    date_to = request.GET.get('date_to')
-    if date_to:
-        queryset = queryset.filter(issue_date__lte=date_to)
+    # The invoice list's invoices, with the export filters from GET parameters
+    scope = request_admin_scope(request) if request.user.is_authenticated else None
+    queryset = invoice_export.exported_invoices(request.user, request.GET, scope)
     
     # Generate filename
     filename = f"invoices_export_{timezone.now().strftime('%Y%m%d_%H%M%S')}"
     
     if format == 'csv':
-        # Create CSV response
-        response = HttpResponse(content_type='text/csv')
+        # Stream rows as they are read instead of building the file in memory
+        response = StreamingHttpResponse(invoice_export.stream_csv(queryset), content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
         
-        writer = csv.writer(response)
-        writer.writerow([
-            'Invoice Number', 'Member', 'Club', 'Issue Date',
-            'Due Date', 'Amount', 'Status', 'Payment Date'
-        ])
-        
-        for invoice in queryset:
-            writer.writerow([
-                invoice.invoice_number,
-                invoice.member.get_full_name() if invoice.member else 'N/A',
-                invoice.member.current_club.name if invoice.member and invoice.member.current_club else 'N/A',
-                invoice.issue_date.strftime('%Y-%m-%d'),
-                invoice.due_date.strftime('%Y-%m-%d'),
-                invoice.total_amount,
-                invoice.get_status_display(),
-                invoice.payment_date.strftime('%Y-%m-%d') if invoice.payment_date else ''
-            ])
-        
         return response
         
     elif format == 'excel':
@@ -538,38 +295,12 @@ def export_invoices(request, format='csv'):
             messages.error(request, _("Excel export is not available. Please install xlsxwriter."))
             return redirect('membership:invoice_list')
             
-        # Create Excel response
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
-        worksheet = workbook.add_worksheet('Invoices')
-        
-        # Add headers
-        headers = ['Invoice Number', 'Member', 'Club', 'Issue Date',
-                  'Due Date', 'Amount', 'Status', 'Payment Date']
-        for col_num, header in enumerate(headers):
-            worksheet.write(0, col_num, header)
-        
-        # Add data
-        for row_num, invoice in enumerate(queryset, 1):
-            worksheet.write(row_num, 0, invoice.invoice_number)
-            worksheet.write(row_num, 1, invoice.member.get_full_name() if invoice.member else 'N/A')
-            worksheet.write(row_num, 2, invoice.member.current_club.name if invoice.member and invoice.member.current_club else 'N/A')
-            worksheet.write(row_num, 3, invoice.issue_date.strftime('%Y-%m-%d'))
-            worksheet.write(row_num, 4, invoice.due_date.strftime('%Y-%m-%d'))
-            worksheet.write(row_num, 5, float(invoice.total_amount))
-            worksheet.write(row_num, 6, invoice.get_status_display())
-            worksheet.write(row_num, 7, invoice.payment_date.strftime('%Y-%m-%d') if invoice.payment_date else '')
-        
-        workbook.close()
-        output.seek(0)
-        
-        response = HttpResponse(
-            output.read(),
+        return FileResponse(
+            invoice_export.write_excel(queryset),
+            as_attachment=True,
+            filename=f'{filename}.xlsx',
             content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
-        response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
-        
-        return response
         
     elif format == 'pdf':
         # Check if weasyprint is available
@@ -577,35 +308,31 @@ def export_invoices(request, format='csv'):
             messages.error(request, _("PDF export is not available. Please install WeasyPrint."))
             return redirect('membership:invoice_list')
         
-        # Render the template to HTML
-        context = {
-            'invoices': queryset,
-            'title': 'Invoices Export',
-            'date': timezone.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'safa_logo_url': request.build_absolute_uri(staticfiles_storage.url('images/safa_logo.png')), # ADD THIS LINE
-        }
-        # Render the template to HTML
         context = {
             'title': 'Invoices Export',
             'date': timezone.now().strftime('%Y-%m-%d %H:%M:%S'),
             'safa_logo_url': request.build_absolute_uri(staticfiles_storage.url('images/safa_logo.png')),
         }
 
-        # Calculate VAT percentage for each invoice
-        invoices_with_vat_percentage = []
-        for invoice in queryset:
-            invoice.vat_percentage = invoice.vat_rate * 100
-            invoices_with_vat_percentage.append(invoice)
-        
-        context['invoices'] = invoices_with_vat_percentage # Update context with modified invoices
+        if queryset.count() > invoice_export.PDF_BATCH_SIZE:
+            # Large exports are rendered in batches by a background job
+            export = InvoiceExport.objects.create(
+                requested_by=request.user if request.user.is_authenticated else None,
+                filters=request.GET.dict()
+            )
+            tasks.build_invoice_pdf_export.enqueue_for(request.user, export.pk, context)
+            download_url = reverse('membership:invoice_export_download', kwargs={'uuid': export.uuid})
+            messages.info(request, _(
+                "The PDF export is being generated in the background. Download it from %(url)s when it is ready."
+            ) % {'url': download_url})
+            return redirect('membership:invoice_list')
 
-        html_string = render(request, 'membership/invoices/invoice_export_pdf.html', context).content.decode('utf-8')
-        
-        # Generate PDF
-        pdf_file = HTML(string=html_string).write_pdf()
+        pdf_file = io.BytesIO()
+        invoices = next(invoice_export.pdf_batches(queryset), [])
+        invoice_export.render_pdf(invoices, context, pdf_file)
         
         # Create HTTP response with PDF
-        response = HttpResponse(pdf_file, content_type='application/pdf')
+        response = HttpResponse(pdf_file.getvalue(), content_type='application/pdf')
         response['Content-Disposition'] = f'attachment; filename="{filename}.pdf"'
         
         return response
@@ -613,3 +340,27 @@ def export_invoices(request, format='csv'):
     # Default fallback
     messages.error(request, _("Unsupported export format"))
     return redirect('membership:invoice_list')
+
+
+def invoice_export_download(request, uuid):
+    """Download a background PDF export, or report its progress"""
+    export = get_object_or_404(InvoiceExport, uuid=uuid)
+    if not request.user.is_authenticated or (
+        export.requested_by_id != request.user.pk and not request.user.is_staff
+    ):
+        messages.error(request, _("You don't have permission to download this export."))
+        return redirect('membership:invoice_list')
+
+    if export.status == 'COMPLETED' and export.file:
+        return FileResponse(
+            export.file.open('rb'),
+            as_attachment=True,
+            filename=os.path.basename(export.file.name),
+            content_type='application/pdf'
+        )
+
+    return JsonResponse({
+        'status': export.status,
+        'invoice_count': export.invoice_count,
+        'error': export.error,
+    })
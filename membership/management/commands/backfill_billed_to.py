@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from membership.billed_to import backfill_billed_to
+from membership.models import Invoice
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the denormalized billed-to name and type on invoices created before they were stored '
+        '(new invoices get them when saved)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season',
+            type=int,
+            help='Only backfill invoices of this season year'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Invoices updated per query'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        invoices = Invoice.objects.all()
+        if options['season']:
+            invoices = invoices.filter(season_config__season_year=options['season'])
+
+        updated = backfill_billed_to(invoices, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Billed-to details filled on {updated} invoice(s)'))
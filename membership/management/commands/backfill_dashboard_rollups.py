@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from membership.models import SAFASeasonConfig
+from membership.season_rollups import rebuild_season_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the daily registration and revenue rollups behind the dashboard charts. '
+        'Run nightly to pick up changes made without model signals (queryset updates, bulk imports).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season',
+            type=int,
+            help='Season year to rebuild (defaults to the active season)'
+        )
+        parser.add_argument(
+            '--all-seasons',
+            action='store_true',
+            help='Rebuild every configured season'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Only rebuild the last N days (default: the whole season)'
+        )
+
+    def handle(self, *args, **options):
+        if options['all_seasons']:
+            seasons = list(SAFASeasonConfig.objects.all())
+        elif options['season']:
+            seasons = list(SAFASeasonConfig.objects.filter(season_year=options['season']))
+            if not seasons:
+                raise CommandError(f"No season configuration found for {options['season']}")
+        else:
+            active_season = SAFASeasonConfig.get_active_season()
+            if not active_season:
+                raise CommandError('No active season found. Use --season or --all-seasons.')
+            seasons = [active_season]
+
+        since = None
+        if options['days']:
+            since = timezone.localdate() - timedelta(days=options['days'])
+
+        for season in seasons:
+            registrations, revenue = rebuild_season_rollups(season, since=since)
+            self.stdout.write(
+                f'Season {season.season_year}: {registrations} registration rows, {revenue} revenue rows'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Dashboard rollups rebuilt for {len(seasons)} season(s)'))
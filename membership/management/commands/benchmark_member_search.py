@@ -0,0 +1,128 @@
+import random
+import sqlite3
+import statistics
+import string
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from membership.member_search import FTS5_CREATE_SQL, FTS5_POPULATE_SQL, MEMBER_SEARCH_TABLE, build_match_query
+
+FIRST_NAMES = [
+    'Thabo', 'Sipho', 'Lerato', 'Ayanda', 'Johan', 'Pieter', 'Naledi', 'Kagiso', 'Zanele', 'Bongani',
+    'Mpho', 'Lindiwe', 'Themba', 'Anele', 'Ruan', 'Karabo', 'Nomsa', 'Tshepo', 'Lwazi', 'Busisiwe',
+]
+# Surnames are built from syllables to get a realistic number of distinct names
+SURNAME_SYLLABLES = [
+    'mo', 'ko', 'na', 'dla', 'mi', 'ni', 'kho', 'ma', 'lo', 'ndlo', 'vu', 'mha', 'la', 'ngu', 'pre',
+    'to', 'ri', 'us', 'nai', 'doo', 'mthe', 'mbu', 'zu', 'si', 'tho', 'le', 'pil', 'lay', 'coe', 'tzee',
+]
+SEARCH_TERMS = ['Th', 'Thab', 'Thabo moko', 'dlamini', 'zulo', 'Zanele pretu', 'Pret']
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare member search on synthetic members: the legacy five-column LIKE scan '
+        'against the FTS5 index and the exact SAFA ID path (in-memory SQLite, no project data touched)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--members',
+            type=int,
+            default=1000000,
+            help='Number of synthetic members'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Runs per search term'
+        )
+
+    def handle(self, *args, **options):
+        count = options['members']
+        if count < 1:
+            raise CommandError('--members must be positive')
+
+        db = sqlite3.connect(':memory:')
+        self.stdout.write(f'Generating {count} synthetic members...')
+        started = time.perf_counter()
+        safa_ids = self.populate(db, count)
+        self.stdout.write(f'  table and indexes built in {time.perf_counter() - started:.1f}s')
+
+        started = time.perf_counter()
+        db.execute(FTS5_CREATE_SQL)
+        db.execute(FTS5_POPULATE_SQL)
+        db.commit()
+        self.stdout.write(f'  FTS5 index built in {time.perf_counter() - started:.1f}s')
+
+        # Each search is timed as the call sites run it: a match count for the
+        # paginator plus the first page of 10 (ranked, for FTS5)
+        legacy_where = (
+            'FROM membership_member WHERE first_name LIKE ? OR last_name LIKE ? '
+            'OR email LIKE ? OR safa_id LIKE ? OR id_number LIKE ?'
+        )
+        legacy_sql = [f'SELECT COUNT(*) {legacy_where}', f'SELECT id {legacy_where} LIMIT 10']
+        fts_where = f'FROM {MEMBER_SEARCH_TABLE} WHERE {MEMBER_SEARCH_TABLE} MATCH ?'
+        fts_sql = [
+            f'SELECT COUNT(*) {fts_where}',
+            f'SELECT rowid {fts_where} ORDER BY bm25({MEMBER_SEARCH_TABLE}, 10.0, 2.0, 5.0, 5.0) LIMIT 10',
+        ]
+
+        self.stdout.write(f"\n{'term':<14} {'matches':>8} {'legacy ms':>10} {'fts5 ms':>9}")
+        for term in SEARCH_TERMS:
+            pattern = f'%{term}%'
+            match = build_match_query(term)
+            legacy = self.measure(db, legacy_sql, [pattern] * 5, options['repeat'])
+            fts = self.measure(db, fts_sql, [match], options['repeat'])
+            matches = db.execute(fts_sql[0], [match]).fetchone()[0]
+            self.stdout.write(f'{term:<14} {matches:>8} {legacy:>10.2f} {fts:>9.2f}')
+
+        sample = random.sample(safa_ids, min(len(safa_ids), 100))
+        started = time.perf_counter()
+        for safa_id in sample:
+            db.execute('SELECT id FROM membership_member WHERE safa_id = ?', [safa_id]).fetchall()
+        exact = (time.perf_counter() - started) * 1000 / len(sample)
+        self.stdout.write(f"{'exact SAFA ID':<14} {'':>8} {'':>10} {exact:>9.3f}")
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completed'))
+
+    def populate(self, db, count):
+        db.execute(
+            'CREATE TABLE membership_member (id INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT, '
+            'email TEXT, safa_id TEXT, id_number TEXT)'
+        )
+        rng = random.Random(42)
+        alphabet = string.ascii_uppercase + string.digits
+        safa_ids = set()
+
+        def rows():
+            for member_id in range(1, count + 1):
+                first = rng.choice(FIRST_NAMES)
+                last = ''.join(rng.choices(SURNAME_SYLLABLES, k=3)).capitalize()
+                safa_id = ''.join(rng.choices(alphabet, k=5))
+                while safa_id in safa_ids:
+                    safa_id = ''.join(rng.choices(alphabet, k=5))
+                safa_ids.add(safa_id)
+                yield (
+                    member_id, first, last,
+                    f"{first}.{last.replace(' ', '')}{member_id}@example.com".lower(),
+                    safa_id, f'{rng.randrange(10 ** 12, 10 ** 13):013d}',
+                )
+
+        db.executemany('INSERT INTO membership_member VALUES (?, ?, ?, ?, ?, ?)', rows())
+        db.execute('CREATE UNIQUE INDEX member_safa_id ON membership_member (safa_id)')
+        db.execute('CREATE INDEX member_id_number ON membership_member (id_number)')
+        db.commit()
+        return list(safa_ids)
+
+    @staticmethod
+    def measure(db, statements, params, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for sql in statements:
+                db.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
@@ -1,51 +1,63 @@
-from django.core.management.base import BaseCommand
-from django.utils import timezone
-from membership.models import JuniorMember
-from django.db import transaction
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from membership.age_transitions import DEFAULT_CHUNK_SIZE, run_age_transitions
+
 
 class Command(BaseCommand):
-    help = 'Check for junior members who have turned 18 and convert them to senior members'
+    help = (
+        'Move players who turned 18 since the last run from the junior to the senior quota counters '
+        '(schedule daily; each run continues from the previous one)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--as-of',
+            help='Process birthdays up to this date, YYYY-MM-DD (defaults to today)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Members per transaction (default {DEFAULT_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing anything'
+        )
 
     def handle(self, *args, **options):
-        self.stdout.write(self.style.SUCCESS('Starting junior member age transition check...'))
-
-        try:
-            with transaction.atomic():
-                # Get all junior members
-                junior_members = JuniorMember.objects.all()
-                self.stdout.write(f'Found {junior_members.count()} junior members to check')
-
-                # Track statistics
-                checked = 0
-                converted = 0
-                errors = 0
-
-                # Check each junior member
-                for junior in junior_members:
-                    checked += 1
-                    try:
-                        if not junior.is_junior:  # They've turned 18
-                            self.stdout.write(f'Converting {junior.get_full_name()} (ID: {junior.pk}) to senior member')
-                            senior_member = junior.convert_to_senior()
-                            if senior_member:
-                                converted += 1
-                                self.stdout.write(self.style.SUCCESS(
-                                    f'Successfully converted {senior_member.get_full_name()} to senior member'
-                                ))
-                    except Exception as e:
-                        errors += 1
-                        self.stdout.write(self.style.ERROR(
-                            f'Error converting {junior.get_full_name()} (ID: {junior.pk}): {str(e)}'
-                        ))
-
-                # Report results
-                self.stdout.write(self.style.SUCCESS(
-                    f'Age transition check completed. '
-                    f'Checked: {checked}, Converted: {converted}, Errors: {errors}'
-                ))
-
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error during age transition check: {str(e)}'))
+        as_of = None
+        if options['as_of']:
+            try:
+                as_of = date.fromisoformat(options['as_of'])
+            except ValueError:
+                raise CommandError('--as-of must be YYYY-MM-DD')
+
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        stats = run_age_transitions(
+            as_of=as_of,
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+            progress=self.report_progress,
+        )
+
+        verb = 'would be updated' if options['dry_run'] else 'updated'
+        if stats.full_reconcile:
+            self.stdout.write(self.style.SUCCESS(
+                f'No previous run: recounted the active season quotas up to {stats.as_of}, '
+                f'{stats.quota_rows} quota rows {verb} ({stats.elapsed:.1f}s)'
+            ))
             return
 
-        self.stdout.write(self.style.SUCCESS('Junior member age transition check completed successfully'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Age transitions {stats.since} - {stats.as_of}: {stats.processed} players turned 18, '
+            f'{stats.quota_members} counted in club quotas, {stats.quota_rows} quota rows {verb} '
+            f'({stats.elapsed:.1f}s, {stats.rate:.0f}/s)'
+        ))
+
+    def report_progress(self, stats):
+        self.stdout.write(f'  {stats.processed} processed, {stats.rate:.0f}/s')
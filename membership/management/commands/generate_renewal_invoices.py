@@ -0,0 +1,96 @@
+from django.core.management.base import BaseCommand, CommandError
+from membership.models import SeasonRenewalCheckpoint, SAFASeasonConfig
+from membership.season_renewal import DEFAULT_CHUNK_SIZE, RENEWAL_SOURCES, run_season_renewal
+
+
+class Command(BaseCommand):
+    help = 'Generate season renewal invoices in resumable chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season',
+            type=int,
+            help='Season year to invoice (defaults to the active season)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Entities per transaction (default {DEFAULT_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--entity-type',
+            action='append',
+            choices=[entity_type for entity_type, _model, _filters in RENEWAL_SOURCES],
+            help='Only process this entity type (may be repeated)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Process entity types in parallel worker processes (PostgreSQL only)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report invoice counts and totals without writing anything'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Discard saved checkpoints and start from the beginning'
+        )
+
+    def handle(self, *args, **options):
+        if options['season']:
+            season = SAFASeasonConfig.objects.filter(season_year=options['season']).first()
+            if not season:
+                raise CommandError(f"No season configuration found for {options['season']}")
+        else:
+            season = SAFASeasonConfig.get_active_season()
+            if not season:
+                raise CommandError('No active season found. Use --season.')
+
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        if options['restart'] and not options['dry_run']:
+            deleted, _ = SeasonRenewalCheckpoint.objects.filter(season_config=season).delete()
+            self.stdout.write(f'Cleared {deleted} checkpoints for season {season.season_year}')
+
+        dry_run = options['dry_run']
+        self.stdout.write(
+            f"{'Dry run for' if dry_run else 'Generating'} season {season.season_year} renewal invoices"
+        )
+
+        results = run_season_renewal(
+            season,
+            chunk_size=options['chunk_size'],
+            dry_run=dry_run,
+            workers=options['workers'],
+            progress=self.report_progress,
+            entity_types=options['entity_type'],
+        )
+
+        total_created = 0
+        for entity_type, stats in results.items():
+            total_created += stats['created']
+            verb = 'would be created' if dry_run else 'created'
+            self.stdout.write(
+                f"{entity_type}: {stats['created']} {verb}, {stats['skipped']} skipped, "
+                f"subtotal R{stats['subtotal']}, VAT R{stats['vat']}, total R{stats['total']} "
+                f"({stats['elapsed']:.1f}s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Renewal invoicing completed. Invoices {"to create" if dry_run else "created"}: {total_created}'
+        ))
+
+    def report_progress(self, stats, checkpoint):
+        if checkpoint and checkpoint.is_complete and not stats.processed:
+            self.stdout.write(f'  {stats.entity_type}: already complete, skipping')
+            return
+        self.stdout.write(
+            f'  {stats.entity_type}: {stats.processed} processed, {stats.created} created, '
+            f'{stats.rate:.0f}/s'
+        )
@@ -0,0 +1,99 @@
+from django.core.management.base import BaseCommand, CommandError
+from geography.models import Club
+from membership.member_import import DEFAULT_CHUNK_SIZE, MemberImporter, MemberImportError, read_rows
+from membership.models import SAFASeasonConfig
+
+
+class Command(BaseCommand):
+    help = 'Import members from a CSV or XLSX file in chunks, with a per-row error report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file with a header row')
+        parser.add_argument(
+            '--season',
+            type=int,
+            help='Season year to register for (defaults to the active season)'
+        )
+        parser.add_argument(
+            '--club',
+            help='SAFA ID of the club to register everyone in (otherwise the file needs a club column)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows per transaction (default {DEFAULT_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--no-invoices',
+            action='store_true',
+            help='Do not create registration invoices'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the file and report what would be imported without writing anything'
+        )
+        parser.add_argument(
+            '--errors',
+            type=int,
+            default=50,
+            help='Row errors to print (default 50)'
+        )
+
+    def handle(self, *args, **options):
+        if options['season']:
+            season = SAFASeasonConfig.objects.filter(season_year=options['season']).first()
+            if not season:
+                raise CommandError(f"No season configuration found for {options['season']}")
+        else:
+            season = SAFASeasonConfig.get_active_season()
+            if not season:
+                raise CommandError('No active season found. Use --season.')
+
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        club = None
+        if options['club']:
+            club = Club.objects.select_related('localfootballassociation__region__province').filter(
+                safa_id=options['club'].upper()
+            ).first()
+            if not club:
+                raise CommandError(f"No club with SAFA ID {options['club']}")
+
+        dry_run = options['dry_run']
+        importer = MemberImporter(
+            season,
+            club=club,
+            chunk_size=options['chunk_size'],
+            dry_run=dry_run,
+            create_invoices=not options['no_invoices'],
+            progress=self.report_progress,
+        )
+        self.stdout.write(
+            f"{'Dry run of' if dry_run else 'Importing'} {options['path']} for season {season.season_year}"
+        )
+        try:
+            with open(options['path'], 'rb') as file:
+                stats = importer.run(read_rows(file, options['path']))
+        except (OSError, MemberImportError) as e:
+            raise CommandError(str(e))
+
+        for row in stats.errors[:options['errors']]:
+            self.stdout.write(self.style.WARNING(f"  line {row['line']}: {'; '.join(row['errors'])}"))
+        hidden = stats.invalid + stats.duplicates - min(len(stats.errors), options['errors'])
+        if hidden > 0:
+            self.stdout.write(f'  ... {hidden} more rows with errors')
+
+        verb = 'would be created' if dry_run else 'created'
+        self.stdout.write(self.style.SUCCESS(
+            f'Import completed in {stats.elapsed:.1f}s: {stats.processed} rows, '
+            f'{stats.created} members {verb}, {stats.invoices} invoices, '
+            f'{stats.invalid} invalid, {stats.duplicates} duplicates'
+        ))
+
+    def report_progress(self, stats):
+        self.stdout.write(
+            f'  {stats.processed} processed, {stats.created} created, {stats.rate:.0f}/s'
+        )
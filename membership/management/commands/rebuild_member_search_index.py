@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from membership.member_search import create_search_index, search_backend
+
+
+class Command(BaseCommand):
+    help = 'Create or repopulate the member search index (SQLite FTS5 table or PostgreSQL trigram index)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Database alias to index'
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not create_search_index(connection):
+            raise CommandError(f'Member search indexing is not supported on {connection.vendor}; icontains is used instead.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Member search index rebuilt ({search_backend(connection.alias)} on {connection.vendor})'
+        ))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from membership.models import ClubMemberQuota, SAFASeasonConfig
+
+
+class Command(BaseCommand):
+    help = 'Recalculate ClubMemberQuota counters from member data and fix any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season',
+            type=int,
+            help='Season year to reconcile (defaults to the active season)'
+        )
+        parser.add_argument(
+            '--all-seasons',
+            action='store_true',
+            help='Reconcile every configured season'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted quotas without writing any changes'
+        )
+
+    def handle(self, *args, **options):
+        if options['all_seasons']:
+            seasons = list(SAFASeasonConfig.objects.all())
+        elif options['season']:
+            seasons = list(SAFASeasonConfig.objects.filter(season_year=options['season']))
+            if not seasons:
+                raise CommandError(f"No season configuration found for {options['season']}")
+        else:
+            active_season = SAFASeasonConfig.get_active_season()
+            if not active_season:
+                raise CommandError('No active season found. Use --season or --all-seasons.')
+            seasons = [active_season]
+
+        dry_run = options['dry_run']
+        total = 0
+        for season in seasons:
+            fixed = ClubMemberQuota.reconcile_season(season, dry_run=dry_run)
+            total += fixed
+            verb = 'would be corrected' if dry_run else 'corrected'
+            self.stdout.write(f'Season {season.season_year}: {fixed} club quotas {verb}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Quota reconciliation completed. Seasons: {len(seasons)}, Quotas fixed: {total}'
+        ))
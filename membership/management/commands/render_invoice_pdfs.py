@@ -0,0 +1,65 @@
+import os
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from membership.invoice_pdfs import DEFAULT_CHUNK_SIZE, prerender_invoice_pdfs
+from membership.models import Invoice
+
+SKIPPED_STATUSES = ['DRAFT', 'CANCELLED']
+
+
+class Command(BaseCommand):
+    help = 'Pre-render and cache the PDFs of newly issued invoices'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            type=date.fromisoformat,
+            help='Issue date (YYYY-MM-DD) to start from (defaults to yesterday)'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Render every issued invoice, whatever its issue date'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Worker processes rendering in parallel (default: one per CPU)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Invoices per worker task (default {DEFAULT_CHUNK_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        queryset = Invoice.objects.exclude(status__in=SKIPPED_STATUSES)
+        if not options['all']:
+            since = options['since'] or timezone.now().date() - timedelta(days=1)
+            queryset = queryset.filter(issue_date__gte=since)
+            self.stdout.write(f'Rendering invoices issued since {since:%Y-%m-%d}')
+
+        stats = prerender_invoice_pdfs(
+            queryset,
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+            progress=self.report_progress,
+        )
+
+        for invoice_number in stats.failed:
+            self.stderr.write(f'  Failed: {invoice_number}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Invoice PDFs: {stats.rendered} rendered, {stats.cached} already cached, '
+            f'{len(stats.failed)} failed in {stats.elapsed:.1f}s ({stats.rate:.1f}/s)'
+        ))
+
+    def report_progress(self, stats):
+        self.stdout.write(f'  {stats.processed} processed, {stats.rendered} rendered, {stats.rate:.1f}/s')
@@ -0,0 +1,412 @@
+# membership/member_import.py
+"""
+Bulk member import from CSV or XLSX.
+
+Rows are streamed from the file and handled in chunks:
+
+* each row is cleaned with the Member model's own field rules, and SA ID
+  numbers are checked with accounts.utils.extract_sa_id_dob_gender (check
+  digit and date) and against the given birth date and gender, as
+  Member.validate_sa_id_number does;
+* duplicates are found with one IN query per chunk against existing ID
+  numbers, passport numbers and emails, plus the values already seen in the
+  file;
+* clubs are resolved by SAFA ID or name and cached for the whole file;
+* the chunk's SAFA IDs are claimed from the pool at once, and members,
+  registration workflows and registration invoices are written with
+  bulk_create in one transaction per chunk.
+
+Search index, dashboard snapshot and rollups are brought up to date once at
+the end (utils.bulk). With dry_run=True nothing is written and the stats
+report what would be imported, including every row's errors.
+
+Usage:
+    importer = MemberImporter(season_config, club=request.user.club)
+    stats = importer.run(read_rows(uploaded_file, uploaded_file.name))
+"""
+import csv
+import io
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from accounts.utils import extract_sa_id_dob_gender
+from geography.models import Club
+from utils.bulk import bulk_operation, defer as defer_bulk
+from utils.run_stats import RunStats
+from utils.safa_ids import claim_safa_ids
+from .member_search import BULK_SEARCH_INDEX
+from .models import Member, RegistrationWorkflow
+from .season_renewal import SeasonRenewalEngine, save_invoices
+from .season_stats import BULK_SEASON_STATS
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+DEFAULT_CHUNK_SIZE = 1000
+# Row errors kept in the report; the counts always cover every row
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_FIELDS = [
+    'first_name', 'last_name', 'email', 'phone_number', 'id_number', 'passport_number',
+    'date_of_birth', 'gender', 'role', 'street_address', 'suburb', 'city', 'postal_code',
+]
+REQUIRED_FIELDS = ['first_name', 'last_name']
+IMPORT_ROLES = {'PLAYER', 'OFFICIAL'}
+
+# Accepted spellings of column headers
+COLUMN_ALIASES = {
+    'name': 'first_name',
+    'first_names': 'first_name',
+    'surname': 'last_name',
+    'email_address': 'email',
+    'phone': 'phone_number',
+    'cell': 'phone_number',
+    'mobile': 'phone_number',
+    'id': 'id_number',
+    'id_no': 'id_number',
+    'sa_id': 'id_number',
+    'passport': 'passport_number',
+    'dob': 'date_of_birth',
+    'birth_date': 'date_of_birth',
+    'sex': 'gender',
+    'club_safa_id': 'club',
+    'club_name': 'club',
+}
+GENDER_VALUES = {'m': 'M', 'male': 'M', 'f': 'F', 'female': 'F'}
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%Y/%m/%d', '%d-%m-%Y']
+
+
+class MemberImportError(Exception):
+    """The file as a whole cannot be imported"""
+
+
+# ----------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------
+
+def normalize_header(header):
+    key = str(header or '').strip().lower().replace(' ', '_').replace('-', '_')
+    return COLUMN_ALIASES.get(key, key)
+
+
+def _cell(value):
+    """XLSX cells arrive typed; turn them into what a CSV would hold"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheets store ID numbers as numbers
+        value = int(value)
+    return str(value).strip()
+
+
+def read_rows(file, filename):
+    """Yield (line number, {column: value}) from a CSV or XLSX file without loading it whole"""
+    name = filename.lower()
+    if name.endswith('.xlsx'):
+        if openpyxl is None:
+            raise MemberImportError('XLSX import needs openpyxl; upload a CSV instead')
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        try:
+            headers = [normalize_header(header) for header in next(rows)]
+        except StopIteration:
+            return
+        for line, values in enumerate(rows, start=2):
+            row = {header: _cell(value) for header, value in zip(headers, values) if header}
+            if any(row.values()):
+                yield line, row
+        workbook.close()
+    elif name.endswith('.csv'):
+        if isinstance(file.read(0), bytes):
+            file = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        reader = csv.reader(file)
+        try:
+            headers = [normalize_header(header) for header in next(reader)]
+        except StopIteration:
+            return
+        for values in reader:
+            row = {header: value.strip() for header, value in zip(headers, values) if header}
+            if any(row.values()):
+                yield reader.line_num, row
+    else:
+        raise MemberImportError('Upload a .csv or .xlsx file')
+
+
+# ----------------------------------------------------------------------
+# Row validation
+# ----------------------------------------------------------------------
+
+def parse_date(value):
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValidationError(f"Unrecognised date '{value}' (use YYYY-MM-DD)")
+
+
+def check_sa_id(id_number, date_of_birth=None, gender=None):
+    """
+    (date_of_birth, gender) for a valid SA ID number; raises ValidationError
+    for a bad number or one that disagrees with the given birth date or gender.
+    """
+    id_dob, id_gender = extract_sa_id_dob_gender(id_number)
+    if id_dob is None:
+        raise ValidationError("Invalid South African ID number")
+    if date_of_birth and date_of_birth != id_dob:
+        raise ValidationError("Birth date doesn't match ID number. Please verify your information.")
+    if gender and gender != id_gender:
+        raise ValidationError("Gender doesn't match ID number. Please verify your information.")
+    return id_dob, id_gender
+
+
+def clean_row(row):
+    """Return (data, errors) for one row; data holds model-ready values"""
+    data = {}
+    errors = []
+
+    for field_name in REQUIRED_FIELDS:
+        if not row.get(field_name):
+            errors.append(f"{field_name.replace('_', ' ').capitalize()} is required")
+
+    raw = {field_name: row.get(field_name, '') for field_name in IMPORT_FIELDS}
+    raw['id_number'] = raw['id_number'].replace(' ', '').replace('-', '')
+    raw['gender'] = GENDER_VALUES.get(raw['gender'].lower(), raw['gender'].upper())
+    raw['role'] = raw['role'].upper() or 'PLAYER'
+    raw['email'] = raw['email'].lower()
+
+    for field_name, value in raw.items():
+        if not value:
+            continue
+        try:
+            if field_name == 'date_of_birth':
+                data[field_name] = parse_date(value)
+            else:
+                data[field_name] = Member._meta.get_field(field_name).clean(value, None)
+        except ValidationError as e:
+            errors.extend(f"{field_name.replace('_', ' ').capitalize()}: {message}" for message in e.messages)
+
+    if data.get('role') and data['role'] not in IMPORT_ROLES:
+        errors.append(f"Role must be one of {', '.join(sorted(IMPORT_ROLES))}")
+
+    if data.get('id_number'):
+        try:
+            data['date_of_birth'], data['gender'] = check_sa_id(
+                data['id_number'], data.get('date_of_birth'), data.get('gender')
+            )
+        except ValidationError as e:
+            errors.extend(e.messages)
+    elif not data.get('passport_number'):
+        errors.append("An SA ID number or passport number is required")
+
+    return data, errors
+
+
+# ----------------------------------------------------------------------
+# Import
+# ----------------------------------------------------------------------
+
+class ImportStats(RunStats):
+    """Row counts and the first MAX_REPORTED_ERRORS row errors of an import"""
+    counters = ('created', 'invalid', 'duplicates', 'invoices')
+
+    def __init__(self, dry_run):
+        super().__init__()
+        self.dry_run = dry_run
+        self.errors = []
+
+    def add_error(self, line, messages):
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': messages})
+
+    def as_dict(self):
+        return {
+            'dry_run': self.dry_run,
+            **super().as_dict(),
+            'errors': self.errors,
+            'errors_truncated': self.invalid + self.duplicates > len(self.errors),
+        }
+
+
+class MemberImporter:
+    """
+    Import member rows for a season, optionally all into one club (club
+    admins) or else into the club named in each row's `club` column (SAFA ID
+    or name), limited to the clubs in `clubs`.
+    """
+
+    def __init__(self, season_config, club=None, clubs=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 dry_run=False, create_invoices=True, registration_method='ADMIN', progress=None):
+        self.season_config = season_config
+        self.club = club
+        self.clubs = clubs if clubs is not None else Club.objects.all()
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.create_invoices = create_invoices
+        self.registration_method = registration_method
+        self.progress = progress
+        self.invoice_builder = SeasonRenewalEngine(season_config, chunk_size=chunk_size)
+        self._club_cache = {}
+        self._seen = {'id_number': set(), 'passport_number': set(), 'email': set()}
+
+    def run(self, rows):
+        """Import (line, row) pairs from read_rows(); returns ImportStats"""
+        stats = ImportStats(self.dry_run)
+        with bulk_operation():
+            chunk = []
+            for line, row in rows:
+                chunk.append((line, row))
+                if len(chunk) >= self.chunk_size:
+                    self._process_chunk(chunk, stats)
+                    chunk = []
+            if chunk:
+                self._process_chunk(chunk, stats)
+        return stats
+
+    def _process_chunk(self, chunk, stats):
+        cleaned = []
+        for line, row in chunk:
+            stats.processed += 1
+            data, errors = clean_row(row)
+            club = self.club
+            if not errors and club is None:
+                club = self._resolve_clubs([row.get('club', '')]).get(row.get('club', ''))
+                if club is None:
+                    errors.append(f"Unknown club '{row.get('club', '')}'" if row.get('club') else "Club is required")
+            if errors:
+                stats.invalid += 1
+                stats.add_error(line, errors)
+                continue
+            data['current_club'] = club
+            cleaned.append((line, data))
+
+        unique = []
+        for line, data, reason in self._find_duplicates(cleaned):
+            if reason:
+                stats.duplicates += 1
+                stats.add_error(line, [reason])
+            else:
+                unique.append(data)
+
+        if not self.dry_run and unique:
+            stats.invoices += self._write_chunk(unique)
+        elif self.create_invoices:
+            stats.invoices += sum(1 for data in unique if self._build_invoice(Member(**data)))
+        stats.created += len(unique)
+        if self.progress:
+            self.progress(stats)
+
+    def _resolve_clubs(self, keys):
+        """{key: Club} for club SAFA IDs or names, cached for the whole import"""
+        missing = [key for key in keys if key and key not in self._club_cache]
+        if missing:
+            clubs = self.clubs.filter(
+                Q(safa_id__in=[key.upper() for key in missing]) | Q(name__in=missing)
+            ).select_related('localfootballassociation__region__province')
+            by_safa_id = {club.safa_id: club for club in clubs if club.safa_id}
+            by_name = {club.name: club for club in clubs}
+            for key in missing:
+                self._club_cache[key] = by_safa_id.get(key.upper()) or by_name.get(key)
+        return {key: self._club_cache.get(key) for key in keys}
+
+    def _find_duplicates(self, cleaned):
+        """Yield (line, data, reason or None), checking the whole chunk with one query per column"""
+        values = {column: set() for column in self._seen}
+        for _line, data in cleaned:
+            for column in values:
+                if data.get(column):
+                    values[column].add(data[column])
+
+        existing = {
+            'id_number': set(
+                Member.objects.filter(id_number__in=values['id_number']).values_list('id_number', flat=True)
+            ) if values['id_number'] else set(),
+            'passport_number': set(
+                Member.objects.filter(passport_number__in=values['passport_number'])
+                .values_list('passport_number', flat=True)
+            ) if values['passport_number'] else set(),
+            'email': set(
+                Member.objects.annotate(email_lower=Lower('email'))
+                .filter(email_lower__in=values['email']).values_list('email_lower', flat=True)
+            ) if values['email'] else set(),
+        }
+
+        labels = {'id_number': 'ID number', 'passport_number': 'Passport number', 'email': 'Email'}
+        for line, data in cleaned:
+            reason = None
+            for column, label in labels.items():
+                value = data.get(column)
+                if not value:
+                    continue
+                if value in existing[column]:
+                    reason = f"{label} {value} is already registered"
+                elif value in self._seen[column]:
+                    reason = f"{label} {value} appears earlier in the file"
+                if reason:
+                    break
+            if not reason:
+                for column in self._seen:
+                    if data.get(column):
+                        self._seen[column].add(data[column])
+            yield line, data, reason
+
+    def _build_member(self, data, safa_id):
+        club = data['current_club']
+        lfa = club.localfootballassociation
+        region = lfa.region if lfa else None
+        province = region.province if region else None
+        return Member(
+            **data,
+            safa_id=safa_id,
+            status='PENDING',
+            registration_method=self.registration_method,
+            current_season=self.season_config,
+            lfa=lfa,
+            region=region,
+            province=province,
+            national_federation_id=province.national_federation_id if province else None,
+        )
+
+    def _build_invoice(self, member):
+        return self.invoice_builder.build_invoice(
+            'MEMBER', member, invoice_type='MEMBER_REGISTRATION', purpose='Registration'
+        )
+
+    def _write_chunk(self, rows):
+        """Write one chunk of new members with their workflows and invoices; returns invoices written"""
+        with transaction.atomic():
+            safa_ids = claim_safa_ids(len(rows), Member._meta.label)
+            members = [self._build_member(data, safa_id) for data, safa_id in zip(rows, safa_ids)]
+            Member.objects.bulk_create(members, batch_size=self.chunk_size)
+            if members[0].pk is None:
+                # Backends without RETURNING support: map SAFA IDs back to ids
+                ids = dict(Member.objects.filter(safa_id__in=safa_ids).values_list('safa_id', 'pk'))
+                for member in members:
+                    member.pk = ids[member.safa_id]
+
+            RegistrationWorkflow.objects.bulk_create(
+                [RegistrationWorkflow(member=member) for member in members], batch_size=self.chunk_size
+            )
+
+            pending = []
+            if self.create_invoices:
+                for member in members:
+                    built = self._build_invoice(member)
+                    if built:
+                        pending.append((member, *built))
+                save_invoices(pending, batch_size=self.chunk_size)
+
+        for member in members:
+            defer_bulk(BULK_SEARCH_INDEX, member.pk, 'default')
+        defer_bulk(BULK_SEASON_STATS, self.season_config.pk)
+        return len(pending)
@@ -0,0 +1,211 @@
+# membership/member_search.py
+"""
+Indexed member search shared by the member search API, MemberViewSet, the
+admin autocomplete and accounts.search_members_api.
+
+search_members(query, queryset) narrows a Member queryset to the members
+matching `query`, best matches first:
+
+* a SAFA ID or 13-digit ID number is looked up exactly on its own index;
+* on SQLite the name, email, SAFA ID and ID number are matched word by word
+  (as prefixes) against the FTS5 table MEMBER_SEARCH_TABLE, ranked by bm25.
+  Member signals keep the table current; rebuild_member_search_index
+  repopulates it;
+* on PostgreSQL the same columns are matched with ILIKE against a pg_trgm GIN
+  expression index and ranked by trigram similarity;
+* other backends fall back to icontains on each column.
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from utils.bulk import register_flush
+
+MEMBER_SEARCH_TABLE = 'membership_member_search'
+# Members saved or deleted inside utils.bulk.bulk_operation(), reindexed at the end
+BULK_SEARCH_INDEX = 'membership.search_index'
+SEARCH_FIELDS = frozenset({'first_name', 'last_name', 'email', 'safa_id', 'id_number'})
+
+SAFA_ID_PATTERN = re.compile(r'^[A-Z0-9]{5}$')
+ID_NUMBER_PATTERN = re.compile(r'^\d{13}$')
+
+# FTS5 keeps extra prefix indexes for 2 and 3 character prefixes so short
+# autocomplete terms do not scan the whole term list.
+FTS5_CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {MEMBER_SEARCH_TABLE} USING fts5("
+    "name, email, safa_id, id_number, tokenize = 'unicode61', prefix = '2 3')"
+)
+FTS5_POPULATE_SQL = (
+    f"INSERT INTO {MEMBER_SEARCH_TABLE} (rowid, name, email, safa_id, id_number) "
+    "SELECT id, TRIM(COALESCE(first_name, '') || ' ' || COALESCE(last_name, '')), "
+    "COALESCE(email, ''), COALESCE(safa_id, ''), COALESCE(id_number, '') FROM membership_member"
+)
+
+TRIGRAM_INDEX_NAME = 'membership_member_search_trgm'
+
+
+def trigram_document(table=''):
+    """Expression the PostgreSQL trigram index is built on; queries must use the same one"""
+    prefix = f'{table}.' if table else ''
+    return (
+        f"(COALESCE({prefix}first_name, '') || ' ' || COALESCE({prefix}last_name, '') || ' ' || "
+        f"COALESCE({prefix}email, '') || ' ' || COALESCE({prefix}safa_id, '') || ' ' || "
+        f"COALESCE({prefix}id_number, ''))"
+    )
+
+
+_backends = {}
+
+
+def search_backend(using='default'):
+    """'fts5', 'trigram' or 'basic' for a database alias"""
+    if using not in _backends:
+        connection = connections[using]
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                tables = connection.introspection.table_names(cursor)
+            backend = 'fts5' if MEMBER_SEARCH_TABLE in tables else 'basic'
+        elif connection.vendor == 'postgresql':
+            backend = 'trigram'
+        else:
+            backend = 'basic'
+        if backend == 'basic':
+            # The index may still be created by a pending migration
+            return backend
+        _backends[using] = backend
+    return _backends[using]
+
+
+def build_match_query(query):
+    """FTS5 MATCH expression: every word must match as a prefix"""
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_members(query, queryset=None):
+    """Members in queryset (default: all) matching query, most relevant first"""
+    from .models import Member
+
+    if queryset is None:
+        queryset = Member.objects.all()
+    query = (query or '').strip()
+    if not query:
+        return queryset
+
+    exact = query.upper()
+    if SAFA_ID_PATTERN.match(exact):
+        matches = queryset.filter(safa_id=exact)
+        if matches.exists():
+            return matches
+    if ID_NUMBER_PATTERN.match(query):
+        matches = queryset.filter(id_number=query)
+        if matches.exists():
+            return matches
+
+    backend = search_backend(queryset.db)
+    if backend == 'fts5':
+        match = build_match_query(query)
+        if not match:
+            return queryset.none()
+        rank = RawSQL(
+            f"SELECT bm25({MEMBER_SEARCH_TABLE}, 10.0, 2.0, 5.0, 5.0) FROM {MEMBER_SEARCH_TABLE} "
+            f"WHERE {MEMBER_SEARCH_TABLE} MATCH %s AND rowid = membership_member.id",
+            [match],
+            output_field=FloatField()
+        )
+        matching_ids = RawSQL(
+            f"SELECT rowid FROM {MEMBER_SEARCH_TABLE} WHERE {MEMBER_SEARCH_TABLE} MATCH %s",
+            [match]
+        )
+        # bm25 is lower for better matches
+        return queryset.filter(pk__in=matching_ids).annotate(search_rank=rank).order_by('search_rank', '-created')
+
+    if backend == 'trigram':
+        document = trigram_document('membership_member')
+        pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        return queryset.filter(
+            RawSQL(f"{document} ILIKE %s", [pattern], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f"similarity({document}, %s)", [query], output_field=FloatField())
+        ).order_by('-search_rank', '-created')
+
+    return queryset.filter(
+        Q(first_name__icontains=query) |
+        Q(last_name__icontains=query) |
+        Q(email__icontains=query) |
+        Q(safa_id__icontains=query) |
+        Q(id_number__icontains=query)
+    )
+
+
+# ----------------------------------------------------------------------
+# Index maintenance (SQLite; the PostgreSQL index maintains itself)
+# ----------------------------------------------------------------------
+
+def index_member(member, using='default'):
+    if search_backend(using) != 'fts5':
+        return
+    name = ' '.join(part for part in (member.first_name, member.last_name) if part)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {MEMBER_SEARCH_TABLE} (rowid, name, email, safa_id, id_number) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            [member.pk, name, member.email or '', member.safa_id or '', member.id_number or '']
+        )
+
+
+def unindex_member(member_id, using='default'):
+    if search_backend(using) != 'fts5':
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {MEMBER_SEARCH_TABLE} WHERE rowid = %s", [member_id])
+
+
+def reindex_members(items, batch_size=500):
+    """Rewrite the index rows of {member_id: database alias} with one statement per batch"""
+    by_alias = {}
+    for member_id, using in items.items():
+        by_alias.setdefault(using or 'default', []).append(member_id)
+    for using, member_ids in by_alias.items():
+        if search_backend(using) != 'fts5':
+            continue
+        with connections[using].cursor() as cursor:
+            for start in range(0, len(member_ids), batch_size):
+                batch = member_ids[start:start + batch_size]
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(f"DELETE FROM {MEMBER_SEARCH_TABLE} WHERE rowid IN ({placeholders})", batch)
+                # Deleted members are no longer in membership_member and drop out here
+                cursor.execute(f"{FTS5_POPULATE_SQL} WHERE id IN ({placeholders})", batch)
+
+
+register_flush(BULK_SEARCH_INDEX, reindex_members)
+
+
+def create_search_index(connection):
+    """Create (and fill) the vendor's search index; returns False if unsupported"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(FTS5_CREATE_SQL)
+            cursor.execute(f"DELETE FROM {MEMBER_SEARCH_TABLE}")
+            cursor.execute(FTS5_POPULATE_SQL)
+        elif connection.vendor == 'postgresql':
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX_NAME} ON membership_member "
+                f"USING gin ({trigram_document()} gin_trgm_ops)"
+            )
+        else:
+            return False
+    _backends.pop(connection.alias, None)
+    return True
+
+
+def drop_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f"DROP TABLE IF EXISTS {MEMBER_SEARCH_TABLE}")
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f"DROP INDEX IF EXISTS {TRIGRAM_INDEX_NAME}")
+    _backends.pop(connection.alias, None)
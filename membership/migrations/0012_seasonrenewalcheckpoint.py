@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-16 19:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('membership', '0011_invoice_from_address_invoice_from_name_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeasonRenewalCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(max_length=30, verbose_name='Entity Type')),
+                ('last_object_id', models.PositiveBigIntegerField(default=0, verbose_name='Last Processed ID')),
+                ('invoices_created', models.PositiveIntegerField(default=0, verbose_name='Invoices Created')),
+                ('skipped', models.PositiveIntegerField(default=0, verbose_name='Skipped')),
+                ('is_complete', models.BooleanField(default=False, verbose_name='Complete')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('season_config', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renewal_checkpoints', to='membership.safaseasonconfig')),
+            ],
+            options={
+                'verbose_name': 'Season Renewal Checkpoint',
+                'verbose_name_plural': 'Season Renewal Checkpoints',
+                'unique_together': {('season_config', 'entity_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-16 19:45
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('membership', '0012_seasonrenewalcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeasonStatsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_members', models.IntegerField(default=0)),
+                ('active_members', models.IntegerField(default=0)),
+                ('pending_members', models.IntegerField(default=0)),
+                ('rejected_members', models.IntegerField(default=0)),
+                ('inactive_members', models.IntegerField(default=0)),
+                ('total_players', models.IntegerField(default=0)),
+                ('total_officials', models.IntegerField(default=0)),
+                ('total_admins', models.IntegerField(default=0)),
+                ('recent_members', models.IntegerField(default=0, verbose_name='Members Added in Growth Window')),
+                ('previous_members', models.IntegerField(default=0, verbose_name='Members Added Before Growth Window')),
+                ('total_invoices', models.IntegerField(default=0)),
+                ('paid_invoices', models.IntegerField(default=0)),
+                ('pending_invoices', models.IntegerField(default=0)),
+                ('overdue_invoices', models.IntegerField(default=0)),
+                ('total_invoiced', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('outstanding_revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('pending_transfers', models.IntegerField(default=0)),
+                ('approved_transfers', models.IntegerField(default=0)),
+                ('rejected_transfers', models.IntegerField(default=0)),
+                ('computed_at', models.DateTimeField(verbose_name='Last Full Recompute')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('season_config', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats_snapshot', to='membership.safaseasonconfig')),
+            ],
+            options={
+                'verbose_name': 'Season Stats Snapshot',
+                'verbose_name_plural': 'Season Stats Snapshots',
+            },
+        ),
+    ]
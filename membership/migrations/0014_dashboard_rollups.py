@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-16 19:49
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('membership', '0013_seasonstatssnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceRevenueRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('invoice_type', models.CharField(max_length=30, verbose_name='Invoice Type')),
+                ('status', models.CharField(max_length=20, verbose_name='Status')),
+                ('count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('season_config', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revenue_rollups', to='membership.safaseasonconfig')),
+            ],
+            options={
+                'verbose_name': 'Invoice Revenue Rollup',
+                'verbose_name_plural': 'Invoice Revenue Rollups',
+                'indexes': [models.Index(fields=['season_config', 'day'], name='membership__season__b2b8bf_idx')],
+                'unique_together': {('season_config', 'day', 'invoice_type', 'status')},
+            },
+        ),
+        migrations.CreateModel(
+            name='MemberRegistrationRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Registration Day')),
+                ('status', models.CharField(max_length=20, verbose_name='Status')),
+                ('role', models.CharField(max_length=20, verbose_name='Role')),
+                ('count', models.IntegerField(default=0)),
+                ('season_config', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registration_rollups', to='membership.safaseasonconfig')),
+            ],
+            options={
+                'verbose_name': 'Member Registration Rollup',
+                'verbose_name_plural': 'Member Registration Rollups',
+                'indexes': [models.Index(fields=['season_config', 'day'], name='membership__season__ff4372_idx')],
+                'unique_together': {('season_config', 'day', 'status', 'role')},
+            },
+        ),
+    ]
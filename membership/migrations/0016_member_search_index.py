@@ -0,0 +1,60 @@
+# Generated by Django 5.2.5 on 2026-10-16 19:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+# The SQL is frozen here rather than imported from membership.member_search so
+# later changes to that module cannot change what this migration does.
+FTS5_CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS membership_member_search USING fts5("
+    "name, email, safa_id, id_number, tokenize = 'unicode61', prefix = '2 3')"
+)
+FTS5_POPULATE_SQL = (
+    "INSERT INTO membership_member_search (rowid, name, email, safa_id, id_number) "
+    "SELECT id, TRIM(COALESCE(first_name, '') || ' ' || COALESCE(last_name, '')), "
+    "COALESCE(email, ''), COALESCE(safa_id, ''), COALESCE(id_number, '') FROM membership_member"
+)
+TRIGRAM_CREATE_SQL = (
+    "CREATE INDEX IF NOT EXISTS membership_member_search_trgm ON membership_member USING gin ("
+    "(COALESCE(first_name, '') || ' ' || COALESCE(last_name, '') || ' ' || "
+    "COALESCE(email, '') || ' ' || COALESCE(safa_id, '') || ' ' || "
+    "COALESCE(id_number, '')) gin_trgm_ops)"
+)
+
+
+def create_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(FTS5_CREATE_SQL)
+            cursor.execute("DELETE FROM membership_member_search")
+            cursor.execute(FTS5_POPULATE_SQL)
+        elif connection.vendor == 'postgresql':
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(TRIGRAM_CREATE_SQL)
+
+
+def drop_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("DROP TABLE IF EXISTS membership_member_search")
+        elif connection.vendor == 'postgresql':
+            cursor.execute("DROP INDEX IF EXISTS membership_member_search_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geography', '0004_geographyupdatelog'),
+        ('membership', '0015_invoiceexport'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['id_number'], name='membership__id_numb_137a52_idx'),
+        ),
+        migrations.RunPython(create_index, drop_index),
+    ]
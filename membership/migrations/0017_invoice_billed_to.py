@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('membership', '0016_member_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='billed_to_name',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Billed To'),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='billed_to_type',
+            field=models.CharField(blank=True, max_length=50, verbose_name='Billed To Type'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geography', '0005_boundaries_and_geocoded_address'),
+        ('membership', '0018_invoice_status_due_date_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgeTransitionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('since', models.DateField(blank=True, null=True, verbose_name='Processed From')),
+                ('as_of', models.DateField(verbose_name='Processed Up To')),
+                ('last_member_id', models.PositiveBigIntegerField(default=0, verbose_name='Last Processed ID')),
+                ('members_converted', models.PositiveIntegerField(default=0, verbose_name='Members Converted')),
+                ('quota_rows_updated', models.PositiveIntegerField(default=0, verbose_name='Quota Rows Updated')),
+                ('is_complete', models.BooleanField(default=False, verbose_name='Complete')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Age Transition Run',
+                'verbose_name_plural': 'Age Transition Runs',
+                'ordering': ['-as_of', '-pk'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['role', 'date_of_birth'], name='membership__role_cca29c_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('membership', '0019_age_transition_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoiceitem',
+            name='is_pro_rata',
+            field=models.BooleanField(default=False, verbose_name='Pro-rata Item'),
+        ),
+        migrations.AddField(
+            model_name='invoiceitem',
+            name='original_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Original annual amount before pro-rata calculation', max_digits=10, null=True, verbose_name='Original Annual Amount'),
+        ),
+        migrations.AddField(
+            model_name='invoiceitem',
+            name='pro_rata_period',
+            field=models.CharField(blank=True, help_text="Description of pro-rata period (e.g., '8 months')", max_length=100, verbose_name='Pro-rata Period'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 # membership/models.py - CORRECTED and Complete Implementation
 
 from django.db import models, transaction
+from django.db.models import Count, F, Q
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
@@ -8,7 +9,6 @@ from django.utils import timezone
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
 from django.core.validators import RegexValidator
 from django.conf import settings
-from django.utils.crypto import get_random_string
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 from model_utils.models import TimeStampedModel
@@ -16,6 +16,15 @@ from decimal import Decimal, ROUND_HALF_UP
 import uuid
 from datetime import date, timedelta
 from .safa_config_models import SAFASeasonConfig, SAFAFeeStructure
+from utils.bulk import defer as defer_bulk, in_bulk_operation, register_flush
+from utils.safa_ids import claim_safa_id, mark_safa_id_used
+from .season_cache import season_cache
+from .season_stats import (
+    SeasonStatsTrackedMixin, invoice_contribution, member_contribution, track_stats_change,
+    transfer_contribution
+)
+from .season_rollups import invoice_rollup, member_rollup
+from .member_search import BULK_SEARCH_INDEX, SEARCH_FIELDS, index_member, unindex_member
 
 # Constants
 MEMBER_ROLES = [
@@ -44,11 +53,14 @@ gis_models = models
 Point = None
 GIS_AVAILABLE = False
 
-# try:
-#     import geocoder
-#     GEOCODER_AVAILABLE = True
-# except ImportError:
-GEOCODER_AVAILABLE = False
+# Marker for members loaded with deferred quota fields (see Member.from_db)
+QUOTA_STATE_UNKNOWN = object()
+
+# Side effects deferred inside utils.bulk.bulk_operation()
+# (season snapshots and the search index defer theirs in their own modules)
+BULK_WORKFLOWS = 'membership.workflows'
+BULK_QUOTAS = 'membership.quotas'
+BULK_SEASON_CACHE = 'membership.season_cache'
 
 # Models
 
@@ -57,10 +69,15 @@ GEOCODER_AVAILABLE = False
 
 
 
-class Member(TimeStampedModel):
+class Member(SeasonStatsTrackedMixin, TimeStampedModel):
     """
     Centralized Member model - handles all member types
     """
+    # Season dashboard snapshot tracking (see season_stats)
+    STATS_STATE_FIELDS = ('status', 'role', 'current_season_id', 'created')
+    STATS_CONTRIBUTION = staticmethod(member_contribution)
+    STATS_ROLLUP = staticmethod(member_rollup)
+
     # Class-level constants
     REGISTRATION_METHODS = [
         ('SELF', _('Self Registration Online')),
@@ -287,15 +304,37 @@ class Member(TimeStampedModel):
         indexes = [
             models.Index(fields=['safa_id']),
             models.Index(fields=['email']),
+            models.Index(fields=['id_number']),
             models.Index(fields=['current_club', 'status']),
             models.Index(fields=['current_season', 'status']),
             models.Index(fields=['role', 'status']),
+            models.Index(fields=['role', 'date_of_birth']),
         ]
 
+    # Fields that decide which ClubMemberQuota counter a member occupies
+    QUOTA_STATE_FIELDS = ('status', 'role', 'date_of_birth', 'current_club_id', 'current_season_id')
+
+    # Quota state as last read from / written to the database (see from_db)
+    _quota_state = None
+
+    # Set by registration views: a new member is rejected if the club's quota
+    # is full. Other saves (admin, imports, fixtures) only keep the counters.
+    enforce_quota = False
+
     def __str__(self):
         club_name = self.current_club.name if self.current_club else "No Club"
         return f"{self.first_name} {self.last_name} ({self.safa_id}) - {club_name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if set(cls.QUOTA_STATE_FIELDS).issubset(field_names):
+            instance._quota_state = instance.get_quota_state()
+        else:
+            # Deferred fields - resolve lazily on save rather than querying here
+            instance._quota_state = QUOTA_STATE_UNKNOWN
+        return instance
+
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -335,6 +374,38 @@ class Member(TimeStampedModel):
                     "Cannot register member. The organization must be paid up for the current season first."
                 ))
 
+    def get_quota_state(self, today=None):
+        """
+        Return the (club_id, season_id, member_type) quota counter this member
+        occupies, or None if the member does not count towards any quota.
+        Mirrors the filters used by ClubMemberQuota.update_counts().
+        """
+        if self.status != 'ACTIVE' or not self.current_club_id or not self.current_season_id:
+            return None
+
+        if self.role == 'OFFICIAL':
+            return (self.current_club_id, self.current_season_id, 'official')
+
+        if self.role == 'PLAYER' and self.date_of_birth:
+            date_of_birth = self.date_of_birth
+            if isinstance(date_of_birth, str):
+                date_of_birth = date.fromisoformat(date_of_birth)
+            cutoff = ClubMemberQuota.get_senior_cutoff_date(today)
+            member_type = 'senior_player' if date_of_birth < cutoff else 'junior_player'
+            return (self.current_club_id, self.current_season_id, member_type)
+
+        return None
+
+    def _get_stored_quota_state(self):
+        """Quota state currently stored in the database for this member"""
+        if self._quota_state is not QUOTA_STATE_UNKNOWN:
+            return self._quota_state
+
+        stored = Member.objects.filter(pk=self.pk).only(
+            'status', 'role', 'date_of_birth', 'current_club', 'current_season'
+        ).first()
+        return stored.get_quota_state() if stored else None
+
     def save(self, *args, **kwargs):
         # Set current season if not set
         if not self.current_season_id:
@@ -345,83 +416,90 @@ class Member(TimeStampedModel):
             self.generate_safa_id()
         elif self.is_existing_member and not self.previous_safa_id:
             self.validate_existing_safa_id()
-
-        # Auto-detect organization if doing self-registration
-        if self.registration_method == 'SELF' and self.registration_address and GIS_AVAILABLE:
+            if self._state.adding:
+                # Returning member's ID must never be handed out from the pool
+                mark_safa_id_used(self.safa_id, self._meta.label)
+
+        # Auto-detect organization if doing self-registration. Only the local
+        # geocode cache is used here; addresses it has not seen are geocoded by
+        # a background job after the save (see queue_member_geocoding).
+        if self.registration_method == 'SELF' and self.registration_address:
             if not self.location:
-                self.geocode_address()
+                self.geocode_address(cached_only=True)
+                self._needs_geocoding = not self.location
 
-            if self.location and not (self.province or self.region or self.lfa):
+            if self.location and not (self.province_id or self.region_id or self.lfa_id):
                 self.assign_organization_by_location()
 
-        super().save(*args, **kwargs)
-
-    def geocode_address(self):
-        """Convert address to GPS coordinates"""
-        if not GEOCODER_AVAILABLE or not GIS_AVAILABLE:
+        update_fields = kwargs.get('update_fields')
+        tracks_quota = update_fields is None or any(
+            field in update_fields or field.replace('_id', '') in update_fields
+            for field in self.QUOTA_STATE_FIELDS
+        )
+        if not tracks_quota:
+            super().save(*args, **kwargs)
             return
 
-        try:
-            g = geocoder.google(self.registration_address)
-            if g.ok:
-                self.location = Point(g.lng, g.lat)
-        except Exception as e:
-            print(f"Geocoding failed for {self.registration_address}: {e}")
+        old_state = None if self._state.adding else self._get_stored_quota_state()
+        new_state = self.get_quota_state()
+
+        if old_state == new_state:
+            super().save(*args, **kwargs)
+        elif in_bulk_operation():
+            # Counters of the touched clubs are recounted when the bulk operation
+            # ends; quota limits are not enforced for bulk imports
+            for state in (old_state, new_state):
+                if state:
+                    defer_bulk(BULK_QUOTAS, state[:2])
+            super().save(*args, **kwargs)
+        else:
+            # Counter deltas and the member row commit together; registrations
+            # hold the quota row lock so concurrent sign-ups cannot overfill a club.
+            with transaction.atomic():
+                ClubMemberQuota.apply_member_delta(
+                    old_state, new_state, enforce=self._state.adding and self.enforce_quota
+                )
+                super().save(*args, **kwargs)
 
-    def assign_organization_by_location(self):
-        """Assign organization based on geographic location"""
-        if not self.location or not GIS_AVAILABLE:
-            return
+        self._quota_state = new_state
 
+    def get_coordinates(self):
+        """(longitude, latitude) from location, a Point with GIS or "lng,lat" text without"""
+        if not self.location:
+            return None
+        if GIS_AVAILABLE:
+            return self.location.x, self.location.y
         try:
-            # Import here to avoid circular imports
-            from geography.models import LocalFootballAssociation, Region, Province
-
-            # Check for LFA (most specific)
-            lfa = LocalFootballAssociation.objects.filter(
-                boundary__contains=self.location,
-                is_active=True
-            ).first()
-
-            if lfa:
-                self.lfa = lfa
-                self.region = lfa.region
-                self.province = lfa.region.province if lfa.region else None
-                return
-
-            # Check for Region
-            region = Region.objects.filter(
-                boundary__contains=self.location,
-                is_active=True
-            ).first()
-
-            if region:
-                self.region = region
-                self.province = region.province
-                return
-
-            # Check for Province
-            province = Province.objects.filter(
-                boundary__contains=self.location,
-                is_active=True
-            ).first()
-
-            if province:
-                self.province = province
+            longitude, latitude = (float(value) for value in self.location.split(','))
+        except ValueError:
+            return None
+        return longitude, latitude
 
-        except Exception as e:
-            print(f"Organization assignment failed: {e}")
+    def set_coordinates(self, longitude, latitude):
+        self.location = Point(longitude, latitude) if GIS_AVAILABLE else f'{longitude:.8f},{latitude:.8f}'
+
+    def geocode_address(self, cached_only=False):
+        """Convert address to GPS coordinates (cached_only: never call the external geocoder)"""
+        from geography.geocoding import cached_coordinates, geocode
+
+        coordinates = (cached_coordinates if cached_only else geocode)(self.registration_address)
+        if coordinates:
+            self.set_coordinates(*coordinates)
+
+    def assign_organization_by_location(self):
+        """Assign LFA, region and province from the in-process boundary index"""
+        from geography.spatial import locate
+
+        coordinates = self.get_coordinates()
+        if not coordinates:
+            return
+        placement = locate(*coordinates)
+        if placement:
+            self.province_id, self.region_id, self.lfa_id = placement
 
     def generate_safa_id(self):
-        """Generate a unique 5-character SAFA ID"""
-        while True:
-            code = get_random_string(
-                length=5,
-                allowed_chars='ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
-            )
-            if not Member.objects.filter(safa_id=code).exists():
-                self.safa_id = code
-                break
+        """Claim a unique 5-character SAFA ID from the shared pool"""
+        self.safa_id = claim_safa_id(self._meta.label)
 
     def validate_existing_safa_id(self):
         """Validate that the provided SAFA ID exists in previous seasons"""
@@ -580,8 +658,12 @@ class Member(TimeStampedModel):
             # If no geography set, return all active clubs
             return Club.objects.filter(is_active=True)
 
-    def calculate_registration_fee(self, season_config=None):
-        """Calculate member's registration fee including pro-rata if applicable"""
+    def calculate_registration_fee(self, season_config=None, fee_table=None):
+        """
+        Calculate member's registration fee including pro-rata if applicable.
+        fee_table ({entity_type: SAFAFeeStructure} for season_config) lets
+        callers pricing many members read the fee structures once.
+        """
         import logging
         logger = logging.getLogger(__name__)
 
@@ -593,12 +675,12 @@ class Member(TimeStampedModel):
             return Decimal('0.00')
 
         entity_type = self.get_entity_type_for_fees()
-        logger.info(f"Calculating fee for member {self.safa_id}, entity_type: {entity_type}, season: {season_config.season_year}")
+        logger.debug(f"Calculating fee for member {self.safa_id}, entity_type: {entity_type}, season: {season_config.season_year}")
 
-        fee_structure = SAFAFeeStructure.objects.filter(
-            season_config=season_config,
-            entity_type=entity_type
-        ).first()
+        if fee_table is not None:
+            fee_structure = fee_table.get(entity_type)
+        else:
+            fee_structure = season_cache.get_fee_structure(season_config, entity_type)
 
         if not fee_structure:
             logger.warning(f"No SAFAFeeStructure found for entity_type: {entity_type} and season: {season_config.season_year}")
@@ -613,7 +695,7 @@ class Member(TimeStampedModel):
                 return Decimal('200.00')  # Default fee
 
         base_fee = fee_structure.annual_fee
-        logger.info(f"Base fee for {entity_type}: {base_fee}")
+        logger.debug(f"Base fee for {entity_type}: {base_fee}")
 
         # Apply pro-rata if applicable and registration is after season start
         if fee_structure.is_pro_rata and season_config:
@@ -628,10 +710,10 @@ class Member(TimeStampedModel):
                     # Apply minimum fee if set
                     if fee_structure.minimum_fee:
                         pro_rata_fee = max(pro_rata_fee, fee_structure.minimum_fee)
-                    logger.info(f"Applied pro-rata fee: {pro_rata_fee}")
+                    logger.debug(f"Applied pro-rata fee: {pro_rata_fee}")
                     return pro_rata_fee.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
                 else:
-                    logger.info("No remaining days for pro-rata calculation, returning base fee.")
+                    logger.debug("No remaining days for pro-rata calculation, returning base fee.")
 
         return base_fee
 
@@ -648,12 +730,9 @@ class Member(TimeStampedModel):
             return Decimal('0.00')
 
         entity_type = self.get_entity_type_for_fees()
-        logger.info(f"Calculating simple fee for member {self.safa_id}, entity_type: {entity_type}, season: {season_config.season_year}")
+        logger.debug(f"Calculating simple fee for member {self.safa_id}, entity_type: {entity_type}, season: {season_config.season_year}")
 
-        fee_structure = SAFAFeeStructure.objects.filter(
-            season_config=season_config,
-            entity_type=entity_type
-        ).first()
+        fee_structure = season_cache.get_fee_structure(season_config, entity_type)
 
         if not fee_structure:
             logger.warning(f"No SAFAFeeStructure found for entity_type: {entity_type} and season: {season_config.season_year}")
@@ -672,15 +751,18 @@ class Member(TimeStampedModel):
         # Use the specific formula: Fee = Total / 1.15
         fee_excluding_vat = total_amount / Decimal('1.15')  # R200 / 1.15 = R173.91
         
-        logger.info(f"Simple fee calculation: Total={total_amount}, Fee (excl. VAT)={fee_excluding_vat}")
+        logger.debug(f"Simple fee calculation: Total={total_amount}, Fee (excl. VAT)={fee_excluding_vat}")
         
         return fee_excluding_vat
 
 
-class Transfer(TimeStampedModel):
+class Transfer(SeasonStatsTrackedMixin, TimeStampedModel):
     """
     Member transfers between clubs (single club membership)
     """
+    STATS_STATE_FIELDS = ('status', 'member_id')
+    STATS_CONTRIBUTION = staticmethod(transfer_contribution)
+
     STATUS_CHOICES = [
         ('PENDING', _('Pending Approval')),
         ('APPROVED', _('Approved')),
@@ -827,31 +909,64 @@ class Membership(TimeStampedModel):
 @receiver(post_save, sender='membership.Member')
 def create_member_workflow(sender, instance, created, **kwargs):
     """Create workflow tracker for new members"""
-    if created:
+    if created and not defer_bulk(BULK_WORKFLOWS, instance.pk):
         RegistrationWorkflow.objects.get_or_create(member=instance)
 
+@receiver(post_delete, sender='membership.Member')
+def update_club_quotas_on_delete(sender, instance, **kwargs):
+    """Release the quota slot held by a deleted member"""
+    old_state = instance._quota_state
+    if old_state is QUOTA_STATE_UNKNOWN:
+        # Loaded with deferred fields; reconcile_club_quotas picks up the drift
+        return
+    if old_state and defer_bulk(BULK_QUOTAS, old_state[:2]):
+        return
+    ClubMemberQuota.apply_member_delta(old_state, None)
+
 @receiver(post_save, sender='membership.Member')
-def update_club_quotas(sender, instance, **kwargs):
-    """Update club member quotas when member is saved"""
-    if instance.current_club and instance.current_season:
-        quota, created = ClubMemberQuota.objects.get_or_create(
-            club=instance.current_club,
-            season_config=instance.current_season
-        )
-        quota.update_counts()
+@receiver(post_save, sender='membership.Invoice')
+@receiver(post_save, sender='membership.Transfer')
+def update_season_stats(sender, instance, **kwargs):
+    """Keep the season dashboard snapshot in step with the saved row"""
+    track_stats_change(instance)
 
 @receiver(post_delete, sender='membership.Member')
-def update_club_quotas_on_delete(sender, instance, **kwargs):
-    """Update club quotas when member is deleted"""
-    if instance.current_club and instance.current_season:
-        try:
-            quota = ClubMemberQuota.objects.get(
-                club=instance.current_club,
-                season_config=instance.current_season
-            )
-            quota.update_counts()
-        except ClubMemberQuota.DoesNotExist:
-            pass
+@receiver(post_delete, sender='membership.Invoice')
+@receiver(post_delete, sender='membership.Transfer')
+def update_season_stats_on_delete(sender, instance, **kwargs):
+    track_stats_change(instance, deleted=True)
+
+@receiver(post_save, sender='membership.Member')
+def update_member_search_index(sender, instance, using, update_fields=None, **kwargs):
+    """Keep the member search index in step with the saved member"""
+    if update_fields and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    if not defer_bulk(BULK_SEARCH_INDEX, instance.pk, using):
+        index_member(instance, using=using)
+
+@receiver(post_delete, sender='membership.Member')
+def remove_from_member_search_index(sender, instance, using, **kwargs):
+    if not defer_bulk(BULK_SEARCH_INDEX, instance.pk, using):
+        unindex_member(instance.pk, using=using)
+
+@receiver(post_save, sender='membership.Member')
+def queue_member_geocoding(sender, instance, **kwargs):
+    """Geocode a self-registration whose address was not in the cache once it commits"""
+    if getattr(instance, '_needs_geocoding', False):
+        instance._needs_geocoding = False
+        from . import tasks
+        member_id = instance.pk
+        transaction.on_commit(lambda: tasks.geocode_member.enqueue(member_id))
+
+@receiver(post_save, sender='membership.Invoice')
+@receiver(post_delete, sender='membership.Invoice')
+def discard_cached_invoice_pdfs(sender, instance, created=False, **kwargs):
+    """Drop the invoice's cached PDFs once the change commits (see invoice_pdfs)"""
+    if created:
+        return
+    from .invoice_pdfs import discard_invoice_pdfs
+    invoice_uuid = instance.uuid
+    transaction.on_commit(lambda: discard_invoice_pdfs(invoice_uuid))
 
 @receiver(post_save, sender=SAFASeasonConfig)
 def handle_season_activation(sender, instance, **kwargs):
@@ -859,6 +974,45 @@ def handle_season_activation(sender, instance, **kwargs):
     if instance.is_active:
         # Deactivate all other seasons
         SAFASeasonConfig.objects.exclude(pk=instance.pk).update(is_active=False)
+    if not defer_bulk(BULK_SEASON_CACHE, True):
+        season_cache.invalidate()
+
+@receiver(post_delete, sender=SAFASeasonConfig)
+@receiver(post_save, sender=SAFAFeeStructure)
+@receiver(post_delete, sender=SAFAFeeStructure)
+def invalidate_season_cache(sender, instance, **kwargs):
+    """Season or fee table changed - drop cached copies in every process"""
+    if not defer_bulk(BULK_SEASON_CACHE, True):
+        season_cache.invalidate()
+
+
+# ----------------------------------------------------------------------
+# Deferred effects, applied once when a bulk operation ends (utils.bulk)
+# ----------------------------------------------------------------------
+
+def create_bulk_workflows(member_ids):
+    """One bulk_create of the workflow trackers of members created in bulk"""
+    existing = set(
+        RegistrationWorkflow.objects.filter(member_id__in=member_ids).values_list('member_id', flat=True)
+    )
+    live = Member.objects.filter(pk__in=member_ids).exclude(pk__in=existing).values_list('pk', flat=True)
+    RegistrationWorkflow.objects.bulk_create(
+        [RegistrationWorkflow(member_id=pk) for pk in live], batch_size=500, ignore_conflicts=True
+    )
+
+
+def reconcile_bulk_quotas(club_seasons):
+    """Recount the quotas of the clubs touched in bulk, one aggregate per season"""
+    clubs_by_season = {}
+    for club_id, season_id in club_seasons:
+        clubs_by_season.setdefault(season_id, set()).add(club_id)
+    for season in SAFASeasonConfig.objects.filter(pk__in=clubs_by_season):
+        ClubMemberQuota.reconcile_season(season, club_ids=clubs_by_season[season.pk])
+
+
+register_flush(BULK_WORKFLOWS, create_bulk_workflows)
+register_flush(BULK_QUOTAS, reconcile_bulk_quotas)
+register_flush(BULK_SEASON_CACHE, lambda items: season_cache.invalidate())
 
 
 # ============================================================================
@@ -1013,6 +1167,13 @@ class ClubMemberQuota(models.Model):
     def __str__(self):
         return f"{self.club.name} - Season {self.season_config.season_year} Quotas"
 
+    # member_type -> (counter field, limit field)
+    QUOTA_FIELDS = {
+        'senior_player': ('current_senior_players', 'max_senior_players'),
+        'junior_player': ('current_junior_players', 'max_junior_players'),
+        'official': ('current_officials', 'max_officials'),
+    }
+
     def can_register_member(self, member_type):
         """Check if club can register another member of given type"""
         if member_type == 'senior_player':
@@ -1023,32 +1184,135 @@ class ClubMemberQuota(models.Model):
             return self.current_officials < self.max_officials
         return False
 
-    def update_counts(self):
-        """Update current member counts"""
-        # Get current season members for this club
+    @staticmethod
+    def get_senior_cutoff_date(today=None):
+        """Players born before this date count as seniors (18+)"""
+        today = today or timezone.now().date()
+        try:
+            return today.replace(year=today.year - 18)
+        except ValueError:
+            # 29 February in a non-leap target year
+            return today.replace(year=today.year - 18, day=28)
+
+    @classmethod
+    def apply_member_delta(cls, old_state, new_state, enforce=False):
+        """
+        Move a member between quota counters with atomic +1/-1 updates.
+
+        States are the (club_id, season_id, member_type) tuples returned by
+        Member.get_quota_state(). With enforce=True the target quota row is
+        locked and a ValidationError is raised if the club has no slot left.
+        """
+        if old_state == new_state:
+            return
+
+        if new_state:
+            club_id, season_id, member_type = new_state
+            current_field, _max_field = cls.QUOTA_FIELDS[member_type]
+            lookup = {'club_id': club_id, 'season_config_id': season_id}
+
+            if enforce:
+                cls.objects.get_or_create(**lookup)
+                quota = cls.objects.select_for_update().get(**lookup)
+                if not quota.can_register_member(member_type):
+                    raise ValidationError(_(
+                        "%(club)s has reached its %(type)s quota for this season"
+                    ) % {'club': quota.club.name, 'type': member_type.replace('_', ' ')})
+                cls.objects.filter(pk=quota.pk).update(**{current_field: F(current_field) + 1})
+            elif not cls.objects.filter(**lookup).update(**{current_field: F(current_field) + 1}):
+                _quota, created = cls.objects.get_or_create(**lookup, defaults={current_field: 1})
+                if not created:
+                    # Lost a creation race - the row exists now
+                    cls.objects.filter(**lookup).update(**{current_field: F(current_field) + 1})
+
+        if old_state:
+            club_id, season_id, member_type = old_state
+            current_field, _max_field = cls.QUOTA_FIELDS[member_type]
+            cls.objects.filter(
+                club_id=club_id,
+                season_config_id=season_id,
+                **{f'{current_field}__gt': 0}
+            ).update(**{current_field: F(current_field) - 1})
+
+    @classmethod
+    def count_active_members(cls, season_config, club=None, club_ids=None):
+        """
+        Count quota members per club (or the given clubs) in one grouped
+        aggregate. Returns {club_id: (senior_players, junior_players, officials)}.
+        """
+        cutoff = cls.get_senior_cutoff_date()
         members = Member.objects.filter(
-            current_club=self.club,
-            current_season=self.season_config,
+            current_season=season_config,
+            current_club__isnull=False,
             status='ACTIVE'
         )
+        if club is not None:
+            members = members.filter(current_club=club)
+        if club_ids is not None:
+            members = members.filter(current_club_id__in=club_ids)
+
+        rows = members.order_by().values('current_club_id').annotate(
+            senior_players=Count('pk', filter=Q(role='PLAYER', date_of_birth__lt=cutoff)),
+            junior_players=Count('pk', filter=Q(role='PLAYER', date_of_birth__gte=cutoff)),
+            officials=Count('pk', filter=Q(role='OFFICIAL')),
+        )
+        return {
+            row['current_club_id']: (row['senior_players'], row['junior_players'], row['officials'])
+            for row in rows
+        }
 
-        self.current_senior_players = members.filter(
-            role='PLAYER',
-            date_of_birth__lt=timezone.now().date().replace(
-                year=timezone.now().year - 18
+    @classmethod
+    def reconcile_season(cls, season_config, dry_run=False, club_ids=None):
+        """
+        Rewrite drifted counters for a season (limited to club_ids, if given)
+        from a single grouped aggregate.
+        Returns the number of quota rows that were (or would be) corrected.
+        """
+        counts = cls.count_active_members(season_config, club_ids=club_ids)
+        quotas = cls.objects.filter(season_config=season_config)
+        if club_ids is not None:
+            quotas = quotas.filter(club_id__in=club_ids)
+        existing = {quota.club_id: quota for quota in quotas}
+
+        drifted = []
+        for club_id, quota in existing.items():
+            expected = counts.get(club_id, (0, 0, 0))
+            actual = (quota.current_senior_players, quota.current_junior_players, quota.current_officials)
+            if actual != expected:
+                (quota.current_senior_players,
+                 quota.current_junior_players,
+                 quota.current_officials) = expected
+                drifted.append(quota)
+
+        missing = [
+            cls(
+                club_id=club_id,
+                season_config=season_config,
+                current_senior_players=seniors,
+                current_junior_players=juniors,
+                current_officials=officials,
             )
-        ).count()
+            for club_id, (seniors, juniors, officials) in counts.items()
+            if club_id not in existing
+        ]
 
-        self.current_junior_players = members.filter(
-            role='PLAYER',
-            date_of_birth__gte=timezone.now().date().replace(
-                year=timezone.now().year - 18
-            )
-        ).count()
+        if not dry_run:
+            with transaction.atomic():
+                cls.objects.bulk_update(
+                    drifted,
+                    ['current_senior_players', 'current_junior_players', 'current_officials'],
+                    batch_size=500
+                )
+                cls.objects.bulk_create(missing, batch_size=500, ignore_conflicts=True)
 
-        self.current_officials = members.filter(
-            role='OFFICIAL'
-        ).count()
+        return len(drifted) + len(missing)
+
+    def update_counts(self):
+        """Update current member counts"""
+        counts = self.count_active_members(self.season_config, club=self.club)
+        (self.current_senior_players,
+         self.current_junior_players,
+         self.current_officials) = counts.get(self.club_id, (0, 0, 0))
 
         self.save()
 
@@ -1434,8 +1698,15 @@ class MemberProfile(models.Model):
         return f"Profile for {self.member.get_full_name()}"
 
 
-class Invoice(TimeStampedModel):
+class Invoice(SeasonStatsTrackedMixin, TimeStampedModel):
     """Universal Invoice model for organizations and members"""
+    STATS_STATE_FIELDS = (
+        'status', 'season_config_id', 'total_amount', 'outstanding_amount',
+        'invoice_type', 'issue_date', 'payment_date'
+    )
+    STATS_CONTRIBUTION = staticmethod(invoice_contribution)
+    STATS_ROLLUP = staticmethod(invoice_rollup)
+
     INVOICE_STATUS = [
         ('DRAFT', _('Draft')),
         ('PENDING', _('Pending Payment')),
@@ -1483,6 +1754,11 @@ class Invoice(TimeStampedModel):
     object_id = models.PositiveIntegerField(null=True, blank=True)
     organization = GenericForeignKey('content_type', 'object_id')
 
+    # Billed party, copied from the member or organisation when the invoice is
+    # created so lists need not resolve the relations (see membership.billed_to)
+    billed_to_name = models.CharField(_("Billed To"), max_length=255, blank=True)
+    billed_to_type = models.CharField(_("Billed To Type"), max_length=50, blank=True)
+
     # Invoice details
     status = models.CharField(_("Status"), max_length=20, choices=INVOICE_STATUS, default='PENDING')
     invoice_type = models.CharField(_("Invoice Type"), max_length=30, choices=INVOICE_TYPES)
@@ -1599,10 +1875,13 @@ class Invoice(TimeStampedModel):
             models.Index(fields=['season_config', 'status']),
             models.Index(fields=['member', 'status']),
             models.Index(fields=['invoice_type', 'status']),
+            models.Index(fields=['status', 'due_date']),
         ]
 
     def __str__(self):
-        if self.member:
+        if self.billed_to_name:
+            entity_name = self.billed_to_name
+        elif self.member:
             entity_name = self.member.get_full_name()
         elif self.organization:
             entity_name = getattr(self.organization, 'name', str(self.organization))
@@ -1617,6 +1896,26 @@ class Invoice(TimeStampedModel):
         if not self.invoice_number:
             self.invoice_number = self.generate_invoice_number()
 
+        if not self.billed_to_name:
+            self.set_billed_to()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'billed_to_name', 'billed_to_type'}
+
+        self.calculate_totals()
+
+        super().save(*args, **kwargs)
+
+    def set_billed_to(self):
+        """Copy the billed member's or organisation's name and kind onto the invoice"""
+        from .billed_to import UNKNOWN, describe_billed_to
+
+        entity = self.member if self.member_id else self.organization
+        name, kind = describe_billed_to(entity)
+        self.billed_to_name = name[:255]
+        self.billed_to_type = kind or UNKNOWN
+
+    def calculate_totals(self):
+        """Derive VAT, totals, due date and payment status (also used before bulk_create)"""
         # Calculate totals
         # Determine if VAT needs to be reverse-calculated
         # This logic applies if total_amount is set, but subtotal is not,
@@ -1660,49 +1959,80 @@ class Invoice(TimeStampedModel):
         elif self.due_date and self.due_date < timezone.now().date() and self.status == 'PENDING':
             self.status = 'OVERDUE'
 
-        super().save(*args, **kwargs)
 
     def generate_invoice_number(self):
-        """Generate unique invoice number in ORG-YYYYMMDD/type-XX format for organizations or MEM-YYYYMMDD/safa_id-XX for members"""
-        today_str = timezone.now().strftime("%Y%m%d")
-        
+        """Generate unique invoice number in MEM-YYYYMMDD/safa_id-XX format for members and organizations (MEM-YYYYMMDD/ORG if no safa_id)"""
+        return self.allocate_invoice_numbers([self.get_billing_safa_id()])[0]
+
+    def get_billing_safa_id(self):
+        """SAFA ID used in the invoice number (member first, then organization)"""
         if self.member and self.member.safa_id:
-            # Member invoice - use existing format
-            base_invoice_number = f"MEM-{today_str}/{self.member.safa_id}"
-            
-            # Check for existing invoices with the same base number and add a counter
-            counter = 0
-            while True:
-                if counter == 0:
-                    invoice_number = base_invoice_number
-                else:
-                    invoice_number = f"{base_invoice_number}-{counter:02d}" # Add -01, -02 etc.
+            return self.member.safa_id
+        try:
+            if self.organization and hasattr(self.organization, 'safa_id') and self.organization.safa_id:
+                return self.organization.safa_id
+        except:
+            # Fallback if organization access fails
+            pass
+        return None
 
-                if not Invoice.objects.filter(invoice_number=invoice_number).exists():
-                    return invoice_number
-                counter += 1
-        else:
-            # Organization invoice - use format: MEM-YYYYMMDD/safa_id or MEM-YYYYMMDD/ORG if no safa_id
-            try:
-                if self.organization and hasattr(self.organization, 'safa_id') and self.organization.safa_id:
-                    base_invoice_number = f"MEM-{today_str}/{self.organization.safa_id}"
-                else:
-                    base_invoice_number = f"MEM-{today_str}/ORG"
-            except:
-                # Fallback if organization access fails
-                base_invoice_number = f"MEM-{today_str}/ORG"
-            
-            # Check for existing invoices with the same base number and add a counter
-            counter = 0
-            while True:
-                if counter == 0:
-                    invoice_number = base_invoice_number
-                else:
-                    invoice_number = f"{base_invoice_number}-{counter:02d}" # Add -01, -02 etc.
+    @staticmethod
+    def get_invoice_number_base(safa_id=None, today=None):
+        today_str = (today or timezone.now()).strftime("%Y%m%d")
+        return f"MEM-{today_str}/{safa_id or 'ORG'}"
+
+    @staticmethod
+    def format_invoice_number(base_invoice_number, sequence):
+        """First invoice for a base gets the bare base, later ones -01, -02 etc."""
+        if sequence == 1:
+            return base_invoice_number
+        return f"{base_invoice_number}-{sequence - 1:02d}"
+
+    @classmethod
+    def get_invoice_sequence_seeds(cls, base_invoice_numbers, batch_size=100):
+        """Invoices already issued per base number, read once when a counter is first created"""
+        seeds = dict.fromkeys(base_invoice_numbers, 0)
+        bases = list(seeds)
+        # Each base is an indexed lookup of its own prefix; bulk jobs OR them
+        # together in batches instead of scanning every invoice of the day
+        for start in range(0, len(bases), batch_size):
+            lookup = Q()
+            for base in bases[start:start + batch_size]:
+                lookup |= Q(invoice_number=base) | Q(invoice_number__startswith=f"{base}-")
+            for invoice_number in cls.objects.filter(lookup).values_list('invoice_number', flat=True):
+                if invoice_number in seeds:
+                    seeds[invoice_number] = max(seeds[invoice_number], 1)
+                    continue
+                base, _, suffix = invoice_number.rpartition('-')
+                if base in seeds and suffix.isdigit():
+                    seeds[base] = max(seeds[base], int(suffix) + 1)
+        return seeds
 
-                if not Invoice.objects.filter(invoice_number=invoice_number).exists():
-                    return invoice_number
-                counter += 1
+    @classmethod
+    def allocate_invoice_numbers(cls, safa_ids, today=None):
+        """
+        Invoice numbers for a batch of billed SAFA IDs (None for organizations without one).
+
+        Uses the shared counter table, so the cost does not depend on how many
+        invoices were issued today and concurrent writers never get the same number.
+        Bases carry the day, so counters from before yesterday are never used
+        again and are discarded whenever new ones are created.
+        """
+        from utils.numbering import discard_counters, reserve_many
+
+        bases = [cls.get_invoice_number_base(safa_id, today) for safa_id in safa_ids]
+        counts = {}
+        for base in bases:
+            counts[f"invoice:{base}"] = counts.get(f"invoice:{base}", 0) + 1
+
+        def seed(keys):
+            yesterday = timezone.now() - timedelta(days=1)
+            discard_counters("invoice:MEM-", f"invoice:MEM-{yesterday:%Y%m%d}")
+            seeds = cls.get_invoice_sequence_seeds([key[len("invoice:"):] for key in keys])
+            return {f"invoice:{base}": sequence for base, sequence in seeds.items()}
+
+        sequences = {key: iter(numbers) for key, numbers in reserve_many(counts, seed=seed).items()}
+        return [cls.format_invoice_number(base, next(sequences[f"invoice:{base}"])) for base in bases]
 
     @property
     def is_overdue(self):
@@ -2049,6 +2379,22 @@ class InvoiceItem(models.Model):
     total_price = models.DecimalField(_("Total Price (Excl. VAT)"), max_digits=10, decimal_places=2, default=Decimal('0.00'))
     amount = models.DecimalField(_("Amount (Incl. VAT)"), max_digits=10, decimal_places=2, default=Decimal('0.00'))
 
+    # Pro-rata information
+    is_pro_rata = models.BooleanField(_("Pro-rata Item"), default=False)
+    original_amount = models.DecimalField(
+        _("Original Annual Amount"),
+        max_digits=10,
+        decimal_places=2,
+        null=True, blank=True,
+        help_text=_("Original annual amount before pro-rata calculation")
+    )
+    pro_rata_period = models.CharField(
+        _("Pro-rata Period"),
+        max_length=100,
+        blank=True,
+        help_text=_("Description of pro-rata period (e.g., '8 months')")
+    )
+
     class Meta:
         verbose_name = _("Invoice Item")
         verbose_name_plural = _("Invoice Items")
@@ -2066,4 +2412,231 @@ class InvoiceItem(models.Model):
     @property
     def sub_total(self):
         """Property to provide sub_total for template compatibility"""
-        return self.total_price
\ No newline at end of file
+        return self.total_price
+
+class SeasonRenewalCheckpoint(models.Model):
+    """
+    Progress marker for the bulk season renewal engine.
+    One row per season and entity type; each committed chunk advances last_object_id
+    so an interrupted run resumes after the last fully written chunk.
+    """
+    season_config = models.ForeignKey(
+        SAFASeasonConfig,
+        on_delete=models.CASCADE,
+        related_name='renewal_checkpoints'
+    )
+    entity_type = models.CharField(_("Entity Type"), max_length=30)
+    last_object_id = models.PositiveBigIntegerField(_("Last Processed ID"), default=0)
+    invoices_created = models.PositiveIntegerField(_("Invoices Created"), default=0)
+    skipped = models.PositiveIntegerField(_("Skipped"), default=0)
+    is_complete = models.BooleanField(_("Complete"), default=False)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Season Renewal Checkpoint")
+        verbose_name_plural = _("Season Renewal Checkpoints")
+        unique_together = [('season_config', 'entity_type')]
+
+    def __str__(self):
+        state = "complete" if self.is_complete else f"after #{self.last_object_id}"
+        return f"Renewal {self.season_config.season_year} {self.entity_type} ({state})"
+
+
+class AgeTransitionRun(models.Model):
+    """
+    One run of the junior-to-senior transition job (membership.age_transitions).
+    The as_of date of the latest complete run is the watermark: the next run
+    only looks at players who turned 18 after it. last_member_id lets an
+    interrupted run resume after its last committed chunk.
+    """
+    since = models.DateField(_("Processed From"), null=True, blank=True)
+    as_of = models.DateField(_("Processed Up To"))
+    last_member_id = models.PositiveBigIntegerField(_("Last Processed ID"), default=0)
+    members_converted = models.PositiveIntegerField(_("Members Converted"), default=0)
+    quota_rows_updated = models.PositiveIntegerField(_("Quota Rows Updated"), default=0)
+    is_complete = models.BooleanField(_("Complete"), default=False)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Age Transition Run")
+        verbose_name_plural = _("Age Transition Runs")
+        ordering = ['-as_of', '-pk']
+
+    def __str__(self):
+        state = "complete" if self.is_complete else f"after #{self.last_member_id}"
+        return f"Age transitions {self.since or 'start'} - {self.as_of} ({state})"
+
+
+class SeasonStatsSnapshot(models.Model):
+    """
+    Materialized dashboard counters for one season (see season_stats).
+    Kept current by Member/Invoice/Transfer signals and fully recomputed
+    periodically or on demand.
+    """
+    season_config = models.OneToOneField(
+        SAFASeasonConfig,
+        on_delete=models.CASCADE,
+        related_name='stats_snapshot'
+    )
+
+    # Members
+    total_members = models.IntegerField(default=0)
+    active_members = models.IntegerField(default=0)
+    pending_members = models.IntegerField(default=0)
+    rejected_members = models.IntegerField(default=0)
+    inactive_members = models.IntegerField(default=0)
+    total_players = models.IntegerField(default=0)
+    total_officials = models.IntegerField(default=0)
+    total_admins = models.IntegerField(default=0)
+    recent_members = models.IntegerField(_("Members Added in Growth Window"), default=0)
+    previous_members = models.IntegerField(_("Members Added Before Growth Window"), default=0)
+
+    # Invoices
+    total_invoices = models.IntegerField(default=0)
+    paid_invoices = models.IntegerField(default=0)
+    pending_invoices = models.IntegerField(default=0)
+    overdue_invoices = models.IntegerField(default=0)
+    total_invoiced = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    total_revenue = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    outstanding_revenue = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+
+    # Transfers
+    pending_transfers = models.IntegerField(default=0)
+    approved_transfers = models.IntegerField(default=0)
+    rejected_transfers = models.IntegerField(default=0)
+
+    computed_at = models.DateTimeField(_("Last Full Recompute"))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Season Stats Snapshot")
+        verbose_name_plural = _("Season Stats Snapshots")
+
+    def __str__(self):
+        return f"Stats {self.season_config.season_year} ({self.computed_at:%Y-%m-%d %H:%M})"
+
+    def as_stats(self):
+        """Dashboard figures in the dashboard_stats response format"""
+        total_revenue = float(self.total_revenue)
+        total_invoiced = float(self.total_invoiced)
+        collection_rate = round((total_revenue / total_invoiced) * 100, 2) if total_invoiced > 0 else 0.0
+        growth_rate = round((self.recent_members / self.previous_members) * 100, 2) if self.previous_members > 0 else 0.0
+        average_invoice = total_invoiced / self.total_invoices if self.total_invoices else 0.0
+
+        return {
+            'total_members': self.total_members,
+            'active_members': self.active_members,
+            'pending_members': self.pending_members,
+            'rejected_members': self.rejected_members,
+            'inactive_members': self.inactive_members,
+            'total_players': self.total_players,
+            'total_officials': self.total_officials,
+            'total_admins': self.total_admins,
+            'total_invoices': self.total_invoices,
+            'paid_invoices': self.paid_invoices,
+            'pending_invoices': self.pending_invoices,
+            'overdue_invoices': self.overdue_invoices,
+            'total_revenue': total_revenue,
+            'outstanding_revenue': float(self.outstanding_revenue),
+            'collection_rate': collection_rate,
+            'pending_transfers': self.pending_transfers,
+            'approved_transfers': self.approved_transfers,
+            'rejected_transfers': self.rejected_transfers,
+            'member_growth_rate': growth_rate,
+            'average_invoice_value': round(average_invoice, 2),
+            'stats_computed_at': self.computed_at.isoformat(),
+        }
+
+
+class MemberRegistrationRollup(models.Model):
+    """
+    Members registered per season, day, status and role (see season_rollups).
+    Feeds the registration charts without scanning the member table.
+    """
+    season_config = models.ForeignKey(
+        SAFASeasonConfig,
+        on_delete=models.CASCADE,
+        related_name='registration_rollups'
+    )
+    day = models.DateField(_("Registration Day"))
+    status = models.CharField(_("Status"), max_length=20)
+    role = models.CharField(_("Role"), max_length=20)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = _("Member Registration Rollup")
+        verbose_name_plural = _("Member Registration Rollups")
+        unique_together = ['season_config', 'day', 'status', 'role']
+        indexes = [
+            models.Index(fields=['season_config', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status}/{self.role}: {self.count}"
+
+
+class InvoiceRevenueRollup(models.Model):
+    """
+    Invoice count and value per season, day, invoice type and status
+    (see season_rollups). Paid invoices are bucketed by payment day, all
+    others by issue day.
+    """
+    season_config = models.ForeignKey(
+        SAFASeasonConfig,
+        on_delete=models.CASCADE,
+        related_name='revenue_rollups'
+    )
+    day = models.DateField(_("Day"))
+    invoice_type = models.CharField(_("Invoice Type"), max_length=30)
+    status = models.CharField(_("Status"), max_length=20)
+    count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        verbose_name = _("Invoice Revenue Rollup")
+        verbose_name_plural = _("Invoice Revenue Rollups")
+        unique_together = ['season_config', 'day', 'invoice_type', 'status']
+        indexes = [
+            models.Index(fields=['season_config', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.invoice_type}/{self.status}: {self.count}"
+
+
+class InvoiceExport(TimeStampedModel):
+    """
+    A PDF invoice export rendered in the background (see invoice_export).
+    The finished file is kept for download until it is deleted.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', _('Pending')),
+        ('RUNNING', _('Running')),
+        ('COMPLETED', _('Completed')),
+        ('FAILED', _('Failed')),
+    ]
+
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='invoice_exports'
+    )
+    filters = models.JSONField(_("Filters"), default=dict, blank=True)
+    status = models.CharField(_("Status"), max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    invoice_count = models.PositiveIntegerField(_("Invoices Exported"), default=0)
+    file = models.FileField(_("Export File"), upload_to='invoice_exports/', blank=True)
+    error = models.TextField(_("Error"), blank=True)
+    completed_at = models.DateTimeField(_("Completed At"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Invoice Export")
+        verbose_name_plural = _("Invoice Exports")
+        ordering = ['-created']
+
+    def __str__(self):
+        return f"Invoice export {self.uuid} ({self.status})"
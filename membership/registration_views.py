@@ -6,7 +6,7 @@ from django.urls import reverse_lazy, reverse
 from django.http import JsonResponse
 from django.utils import timezone
 from django.utils.crypto import get_random_string
-from django.core.exceptions import PermissionDenied
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import transaction
 from django.contrib.contenttypes.models import ContentType
 
@@ -18,9 +18,9 @@ from .models import (
     Member,
     Invoice,
     InvoiceItem,
-    SAFASeasonConfig,
-    SAFAFeeStructure
+    SAFASeasonConfig
 )
+from .season_cache import season_cache
 from geography.models import Club
 
 
@@ -80,11 +80,18 @@ class PlayerRegistrationView(ClubAdminRequiredMixin, CreateView):
     def form_valid(self, form):
         # The form now creates a user and a member.
         # We need to assign the club and role.
-        member = form.save(commit=False)
-        member.current_club = self.user_club
-        member.role = 'PLAYER'
-        member.status = 'PENDING' # Start as pending
-        member.save()
+        try:
+            with transaction.atomic():
+                member = form.save(commit=False)
+                member.current_club = self.user_club
+                member.role = 'PLAYER'
+                member.status = 'PENDING' # Start as pending
+                member.enforce_quota = True
+                member.save()
+        except ValidationError as e:
+            # Club quota is full; the user created by the form is rolled back too
+            form.add_error(None, e)
+            return self.form_invalid(form)
 
         # Store member ID in session for next step
         self.request.session['new_member_id'] = member.id
@@ -112,7 +119,7 @@ class PaymentSelectionView(ClubAdminRequiredMixin, TemplateView):
             return context
 
         fee_type = 'PLAYER_JUNIOR' if member.is_junior else 'PLAYER_SENIOR'
-        fee_structure = SAFAFeeStructure.objects.filter(season_config=active_season, entity_type=fee_type).first()
+        fee_structure = season_cache.get_fee_structure(active_season, fee_type)
 
         if not fee_structure:
             messages.error(self.request, f"No fee structure found for {fee_type} in the current season.")
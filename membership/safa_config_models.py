@@ -111,10 +111,23 @@ class SAFASeasonConfig(models.Model):
         
         super().save(*args, **kwargs)
     
+    @property
+    def organization_registration_open(self):
+        """Whether today falls inside the organization registration window"""
+        today = timezone.now().date()
+        return self.organization_registration_start <= today <= self.organization_registration_end
+
+    @property
+    def member_registration_open(self):
+        """Whether today falls inside the member registration window"""
+        today = timezone.now().date()
+        return self.member_registration_start <= today <= self.member_registration_end
+
     @classmethod
     def get_active_season(cls):
-        """Get the currently active season configuration"""
-        return cls.objects.filter(is_active=True).first()
+        """Get the currently active season configuration (cached per process)"""
+        from .season_cache import season_cache
+        return season_cache.get_active_season()
     
     @classmethod
     def get_current_season_year(cls):
@@ -214,20 +227,16 @@ class SAFAFeeStructure(models.Model):
     @classmethod
     def get_fee_for_entity(cls, entity_type, season_year=None):
         """Get fee for specific entity type in specific season"""
-        if not season_year:
-            season_config = SAFASeasonConfig.get_active_season()
-        else:
+        from .season_cache import season_cache
+
+        season_config = SAFASeasonConfig.get_active_season()
+        if season_year and (not season_config or season_config.season_year != int(season_year)):
             season_config = SAFASeasonConfig.objects.filter(season_year=season_year).first()
         
         if not season_config:
             return None
         
-        fee_structure = cls.objects.filter(
-            season_config=season_config,
-            entity_type=entity_type
-        ).first()
-        
-        return fee_structure
+        return season_cache.get_fee_structure(season_config, entity_type)
 
 
 class SAFAPaymentPlan(models.Model):
@@ -5,7 +5,7 @@ from datetime import timedelta, date
 from decimal import Decimal, ROUND_HALF_UP
 from django.contrib.contenttypes.models import ContentType
 from .models import Invoice, InvoiceItem, Member
-from .config_models import SAFASeasonConfig, SAFAFeeStructure, SAFAPaymentPlan
+from .safa_config_models import SAFASeasonConfig, SAFAFeeStructure, SAFAPaymentPlan
 from geography.models import Association, Province, Region, LocalFootballAssociation, Club
 
 class SAFAInvoiceManager:
@@ -63,30 +63,13 @@ class SAFAInvoiceManager:
         return pro_rata_amount, months_remaining, period_description
     
     @classmethod
-    def create_member_invoice(cls, member, registration_date=None, season_config=None):
+    def get_member_entity_type(cls, member, registration_date=None):
         """
-        Create invoice for individual members (Players/Officials)
+        Fee entity type for a member based on role (and age for players)
         """
-        if not season_config:
-            season_config = cls.get_active_season_config()
-        
-        if not season_config:
-            raise ValueError("No active season configuration found")
-        
         if not registration_date:
             registration_date = timezone.now().date()
         
-        # Check if invoice already exists for this season
-        existing_invoice = Invoice.objects.filter(
-            season_config=season_config,
-            member=member,
-            invoice_type='REGISTRATION'
-        ).first()
-        
-        if existing_invoice:
-            return existing_invoice
-        
-        # Determine entity type for fee lookup based on member role
         role = getattr(member, 'role', 'PLAYER')
         if role == 'PLAYER':
             # Calculate age to determine junior vs senior
@@ -113,6 +96,35 @@ class SAFAInvoiceManager:
         else:
             entity_type = 'PLAYER_SENIOR'  # Default
         
+        return entity_type
+    
+    @classmethod
+    def create_member_invoice(cls, member, registration_date=None, season_config=None):
+        """
+        Create invoice for individual members (Players/Officials)
+        """
+        if not season_config:
+            season_config = cls.get_active_season_config()
+        
+        if not season_config:
+            raise ValueError("No active season configuration found")
+        
+        if not registration_date:
+            registration_date = timezone.now().date()
+        
+        # Check if invoice already exists for this season
+        existing_invoice = Invoice.objects.filter(
+            season_config=season_config,
+            member=member,
+            invoice_type='REGISTRATION'
+        ).first()
+        
+        if existing_invoice:
+            return existing_invoice
+        
+        # Determine entity type for fee lookup based on member role
+        entity_type = cls.get_member_entity_type(member, registration_date)
+        
         # Get fee structure
         fee_structure = SAFAFeeStructure.get_fee_for_entity(entity_type, season_config.season_year)
         if not fee_structure:
@@ -347,10 +359,23 @@ class SAFAInvoiceManager:
         return invoice.installments.all()
     
     @classmethod
-    def generate_season_renewal_invoices(cls, season_config=None):
+    def shift_season_date(cls, value, years=1):
+        """Move a season date forward by whole years (29 Feb becomes 28 Feb)"""
+        try:
+            return value.replace(year=value.year + years)
+        except ValueError:
+            return value.replace(year=value.year + years, day=28)
+
+    @classmethod
+    def generate_season_renewal_invoices(cls, season_config=None, chunk_size=None, progress=None):
         """
-        Generate renewal invoices for all active entities for a new season
+        Generate renewal invoices for all active entities for a new season.
+
+        Delegates to the chunked, resumable SeasonRenewalEngine - rerunning after
+        an interruption continues from the last committed chunk.
         """
+        from .season_renewal import DEFAULT_CHUNK_SIZE, run_season_renewal
+
         if not season_config:
             # Create next season config or get existing
             current_season = cls.get_active_season_config()
@@ -361,8 +386,12 @@ class SAFAInvoiceManager:
             season_config, created = SAFASeasonConfig.objects.get_or_create(
                 season_year=next_year,
                 defaults={
-                    'season_start_date': current_season.season_start_date.replace(year=next_year),
-                    'season_end_date': current_season.season_end_date.replace(year=next_year),
+                    'season_start_date': cls.shift_season_date(current_season.season_start_date),
+                    'season_end_date': cls.shift_season_date(current_season.season_end_date),
+                    'organization_registration_start': cls.shift_season_date(current_season.organization_registration_start),
+                    'organization_registration_end': cls.shift_season_date(current_season.organization_registration_end),
+                    'member_registration_start': cls.shift_season_date(current_season.member_registration_start),
+                    'member_registration_end': cls.shift_season_date(current_season.member_registration_end),
                     'vat_rate': current_season.vat_rate,
                     'payment_due_days': current_season.payment_due_days,
                     'is_renewal_season': True,
@@ -370,55 +399,11 @@ class SAFAInvoiceManager:
                 }
             )
         
-        renewal_count = 0
-        
-        with transaction.atomic():
-            # Generate for all active associations
-            for association in Association.objects.all():
-                try:
-                    invoice = cls.create_organization_invoice(association, 'ASSOCIATION', season_config)
-                    renewal_count += 1
-                except Exception as e:
-                    print(f"Failed to create invoice for association {association}: {e}")
-            
-            # Generate for all provinces
-            for province in Province.objects.all():
-                try:
-                    invoice = cls.create_organization_invoice(province, 'PROVINCE', season_config)
-                    renewal_count += 1
-                except Exception as e:
-                    print(f"Failed to create invoice for province {province}: {e}")
-            
-            # Generate for all regions
-            for region in Region.objects.all():
-                try:
-                    invoice = cls.create_organization_invoice(region, 'REGION', season_config)
-                    renewal_count += 1
-                except Exception as e:
-                    print(f"Failed to create invoice for region {region}: {e}")
-            
-            # Generate for all LFAs
-            for lfa in LocalFootballAssociation.objects.all():
-                try:
-                    invoice = cls.create_organization_invoice(lfa, 'LFA', season_config)
-                    renewal_count += 1
-                except Exception as e:
-                    print(f"Failed to create invoice for LFA {lfa}: {e}")
-            
-            # Generate for all active clubs
-            for club in Club.objects.filter(status='ACTIVE'):
-                try:
-                    invoice = cls.create_organization_invoice(club, 'CLUB', season_config)
-                    renewal_count += 1
-                except Exception as e:
-                    print(f"Failed to create invoice for club {club}: {e}")
-            
-            # Generate for all active members
-            for member in Member.objects.filter(status='ACTIVE'):
-                try:
-                    invoice = cls.create_member_invoice(member, season_config=season_config)
-                    renewal_count += 1
-                except Exception as e:
-                    print(f"Failed to create invoice for member {member}: {e}")
+        results = run_season_renewal(
+            season_config,
+            chunk_size=chunk_size or DEFAULT_CHUNK_SIZE,
+            progress=progress
+        )
+        renewal_count = sum(stats['created'] for stats in results.values())
         
         return renewal_count, season_config
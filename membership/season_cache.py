@@ -0,0 +1,180 @@
+# membership/season_cache.py
+"""
+Process-wide cache for the active season and its fee structures.
+
+The active SAFASeasonConfig and each season's SAFAFeeStructure table (keyed by
+entity type) are loaded once per process and reused until a season or fee
+structure is saved or deleted. Invalidation bumps a version key in the shared
+cache so other worker processes drop their copy the next time they check it -
+once per request (see SeasonCacheMiddleware) and at most every
+SEASON_CACHE_CHECK_SECONDS outside requests.
+
+Cached instances are copied before being returned, so callers may modify them
+freely. The cache is only filled outside transactions, so uncommitted seasons or
+fees are never cached.
+"""
+import contextvars
+import copy
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from utils.shared_cache import get_shared_cache
+
+logger = logging.getLogger(__name__)
+
+SEASON_CACHE_VERSION_KEY = 'membership:season_cache_version'
+SEASON_CACHE_CHECK_SECONDS = getattr(settings, 'SEASON_CACHE_CHECK_SECONDS', 5)
+
+_MISSING = object()
+
+# Per-request hit/miss counters (reset by SeasonCacheMiddleware)
+_request_stats = contextvars.ContextVar('season_cache_stats', default=None)
+_request_checked = contextvars.ContextVar('season_cache_checked', default=False)
+
+
+class SeasonCache:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0.0
+        self._active_season = _MISSING
+        self._fee_tables = {}
+
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+
+    def _clear(self):
+        self._active_season = _MISSING
+        self._fee_tables = {}
+
+    def _check_version(self):
+        """Drop local data if another process invalidated it"""
+        now = time.monotonic()
+        in_request_first_use = _request_stats.get() is not None and not _request_checked.get()
+        if not in_request_first_use and now - self._checked_at < SEASON_CACHE_CHECK_SECONDS:
+            return
+
+        version = get_shared_cache().get(SEASON_CACHE_VERSION_KEY)
+        with self._lock:
+            if version != self._version:
+                self._clear()
+                self._version = version
+            self._checked_at = now
+        _request_checked.set(True)
+
+    def invalidate(self):
+        """Forget cached data here and tell other processes to do the same"""
+        with self._lock:
+            self._clear()
+
+        def bump():
+            get_shared_cache().set(SEASON_CACHE_VERSION_KEY, time.time_ns(), None)
+            with self._lock:
+                self._clear()
+
+        transaction.on_commit(bump)
+
+    @staticmethod
+    def _can_fill():
+        # Never cache data read inside a transaction that may still roll back
+        return not connection.in_atomic_block
+
+    @staticmethod
+    def _count(hit):
+        stats = _request_stats.get()
+        if stats is not None:
+            stats['hits' if hit else 'misses'] += 1
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get_active_season(self):
+        from .safa_config_models import SAFASeasonConfig
+
+        self._check_version()
+        season = self._active_season
+        if season is not _MISSING:
+            self._count(True)
+            return copy.copy(season)
+
+        self._count(False)
+        season = SAFASeasonConfig.objects.select_related('created_by').filter(is_active=True).first()
+        if self._can_fill():
+            with self._lock:
+                self._active_season = season
+        return copy.copy(season)
+
+    def get_fee_table(self, season_config):
+        """{entity_type: SAFAFeeStructure} for a season"""
+        from .safa_config_models import SAFAFeeStructure
+
+        if season_config is None or season_config.pk is None:
+            return {}
+
+        self._check_version()
+        table = self._fee_tables.get(season_config.pk)
+        if table is not None:
+            self._count(True)
+        else:
+            self._count(False)
+            table = {
+                fee.entity_type: fee
+                for fee in SAFAFeeStructure.objects.filter(season_config_id=season_config.pk)
+            }
+            if self._can_fill():
+                with self._lock:
+                    self._fee_tables[season_config.pk] = table
+        return {entity_type: copy.copy(fee) for entity_type, fee in table.items()}
+
+    def get_fee_structure(self, season_config, entity_type):
+        """SAFAFeeStructure for one entity type, or None"""
+        return self.get_fee_table(season_config).get(entity_type)
+
+
+season_cache = SeasonCache()
+
+
+def start_request_stats():
+    """Begin hit/miss counting for the current request"""
+    stats = {'hits': 0, 'misses': 0}
+    _request_stats.set(stats)
+    _request_checked.set(False)
+    return stats
+
+
+def get_request_stats():
+    return _request_stats.get()
+
+
+class SeasonCacheMiddleware:
+    """
+    Checks the season cache version once per request and reports its hit rate
+    (logged at DEBUG, and as an X-Season-Cache header when DEBUG is on).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = start_request_stats()
+        request.season_cache_stats = stats
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_stats.set(None)
+
+        lookups = stats['hits'] + stats['misses']
+        if lookups:
+            logger.debug(
+                f"Season cache {request.path}: {stats['hits']}/{lookups} hits"
+            )
+            if settings.DEBUG:
+                response['X-Season-Cache'] = f"hits={stats['hits']}; misses={stats['misses']}"
+        return response
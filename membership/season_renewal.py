@@ -0,0 +1,350 @@
+# membership/season_renewal.py
+"""
+Bulk season renewal invoice engine.
+
+Reads the season's fee structures once, builds invoices and line items in
+memory and writes them with bulk_create in chunks. Every chunk commits in its
+own transaction together with a SeasonRenewalCheckpoint update, so an
+interrupted run resumes after the last committed chunk.
+"""
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, transaction
+from django.utils import timezone
+
+from geography.models import Association, Club, LocalFootballAssociation, Province, Region
+from utils.run_stats import RunStats
+from .billed_to import describe_billed_to
+from .models import Invoice, InvoiceItem, Member, SeasonRenewalCheckpoint
+from .safa_config_models import SAFASeasonConfig
+from .season_cache import season_cache
+from .season_rollups import rebuild_season_rollups
+from .season_stats import refresh_season_snapshot
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# (entity_type, model, queryset filters) in processing order
+RENEWAL_SOURCES = [
+    ('ASSOCIATION', Association, {}),
+    ('PROVINCE', Province, {}),
+    ('REGION', Region, {}),
+    ('LFA', LocalFootballAssociation, {}),
+    ('CLUB', Club, {'status': 'ACTIVE'}),
+    ('MEMBER', Member, {'status': 'ACTIVE'}),
+]
+
+ORGANIZATION_INVOICE_TYPE = 'ANNUAL_FEE'
+MEMBER_INVOICE_TYPE = 'RENEWAL'
+
+
+class RenewalStats(RunStats):
+    """Invoices created and skipped, and the amounts invoiced, for one entity type"""
+    counters = ('created', 'skipped')
+
+    def __init__(self, entity_type):
+        super().__init__()
+        self.entity_type = entity_type
+        self.subtotal = Decimal('0.00')
+        self.vat = Decimal('0.00')
+        self.total = Decimal('0.00')
+        self.errors = []
+
+    def as_dict(self):
+        return {
+            'entity_type': self.entity_type,
+            **super().as_dict(),
+            'subtotal': self.subtotal,
+            'vat': self.vat,
+            'total': self.total,
+            'errors': self.errors,
+        }
+
+
+class SeasonRenewalEngine:
+    """
+    Generate renewal invoices for every active entity of a season in chunks.
+
+    Usage:
+        engine = SeasonRenewalEngine(season_config, chunk_size=2000)
+        results = engine.run()
+    """
+
+    def __init__(self, season_config, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False,
+                 progress=None, registration_date=None):
+        self.season_config = season_config
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.progress = progress
+        self.registration_date = registration_date or timezone.now().date()
+        self.fees = season_cache.get_fee_table(season_config)
+        self._fee_cache = {}
+
+    # ------------------------------------------------------------------
+    # Fee calculation (fee table is read once per run)
+    # ------------------------------------------------------------------
+
+    def get_fee(self, entity_type):
+        """Return (amount, is_pro_rata, period_description, original_amount) or None"""
+        if entity_type in self._fee_cache:
+            return self._fee_cache[entity_type]
+
+        from .safa_invoice_manager import SAFAInvoiceManager
+
+        fee_structure = self.fees.get(entity_type)
+        if not fee_structure:
+            result = None
+        elif fee_structure.is_pro_rata:
+            amount, months_remaining, period = SAFAInvoiceManager.calculate_pro_rata_amount(
+                fee_structure.annual_fee, self.registration_date, self.season_config
+            )
+            if fee_structure.minimum_fee and amount < fee_structure.minimum_fee:
+                amount = fee_structure.minimum_fee
+                period = "Minimum fee applied"
+            is_pro_rata = months_remaining < 12
+            result = (amount, is_pro_rata, period, fee_structure.annual_fee)
+        else:
+            result = (fee_structure.annual_fee, False, "Full Season", fee_structure.annual_fee)
+
+        self._fee_cache[entity_type] = result
+        return result
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    def run(self, entity_types=None):
+        """Process the requested entity types (all by default); returns {entity_type: stats dict}"""
+        results = {}
+        for entity_type, model, filters in RENEWAL_SOURCES:
+            if entity_types and entity_type not in entity_types:
+                continue
+            results[entity_type] = self.run_entity(entity_type, model, filters).as_dict()
+        return results
+
+    def run_entity(self, entity_type, model, filters):
+        stats = RenewalStats(entity_type)
+
+        if self.dry_run:
+            checkpoint = None
+            last_id = 0
+        else:
+            checkpoint, _created = SeasonRenewalCheckpoint.objects.get_or_create(
+                season_config=self.season_config,
+                entity_type=entity_type
+            )
+            if checkpoint.is_complete:
+                self._report(stats, checkpoint)
+                return stats
+            last_id = checkpoint.last_object_id
+
+        queryset = model.objects.filter(**filters).order_by('pk')
+
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_id)[:self.chunk_size])
+            if not chunk:
+                break
+
+            self._process_chunk(entity_type, chunk, stats, checkpoint)
+            last_id = chunk[-1].pk
+            self._report(stats, checkpoint)
+            if len(chunk) < self.chunk_size:
+                break
+
+        if checkpoint:
+            checkpoint.is_complete = True
+            checkpoint.save(update_fields=['is_complete', 'updated_at'])
+
+        return stats
+
+    def _report(self, stats, checkpoint):
+        if self.progress:
+            self.progress(stats, checkpoint)
+
+    def _process_chunk(self, entity_type, chunk, stats, checkpoint):
+        already_invoiced = self._already_invoiced(entity_type, chunk)
+        pending = []
+
+        for obj in chunk:
+            stats.processed += 1
+            if obj.pk in already_invoiced:
+                stats.skipped += 1
+                continue
+
+            built = self.build_invoice(entity_type, obj)
+            if built is None:
+                stats.skipped += 1
+                continue
+
+            invoice, item = built
+            stats.subtotal += invoice.subtotal
+            stats.vat += invoice.vat_amount
+            stats.total += invoice.total_amount
+            pending.append((obj, invoice, item))
+
+        if self.dry_run:
+            stats.created += len(pending)
+            return
+
+        self._write_chunk(pending, chunk[-1].pk, stats, checkpoint)
+        stats.created += len(pending)
+
+    def _write_chunk(self, pending, last_pk, stats, checkpoint):
+        with transaction.atomic():
+            invoices = save_invoices(pending, batch_size=self.chunk_size)
+            checkpoint.last_object_id = last_pk
+            checkpoint.invoices_created += len(invoices)
+            checkpoint.skipped = stats.skipped
+            checkpoint.save(update_fields=['last_object_id', 'invoices_created', 'skipped', 'updated_at'])
+
+    def _already_invoiced(self, entity_type, chunk):
+        """Ids in this chunk that already have a renewal invoice for the season"""
+        ids = [obj.pk for obj in chunk]
+        if entity_type == 'MEMBER':
+            return set(
+                Invoice.objects.filter(
+                    season_config=self.season_config,
+                    member_id__in=ids,
+                    invoice_type=MEMBER_INVOICE_TYPE
+                ).order_by().values_list('member_id', flat=True)
+            )
+
+        content_type = ContentType.objects.get_for_model(chunk[0])
+        return set(
+            Invoice.objects.filter(
+                season_config=self.season_config,
+                content_type=content_type,
+                object_id__in=ids,
+                invoice_type=ORGANIZATION_INVOICE_TYPE
+            ).order_by().values_list('object_id', flat=True)
+        )
+
+    def build_invoice(self, entity_type, obj, invoice_type=None, purpose='Renewal'):
+        """
+        Build an unsaved (Invoice, InvoiceItem) pair, or None if no fee applies.
+        Member invoices default to RENEWAL; the member import passes
+        MEMBER_REGISTRATION / 'Registration'.
+        """
+        from .safa_invoice_manager import SAFAInvoiceManager
+
+        season = self.season_config
+        if entity_type == 'MEMBER':
+            fee_entity_type = SAFAInvoiceManager.get_member_entity_type(obj, self.registration_date)
+        else:
+            fee_entity_type = entity_type
+
+        fee = self.get_fee(fee_entity_type)
+        if fee is None:
+            return None
+        amount, is_pro_rata, period_description, original_amount = fee
+
+        invoice = Invoice(
+            season_config=season,
+            subtotal=amount,
+            vat_rate=season.vat_rate,
+            status='PENDING',
+        )
+        if entity_type == 'MEMBER':
+            invoice.member = obj
+            invoice.invoice_type = invoice_type or MEMBER_INVOICE_TYPE
+            invoice.to_name = obj.get_full_name()
+            description = f"SAFA {fee_entity_type.replace('_', ' ').title()} {purpose} - {season.season_year}"
+        else:
+            invoice.content_type = ContentType.objects.get_for_model(obj)
+            invoice.object_id = obj.pk
+            invoice.invoice_type = ORGANIZATION_INVOICE_TYPE
+            invoice.to_name = obj.name or ''
+            invoice.due_date = season.organization_registration_end
+            description = f"SAFA {entity_type.title()} Annual Membership - {season.season_year}"
+
+        if is_pro_rata:
+            description += f" ({period_description})"
+
+        # bulk_create skips save(), so fill what it would have
+        invoice.billed_to_name, invoice.billed_to_type = describe_billed_to(obj)
+        invoice.calculate_totals()
+
+        item = InvoiceItem(
+            description=description[:255],
+            unit_price=amount,
+            quantity=1,
+            total_price=amount,
+            amount=invoice.total_amount,
+            is_pro_rata=is_pro_rata,
+            original_amount=original_amount if is_pro_rata else None,
+            pro_rata_period=period_description if is_pro_rata else '',
+        )
+        return invoice, item
+
+
+def save_invoices(pending, batch_size=DEFAULT_CHUNK_SIZE):
+    """
+    Number and bulk_create (obj, invoice, item) triples built by build_invoice().
+    Call inside the chunk's transaction so a failed chunk does not burn numbers.
+    """
+    invoices = [invoice for _obj, invoice, _item in pending]
+    numbers = Invoice.allocate_invoice_numbers(
+        [getattr(obj, 'safa_id', None) for obj, _invoice, _item in pending]
+    )
+    for invoice, number in zip(invoices, numbers):
+        invoice.invoice_number = number
+    Invoice.objects.bulk_create(invoices, batch_size=batch_size)
+
+    if invoices and invoices[0].pk is None:
+        # Backends without RETURNING support: map numbers back to ids
+        ids = dict(
+            Invoice.objects.filter(
+                invoice_number__in=[invoice.invoice_number for invoice in invoices]
+            ).values_list('invoice_number', 'pk')
+        )
+        for invoice in invoices:
+            invoice.pk = ids[invoice.invoice_number]
+
+    items = []
+    for _obj, invoice, item in pending:
+        item.invoice_id = invoice.pk
+        items.append(item)
+    InvoiceItem.objects.bulk_create(items, batch_size=batch_size)
+    return invoices
+
+
+def _run_entity_worker(season_id, entity_type, chunk_size, dry_run):
+    """Process one entity type in a worker process"""
+    # Connections inherited from the parent process must not be shared
+    connections.close_all()
+    season_config = SAFASeasonConfig.objects.get(pk=season_id)
+    engine = SeasonRenewalEngine(season_config, chunk_size=chunk_size, dry_run=dry_run)
+    return engine.run(entity_types=[entity_type])
+
+
+def run_season_renewal(season_config, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False,
+                       workers=1, progress=None, entity_types=None):
+    """
+    Run the renewal engine, optionally splitting entity types across worker processes.
+    Returns {entity_type: stats dict}.
+    """
+    entity_types = entity_types or [entity_type for entity_type, _model, _filters in RENEWAL_SOURCES]
+    started_on = timezone.localdate()
+
+    if workers <= 1:
+        engine = SeasonRenewalEngine(season_config, chunk_size=chunk_size, dry_run=dry_run, progress=progress)
+        results = engine.run(entity_types=entity_types)
+    else:
+        results = defaultdict(dict)
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_run_entity_worker, season_config.pk, entity_type, chunk_size, dry_run)
+                for entity_type in entity_types
+            ]
+            for future in futures:
+                results.update(future.result())
+        results = dict(results)
+
+    if not dry_run:
+        # bulk_create bypasses the signals that keep the dashboard snapshot and rollups current
+        refresh_season_snapshot(season_config)
+        rebuild_season_rollups(season_config, since=started_on)
+    return results
@@ -0,0 +1,184 @@
+# membership/season_rollups.py
+"""
+Daily rollups behind the dashboard charts.
+
+MemberRegistrationRollup counts members per (season, day, status, role) and
+InvoiceRevenueRollup counts and sums invoices per (season, day, invoice type,
+status). Member and Invoice signals keep them current with F() deltas (via
+season_stats.track_stats_change); rebuild_season_rollups() recomputes them
+from the source tables and is run nightly by backfill_dashboard_rollups to
+pick up queryset updates and bulk_create writes that skip the signals.
+
+Chart queries group the rollup rows with Trunc* functions, so their cost
+depends on the number of days charted rather than the number of members.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth
+from django.utils import timezone
+
+
+# ----------------------------------------------------------------------
+# Per-row rollup keys: (model name, lookup, {field: amount}) or None
+# ----------------------------------------------------------------------
+
+def member_rollup(member):
+    if not member.current_season_id or not member.created:
+        return None
+    key = {
+        'season_config_id': member.current_season_id,
+        'day': timezone.localdate(member.created),
+        'status': member.status,
+        'role': member.role,
+    }
+    return 'MemberRegistrationRollup', key, {'count': 1}
+
+
+def invoice_day(invoice):
+    """Payment day for paid invoices, issue day otherwise"""
+    if invoice.payment_date:
+        return timezone.localdate(invoice.payment_date)
+    return invoice.issue_date
+
+
+def invoice_rollup(invoice):
+    if not invoice.season_config_id:
+        return None
+    day = invoice_day(invoice)
+    if not day:
+        return None
+    key = {
+        'season_config_id': invoice.season_config_id,
+        'day': day,
+        'invoice_type': invoice.invoice_type,
+        'status': invoice.status,
+    }
+    return 'InvoiceRevenueRollup', key, {'count': 1, 'total_amount': invoice.total_amount or 0}
+
+
+def _apply(model_name, key, values, sign):
+    from django.apps import apps
+
+    model = apps.get_model('membership', model_name)
+    deltas = {field: F(field) + sign * amount for field, amount in values.items()}
+    if model.objects.filter(**key).update(**deltas) or sign < 0:
+        # A missing row on removal means the rollup was never backfilled
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**key, **values)
+    except IntegrityError:
+        # Created concurrently
+        model.objects.filter(**key).update(**deltas)
+
+
+def apply_rollup_change(old, new):
+    """Move one row's contribution from its old rollup bucket to its new one"""
+    if old == new:
+        return
+    if old:
+        _apply(*old, sign=-1)
+    if new:
+        _apply(*new, sign=1)
+
+
+# ----------------------------------------------------------------------
+# Rebuild from source tables
+# ----------------------------------------------------------------------
+
+def rebuild_season_rollups(season_config, since=None):
+    """
+    Recompute a season's rollup rows (from `since` onwards, if given) with
+    one GROUP BY per source table. Returns (registration rows, revenue rows).
+    """
+    from .models import Invoice, InvoiceRevenueRollup, Member, MemberRegistrationRollup
+
+    members = (
+        Member.objects.filter(current_season=season_config, created__isnull=False)
+        .annotate(day=TruncDate('created'))
+    )
+    invoices = (
+        Invoice.objects.filter(season_config=season_config)
+        .annotate(day=Coalesce(TruncDate('payment_date'), 'issue_date'))
+        .exclude(day__isnull=True)
+    )
+    registration_rows = MemberRegistrationRollup.objects.filter(season_config=season_config)
+    revenue_rows = InvoiceRevenueRollup.objects.filter(season_config=season_config)
+    if since:
+        members = members.filter(day__gte=since)
+        invoices = invoices.filter(day__gte=since)
+        registration_rows = registration_rows.filter(day__gte=since)
+        revenue_rows = revenue_rows.filter(day__gte=since)
+
+    registrations = [
+        MemberRegistrationRollup(season_config=season_config, **row)
+        for row in members.values('day', 'status', 'role').annotate(count=Count('id')).order_by()
+    ]
+    revenue = [
+        InvoiceRevenueRollup(season_config=season_config, **row)
+        for row in invoices.values('day', 'invoice_type', 'status').annotate(
+            count=Count('id'), total_amount=Sum('total_amount')
+        ).order_by()
+    ]
+    for row in revenue:
+        row.total_amount = row.total_amount or 0
+
+    with transaction.atomic():
+        registration_rows.delete()
+        revenue_rows.delete()
+        MemberRegistrationRollup.objects.bulk_create(registrations, batch_size=1000)
+        InvoiceRevenueRollup.objects.bulk_create(revenue, batch_size=1000)
+    return len(registrations), len(revenue)
+
+
+# ----------------------------------------------------------------------
+# Chart series
+# ----------------------------------------------------------------------
+
+def registrations_by_day(seasons, since):
+    from .models import MemberRegistrationRollup
+
+    return (
+        MemberRegistrationRollup.objects.filter(season_config__in=seasons, day__gte=since)
+        .values('day').annotate(count=Sum('count')).order_by('day')
+    )
+
+
+def registrations_by_month(seasons, since):
+    from .models import MemberRegistrationRollup
+
+    return (
+        MemberRegistrationRollup.objects.filter(season_config__in=seasons, day__gte=since)
+        .annotate(month=TruncMonth('day')).values('month')
+        .annotate(count=Sum('count')).order_by('month')
+    )
+
+
+def registrations_by(seasons, field):
+    """Registration totals grouped by 'status' or 'role'"""
+    from .models import MemberRegistrationRollup
+
+    return (
+        MemberRegistrationRollup.objects.filter(season_config__in=seasons)
+        .values(field).annotate(count=Sum('count')).order_by(field)
+    )
+
+
+def invoices_by_status(seasons):
+    from .models import InvoiceRevenueRollup
+
+    return (
+        InvoiceRevenueRollup.objects.filter(season_config__in=seasons)
+        .values('status').annotate(count=Sum('count'), total_amount=Sum('total_amount'))
+        .order_by('status')
+    )
+
+
+def revenue_by_month(seasons, since):
+    from .models import InvoiceRevenueRollup
+
+    return (
+        InvoiceRevenueRollup.objects.filter(season_config__in=seasons, status='PAID', day__gte=since)
+        .annotate(month=TruncMonth('day')).values('month')
+        .annotate(revenue=Sum('total_amount')).order_by('month')
+    )
@@ -0,0 +1,257 @@
+# membership/season_stats.py
+"""
+Season dashboard statistics.
+
+compute_season_stats() builds every dashboard counter with one conditional
+aggregate per table (Member, Invoice, Transfer). The result is stored in a
+SeasonStatsSnapshot row that Member, Invoice and Transfer signals keep current
+with F() deltas, so dashboard_stats reads a single row. Time-window figures
+(member growth) and anything changed through queryset updates or bulk_create
+are corrected by the periodic full recompute (SNAPSHOT_MAX_AGE) or ?fresh=1.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from utils.bulk import defer as defer_bulk, in_bulk_operation, register_flush
+
+SNAPSHOT_MAX_AGE = timedelta(hours=1)
+GROWTH_WINDOW = timedelta(days=30)
+
+MEMBER_STATUS_FIELDS = {
+    'ACTIVE': 'active_members',
+    'PENDING': 'pending_members',
+    'REJECTED': 'rejected_members',
+    'INACTIVE': 'inactive_members',
+}
+MEMBER_ROLE_FIELDS = {
+    'PLAYER': 'total_players',
+    'OFFICIAL': 'total_officials',
+    'ADMIN': 'total_admins',
+}
+INVOICE_STATUS_FIELDS = {
+    'PAID': 'paid_invoices',
+    'PENDING': 'pending_invoices',
+    'OVERDUE': 'overdue_invoices',
+}
+OUTSTANDING_STATUSES = ['PENDING', 'OVERDUE', 'PARTIALLY_PAID']
+TRANSFER_STATUS_FIELDS = {
+    'PENDING': 'pending_transfers',
+    'APPROVED': 'approved_transfers',
+    'REJECTED': 'rejected_transfers',
+}
+
+STATS_STATE_UNKNOWN = object()
+
+# Seasons touched inside utils.bulk.bulk_operation(), recomputed at the end
+BULK_SEASON_STATS = 'membership.season_stats'
+
+
+# ----------------------------------------------------------------------
+# Per-row contributions: (season_id, {snapshot_field: amount}) or None
+# ----------------------------------------------------------------------
+
+def member_contribution(member):
+    if not member.current_season_id:
+        return None
+    values = {'total_members': 1}
+    if member.status in MEMBER_STATUS_FIELDS:
+        values[MEMBER_STATUS_FIELDS[member.status]] = 1
+    if member.role in MEMBER_ROLE_FIELDS:
+        values[MEMBER_ROLE_FIELDS[member.role]] = 1
+    if member.created:
+        recent = member.created >= timezone.now() - GROWTH_WINDOW
+        values['recent_members' if recent else 'previous_members'] = 1
+    return member.current_season_id, values
+
+
+def invoice_contribution(invoice):
+    if not invoice.season_config_id:
+        return None
+    total_amount = invoice.total_amount or Decimal('0.00')
+    values = {'total_invoices': 1, 'total_invoiced': total_amount}
+    if invoice.status in INVOICE_STATUS_FIELDS:
+        values[INVOICE_STATUS_FIELDS[invoice.status]] = 1
+    if invoice.status == 'PAID':
+        values['total_revenue'] = total_amount
+    if invoice.status in OUTSTANDING_STATUSES:
+        values['outstanding_revenue'] = invoice.outstanding_amount or Decimal('0.00')
+    return invoice.season_config_id, values
+
+
+def transfer_contribution(transfer):
+    if transfer.status not in TRANSFER_STATUS_FIELDS or not transfer.member_id:
+        return None
+    from .models import Member
+    season_id = Member.objects.filter(pk=transfer.member_id).values_list('current_season_id', flat=True).first()
+    if not season_id:
+        return None
+    return season_id, {TRANSFER_STATUS_FIELDS[transfer.status]: 1}
+
+
+class SeasonStatsTrackedMixin:
+    """
+    Remembers the STATS_STATE_FIELDS values a row was loaded with so the
+    post_save handler can apply the difference to the season snapshot (and,
+    for models that set STATS_ROLLUP, to the daily chart rollups).
+    Models set STATS_STATE_FIELDS and STATS_CONTRIBUTION.
+    """
+    STATS_STATE_FIELDS = ()
+    STATS_ROLLUP = None
+    _stats_state = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if set(cls.STATS_STATE_FIELDS).issubset(field_names):
+            instance._stats_state = instance.get_stats_state()
+        else:
+            # Deferred fields - the next full recompute covers this row
+            instance._stats_state = STATS_STATE_UNKNOWN
+        return instance
+
+    def get_stats_state(self):
+        return SimpleNamespace(**{field: getattr(self, field) for field in self.STATS_STATE_FIELDS})
+
+    def get_stats_contribution(self, state=None):
+        return self.STATS_CONTRIBUTION(state or self)
+
+
+# ----------------------------------------------------------------------
+# Snapshot maintenance
+# ----------------------------------------------------------------------
+
+def _add(updates, season_id, values, sign):
+    season_updates = updates.setdefault(season_id, {})
+    for field, amount in values.items():
+        season_updates[field] = season_updates.get(field, 0) + sign * amount
+
+
+def apply_stats_change(old, new):
+    """Apply the difference between two contributions to the affected snapshots"""
+    if old is STATS_STATE_UNKNOWN or old == new:
+        return
+
+    updates = {}
+    if old:
+        _add(updates, old[0], old[1], -1)
+    if new:
+        _add(updates, new[0], new[1], 1)
+
+    from .models import SeasonStatsSnapshot
+
+    now = timezone.now()
+    for season_id, deltas in updates.items():
+        deltas = {field: amount for field, amount in deltas.items() if amount}
+        if deltas:
+            SeasonStatsSnapshot.objects.filter(season_config_id=season_id).update(
+                updated_at=now,
+                **{field: F(field) + amount for field, amount in deltas.items()}
+            )
+
+
+def track_stats_change(instance, deleted=False):
+    """post_save / post_delete handler body"""
+    old_state = instance._stats_state
+    current_state = None if deleted else instance.get_stats_state()
+    if old_state is not None and old_state is not STATS_STATE_UNKNOWN and old_state == current_state:
+        # Nothing the snapshot counts has changed
+        return
+    if old_state is STATS_STATE_UNKNOWN:
+        old = STATS_STATE_UNKNOWN
+    else:
+        old = instance.get_stats_contribution(old_state) if old_state else None
+    new = None if deleted else instance.get_stats_contribution()
+    if in_bulk_operation():
+        for contribution in (old, new):
+            if contribution and contribution is not STATS_STATE_UNKNOWN:
+                defer_bulk(BULK_SEASON_STATS, contribution[0])
+        instance._stats_state = current_state
+        return
+    apply_stats_change(old, new)
+
+    if instance.STATS_ROLLUP and old is not STATS_STATE_UNKNOWN:
+        from .season_rollups import apply_rollup_change
+        apply_rollup_change(
+            instance.STATS_ROLLUP(old_state) if old_state else None,
+            instance.STATS_ROLLUP(instance) if not deleted else None,
+        )
+    instance._stats_state = current_state
+
+
+def compute_season_stats(season_config):
+    """All snapshot counters for a season, one aggregate query per table"""
+    from .models import Invoice, Member, Transfer
+
+    growth_cutoff = timezone.now() - GROWTH_WINDOW
+    members = Member.objects.filter(current_season=season_config).aggregate(
+        total_members=Count('id'),
+        recent_members=Count('id', filter=Q(created__gte=growth_cutoff)),
+        previous_members=Count('id', filter=Q(created__lt=growth_cutoff)),
+        **{field: Count('id', filter=Q(status=value)) for value, field in MEMBER_STATUS_FIELDS.items()},
+        **{field: Count('id', filter=Q(role=value)) for value, field in MEMBER_ROLE_FIELDS.items()},
+    )
+
+    zero = Decimal('0.00')
+    invoices = Invoice.objects.filter(season_config=season_config).aggregate(
+        total_invoices=Count('id'),
+        total_invoiced=Sum('total_amount'),
+        total_revenue=Sum('total_amount', filter=Q(status='PAID')),
+        outstanding_revenue=Sum('outstanding_amount', filter=Q(status__in=OUTSTANDING_STATUSES)),
+        **{field: Count('id', filter=Q(status=value)) for value, field in INVOICE_STATUS_FIELDS.items()},
+    )
+    for field in ('total_invoiced', 'total_revenue', 'outstanding_revenue'):
+        invoices[field] = invoices[field] or zero
+
+    transfers = Transfer.objects.filter(member__current_season=season_config).aggregate(
+        **{field: Count('id', filter=Q(status=value)) for value, field in TRANSFER_STATUS_FIELDS.items()},
+    )
+
+    return {**members, **invoices, **transfers}
+
+
+def refresh_season_snapshot(season_config):
+    """Recompute and store the snapshot for a season"""
+    from .models import SeasonStatsSnapshot
+
+    values = compute_season_stats(season_config)
+    values['computed_at'] = timezone.now()
+    try:
+        with transaction.atomic():
+            snapshot, _created = SeasonStatsSnapshot.objects.update_or_create(
+                season_config=season_config, defaults=values
+            )
+    except IntegrityError:
+        # Created concurrently by another request
+        snapshot, _created = SeasonStatsSnapshot.objects.update_or_create(
+            season_config=season_config, defaults=values
+        )
+    return snapshot
+
+
+def refresh_bulk_seasons(season_ids):
+    """Recompute the snapshot and chart rollups of seasons changed in bulk"""
+    from .safa_config_models import SAFASeasonConfig
+    from .season_rollups import rebuild_season_rollups
+
+    for season_config in SAFASeasonConfig.objects.filter(pk__in=season_ids):
+        refresh_season_snapshot(season_config)
+        rebuild_season_rollups(season_config)
+
+
+register_flush(BULK_SEASON_STATS, refresh_bulk_seasons)
+
+
+def get_season_snapshot(season_config, fresh=False):
+    """Stored snapshot, recomputed when forced, missing or older than SNAPSHOT_MAX_AGE"""
+    from .models import SeasonStatsSnapshot
+
+    if not fresh:
+        snapshot = SeasonStatsSnapshot.objects.filter(season_config=season_config).first()
+        if snapshot and snapshot.computed_at >= timezone.now() - SNAPSHOT_MAX_AGE:
+            return snapshot
+    return refresh_season_snapshot(season_config)
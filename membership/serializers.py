@@ -4,6 +4,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from django.db.models import Exists, OuterRef
 from decimal import Decimal
 
 from .models import (
@@ -12,10 +13,13 @@ from .models import (
     MemberSeasonHistory, ClubMemberQuota, OrganizationSeasonRegistration,
     MemberProfile, MEMBERSHIP_STATUS, MEMBER_ROLES
 )
+from .fee_quotes import FeeQuoteEngine
 from geography.models import Club, Province, Region, LocalFootballAssociation, Association
 
 User = get_user_model()
 
+OUTSTANDING_INVOICE_STATUSES = ['PENDING', 'OVERDUE', 'PARTIALLY_PAID']
+
 
 class SAFASeasonConfigSerializer(serializers.ModelSerializer):
     """Serializer for SAFA Season Configuration"""
@@ -147,7 +151,7 @@ class AssociationSimpleSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Association
-        fields = ['id', 'name', 'association_type']
+        fields = ['id', 'name', 'acronym']
 
 
 class MemberSerializer(serializers.ModelSerializer):
@@ -204,22 +208,55 @@ class MemberSerializer(serializers.ModelSerializer):
             'created', 'modified', 'registration_fee', 'has_outstanding_invoices'
         ]
     
+    @staticmethod
+    def setup_queryset(queryset):
+        """
+        Load everything the serializer reads per member up front, so a page
+        costs the same number of queries whatever its size.
+        """
+        outstanding = Invoice.objects.filter(
+            member=OuterRef('pk'), status__in=OUTSTANDING_INVOICE_STATUSES
+        )
+        return queryset.select_related(
+            'current_club', 'current_season', 'province', 'region', 'lfa', 'user',
+            'workflow', 'profile__official_position'
+        ).prefetch_related(
+            'associations', 'documents__verified_by'
+        ).annotate(outstanding_invoices_exist=Exists(outstanding))
+    
     def get_association_names(self, obj):
         """Get comma-separated list of association names"""
         if obj.role == 'OFFICIAL':
             return ', '.join([assoc.name for assoc in obj.associations.all()])
         return ''
     
+    def _get_fee_engine(self, season_config):
+        """Fee quote engine per season, shared by the whole serialization"""
+        engines = self.context.setdefault('member_fee_engines', {})
+        if season_config.pk not in engines:
+            engines[season_config.pk] = FeeQuoteEngine(season_config)
+        return engines[season_config.pk]
+    
+    def _get_active_season(self):
+        if 'active_season' not in self.context:
+            self.context['active_season'] = SAFASeasonConfig.get_active_season()
+        return self.context['active_season']
+    
     def get_registration_fee(self, obj):
         """Calculate member's registration fee"""
         try:
-            return float(obj.calculate_registration_fee())
+            season_config = obj.current_season or self._get_active_season()
+            if not season_config:
+                return 0.0
+            return float(self._get_fee_engine(season_config).quote_members([obj])[0].subtotal)
         except:
             return 0.0
     
     def get_has_outstanding_invoices(self, obj):
         """Check if member has outstanding invoices"""
-        return obj.invoices.filter(status__in=['PENDING', 'OVERDUE', 'PARTIALLY_PAID']).exists()
+        if hasattr(obj, 'outstanding_invoices_exist'):
+            return obj.outstanding_invoices_exist
+        return obj.invoices.filter(status__in=OUTSTANDING_INVOICE_STATUSES).exists()
     
     def validate_email(self, value):
         """Ensure email is unique"""
@@ -324,6 +361,8 @@ class InvoiceSerializer(serializers.ModelSerializer):
         ]
     
     def get_billed_to_name(self, obj):
+        if obj.billed_to_name:
+            return obj.billed_to_name
         if obj.member:
             return obj.member.get_full_name()
         elif obj.organization:
@@ -331,6 +370,8 @@ class InvoiceSerializer(serializers.ModelSerializer):
         return 'Unknown'
     
     def get_billed_to_type(self, obj):
+        if obj.billed_to_type and obj.billed_to_type != 'Unknown':
+            return 'Member' if obj.billed_to_type == 'Member' else 'Organization'
         if obj.member:
             return 'Member'
         elif obj.organization:
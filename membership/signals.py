@@ -7,11 +7,13 @@ from django.utils import timezone
 from django.db import transaction
 from decimal import Decimal
 
+from utils.bulk import defer as defer_bulk, in_bulk_operation, register_flush
+
 # Import the corrected models
 from .models import (
     Member, SAFASeasonConfig, SAFAFeeStructure, Invoice, InvoiceItem,
     RegistrationWorkflow, ClubMemberQuota, MemberSeasonHistory,
-    OrganizationSeasonRegistration
+    OrganizationSeasonRegistration, BULK_WORKFLOWS
 )
 
 # Check if external models are available (for legacy/external system integration)
@@ -21,6 +23,16 @@ try:
 except ImportError:
     EXTERNAL_MODELS_AVAILABLE = False
 
+# Organisations created or activated inside utils.bulk.bulk_operation(),
+# invoiced in one batch at the end
+BULK_ORGANIZATION_INVOICES = 'membership.organization_invoices'
+ORGANIZATION_ENTITY_TYPES = {
+    'geography.province': 'PROVINCE',
+    'geography.region': 'REGION',
+    'geography.localfootballassociation': 'LFA',
+    'geography.club': 'CLUB',
+}
+
 
 
 
@@ -32,6 +44,9 @@ except ImportError:
 def handle_member_creation(sender, instance, created, **kwargs):
     """Handle member creation and updates"""
     
+    if created and defer_bulk(BULK_WORKFLOWS, instance.pk):
+        return
+
     if created:
         print(f"✅ New member created: {instance.get_full_name()} ({instance.safa_id})")
         
@@ -48,31 +63,23 @@ def handle_member_creation(sender, instance, created, **kwargs):
         # Invoice creation is now handled directly in the views to prevent duplicates
         # and ensure proper season configuration
         print(f"✅ Member {instance.get_full_name()} created - invoice will be created by view")
-    
-    # Update club quotas whenever member is saved
-    if instance.current_club and instance.current_season:
-        try:
-            update_club_quotas_for_member(instance)
-        except Exception as e:
-            print(f"❌ Failed to update club quotas for {instance.get_full_name()}: {str(e)}")
+
+    # Club quota counters are maintained incrementally by Member.save()
 
 
 @receiver(post_delete, sender=Member)
 def handle_member_deletion(sender, instance, **kwargs):
     """Handle member deletion"""
     
+    if in_bulk_operation():
+        return
     print(f"🗑️ Member deleted: {instance.get_full_name()} ({instance.safa_id})")
-    
-    # Update club quotas when member is deleted
-    if instance.current_club and instance.current_season:
-        try:
-            update_club_quotas_for_member(instance, deleted=True)
-        except Exception as e:
-            print(f"❌ Failed to update club quotas after deletion: {str(e)}")
+
+    # Quota slot release is handled by membership.models.update_club_quotas_on_delete
 
 
 def update_club_quotas_for_member(member, deleted=False):
-    """Update club member quotas when member is saved or deleted"""
+    """Recount the quota of the member's club (use reconcile_club_quotas for bulk fixes)"""
     
     if not member.current_club or not member.current_season:
         return
@@ -80,23 +87,9 @@ def update_club_quotas_for_member(member, deleted=False):
     try:
         quota, created = ClubMemberQuota.objects.get_or_create(
             club=member.current_club,
-            season_config=member.current_season,
-            defaults={
-                'max_senior_players': 30,
-                'max_junior_players': 50,
-                'max_officials': 20,
-            }
+            season_config=member.current_season
         )
-        
-        if created:
-            print(f"✅ Created quota tracker for {member.current_club.name}")
-        
-        # Update the counts
         quota.update_counts()
-        
-        if not deleted:
-            print(f"✅ Updated quotas for {member.current_club.name}")
-        
     except Exception as e:
         print(f"❌ Error updating club quotas: {str(e)}")
 
@@ -113,7 +106,9 @@ def handle_organization_status_change(sender, instance, created, **kwargs):
     """Handle organization status changes and create invoices when they become active"""
     
     # Only proceed if this is a status change to ACTIVE
-    if not created and 'status' in kwargs.get('update_fields', []):
+    if not created and 'status' in (kwargs.get('update_fields') or []):
+        if instance.status == 'ACTIVE' and defer_bulk(BULK_ORGANIZATION_INVOICES, (instance._meta.label_lower, instance.pk)):
+            return
         if instance.status == 'ACTIVE':
             print(f"✅ Organization {instance.name} ({instance.get_model_name()}) became ACTIVE")
             
@@ -291,7 +286,7 @@ def handle_renewal_season_activation(season_config):
 def handle_invoice_changes(sender, instance, created, **kwargs):
     """Handle invoice creation and payment updates"""
     
-    if created:
+    if created and not in_bulk_operation():
         print(f"✅ Invoice created: {instance.invoice_number} - R{instance.total_amount}")
     
     # Handle invoice payment completion
@@ -422,6 +417,9 @@ if EXTERNAL_MODELS_AVAILABLE:
     def handle_club_creation(sender, instance, created, **kwargs):
         """Create organization invoice when Club is created"""
         
+        if created and defer_bulk(BULK_ORGANIZATION_INVOICES, (instance._meta.label_lower, instance.pk)):
+            return
+
         if created:
             try:
                 active_season = SAFASeasonConfig.get_active_season()
@@ -495,6 +493,26 @@ def create_organization_invoice(organization, entity_type, season_config):
         return None
 
 
+def create_bulk_organization_invoices(organizations):
+    """Invoice the organisations created or activated in bulk in one transaction"""
+    from django.apps import apps
+
+    active_season = SAFASeasonConfig.get_active_season()
+    if not active_season:
+        return
+
+    pks_by_label = {}
+    for label, pk in organizations:
+        pks_by_label.setdefault(label, []).append(pk)
+    with transaction.atomic():
+        for label, pks in pks_by_label.items():
+            for organization in apps.get_model(label).objects.filter(pk__in=pks):
+                create_organization_invoice(organization, ORGANIZATION_ENTITY_TYPES[label], active_season)
+
+
+register_flush(BULK_ORGANIZATION_INVOICES, create_bulk_organization_invoices)
+
+
 def check_and_update_overdue_invoices():
     """Utility function to check and update overdue invoices"""
     
@@ -631,10 +649,8 @@ def run_daily_maintenance():
     # Update club quotas for active season
     active_season = SAFASeasonConfig.get_active_season()
     if active_season:
-        quotas = ClubMemberQuota.objects.filter(season_config=active_season)
-        for quota in quotas:
-            quota.update_counts()
-        print(f"✅ Updated {quotas.count()} club quotas")
+        fixed = ClubMemberQuota.reconcile_season(active_season)
+        print(f"✅ Reconciled club quotas ({fixed} corrected)")
     
     # Clean up old workflow records
     # Send reminder emails
@@ -673,7 +689,11 @@ def enable_signal_debugging():
 
 
 def disable_signals():
-    """Disable signals temporarily (useful for data migrations)"""
+    """
+    Disable signals temporarily (useful for data migrations).
+    Only covers this module; prefer utils.bulk.bulk_operation(), which defers
+    the side effects of every app's handlers and applies them once at the end.
+    """
     
     from django.db.models.signals import post_save, post_delete, pre_save
     
@@ -0,0 +1,165 @@
+# membership/tasks.py
+"""
+Background tasks for the membership app (run by `manage.py run_jobs`, see
+utils.jobs). Arguments are primary keys so jobs see the committed rows.
+Exceptions are left to propagate so the job is retried.
+"""
+from django.core.mail import send_mail
+from django_tasks import task
+
+
+@task(queue_name='email')
+def send_registration_email(member_id, invoice_id):
+    """Registration confirmation with the member's first invoice"""
+    from .models import Invoice, Member
+
+    member = Member.objects.select_related('current_club', 'current_season').get(pk=member_id)
+    invoice = Invoice.objects.get(pk=invoice_id)
+    if not member.email:
+        return {'sent': 0}
+
+    subject = f'SAFA Registration Confirmation - {member.safa_id}'
+    message = f"""
+Dear {member.get_full_name()},
+
+Your SAFA registration has been submitted successfully.
+
+Registration Details:
+- SAFA ID: {member.safa_id}
+- Club: {member.current_club.name if member.current_club else 'N/A'}
+- Season: {member.current_season.season_year if member.current_season else 'N/A'}
+
+Payment Information:
+- Invoice Number: {invoice.invoice_number}
+- Amount Due: R{invoice.total_amount}
+- Due Date: {invoice.due_date}
+
+Please complete payment to activate your membership.
+
+Thank you,
+SAFA Registration Team
+            """
+
+    sent = send_mail(
+        subject=subject,
+        message=message,
+        from_email='noreply@safa.org.za',
+        recipient_list=[member.email],
+        fail_silently=False
+    )
+    return {'sent': sent}
+
+
+@task(queue_name='email')
+def send_invoice_reminder(invoice_id):
+    """Payment reminder for an unpaid member invoice"""
+    from .models import Invoice
+
+    invoice = Invoice.objects.select_related('member').get(pk=invoice_id)
+    if invoice.status not in ['PENDING', 'OVERDUE', 'PARTIALLY_PAID']:
+        # Paid while the reminder was queued
+        return {'sent': 0, 'status': invoice.status}
+
+    recipient_name = invoice.member.get_full_name()
+    subject = f'Payment Reminder - Invoice #{invoice.invoice_number}'
+    message = f"""
+Dear {recipient_name},
+
+This is a reminder that your invoice #{invoice.invoice_number} for R{invoice.total_amount:.2f} is outstanding.
+
+Invoice Details:
+- Amount Due: R{invoice.outstanding_amount:.2f}
+- Due Date: {invoice.due_date}
+- Status: {invoice.get_status_display()}
+
+Please log in to the SAFA system to view and pay this invoice.
+
+Thank you,
+SAFA Finance Team
+                """
+
+    sent = send_mail(
+        subject=subject,
+        message=message,
+        from_email='finance@safa.org.za',
+        recipient_list=[invoice.member.email],
+        fail_silently=False
+    )
+    return {'sent': sent, 'recipient': recipient_name}
+
+
+@task(queue_name='documents')
+def import_members_file(path, season_id, user_id, club_id=None, dry_run=False):
+    """
+    Import an uploaded member file (see member_import) within the uploading
+    admin's jurisdiction. The result is the import report.
+    """
+    from django.core.files.storage import default_storage
+    from accounts.jurisdiction import get_admin_scope, jurisdiction_clubs
+    from accounts.models import CustomUser
+    from .member_import import MemberImporter, read_rows
+    from .models import SAFASeasonConfig
+
+    season = SAFASeasonConfig.objects.get(pk=season_id)
+    user = CustomUser.objects.get(pk=user_id)
+    clubs = jurisdiction_clubs(*get_admin_scope(user))
+    club = None
+    if club_id:
+        club = clubs.select_related('localfootballassociation__region__province').get(pk=club_id)
+
+    importer = MemberImporter(
+        season,
+        club=club,
+        clubs=clubs,
+        dry_run=dry_run,
+        registration_method='CLUB' if club else 'ADMIN',
+    )
+    with default_storage.open(path, 'rb') as file:
+        stats = importer.run(read_rows(file, path))
+    # Kept until the import has gone through; a retry skips rows already imported as duplicates
+    default_storage.delete(path)
+    return stats.as_dict()
+
+
+@task(queue_name='default')
+def geocode_member(member_id):
+    """
+    Geocode a self-registration's address (cached in geography.geocoding) and
+    place the member in the LFA/region/province it falls in.
+    """
+    from .models import Member
+
+    member = Member.objects.get(pk=member_id)
+    if member.location or not member.registration_address:
+        return {'located': bool(member.location)}
+
+    member.geocode_address()
+    if not member.location:
+        return {'located': False}
+
+    update_fields = ['location']
+    if not (member.province_id or member.region_id or member.lfa_id):
+        member.assign_organization_by_location()
+        update_fields += ['province', 'region', 'lfa']
+    member.save(update_fields=update_fields)
+    return {'located': True, 'lfa': member.lfa_id, 'region': member.region_id, 'province': member.province_id}
+
+
+@task(queue_name='documents')
+def build_invoice_pdf_export(export_id, context):
+    """
+    Render a large invoice PDF export (see invoice_export). The export is
+    marked FAILED with the error until a retry succeeds.
+    """
+    from .invoice_export import build_pdf_export
+    from .models import InvoiceExport
+
+    export = InvoiceExport.objects.select_related('requested_by').get(pk=export_id)
+    try:
+        build_pdf_export(export, context)
+    except Exception as e:
+        export.status = 'FAILED'
+        export.error = str(e)
+        export.save(update_fields=['status', 'error', 'modified'])
+        raise
+    return {'export': str(export.uuid), 'invoices': export.invoice_count}
@@ -0,0 +1,60 @@
+"""
+Shared setUp data for the membership tests: an admin user, an active season
+and a Country -> NationalFederation -> Province -> Region -> LFA -> Club
+chain. Test cases mix in MembershipFixturesMixin and call create_fixtures()
+(or the individual create_* steps) from setUp.
+"""
+from datetime import date, timedelta
+
+from accounts.models import CustomUser
+from geography.models import Club, Country, LocalFootballAssociation, NationalFederation, Province, Region
+from .models import SAFASeasonConfig
+
+PASSWORD = 'ComplexPassword123!'
+
+
+class MembershipFixturesMixin:
+
+    def create_admin(self, name, superuser=False, **extra_fields):
+        """self.admin, a (super)user called '<name> Admin'"""
+        create = CustomUser.objects.create_superuser if superuser else CustomUser.objects.create_user
+        self.admin = create(
+            email=f'{name.lower()}-admin@example.com',
+            password=PASSWORD,
+            first_name=name,
+            last_name='Admin',
+            **extra_fields
+        )
+        return self.admin
+
+    def create_season(self, days_before=30, days_after=300):
+        """self.season, active from days_before until days_after around self.today"""
+        self.today = date.today()
+        self.season = SAFASeasonConfig.objects.create(
+            season_year=self.today.year,
+            season_start_date=self.today - timedelta(days=days_before),
+            season_end_date=self.today + timedelta(days=days_after),
+            organization_registration_start=self.today - timedelta(days=days_before),
+            organization_registration_end=self.today + timedelta(days=30),
+            member_registration_start=self.today - timedelta(days=days_before),
+            member_registration_end=self.today + timedelta(days=days_after),
+            is_active=True,
+            created_by=self.admin
+        )
+        return self.season
+
+    def create_geography(self, name, club=True, **club_fields):
+        """self.federation, self.province, self.region, self.lfa and (with club) self.club, '<name> FC'"""
+        country = Country.objects.create(name='South Africa', code='RSA')
+        self.federation = NationalFederation.objects.create(name='SAFA', country=country)
+        self.province = Province.objects.create(name=f'{name} Province', national_federation=self.federation)
+        self.region = Region.objects.create(name=f'{name} Region', province=self.province)
+        self.lfa = LocalFootballAssociation.objects.create(name=f'{name} LFA', region=self.region)
+        if club:
+            self.club = Club.objects.create(name=f'{name} FC', localfootballassociation=self.lfa, **club_fields)
+
+    def create_fixtures(self, name, superuser=False, **club_fields):
+        """Admin, active season and geography, all named after name"""
+        self.create_admin(name, superuser=superuser)
+        self.create_season()
+        self.create_geography(name, **club_fields)
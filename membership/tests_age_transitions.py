@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.test import TestCase
+
+from .age_transitions import run_age_transitions
+from .models import AgeTransitionRun, ClubMemberQuota, Member
+from .test_fixtures import MembershipFixturesMixin
+
+
+class AgeTransitionTests(MembershipFixturesMixin, TestCase):
+
+    def setUp(self):
+        self.create_fixtures('Transition')
+
+        cutoff = ClubMemberQuota.get_senior_cutoff_date(self.today)
+        # Turn 18 over the next week, then one who stays junior
+        for days in [1, 2, 3, 5, 30]:
+            Member.objects.create(
+                first_name='Junior', last_name=str(days), role='PLAYER', status='ACTIVE',
+                date_of_birth=cutoff + timedelta(days=days),
+                current_club=self.club, current_season=self.season, national_federation=self.federation
+            )
+        Member.objects.create(
+            first_name='Pending', last_name='Junior', role='PLAYER', status='PENDING',
+            date_of_birth=cutoff + timedelta(days=2),
+            current_club=self.club, current_season=self.season, national_federation=self.federation
+        )
+
+    def counters(self):
+        quota = ClubMemberQuota.objects.get(club=self.club, season_config=self.season)
+        return quota.current_junior_players, quota.current_senior_players
+
+    def test_incremental_runs_move_only_new_seniors(self):
+        first = run_age_transitions(as_of=self.today)
+        self.assertTrue(first.full_reconcile)
+        self.assertEqual(self.counters(), (5, 0))
+
+        stats = run_age_transitions(as_of=self.today + timedelta(days=3), chunk_size=2)
+        self.assertEqual((stats.processed, stats.quota_members), (3, 2))
+        self.assertEqual(self.counters(), (3, 2))
+
+        # Same watermark: nothing to do
+        self.assertEqual(run_age_transitions(as_of=self.today + timedelta(days=3)).processed, 0)
+
+        stats = run_age_transitions(as_of=self.today + timedelta(days=10))
+        self.assertEqual(stats.quota_members, 2)
+        self.assertEqual(self.counters(), (1, 4))
+
+    def test_resumes_interrupted_run(self):
+        run_age_transitions(as_of=self.today)
+        AgeTransitionRun.objects.create(since=self.today, as_of=self.today + timedelta(days=3))
+
+        stats = run_age_transitions(as_of=self.today + timedelta(days=30))
+        self.assertEqual(stats.as_of, self.today + timedelta(days=3))
+        self.assertEqual(self.counters(), (3, 2))
+        self.assertFalse(AgeTransitionRun.objects.filter(is_complete=False).exists())
+
+    def test_dry_run_writes_nothing(self):
+        run_age_transitions(as_of=self.today)
+        stats = run_age_transitions(as_of=self.today + timedelta(days=3), dry_run=True)
+        self.assertEqual(stats.quota_members, 2)
+        self.assertEqual(self.counters(), (5, 0))
+        self.assertEqual(AgeTransitionRun.objects.count(), 1)
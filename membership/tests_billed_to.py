@@ -0,0 +1,74 @@
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from geography.models import Club
+from .billed_to import resolve_organizations
+from .models import Invoice, Member
+from .test_fixtures import MembershipFixturesMixin
+
+
+class BilledToTests(MembershipFixturesMixin, TestCase):
+
+    def setUp(self):
+        self.create_admin('Billing')
+        self.create_season()
+        self.create_geography('Billing', club=False)
+        clubs = [
+            Club.objects.create(name=f'Billing FC {number}', localfootballassociation=self.lfa)
+            for number in range(3)
+        ]
+        member = Member.objects.create(
+            first_name='Thandi', last_name='Billing', role='PLAYER',
+            date_of_birth=date(1990, 1, 1), current_club=clubs[0], current_season=self.season,
+            national_federation=self.federation
+        )
+
+        def invoice(**billed_to):
+            return Invoice.objects.create(
+                invoice_type='ORGANIZATION_MEMBERSHIP', season_config=self.season,
+                subtotal=Decimal('100.00'), vat_rate=Decimal('0.15'),
+                due_date=self.today + timedelta(days=30), **billed_to
+            )
+
+        invoice(member=member)
+        invoice(organization=self.province)
+        invoice(organization=self.region)
+        for club in clubs:
+            invoice(organization=club)
+
+    def test_billed_to_is_stored_when_the_invoice_is_created(self):
+        billed_to = set(Invoice.objects.values_list('billed_to_name', 'billed_to_type'))
+        self.assertIn(('Thandi Billing', 'Member'), billed_to)
+        self.assertIn(('Billing Province', 'Province'), billed_to)
+        self.assertIn(('Billing Region', 'Region'), billed_to)
+        self.assertIn(('Billing FC 2', 'Club'), billed_to)
+
+        with self.assertNumQueries(1):
+            labels = [str(invoice) for invoice in Invoice.objects.all()]
+        self.assertEqual(len(labels), 6)
+
+    def test_organizations_are_resolved_with_one_query_per_type(self):
+        invoices = list(Invoice.objects.filter(content_type__isnull=False))
+
+        # Clubs, provinces and regions
+        with self.assertNumQueries(3):
+            resolve_organizations(invoices)
+        with self.assertNumQueries(0):
+            names = sorted(invoice.organization.name for invoice in invoices)
+        self.assertEqual(names[0], 'Billing FC 0')
+        self.assertEqual(names[-1], 'Billing Region')
+
+    def test_backfill_fills_existing_rows(self):
+        Invoice.objects.update(billed_to_name='', billed_to_type='')
+
+        call_command('backfill_billed_to', batch_size=4, stdout=io.StringIO())
+
+        self.assertFalse(Invoice.objects.filter(billed_to_type='').exists())
+        self.assertEqual(
+            Invoice.objects.get(content_type__model='province').billed_to_name,
+            'Billing Province'
+        )
@@ -0,0 +1,82 @@
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from geography.models import Club
+from utils.bulk import bulk_operation, in_bulk_operation
+from .member_search import search_members
+from .models import ClubMemberQuota, Member, RegistrationWorkflow, SeasonStatsSnapshot
+from .season_stats import compute_season_stats, refresh_season_snapshot
+from .test_fixtures import MembershipFixturesMixin
+
+
+class BulkOperationTests(MembershipFixturesMixin, TestCase):
+
+    def setUp(self):
+        self.create_fixtures('Bulk')
+        self.other_club = Club.objects.create(name='Other FC', localfootballassociation=self.lfa)
+        refresh_season_snapshot(self.season)
+
+    def create_members(self, count, **kwargs):
+        members = []
+        for number in range(count):
+            data = {
+                'first_name': 'Bulk',
+                'last_name': f'Zwane{number}',
+                'role': 'PLAYER',
+                'status': 'ACTIVE',
+                'date_of_birth': date(1990, 1, 1),
+                'current_club': self.club if number % 2 else self.other_club,
+                'current_season': self.season,
+                'national_federation': self.federation,
+            }
+            data.update(kwargs)
+            members.append(Member.objects.create(**data))
+        return members
+
+    def test_side_effects_are_applied_once_at_the_end(self):
+        with bulk_operation() as bulk:
+            members = self.create_members(6)
+            self.assertFalse(RegistrationWorkflow.objects.filter(member__in=members).exists())
+
+        self.assertFalse(in_bulk_operation())
+        self.assertEqual(RegistrationWorkflow.objects.filter(member__in=members).count(), 6)
+        self.assertEqual(ClubMemberQuota.objects.get(club=self.club).current_senior_players, 3)
+        self.assertEqual(ClubMemberQuota.objects.get(club=self.other_club).current_senior_players, 3)
+        snapshot = SeasonStatsSnapshot.objects.get(season_config=self.season)
+        self.assertEqual(snapshot.total_members, compute_season_stats(self.season)['total_members'])
+        self.assertEqual(snapshot.total_members, 6)
+        self.assertEqual(search_members('zwane3').get(), members[3])
+        self.assertEqual(bulk.summary()['membership.quotas'], 2)
+
+    def test_bulk_changes_and_deletes_match_row_by_row_results(self):
+        members = self.create_members(4)
+        with bulk_operation():
+            members[0].delete()
+            members[1].status = 'INACTIVE'
+            members[1].save()
+            members[2].last_name = 'Dlamini'
+            members[2].save()
+
+        self.assertEqual(ClubMemberQuota.objects.get(club=self.club).current_senior_players, 1)
+        self.assertEqual(ClubMemberQuota.objects.get(club=self.other_club).current_senior_players, 1)
+        self.assertEqual(search_members('dlamini').get(), members[2])
+        self.assertFalse(search_members('zwane0').exists())
+
+    def test_nested_blocks_flush_with_the_outermost(self):
+        with bulk_operation() as outer:
+            with bulk_operation() as inner:
+                members = self.create_members(2)
+            self.assertIs(inner, outer)
+            self.assertFalse(RegistrationWorkflow.objects.filter(member__in=members).exists())
+        self.assertEqual(RegistrationWorkflow.objects.filter(member__in=members).count(), 2)
+
+    def test_bulk_mode_uses_fewer_queries(self):
+        with CaptureQueriesContext(connection) as row_by_row:
+            self.create_members(10, last_name='Single')
+        with CaptureQueriesContext(connection) as bulk:
+            with bulk_operation():
+                self.create_members(10, last_name='Bulk')
+        self.assertLess(len(bulk), len(row_by_row) * 0.7)
@@ -0,0 +1,100 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .api_views import quote_fees
+from .fee_quotes import FeeQuoteEngine
+from .models import Invoice, Member, SAFAFeeStructure, SAFASeasonConfig
+from .test_fixtures import MembershipFixturesMixin
+
+ENTITY_TYPES = ['PLAYER_SENIOR', 'PLAYER_JUNIOR', 'OFFICIAL_GENERAL']
+
+
+class FeeQuotePropertyTests(SimpleTestCase):
+    """Random seasons, fee rules and members priced by the engine and by Member.calculate_registration_fee"""
+
+    def random_case(self, rng):
+        today = date.today()
+        start = today + timedelta(days=rng.randint(-400, 30))
+        season = SAFASeasonConfig(
+            season_year=start.year,
+            season_start_date=start,
+            season_end_date=start + timedelta(days=rng.randint(1, 500)),
+            vat_rate=Decimal(rng.choice(['0.1500', '0.1400', '0.0000', '0.1250'])),
+        )
+        fee_table = {}
+        for entity_type in rng.sample(ENTITY_TYPES, rng.randint(0, len(ENTITY_TYPES))):
+            annual_fee = Decimal(rng.randint(0, 200000)) / 100
+            fee_table[entity_type] = SAFAFeeStructure(
+                season_config=season,
+                entity_type=entity_type,
+                annual_fee=annual_fee,
+                is_pro_rata=rng.random() < 0.7,
+                minimum_fee=rng.choice([None, Decimal(rng.randint(0, 100000)) / 100]),
+            )
+        members = [
+            Member(
+                role=rng.choice(['PLAYER', 'OFFICIAL']),
+                date_of_birth=rng.choice([None, today - timedelta(days=rng.randint(2000, 20000))]),
+            )
+            for _ in range(rng.randint(1, 20))
+        ]
+        return season, fee_table, members
+
+    def test_engine_matches_per_member_pricing(self):
+        rng = random.Random(2024)
+        for _ in range(300):
+            season, fee_table, members = self.random_case(rng)
+            quotes = FeeQuoteEngine(season, fee_table=fee_table).quote_members(members)
+            for member, quote in zip(members, quotes):
+                self.assertEqual(quote.subtotal, member.calculate_registration_fee(season, fee_table=fee_table))
+
+                invoice = Invoice(subtotal=quote.subtotal, vat_rate=season.vat_rate, due_date=date.today())
+                invoice.calculate_totals()
+                self.assertEqual((quote.vat_amount, quote.total), (invoice.vat_amount, invoice.total_amount))
+
+
+class FeeQuoteEndpointTests(MembershipFixturesMixin, TestCase):
+
+    def setUp(self):
+        self.create_admin('Quote', superuser=True)
+        self.create_season()
+        SAFAFeeStructure.objects.create(
+            season_config=self.season, entity_type='PLAYER_SENIOR', annual_fee=Decimal('200.00'),
+            is_pro_rata=False, created_by=self.admin
+        )
+        self.create_geography('Quote', status='ACTIVE')
+        self.members = [
+            Member.objects.create(
+                first_name='Squad', last_name=str(number), role='PLAYER', date_of_birth=date(1990, 1, 1),
+                current_club=self.club, current_season=self.season, national_federation=self.federation
+            )
+            for number in range(3)
+        ]
+
+    def post(self, data):
+        request = APIRequestFactory().post('/membership/api/fees/quote/', data, format='json')
+        force_authenticate(request, user=self.admin)
+        return quote_fees(request)
+
+    def test_quotes_members_and_items_in_one_call(self):
+        member_ids = [member.pk for member in self.members]
+        with self.assertNumQueries(3):  # active season, fee table, members
+            response = self.post({
+                'member_ids': member_ids,
+                'items': [{'entity_type': 'PLAYER_SENIOR'}, {'entity_type': 'PLAYER_JUNIOR'}],
+            })
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+        self.assertEqual([quote['member_id'] for quote in data['members']], member_ids)
+        self.assertEqual(data['members'][0]['total'], '230.00')
+        self.assertEqual(data['items'][1]['subtotal'], '100.00')
+        self.assertTrue(data['items'][1]['default_fee'])
+        self.assertEqual(data['total'], '1035.00')
+
+    def test_rejects_unknown_entity_type(self):
+        response = self.post({'items': [{'entity_type': 'NOPE'}]})
+        self.assertEqual(response.status_code, 400)
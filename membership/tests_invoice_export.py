@@ -0,0 +1,80 @@
+import csv
+import io
+import os
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+import fitz
+from django.test import TestCase
+
+from . import tasks
+from .invoice_export import EXPORT_HEADERS, append_pdf, stream_csv, write_excel
+from .models import Invoice, InvoiceExport, Member
+from .test_fixtures import MembershipFixturesMixin
+
+
+class InvoiceExportTests(MembershipFixturesMixin, TestCase):
+
+    def setUp(self):
+        self.create_admin('Export', is_staff=True)
+        self.create_season()
+        self.create_geography('Export')
+
+        for number in range(5):
+            member = Member.objects.create(
+                first_name=f'Member{number}', last_name='Export', role='PLAYER',
+                date_of_birth=date(1990, 1, 1), current_club=self.club, current_season=self.season,
+                national_federation=self.federation
+            )
+            Invoice.objects.create(
+                invoice_type='REGISTRATION', season_config=self.season, member=member,
+                subtotal=Decimal('100.00'), vat_rate=Decimal('0.15'),
+                due_date=self.today + timedelta(days=30)
+            )
+
+    def test_csv_streams_every_invoice_in_one_query(self):
+        with self.assertNumQueries(1):
+            content = ''.join(stream_csv(Invoice.objects.order_by('pk')))
+
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], EXPORT_HEADERS)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][1:3], ['Member0 Export', 'Export FC'])
+        self.assertEqual(rows[1][5], '115.00')
+
+    def test_excel_is_written_in_constant_memory_mode(self):
+        with self.assertNumQueries(1):
+            output = write_excel(Invoice.objects.order_by('pk'))
+
+        with zipfile.ZipFile(output) as workbook:
+            sheet = workbook.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row '), 6)
+        self.assertIn('Export FC', sheet)
+        self.assertIn('<v>115</v>', sheet)
+
+    def test_pdf_export_job_rebuilds_the_invoices_from_the_export(self):
+        export = InvoiceExport.objects.create(requested_by=self.admin, filters={'club': ''})
+        result = tasks.build_invoice_pdf_export.call(export.pk, {'title': 'Invoices Export'})
+
+        export.refresh_from_db()
+        self.assertEqual(result['invoices'], 5)
+        self.assertEqual((export.status, export.invoice_count), ('COMPLETED', 5))
+        with export.file.open('rb') as pdf, fitz.open(stream=pdf.read(), filetype='pdf') as doc:
+            self.assertGreaterEqual(doc.page_count, 1)
+
+    def test_batches_are_appended_to_the_file_on_disk(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            merged_path = os.path.join(workdir, 'export.pdf')
+            batch_path = os.path.join(workdir, 'batch.pdf')
+            for number in range(3):
+                with fitz.open() as batch:
+                    for _ in range(2):
+                        batch.new_page().insert_text((72, 72), f'Batch {number}')
+                    batch.save(batch_path)
+                append_pdf(merged_path, batch_path)
+
+            with fitz.open(merged_path) as merged:
+                self.assertEqual(merged.page_count, 6)
+                self.assertIn('Batch 2', merged[5].get_text())
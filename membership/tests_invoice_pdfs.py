@@ -0,0 +1,66 @@
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from .invoice_pdfs import get_invoice_pdf, invoice_pdf_dir, pdf_digest, pdf_queryset, render_html
+from .models import Invoice, Member
+from .test_fixtures import MembershipFixturesMixin
+
+
+class InvoicePDFCacheTests(MembershipFixturesMixin, TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.create_admin('PDF')
+        self.create_season()
+        self.create_geography('PDF', club=False)
+        member = Member.objects.create(
+            first_name='Cached', last_name='Invoice', role='PLAYER', date_of_birth=date(1990, 1, 1),
+            national_federation=self.federation
+        )
+        self.invoice = Invoice.objects.create(
+            invoice_type='REGISTRATION', season_config=self.season, member=member,
+            subtotal=Decimal('100.00'), vat_rate=Decimal('0.15'), due_date=self.today + timedelta(days=30)
+        )
+
+    def load(self):
+        return pdf_queryset(Invoice.objects.filter(pk=self.invoice.pk)).get()
+
+    def seed(self, invoice):
+        """Store a placeholder PDF under the invoice's current cache name"""
+        digest = pdf_digest(render_html(invoice))
+        return default_storage.save(f'{invoice_pdf_dir(invoice.uuid)}/{digest}.pdf', ContentFile(b'%PDF-1.7'))
+
+    def test_digest_follows_rendered_content(self):
+        digest = pdf_digest(render_html(self.load()))
+        self.assertEqual(pdf_digest(render_html(self.load())), digest)
+
+        Invoice.objects.filter(pk=self.invoice.pk).update(status='PAID')
+        self.assertNotEqual(pdf_digest(render_html(self.load())), digest)
+
+        Invoice.objects.filter(pk=self.invoice.pk).update(status='PENDING')
+        Member.objects.filter(pk=self.invoice.member_id).update(first_name='Renamed')
+        self.assertNotEqual(pdf_digest(render_html(self.load())), digest)
+
+    def test_cached_pdf_is_served_without_rendering(self):
+        invoice = self.load()
+        name = self.seed(invoice)
+        pdf = get_invoice_pdf(invoice)
+        self.assertEqual(pdf.name, name)
+        self.assertFalse(pdf.rendered)
+
+    def test_saving_the_invoice_discards_cached_pdfs(self):
+        name = self.seed(self.load())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.invoice.save()
+        self.assertFalse(default_storage.exists(name))
@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import RequestFactory, TestCase
+
+from accounts.jurisdiction import jurisdiction_invoices, request_admin_scope
+from accounts.models import CustomUser
+from geography.models import Club, LocalFootballAssociation
+from .invoice_summaries import invoice_totals, outstanding_balances
+from .models import Invoice, Member
+from .test_fixtures import MembershipFixturesMixin
+
+
+class InvoiceSummaryTests(MembershipFixturesMixin, TestCase):
+
+    def setUp(self):
+        self.create_admin('Summary')
+        season = self.create_season(days_before=200, days_after=200)
+        self.create_geography('Summary', club=False)
+        lfas = [
+            self.lfa,
+            LocalFootballAssociation.objects.create(name='Second Summary LFA', region=self.region),
+        ]
+        # Two clubs in the first LFA, one in the second
+        clubs = [
+            Club.objects.create(name='Summary FC A', localfootballassociation=lfas[0]),
+            Club.objects.create(name='Summary FC B', localfootballassociation=lfas[0]),
+            Club.objects.create(name='Summary FC C', localfootballassociation=lfas[1]),
+        ]
+        self.lfas = lfas
+
+        # (club, days past due, status)
+        invoices = [
+            (0, -10, 'PENDING'), (0, 45, 'PENDING'), (0, 120, 'PENDING'),
+            (1, 10, 'PENDING'), (2, 100, 'PENDING'), (2, 5, 'PAID'),
+        ]
+        for number, (club, days, status) in enumerate(invoices):
+            member = Member.objects.create(
+                first_name=f'Member{number}', last_name='Summary', role='PLAYER',
+                date_of_birth=date(1990, 1, 1), current_club=clubs[club], current_season=season,
+                national_federation=self.federation
+            )
+            invoice = Invoice.objects.create(
+                invoice_type='REGISTRATION', season_config=season, member=member,
+                subtotal=Decimal('100.00'), vat_rate=Decimal('0.15'),
+                issue_date=self.today - timedelta(days=days + 30),
+                due_date=self.today - timedelta(days=days)
+            )
+            # save() derives OVERDUE/PAID from the dates and amounts; pin the status
+            Invoice.objects.filter(pk=invoice.pk).update(status=status)
+
+    def test_invoice_totals_in_one_query(self):
+        with self.assertNumQueries(1):
+            totals = invoice_totals(Invoice.objects.all())
+
+        self.assertEqual(totals['total_count'], 6)
+        self.assertEqual(totals['pending_count'], 5)
+        self.assertEqual(totals['pending_amount'], Decimal('575.00'))
+        self.assertEqual(totals['paid_count'], 1)
+        self.assertEqual(totals['overdue_amount'], Decimal('0.00'))
+
+    def test_outstanding_balances_group_and_subtotal_in_one_query(self):
+        with self.assertNumQueries(1):
+            items, subtotals, totals = outstanding_balances(Invoice.objects.all(), 'club', self.today)
+
+        self.assertEqual([item['name'] for item in items], ['Summary FC A', 'Summary FC B', 'Summary FC C'])
+        club_a = items[0]
+        self.assertEqual(club_a['invoice_count'], 3)
+        self.assertEqual(club_a['player_count'], 3)
+        self.assertEqual(club_a['days_30_amount'], Decimal('115.00'))
+        self.assertEqual(club_a['days_90_amount'], Decimal('115.00'))
+        self.assertEqual(club_a['days_90_plus_amount'], Decimal('115.00'))
+
+        self.assertEqual(list(subtotals), ['province', 'region', 'lfa'])
+        lfa_totals = {item['name']: item['total_amount'] for item in subtotals['lfa']}
+        self.assertEqual(lfa_totals, {'Summary LFA': Decimal('460.00'), 'Second Summary LFA': Decimal('115.00')})
+        self.assertEqual(subtotals['province'][0]['invoice_count'], 5)
+        self.assertEqual(totals['total_amount'], Decimal('575.00'))
+        self.assertEqual(totals['days_90_plus_count'], 2)
+
+    def test_admin_scope_is_resolved_once_per_request(self):
+        self.admin.role = 'ADMIN_LOCAL_FED'
+        self.admin.local_federation = self.lfas[1]
+        self.admin.save()
+        request = RequestFactory().get('/')
+        request.user = CustomUser.objects.get(pk=self.admin.pk)
+
+        with self.assertNumQueries(1):
+            scope = request_admin_scope(request)
+            self.assertEqual(request_admin_scope(request), scope)
+        self.assertEqual(jurisdiction_invoices(*scope).count(), 2)
@@ -0,0 +1,118 @@
+import io
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from .member_import import MemberImporter, clean_row, read_rows
+from .models import Invoice, Member, RegistrationWorkflow
+from .safa_config_models import SAFAFeeStructure
+from .test_fixtures import MembershipFixturesMixin
+
+
+def sa_id(prefix):
+    """Complete a 12-digit SA ID prefix with its check digit"""
+    total = 0
+    for position, digit in enumerate(prefix):
+        value = int(digit) * (2 if position % 2 else 1)
+        total += value - 9 if value > 9 else value
+    return prefix + str((10 - total % 10) % 10)
+
+
+def csv_file(*lines):
+    return io.BytesIO('\n'.join(lines).encode('utf-8'))
+
+
+class MemberImportTests(MembershipFixturesMixin, TestCase):
+
+    def setUp(self):
+        self.create_admin('Import')
+        self.create_season()
+        SAFAFeeStructure.objects.create(
+            season_config=self.season,
+            entity_type='PLAYER_SENIOR',
+            annual_fee=Decimal('200.00'),
+            is_pro_rata=False,
+            created_by=self.admin
+        )
+        self.create_geography('Import', status='ACTIVE')
+        self.male_id = sa_id('900101500008')
+
+    def import_csv(self, *lines, **kwargs):
+        importer = MemberImporter(self.season, chunk_size=2, **kwargs)
+        return importer.run(read_rows(csv_file(*lines), 'members.csv'))
+
+    def test_clean_row_checks_sa_id(self):
+        data, errors = clean_row({'first_name': 'A', 'last_name': 'B', 'id_number': self.male_id})
+        self.assertEqual(errors, [])
+        self.assertEqual(data['date_of_birth'], date(1990, 1, 1))
+        self.assertEqual(data['gender'], 'M')
+
+        bad_check_digit = self.male_id[:12] + str((int(self.male_id[12]) + 1) % 10)
+        _data, errors = clean_row({'first_name': 'A', 'last_name': 'B', 'id_number': bad_check_digit})
+        self.assertEqual(errors, ['Invalid South African ID number'])
+
+        _data, errors = clean_row({
+            'first_name': 'A', 'last_name': 'B', 'id_number': self.male_id, 'dob': '', 'gender': 'F'
+        })
+        self.assertEqual(errors, ["Gender doesn't match ID number. Please verify your information."])
+
+        _data, errors = clean_row({'first_name': 'A', 'last_name': 'B'})
+        self.assertEqual(errors, ['An SA ID number or passport number is required'])
+
+    def test_import_creates_members_workflows_and_invoices(self):
+        stats = self.import_csv(
+            'First Name,Surname,ID No,Email,Club',
+            f'Thabo,Mokoena,{self.male_id},thabo@example.com,Import FC',
+            f'Lerato,Dube,{sa_id("950315012008")},lerato@example.com,{self.club.safa_id}',
+            f'Sipho,Nkosi,{sa_id("880720512008")},sipho@example.com,Unknown FC',
+        )
+        self.assertEqual((stats.processed, stats.created, stats.invalid, stats.invoices), (3, 2, 1, 2))
+        self.assertEqual(stats.errors, [{'line': 4, 'errors': ["Unknown club 'Unknown FC'"]}])
+
+        members = Member.objects.filter(current_club=self.club)
+        self.assertEqual(members.count(), 2)
+        thabo = members.get(first_name='Thabo')
+        self.assertTrue(thabo.safa_id)
+        self.assertEqual(thabo.status, 'PENDING')
+        self.assertEqual(thabo.date_of_birth, date(1990, 1, 1))
+        self.assertEqual(thabo.province, self.province)
+        self.assertEqual(RegistrationWorkflow.objects.filter(member__in=members).count(), 2)
+        invoice = Invoice.objects.get(member=thabo)
+        self.assertEqual(invoice.invoice_type, 'MEMBER_REGISTRATION')
+        self.assertEqual(invoice.items.count(), 1)
+
+    def test_duplicates_in_database_and_file(self):
+        Member.objects.create(
+            first_name='Existing', last_name='Member', email='taken@example.com',
+            role='PLAYER', current_club=self.club, current_season=self.season
+        )
+        other_id = sa_id('950315012008')
+        stats = self.import_csv(
+            'first_name,last_name,id_number,email',
+            f'B,Two,{other_id},two@example.com',
+            f'C,Three,{other_id},three@example.com',
+            f'A,One,{self.male_id},TAKEN@example.com',
+            club=self.club,
+        )
+        self.assertEqual((stats.created, stats.duplicates), (1, 2))
+        self.assertEqual(
+            [row['errors'] for row in stats.errors],
+            [[f'ID number {other_id} appears earlier in the file'],
+             ['Email taken@example.com is already registered']]
+        )
+
+    def test_dry_run_writes_nothing(self):
+        before = Member.objects.count()
+        stats = self.import_csv(
+            'first_name,last_name,id_number',
+            f'A,One,{self.male_id}',
+            f'B,Two,{self.male_id[:12]}0',
+            club=self.club,
+            dry_run=True,
+        )
+        self.assertTrue(stats.dry_run)
+        self.assertEqual(stats.created, 1)
+        self.assertEqual(stats.invoices, 1)
+        self.assertEqual(Member.objects.count(), before)
+        self.assertFalse(Invoice.objects.exists())
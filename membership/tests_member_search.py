@@ -0,0 +1,48 @@
+from datetime import date
+
+from django.test import TestCase
+
+from geography.models import Country, NationalFederation
+from .member_search import search_backend, search_members
+from .models import Member
+
+
+class MemberSearchTests(TestCase):
+
+    def setUp(self):
+        country = Country.objects.create(name='South Africa', code='RSA')
+        self.federation = NationalFederation.objects.create(name='SAFA', country=country)
+        self.thabo = self.create_member('Thabo', 'Mokoena', 'thabo@example.com', '9001015800085')
+        self.thandi = self.create_member('Thandi', 'Nkosi', 'tnkosi@example.com', '9202025800087')
+        self.johan = self.create_member('Johan', 'Thabethe', 'johan@example.com', '8803035800089')
+
+    def create_member(self, first_name, last_name, email, id_number):
+        return Member.objects.create(
+            first_name=first_name, last_name=last_name, email=email, id_number=id_number,
+            role='PLAYER', date_of_birth=date(1990, 1, 1), national_federation=self.federation
+        )
+
+    def test_sqlite_uses_fts5_index(self):
+        self.assertEqual(search_backend(), 'fts5')
+
+    def test_prefix_search_ranks_name_matches(self):
+        self.assertEqual(set(search_members('tha')), {self.thabo, self.thandi, self.johan})
+        self.assertEqual(list(search_members('Thabo Mok')), [self.thabo])
+        self.assertEqual(list(search_members('tnkosi@exa')), [self.thandi])
+
+    def test_exact_safa_id_and_id_number_paths(self):
+        self.assertEqual(list(search_members(self.johan.safa_id.lower())), [self.johan])
+        self.assertEqual(list(search_members('9202025800087')), [self.thandi])
+
+    def test_signals_keep_index_current(self):
+        self.thandi.last_name = 'Dlamini'
+        self.thandi.save()
+        self.assertEqual(list(search_members('dlam')), [self.thandi])
+        self.assertFalse(search_members('nkosi').exists())
+
+        self.thabo.delete()
+        self.assertEqual(list(search_members('mokoena')), [])
+
+    def test_search_respects_the_callers_queryset(self):
+        scoped = Member.objects.exclude(pk=self.thandi.pk)
+        self.assertEqual(set(search_members('tha', scoped)), {self.thabo, self.johan})
@@ -0,0 +1,71 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from accounts.models import Position
+from geography.models import Association
+from .models import Invoice, Member, MemberProfile, SAFAFeeStructure
+from .serializers import MemberSerializer
+from .test_fixtures import MembershipFixturesMixin
+
+
+class MemberSerializerQueryTests(MembershipFixturesMixin, TestCase):
+
+    def setUp(self):
+        self.create_admin('Serializer')
+        self.create_season()
+        for entity_type, fee in [('PLAYER_SENIOR', '200.00'), ('PLAYER_JUNIOR', '100.00'),
+                                 ('OFFICIAL_REFEREE', '300.00')]:
+            SAFAFeeStructure.objects.create(
+                season_config=self.season, entity_type=entity_type, annual_fee=Decimal(fee), created_by=self.admin
+            )
+        self.create_geography('Serializer')
+        self.association = Association.objects.create(name='Referees Association', national_federation=self.federation)
+        self.referee = Position.objects.create(title='Referee', employment_type='VOLUNTEER')
+
+    def create_members(self, count):
+        for number in range(count):
+            official = number % 3 == 0
+            member = Member.objects.create(
+                first_name=f'Member{number}', last_name='Serialized', role='OFFICIAL' if official else 'PLAYER',
+                date_of_birth=date(2012 if number % 2 else 1990, 1, 1), current_club=self.club,
+                current_season=self.season, national_federation=self.federation
+            )
+            if official:
+                member.associations.add(self.association)
+                MemberProfile.objects.create(member=member, official_position=self.referee)
+            if number % 2:
+                Invoice.objects.create(
+                    invoice_type='REGISTRATION', season_config=self.season, member=member,
+                    subtotal=Decimal('100.00'), vat_rate=Decimal('0.15')
+                )
+
+    def serialize_page(self):
+        queryset = MemberSerializer.setup_queryset(Member.objects.order_by('pk'))
+        return MemberSerializer(queryset, many=True).data
+
+    def test_page_costs_a_fixed_number_of_queries(self):
+        self.create_members(3)
+        # Members, associations, documents and the season's fee table
+        with self.assertNumQueries(4) as small:
+            self.serialize_page()
+
+        self.create_members(12)
+        with self.assertNumQueries(len(small.captured_queries)):
+            data = self.serialize_page()
+
+        self.assertEqual(len(data), 15)
+
+    def test_batched_values_match_per_member_calculation(self):
+        self.create_members(6)
+        data = {row['id']: row for row in self.serialize_page()}
+        for member in Member.objects.all():
+            row = data[member.pk]
+            self.assertEqual(row['registration_fee'], float(member.calculate_registration_fee()))
+            self.assertEqual(
+                row['has_outstanding_invoices'],
+                member.invoices.filter(status__in=['PENDING', 'OVERDUE', 'PARTIALLY_PAID']).exists()
+            )
+            expected_names = 'Referees Association' if member.role == 'OFFICIAL' else ''
+            self.assertEqual(row['association_names'], expected_names)
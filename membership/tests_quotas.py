@@ -0,0 +1,99 @@
+from datetime import date, timedelta
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from geography.models import Club
+from .models import ClubMemberQuota, Member
+from .test_fixtures import MembershipFixturesMixin
+
+
+class ClubMemberQuotaCounterTests(MembershipFixturesMixin, TestCase):
+
+    def setUp(self):
+        self.create_fixtures('Quota')
+        self.other_club = Club.objects.create(name='Other FC', localfootballassociation=self.lfa)
+
+    def create_member(self, enforce_quota=False, **kwargs):
+        data = {
+            'first_name': 'Test',
+            'last_name': 'Member',
+            'role': 'PLAYER',
+            'status': 'ACTIVE',
+            'date_of_birth': date(1990, 1, 1),
+            'current_club': self.club,
+            'current_season': self.season,
+            'national_federation': self.federation,
+        }
+        data.update(kwargs)
+        member = Member(**data)
+        member.enforce_quota = enforce_quota
+        member.save()
+        return member
+
+    def get_quota(self, club=None):
+        return ClubMemberQuota.objects.get(club=club or self.club, season_config=self.season)
+
+    def test_counters_follow_member_changes(self):
+        member = self.create_member()
+        self.create_member(date_of_birth=date.today() - timedelta(days=365 * 10))
+        self.create_member(role='OFFICIAL')
+
+        quota = self.get_quota()
+        self.assertEqual(
+            (quota.current_senior_players, quota.current_junior_players, quota.current_officials),
+            (1, 1, 1)
+        )
+
+        member = Member.objects.get(pk=member.pk)
+        member.current_club = self.other_club
+        member.save()
+        self.assertEqual(self.get_quota().current_senior_players, 0)
+        self.assertEqual(self.get_quota(self.other_club).current_senior_players, 1)
+
+        member.status = 'SUSPENDED'
+        member.save(update_fields=['status'])
+        self.assertEqual(self.get_quota(self.other_club).current_senior_players, 0)
+
+        Member.objects.get(role='OFFICIAL').delete()
+        self.assertEqual(self.get_quota().current_officials, 0)
+
+    def test_unrelated_save_does_not_touch_quota(self):
+        member = self.create_member()
+        member = Member.objects.get(pk=member.pk)
+        member.first_name = 'Renamed'
+        # The UPDATE plus the member search index row; no quota queries
+        with self.assertNumQueries(2):
+            member.save(update_fields=['first_name'])
+        member.gender = 'M'
+        with self.assertNumQueries(1):
+            member.save(update_fields=['gender'])
+
+    def test_registration_is_rejected_when_quota_is_full(self):
+        ClubMemberQuota.objects.create(club=self.club, season_config=self.season, max_officials=1)
+        self.create_member(role='OFFICIAL')
+
+        with self.assertRaises(ValidationError):
+            self.create_member(enforce_quota=True, role='OFFICIAL', first_name='Late')
+
+        self.assertFalse(Member.objects.filter(first_name='Late').exists())
+        self.assertEqual(self.get_quota().current_officials, 1)
+
+        # Only registration enforces the limit; other creation paths just count
+        self.create_member(role='OFFICIAL', first_name='Imported')
+        self.assertEqual(self.get_quota().current_officials, 2)
+
+    def test_reconcile_fixes_drift_in_one_aggregate(self):
+        self.create_member()
+        self.create_member(role='OFFICIAL')
+        # Queryset updates bypass Member.save(), leaving the counters stale
+        Member.objects.filter(role='OFFICIAL').update(status='INACTIVE')
+        ClubMemberQuota.objects.filter(club=self.club).update(current_senior_players=7)
+
+        with self.assertNumQueries(2):
+            fixed = ClubMemberQuota.reconcile_season(self.season, dry_run=True)
+        self.assertEqual(fixed, 1)
+
+        ClubMemberQuota.reconcile_season(self.season)
+        quota = self.get_quota()
+        self.assertEqual((quota.current_senior_players, quota.current_officials), (1, 0))
@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.test import TransactionTestCase, override_settings
+
+from .models import SAFASeasonConfig
+from .safa_config_models import SAFAFeeStructure
+from .season_cache import SEASON_CACHE_VERSION_KEY, season_cache, start_request_stats
+from .test_fixtures import MembershipFixturesMixin
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SeasonCacheTests(MembershipFixturesMixin, TransactionTestCase):
+    """TransactionTestCase: the cache is only filled outside transactions"""
+
+    def setUp(self):
+        self.create_admin('Cache')
+        self.create_season()
+        self.fee = SAFAFeeStructure.objects.create(
+            season_config=self.season,
+            entity_type='PLAYER_SENIOR',
+            annual_fee=Decimal('200.00'),
+            created_by=self.admin
+        )
+
+    def tearDown(self):
+        season_cache.invalidate()
+
+    def test_repeated_lookups_hit_the_cache(self):
+        stats = start_request_stats()
+        SAFASeasonConfig.get_active_season()
+        SAFAFeeStructure.get_fee_for_entity('PLAYER_SENIOR')
+
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                season = SAFASeasonConfig.get_active_season()
+                fee = SAFAFeeStructure.get_fee_for_entity('PLAYER_SENIOR')
+
+        self.assertEqual(season.pk, self.season.pk)
+        self.assertEqual(fee.annual_fee, Decimal('200.00'))
+        self.assertEqual(stats, {'hits': 16, 'misses': 2})
+
+    def test_fee_structure_save_invalidates(self):
+        SAFAFeeStructure.get_fee_for_entity('PLAYER_SENIOR')
+        self.fee.annual_fee = Decimal('250.00')
+        self.fee.save()
+        self.assertEqual(SAFAFeeStructure.get_fee_for_entity('PLAYER_SENIOR').annual_fee, Decimal('250.00'))
+
+    def test_other_process_invalidation_is_seen_on_next_request(self):
+        self.assertEqual(SAFASeasonConfig.get_active_season().pk, self.season.pk)
+
+        # Another worker deactivated the season and bumped the shared version key
+        SAFASeasonConfig.objects.filter(pk=self.season.pk).update(is_active=False)
+        caches['shared'].set(SEASON_CACHE_VERSION_KEY, 'other-worker', None)
+
+        start_request_stats()
+        self.assertIsNone(SAFASeasonConfig.get_active_season())
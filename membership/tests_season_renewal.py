@@ -0,0 +1,93 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from .models import Invoice, Member, SeasonRenewalCheckpoint
+from .safa_config_models import SAFAFeeStructure
+from .safa_invoice_manager import SAFAInvoiceManager
+from .season_renewal import SeasonRenewalEngine
+from .test_fixtures import MembershipFixturesMixin
+
+
+class SeasonRenewalEngineTests(MembershipFixturesMixin, TestCase):
+
+    def setUp(self):
+        self.create_admin('Renewal')
+        self.create_season()
+        for entity_type, fee in [('CLUB', '1000.00'), ('PLAYER_SENIOR', '200.00')]:
+            SAFAFeeStructure.objects.create(
+                season_config=self.season,
+                entity_type=entity_type,
+                annual_fee=Decimal(fee),
+                is_pro_rata=False,
+                created_by=self.admin
+            )
+
+        self.create_geography('Renewal', status='ACTIVE')
+        for i in range(5):
+            Member.objects.create(
+                first_name='Player',
+                last_name=str(i),
+                role='PLAYER',
+                status='ACTIVE',
+                date_of_birth=date(1990, 1, 1),
+                current_club=self.club,
+                current_season=self.season,
+                national_federation=self.federation
+            )
+
+    def test_dry_run_writes_nothing(self):
+        results = SeasonRenewalEngine(self.season, dry_run=True).run()
+
+        self.assertEqual(results['MEMBER']['created'], 5)
+        self.assertEqual(results['CLUB']['created'], 1)
+        self.assertEqual(results['MEMBER']['subtotal'], Decimal('1000.00'))
+        self.assertFalse(Invoice.objects.exists())
+        self.assertFalse(SeasonRenewalCheckpoint.objects.exists())
+
+    def test_chunks_resume_and_do_not_duplicate(self):
+        # Simulate a run that stopped after the first two members
+        first_two = list(Member.objects.order_by('pk')[:2])
+        engine = SeasonRenewalEngine(self.season, chunk_size=2)
+        engine.run(entity_types=['MEMBER'])
+        SeasonRenewalCheckpoint.objects.filter(entity_type='MEMBER').update(
+            last_object_id=first_two[-1].pk, is_complete=False
+        )
+        Invoice.objects.exclude(member__in=first_two).delete()
+
+        results = SeasonRenewalEngine(self.season, chunk_size=2).run(entity_types=['MEMBER'])
+
+        self.assertEqual(results['MEMBER']['created'], 3)
+        self.assertEqual(Invoice.objects.filter(invoice_type='RENEWAL').count(), 5)
+        invoice = Invoice.objects.filter(invoice_type='RENEWAL').first()
+        self.assertEqual(invoice.total_amount, Decimal('230.00'))
+        self.assertEqual(invoice.items.get().total_price, Decimal('200.00'))
+
+        # A fresh checkpoint still skips members that already have an invoice
+        SeasonRenewalCheckpoint.objects.all().delete()
+        results = SeasonRenewalEngine(self.season).run(entity_types=['MEMBER'])
+        self.assertEqual((results['MEMBER']['created'], results['MEMBER']['skipped']), (0, 5))
+
+    def test_queries_do_not_grow_per_member(self):
+        engine = SeasonRenewalEngine(self.season, chunk_size=100)
+        # checkpoint get_or_create, chunk read, duplicate check, invoice number
+        # block (with the stale counter cleanup), bulk writes and checkpoint
+        # saves - none of it scales with chunk size
+        with self.assertNumQueries(20):
+            engine.run(entity_types=['MEMBER'])
+        self.assertEqual(Invoice.objects.filter(invoice_type='RENEWAL').count(), 5)
+
+    def test_pro_rata_renewal_records_the_annual_fee_and_period(self):
+        SAFAFeeStructure.objects.filter(entity_type='PLAYER_SENIOR').update(is_pro_rata=True)
+        amount, _months, period = SAFAInvoiceManager.calculate_pro_rata_amount(
+            Decimal('200.00'), self.today, self.season
+        )
+
+        SeasonRenewalEngine(self.season, registration_date=self.today).run(entity_types=['MEMBER'])
+
+        item = Invoice.objects.filter(invoice_type='RENEWAL').first().items.get()
+        self.assertTrue(item.is_pro_rata)
+        self.assertEqual((item.unit_price, item.original_amount), (amount, Decimal('200.00')))
+        self.assertEqual(item.pro_rata_period, period)
+        self.assertIn(f"({period})", item.description)
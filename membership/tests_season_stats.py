@@ -0,0 +1,140 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .api_views import dashboard_charts, dashboard_stats
+from .models import Invoice, InvoiceRevenueRollup, Member, MemberRegistrationRollup, SeasonStatsSnapshot
+from .season_rollups import rebuild_season_rollups
+from .season_stats import compute_season_stats, get_season_snapshot
+from .test_fixtures import MembershipFixturesMixin
+
+
+class SeasonStatsSnapshotTests(MembershipFixturesMixin, TestCase):
+
+    def setUp(self):
+        self.create_fixtures('Stats')
+
+    def create_member(self, **kwargs):
+        data = {
+            'first_name': 'Stats',
+            'last_name': 'Member',
+            'role': 'PLAYER',
+            'status': 'PENDING',
+            'date_of_birth': date(1990, 1, 1),
+            'current_club': self.club,
+            'current_season': self.season,
+            'national_federation': self.federation,
+        }
+        data.update(kwargs)
+        return Member.objects.create(**data)
+
+    def snapshot_counters(self):
+        snapshot = SeasonStatsSnapshot.objects.get(season_config=self.season)
+        return {field: getattr(snapshot, field) for field in compute_season_stats(self.season)}
+
+    def test_signals_keep_snapshot_in_step_with_full_recompute(self):
+        self.create_member()
+        get_season_snapshot(self.season, fresh=True)
+
+        member = self.create_member(role='OFFICIAL')
+        member = Member.objects.get(pk=member.pk)
+        member.status = 'ACTIVE'
+        member.save()
+        invoice = Invoice.objects.create(
+            invoice_type='REGISTRATION', season_config=self.season, member=member,
+            subtotal=Decimal('100.00'), vat_rate=Decimal('0.15')
+        )
+        invoice = Invoice.objects.get(pk=invoice.pk)
+        invoice.status = 'PAID'
+        invoice.save()
+        Member.objects.filter(first_name='Stats', role='PLAYER').get().delete()
+
+        self.assertEqual(self.snapshot_counters(), compute_season_stats(self.season))
+        self.assertEqual(SeasonStatsSnapshot.objects.get().active_members, 1)
+
+    def test_full_recompute_is_one_query_per_table(self):
+        self.create_member()
+        with self.assertNumQueries(3):
+            compute_season_stats(self.season)
+
+    def test_dashboard_stats_reads_snapshot_and_supports_etag(self):
+        self.create_member(status='ACTIVE')
+        factory = APIRequestFactory()
+
+        request = factory.get('/api/dashboard/stats/')
+        force_authenticate(request, user=self.admin)
+        response = dashboard_stats(request)
+        self.assertEqual(response.data['data']['active_members'], 1)
+        etag = response['ETag']
+
+        request = factory.get('/api/dashboard/stats/', HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=self.admin)
+        # Active season (not cached inside the test transaction) and the snapshot row
+        with self.assertNumQueries(2):
+            response = dashboard_stats(request)
+        self.assertEqual(response.status_code, 304)
+
+        # Tags are compared whole, not as substrings of the header
+        request = factory.get('/api/dashboard/stats/', HTTP_IF_NONE_MATCH=f'"x{etag[1:-1]}x"')
+        force_authenticate(request, user=self.admin)
+        self.assertEqual(dashboard_stats(request).status_code, 200)
+
+        self.create_member(status='ACTIVE', first_name='Second')
+        request = factory.get('/api/dashboard/stats/', HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=self.admin)
+        response = dashboard_stats(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['active_members'], 2)
+
+    def rollup_rows(self):
+        return (
+            sorted(MemberRegistrationRollup.objects.filter(count__gt=0).values_list('day', 'status', 'role', 'count')),
+            sorted(InvoiceRevenueRollup.objects.filter(count__gt=0).values_list(
+                'day', 'invoice_type', 'status', 'count', 'total_amount'
+            )),
+        )
+
+    def test_signals_keep_rollups_in_step_with_rebuild(self):
+        member = self.create_member()
+        self.create_member(role='OFFICIAL', status='ACTIVE')
+        member = Member.objects.get(pk=member.pk)
+        member.status = 'ACTIVE'
+        member.save()
+        invoice = Invoice.objects.create(
+            invoice_type='REGISTRATION', season_config=self.season, member=member,
+            subtotal=Decimal('100.00'), vat_rate=Decimal('0.15')
+        )
+        invoice = Invoice.objects.get(pk=invoice.pk)
+        invoice.status = 'PAID'
+        invoice.payment_date = invoice.created - timedelta(days=40)
+        invoice.save()
+
+        incremental = self.rollup_rows()
+        rebuild_season_rollups(self.season)
+        self.assertEqual(incremental, self.rollup_rows())
+        self.assertEqual(MemberRegistrationRollup.objects.get(status='ACTIVE', role='PLAYER').count, 1)
+
+    def test_dashboard_charts_read_rollups(self):
+        self.create_member(status='ACTIVE')
+        member = self.create_member(role='OFFICIAL')
+        Invoice.objects.create(
+            invoice_type='REGISTRATION', season_config=self.season, member=member, status='PAID',
+            subtotal=Decimal('100.00'), vat_rate=Decimal('0.15'), payment_date=member.created
+        )
+        request = APIRequestFactory().get('/api/dashboard/charts/', {'season': 'all', 'months': 24})
+        force_authenticate(request, user=self.admin)
+        response = dashboard_charts(request)
+
+        charts = response.data['data']
+        month = member.created.strftime('%Y-%m')
+        self.assertEqual(charts['monthly_registrations'], [{'month': month, 'count': 2}])
+        self.assertEqual(charts['monthly_revenue'], [{'month': month, 'revenue': 115.0}])
+        self.assertEqual(sum(item['count'] for item in charts['daily_registrations']), 2)
+        self.assertIn({'role': 'OFFICIAL', 'count': 1}, charts['role_distribution'])
+
+        for params in ({'season': 'last'}, {'months': 100000}, {'months': 0}, {'months': 'many'}):
+            request = APIRequestFactory().get('/api/dashboard/charts/', params)
+            force_authenticate(request, user=self.admin)
+            self.assertEqual(dashboard_charts(request).status_code, 400)
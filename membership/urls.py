@@ -1,5 +1,6 @@
 # membership/urls.py
 from django.urls import path
+from . import api_views
 from . import views
 from . import invoice_views
 from . import registration_views
@@ -15,6 +16,7 @@ urlpatterns = [
     path('invoices/<int:invoice_id>/pdf-export/', views.generate_invoice_pdf, name='generate_invoice_pdf'),
     path('invoices/<uuid:uuid>/pay/', invoice_views.mark_invoice_paid, name='mark_invoice_paid'),
     path('invoices/export/<str:format>/', invoice_views.export_invoices, name='export_invoices'),
+    path('invoices/exports/<uuid:uuid>/', invoice_views.invoice_export_download, name='invoice_export_download'),
     path('reports/outstanding/', invoice_views.OutstandingReportView.as_view(), name='outstanding_report'),
 
     # path('register/', views.registration_portal, name='registration_portal'), # Removed as per user request
@@ -22,12 +24,17 @@ urlpatterns = [
     path('register/official/', views.OfficialRegistrationView.as_view(), name='official_registration'),
     path('register/admin/', views.AdminRegistrationView.as_view(), name='admin_registration'),
     path('register/success/', views.registration_success, name='registration_success'),
+    path('members/import/', views.import_members, name='import_members'),
     path('member-approvals/', views.MemberApprovalListView.as_view(), name='member_approval_list'),
     path('member-approvals/<int:member_id>/approve/', views.approve_member, name='approve_member'),
     path('member-approvals/<int:member_id>/reject/', views.reject_member, name='reject_member'),
     path('card/<int:member_id>/', views.generate_membership_card, name='generate_membership_card'),
     path('profile/<int:user_id>/export-pdf/', views.export_profile_pdf, name='export_profile_pdf'),
 
+    # Fee quotes
+    path('api/fees/', api_views.calculate_fees, name='calculate_fees'),
+    path('api/fees/quote/', api_views.quote_fees, name='quote_fees'),
+
     # Registration AJAX
     path('club-info/', registration_views.get_club_info, name='club_info'),
 
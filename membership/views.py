@@ -1,14 +1,16 @@
 # membership/views.py
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import CreateView, ListView
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
 from django.utils import timezone
 from .forms import PlayerRegistrationForm, OfficialRegistrationForm, AdminRegistrationForm
 from .models import Member, Invoice
 from accounts.models import CustomUser
-from django.http import HttpResponse
+from django.core.files.storage import default_storage
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_POST
 from django.template.loader import get_template
 from xhtml2pdf import pisa
 
@@ -235,3 +237,43 @@ def export_profile_pdf(request, user_id):
     if pisa_status.err:
        return HttpResponse('We had some errors <pre>' + html + '</pre>')
     return response
+
+
+@login_required
+@require_POST
+def import_members(request):
+    """
+    Upload a CSV or XLSX of members to import in the background. Club admins
+    import into their own club; higher admins name each row's club. With
+    dry_run the job only reports what would be imported and each row's errors.
+    """
+    from accounts.jurisdiction import request_admin_scope
+    from . import tasks
+
+    level, organisation = request_admin_scope(request)
+    if level == 'none':
+        return JsonResponse({'error': 'Only administrators can import members'}, status=403)
+
+    upload = request.FILES.get('file')
+    if not upload or not upload.name.lower().endswith(('.csv', '.xlsx')):
+        return JsonResponse({'error': 'Upload a .csv or .xlsx file'}, status=400)
+
+    season = SAFASeasonConfig.get_active_season()
+    if not season:
+        return JsonResponse({'error': 'No active season'}, status=400)
+
+    dry_run = request.POST.get('dry_run', '').lower() in ('1', 'true', 'on', 'yes')
+    path = default_storage.save(f'member_imports/{upload.name}', upload)
+    job = tasks.import_members_file.enqueue_for(
+        request.user,
+        path,
+        season.pk,
+        request.user.pk,
+        club_id=organisation.pk if level == 'club' else None,
+        dry_run=dry_run,
+    )
+    return JsonResponse({
+        'job_id': job.id,
+        'dry_run': dry_run,
+        'status_url': reverse('jobs:job_status', kwargs={'job_id': job.id}),
+    }, status=202)
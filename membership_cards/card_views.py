@@ -12,6 +12,7 @@ from django.conf import settings
 from membership.models import Member, MemberSeasonHistory, get_current_season
 from .card_generator import SAFACardGenerator, generate_print_ready_pdf
 from .models import PhysicalCard
+from . import tasks
 import os
 
 
@@ -321,24 +322,11 @@ def admin_bulk_generate_cards(request):
         messages.error(request, "No valid members selected (members must have SAFA IDs).")
         return redirect('membership_cards:admin_management')
     
-    try:
-        generator = SAFACardGenerator()
-        results = generator.bulk_generate_cards(members, format_type)
-        
-        success_count = sum(1 for r in results if r['success'])
-        error_count = len(results) - success_count
-        
-        if success_count > 0:
-            messages.success(request, f"Successfully generated {success_count} card(s).")
-        
-        if error_count > 0:
-            messages.warning(request, f"Failed to generate {error_count} card(s).")
-            
-        return redirect('membership_cards:admin_management')
-        
-    except Exception as e:
-        messages.error(request, f"Error during bulk generation: {str(e)}")
-        return redirect('membership_cards:admin_management')
+    # Rendering card images takes a while per member, so it runs as a job
+    ids = list(members.values_list('id', flat=True))
+    job = tasks.generate_member_cards.enqueue_for(request.user, ids, format_type)
+    messages.info(request, f"Generating {len(ids)} card(s) in the background (job {job.id}).")
+    return redirect('membership_cards:admin_management')
 
 
 @staff_member_required
@@ -5,11 +5,15 @@ from django.utils import timezone
 from datetime import timedelta
 import logging
 
+from utils.bulk import defer as defer_bulk, register_flush
 from .models import DigitalCard, PhysicalCard
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Users saved inside utils.bulk.bulk_operation(); their cards are synced once at the end
+BULK_CARD_SYNC = 'membership_cards.card_sync'
+
 def get_membership_expiry_date(user):
     """Safely get the membership expiry date from the user's member profile and season."""
     if hasattr(user, 'member_profile') and user.member_profile and user.member_profile.current_season:
@@ -34,6 +38,8 @@ def handle_membership_activation(sender, instance, created, **kwargs):
     Automatically generate cards when membership is activated
     Triggered when membership status changes from PAID → ACTIVE
     """
+    if defer_bulk(BULK_CARD_SYNC, instance.pk, getattr(instance, '_previous_membership_status', None)):
+        return
     
     # Only process if user has a SAFA ID (security requirement)
     if not instance.safa_id:
@@ -87,6 +93,8 @@ def handle_membership_suspension(sender, instance, **kwargs):
     """
     Suspend cards when membership is suspended or expired
     """
+    if defer_bulk(BULK_CARD_SYNC, instance.pk, getattr(instance, '_previous_membership_status', None)):
+        return
     if instance.membership_status in ['SUSPENDED', 'EXPIRED']:
         
         # Suspend digital card
@@ -106,6 +114,8 @@ def update_card_expiry_dates(sender, instance, **kwargs):
     """
     Update card expiry dates when membership expiry date changes
     """
+    if defer_bulk(BULK_CARD_SYNC, instance.pk, getattr(instance, '_previous_membership_status', None)):
+        return
     expiry_date = get_membership_expiry_date(instance)
     if expiry_date:
         try:
@@ -116,3 +126,15 @@ def update_card_expiry_dates(sender, instance, **kwargs):
                 logger.info(f"Updated expiry date for digital card #{digital_card.card_number}")
         except DigitalCard.DoesNotExist:
             pass
+
+
+def sync_bulk_cards(items):
+    """Run the card handlers once per user saved in bulk, against the status the user had before"""
+    for user in User.objects.filter(pk__in=items):
+        user._previous_membership_status = items[user.pk]
+        handle_membership_activation(User, user, created=False)
+        handle_membership_suspension(User, user)
+        update_card_expiry_dates(User, user)
+
+
+register_flush(BULK_CARD_SYNC, sync_bulk_cards)
@@ -0,0 +1,18 @@
+# membership_cards/tasks.py
+"""
+Background tasks for membership cards (run by `manage.py run_jobs`, see
+utils.jobs).
+"""
+from django_tasks import task
+
+
+@task(queue_name='cards')
+def generate_member_cards(member_ids, format_type):
+    """Generate card files for the given members; returns success/failure counts"""
+    from membership.models import Member
+    from .card_generator import SAFACardGenerator
+
+    members = Member.objects.filter(id__in=member_ids, safa_id__isnull=False)
+    results = SAFACardGenerator().bulk_generate_cards(members, format_type)
+    generated = sum(1 for r in results if r['success'])
+    return {'generated': generated, 'failed': len(results) - generated}
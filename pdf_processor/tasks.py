@@ -0,0 +1,16 @@
+from django_tasks import task
+
+
+@task(queue_name='documents')
+def process_pdf_document(pdf_document_id):
+    """Extract text, metadata and structured data from an uploaded PDF"""
+    from .models import PDFDocument
+    from .utils import PDFParser
+
+    pdf_document = PDFDocument.objects.get(pk=pdf_document_id)
+    # PDFParser catches parse errors and marks the document FAILED, so the job
+    # still succeeds and is not run again. Anything that escapes it (a missing
+    # document, a database error) is retried up to the documents queue's
+    # max_attempts (settings.TASKS)
+    PDFParser(pdf_document).process()
+    return {'pdf_document': pdf_document.pk, 'status': pdf_document.status}
@@ -9,7 +9,7 @@ from django.utils.translation import gettext_lazy as _
 
 from .models import PDFDocument, PDFExtractedData
 from .forms import PDFUploadForm
-from .utils import PDFParser, process_pdf
+from .tasks import process_pdf_document
 
 class PDFUploadView(LoginRequiredMixin, CreateView):
     """View for uploading PDF documents"""
@@ -76,21 +76,14 @@ class PDFProcessView(LoginRequiredMixin, View):
             messages.warning(request, _('This document is already being processed.'))
             return redirect('pdf_processor:pdf-detail', pk=pk)
 
-        # Process the PDF document
-        try:
-            pdf_document.status = 'PROCESSING'
-            pdf_document.save()
-
-            # Process the PDF
-            parser = PDFParser(pdf_document)
-            parser.process()
-
-            messages.success(request, _('PDF document processed successfully.'))
-        except Exception as e:
-            pdf_document.status = 'FAILED'
-            pdf_document.error_message = str(e)
-            pdf_document.save()
-            messages.error(request, _('Error processing PDF document: {}').format(str(e)))
+        # Parsing (with OCR fallback) can take minutes, so it runs as a background job;
+        # the detail page shows the document as processing until the job finishes
+        pdf_document.status = 'PROCESSING'
+        pdf_document.error_message = ''
+        pdf_document.save(update_fields=['status', 'error_message', 'modified'])
+        process_pdf_document.enqueue_for(request.user, pdf_document.pk)
+
+        messages.success(request, _('PDF document queued for processing.'))
 
         return redirect('pdf_processor:pdf-detail', pk=pk)
 
@@ -3,7 +3,6 @@ from django.contrib.admin.views.decorators import staff_member_required
 from django.db.models import Sum, Count, Q
 from django.utils import timezone
 from datetime import timedelta
-from django.contrib.sessions.models import Session
 from django.contrib import messages
 from django.http import JsonResponse
 from django.core.paginator import Paginator
@@ -12,6 +11,9 @@ from membership.models import Member
 from geography.models import Club
 from accounts.models import CustomUser
 from accounts.forms import UserManagementForm
+from accounts import presence
+
+ONLINE_USERS_LIMIT = 50
 
 
 @staff_member_required
@@ -23,15 +25,9 @@ def superuser_dashboard(request):
     last_7_days = now - timedelta(days=7)
     
     # ==== ONLINE USERS ====
-    sessions = Session.objects.filter(expire_date__gte=timezone.now())
-    user_ids = []
-    for session in sessions:
-        session_data = session.get_decoded()
-        user_id = session_data.get('_auth_user_id')
-        if user_id:
-            user_ids.append(user_id)
-    
-    online_users = CustomUser.objects.filter(id__in=user_ids).select_related('province', 'region')
+    # Recorded by accounts.presence.PresenceMiddleware
+    online_users = presence.online_users(minutes=15, now=now).select_related('province', 'region')[:ONLINE_USERS_LIMIT]
+    presence_metrics = presence.presence_counts(now=now)
 
     # ==== INVOICES & REVENUE METRICS ====
     try:
@@ -168,6 +164,7 @@ def superuser_dashboard(request):
 
     context = {
         'online_users': online_users,
+        'presence_metrics': presence_metrics,
         'invoice_metrics': invoice_metrics,
         'membership_metrics': membership_metrics,
         'league_metrics': league_metrics,
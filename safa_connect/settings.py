@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     'crispy_forms',
     'crispy_bootstrap5',
     'widget_tweaks',
+    'django_tasks',
     
     # Local apps - cleaned up
     'geography.apps.GeographyConfig',
@@ -80,6 +81,8 @@ MIDDLEWARE = [
     'django.middleware.common.BrokenLinkEmailsMiddleware',
     'accounts.middleware.AdminFormErrorMiddleware',
     'accounts.middleware.DocumentAccessMiddleware',  # Document tracking and watermarking
+    'membership.season_cache.SeasonCacheMiddleware',  # Active season / fee table cache version check
+    'accounts.presence.PresenceMiddleware',  # Throttled last-seen tracking for online users
 ]
 
 ROOT_URLCONF = 'safa_connect.urls'
@@ -124,6 +127,39 @@ DATABASES = {
     }
 
 
+# Caches
+# 'shared' is visible to every worker process on this host; the season/fee cache
+# keeps its version key there. Point it at Redis or Memcached when running on
+# more than one host.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'shared'),
+    },
+}
+
+
+# Background jobs
+# Tasks are queued as utils.BackgroundJob rows and run by `manage.py run_jobs`
+# workers (see utils/jobs.py). concurrency caps the jobs of a queue running at
+# once across all workers.
+TASKS = {
+    'default': {
+        'BACKEND': 'utils.jobs.JobBackend',
+        'QUEUES': {
+            'default': {'concurrency': 2},
+            'email': {'concurrency': 4, 'max_attempts': 5, 'retry_backoff': 60},
+            'documents': {'concurrency': 2, 'max_attempts': 2},
+            'verification': {'concurrency': 1, 'max_attempts': 2},
+            'cards': {'concurrency': 1, 'max_attempts': 2},
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -280,7 +316,7 @@ LOGGING = {
 # Django REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.token_auth.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -46,6 +46,7 @@ urlpatterns = [
     path('store/', include('merchandise.urls', namespace='merchandise')),
     path('pwa/', include('pwa.urls', namespace='pwa')),
     path('legal/', include('legal.urls', namespace='legal')),
+    path('jobs/', include('utils.urls', namespace='jobs')),
     path('', TemplateView.as_view(template_name='home.html'), name='home'),  # Add home page instead
 ]
 
@@ -1,24 +1,31 @@
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from .models import TournamentRegistration
-from .tournament_models import TournamentTeam
-import threading
+from utils.bulk import defer as defer_bulk, register_flush
+
+# Teams whose photo changed inside utils.bulk.bulk_operation(); regenerated once each at the end
+BULK_TEAM_PHOTOS = 'tournament_verification.team_photos'
+
+
+def generate_team_photos(team_ids):
+    """Regenerate team photos in a background job once the registrations are committed"""
+    from . import tasks
+
+    team_ids = [str(team_id) for team_id in team_ids]
+    transaction.on_commit(lambda: tasks.generate_team_photos.enqueue(team_ids))
+
+
+register_flush(BULK_TEAM_PHOTOS, generate_team_photos)
 
 @receiver(post_save, sender=TournamentRegistration)
 def generate_team_photo_on_registration(sender, instance, created, **kwargs):
     """Automatically generate team photo when a player registers"""
     if created and instance.team and instance.verification_status == 'VERIFIED':
+        if defer_bulk(BULK_TEAM_PHOTOS, instance.team_id):
+            return
         # Generate team photo in background to avoid blocking the request
-        def generate_photo():
-            try:
-                instance.team.generate_team_photo()
-            except Exception as e:
-                print(f"Error generating team photo for {instance.team.name}: {e}")
-        
-        # Run in background thread
-        thread = threading.Thread(target=generate_photo)
-        thread.daemon = True
-        thread.start()
+        generate_team_photos([instance.team_id])
 
 @receiver(post_save, sender=TournamentRegistration)
 def update_team_photo_on_verification(sender, instance, created, **kwargs):
@@ -27,15 +34,9 @@ def update_team_photo_on_verification(sender, instance, created, **kwargs):
         # Check if this is a status change to VERIFIED
         if hasattr(instance, '_previous_verification_status'):
             if instance._previous_verification_status != 'VERIFIED':
+                if defer_bulk(BULK_TEAM_PHOTOS, instance.team_id):
+                    return
                 # Generate team photo in background
-                def generate_photo():
-                    try:
-                        instance.team.generate_team_photo()
-                    except Exception as e:
-                        print(f"Error updating team photo for {instance.team.name}: {e}")
-                
-                thread = threading.Thread(target=generate_photo)
-                thread.daemon = True
-                thread.start()
+                generate_team_photos([instance.team_id])
 
 
@@ -0,0 +1,76 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django_tasks import task
+
+logger = logging.getLogger(__name__)
+
+
+@task(queue_name='verification')
+def auto_verify_registration(registration_id, verified_by_id):
+    """Compare a registration's live photo with the player's profile photo and record the outcome"""
+    from .facial_verification import facial_verifier
+    from .models import TournamentRegistration, VerificationLog
+
+    registration = TournamentRegistration.objects.select_related('player').get(id=registration_id)
+    verified_by = get_user_model().objects.filter(pk=verified_by_id).first()
+
+    stored_photo_path = None
+    if registration.player and hasattr(registration.player, 'profile_pic') and registration.player.profile_pic:
+        stored_photo_path = registration.player.profile_pic.path
+
+    verification_result = facial_verifier.verify_faces(
+        live_photo_path=registration.live_photo.path,
+        stored_photo_path=stored_photo_path
+    )
+
+    # Determine verification status based on result
+    if verification_result['verified'] and verification_result['confidence'] > 0.7:
+        status = 'VERIFIED'
+        notes = f"Auto-verified: Confidence {verification_result['confidence']:.2f}"
+    elif verification_result['confidence'] > 0.5:
+        status = 'MANUAL_REVIEW'
+        notes = f"Auto-review: Confidence {verification_result['confidence']:.2f} - requires manual review"
+    else:
+        status = 'FAILED'
+        notes = f"Auto-failed: Confidence {verification_result['confidence']:.2f} - {verification_result.get('error', 'Low confidence')}"
+
+    registration.verification_status = status
+    registration.verification_score = verification_result['confidence']
+    registration.verification_notes = notes
+    registration.verified_at = timezone.now()
+    registration.verified_by = verified_by
+    registration.save()
+
+    VerificationLog.objects.create(
+        registration=registration,
+        verification_status=status,
+        notes=notes,
+        processed_by=verified_by
+    )
+
+    # Same shape as the synchronous response the verification page renders
+    return {
+        'success': True,
+        'verification_result': verification_result,
+        'status': status,
+        'confidence': verification_result['confidence'],
+        'message': f'Verification completed with {verification_result["confidence"]:.2f} confidence'
+    }
+
+
+@task(queue_name='documents')
+def generate_team_photos(team_ids):
+    """Regenerate the team photos of the given teams; a failing team does not stop the others"""
+    from .tournament_models import TournamentTeam
+
+    generated = failed = 0
+    for team in TournamentTeam.objects.filter(pk__in=team_ids):
+        try:
+            team.generate_team_photo()
+            generated += 1
+        except Exception:
+            logger.exception(f"Error generating team photo for {team.name}")
+            failed += 1
+    return {'generated': generated, 'failed': failed}
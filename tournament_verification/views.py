@@ -4,6 +4,7 @@ from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
+from django.urls import reverse
 from django.utils import timezone
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
@@ -13,6 +14,7 @@ import os
 from PIL import Image
 import io
 
+from . import tasks
 from .models import TournamentRegistration, VerificationLog
 from .tournament_models import TournamentCompetition, TournamentPlayer, TournamentTeam, TournamentFixture, TournamentTeamPlayer
 from accounts.models import CustomUser
@@ -142,57 +144,15 @@ def auto_verify_registration(request, registration_id):
                 'error': 'No live photo available for verification'
             })
         
-        # For now, we'll use a simple approach:
-        # 1. Check if the player has a stored photo (from their profile)
-        # 2. If not, we'll need to implement a way to store reference photos
-        
-        stored_photo_path = None
-        if registration.player and hasattr(registration.player, 'profile_pic') and registration.player.profile_pic:
-            stored_photo_path = registration.player.profile_pic.path
-        
-        # Perform facial verification
-        verification_result = facial_verifier.verify_faces(
-            live_photo_path=registration.live_photo.path,
-            stored_photo_path=stored_photo_path
-        )
-        
-        # Determine verification status based on result
-        if verification_result['verified'] and verification_result['confidence'] > 0.7:
-            status = 'VERIFIED'
-            notes = f"Auto-verified: Confidence {verification_result['confidence']:.2f}"
-        elif verification_result['confidence'] > 0.5:
-            status = 'MANUAL_REVIEW'
-            notes = f"Auto-review: Confidence {verification_result['confidence']:.2f} - requires manual review"
-        else:
-            status = 'FAILED'
-            notes = f"Auto-failed: Confidence {verification_result['confidence']:.2f} - {verification_result.get('error', 'Low confidence')}"
-        
-        # Update registration
-        registration.verification_status = status
-        registration.verification_score = verification_result['confidence']
-        registration.verification_notes = notes
-        registration.verified_at = timezone.now()
-        registration.verified_by = request.user
-        registration.save()
-        
-        # Create verification log
-        VerificationLog.objects.create(
-            registration=registration,
-            verification_status=status,
-            notes=notes,
-            processed_by=request.user
-        )
-        
-        response_data = {
+        # Face matching takes several seconds, so it runs as a background job;
+        # the page polls status_url for the outcome
+        job = tasks.auto_verify_registration.enqueue_for(request.user, str(registration.id), request.user.pk)
+        return JsonResponse({
             'success': True,
-            'verification_result': verification_result,
-            'status': status,
-            'confidence': verification_result['confidence'],
-            'message': f'Verification completed with {verification_result["confidence"]:.2f} confidence'
-        }
-        
-        print(f"DEBUG: Auto-verify response: {response_data}")
-        return JsonResponse(response_data)
+            'queued': True,
+            'job_id': job.id,
+            'status_url': reverse('jobs:job_status', kwargs={'job_id': job.id})
+        }, status=202)
         
     except TournamentRegistration.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'Registration not found'})
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
+from .models import BackgroundJob, DocumentCounter, SAFAIdPool
 
 class ModelWithLogoAdmin(admin.ModelAdmin):
     """Base admin class for models with logo functionality"""
@@ -19,4 +20,29 @@ class ModelWithLogoAdmin(admin.ModelAdmin):
         return '-'
 
     display_logo.short_description = 'Logo'
-    display_logo.allow_tags = True
\ No newline at end of file
+    display_logo.allow_tags = True
+
+@admin.register(DocumentCounter)
+class DocumentCounterAdmin(admin.ModelAdmin):
+    list_display = ['key', 'value', 'updated_at']
+    search_fields = ['key']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(SAFAIdPool)
+class SAFAIdPoolAdmin(admin.ModelAdmin):
+    list_display = ['safa_id', 'is_claimed', 'claimed_by', 'claimed_at']
+    list_filter = ['is_claimed', 'claimed_by']
+    search_fields = ['safa_id']
+    readonly_fields = ['created_at', 'claimed_at']
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ['task_path', 'queue_name', 'status', 'attempts', 'enqueued_at', 'started_at', 'finished_at']
+    list_filter = ['status', 'queue_name']
+    search_fields = ['task_path', 'id']
+    readonly_fields = [
+        'id', 'task_path', 'queue_name', 'backend_name', 'priority', 'args_kwargs', 'attempts',
+        'max_attempts', 'enqueued_at', 'started_at', 'finished_at', 'worker', 'result', 'error', 'requested_by'
+    ]
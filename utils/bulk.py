@@ -0,0 +1,107 @@
+"""
+Bulk mode for imports, fixture loads and data migrations.
+
+Model signals and save() hooks do per-row work (workflow rows, quota
+counters, dashboard snapshots, search index entries, card and wallet
+set-up). Inside ``bulk_operation()`` those hooks record what they would have
+touched instead, keyed by effect, and the work is done once per key when the
+outermost block exits:
+
+    with bulk_operation() as bulk:
+        for row in rows:
+            Member.objects.create(**row)
+    bulk.summary()   # {'membership.workflows': 500, 'membership.quotas': 12, ...}
+
+Hooks take part with ``defer()``, which records an item and returns True
+inside a bulk operation (the hook should then return) or False outside one:
+
+    if bulk.defer(QUOTA_RECONCILE, (club_id, season_id)):
+        return
+
+and each effect registers the function that handles its items in one go with
+``register_flush(key, func)``; func receives {item: value} for every item
+recorded under the key, where value is the one passed on the first defer()
+of that item.
+
+Nested blocks join the outermost one. If the block raises, what was recorded
+is still flushed for the rows that were written, unless the surrounding
+transaction is being rolled back.
+"""
+import contextvars
+import logging
+from contextlib import contextmanager
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('bulk_operation', default=None)
+_flushers = {}
+
+
+class BulkOperation:
+    """Side effects recorded during a bulk operation"""
+
+    def __init__(self):
+        self.deferred = {}
+        self.flushed = {}
+
+    def defer(self, key, item, value=None):
+        self.deferred.setdefault(key, {}).setdefault(item, value)
+
+    def flush(self):
+        """Run each registered effect once over its recorded items"""
+        for key, func in _flushers.items():
+            items = self.deferred.pop(key, None)
+            if items:
+                func(items)
+                self.flushed[key] = len(items)
+        for key in self.deferred:
+            logger.warning(f"No flush registered for deferred bulk effect {key}")
+
+    def summary(self):
+        """{effect key: number of distinct items it was run for}"""
+        return dict(self.flushed)
+
+
+def in_bulk_operation():
+    return _current.get() is not None
+
+
+def defer(key, item, value=None):
+    """Record `item` under `key` if a bulk operation is active; returns whether it was"""
+    operation = _current.get()
+    if operation is None:
+        return False
+    operation.defer(key, item, value)
+    return True
+
+
+def register_flush(key, func):
+    """Handle every item deferred under `key` with func({item: value}) at the end"""
+    _flushers[key] = func
+
+
+@contextmanager
+def bulk_operation():
+    """Defer per-row signal side effects until the block exits (see module docstring)"""
+    outer = _current.get()
+    if outer is not None:
+        yield outer
+        return
+
+    operation = BulkOperation()
+    token = _current.set(operation)
+    try:
+        yield operation
+    except Exception:
+        _current.reset(token)
+        if not (connection.in_atomic_block and connection.needs_rollback):
+            try:
+                operation.flush()
+            except Exception:
+                logger.exception("Failed to apply deferred bulk effects")
+        raise
+    else:
+        _current.reset(token)
+        operation.flush()
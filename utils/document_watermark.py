@@ -1,33 +1,75 @@
 """
 Document watermarking utilities for SAFA Connect system
 Adds watermarks to documents when downloaded to track unauthorized distribution
+
+Images: fonts are loaded once per process, and only the corner the stamp
+covers is composited - the rest of the image is never converted or copied.
+
+PDFs: the stamp and the diagonal banner are drawn once per page size on a
+one-page overlay document, and every page shows that page by reference
+(show_pdf_page), so the overlay is stored once as a shared Form XObject
+instead of being re-inserted as text on every page.
+
+Renders are CPU-heavy (decoding, encoding, compressing); render_pool() is a
+bounded thread pool to run them in. Pillow and MuPDF release the GIL while
+they work, and the bound keeps simultaneous downloads from oversubscribing
+the CPU.
 """
 import os
-import io
-from datetime import datetime
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
-from PIL.ImageColor import getcolor
 import fitz  # PyMuPDF for PDF handling
 from django.conf import settings
-from django.core.files.base import ContentFile
 from django.utils import timezone
 import tempfile
 
+WATERMARK_RENDER_THREADS = getattr(settings, 'WATERMARK_RENDER_THREADS', min(4, os.cpu_count() or 1))
+FONT_CANDIDATES = ('arial.ttf', 'DejaVuSans.ttf')
+DIAGONAL_TEXT = "SAFA CONFIDENTIAL - UNAUTHORIZED DISTRIBUTION PROHIBITED"
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def load_font(size):
+    """The first available TrueType font at size, or Pillow's default; loaded once per process"""
+    for name in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def render_pool():
+    """Process-wide thread pool for watermark renders"""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ThreadPoolExecutor(max_workers=WATERMARK_RENDER_THREADS, thread_name_prefix='watermark')
+        return _render_pool
+
 
 class DocumentWatermarker:
     """Handle watermarking of documents with SAFA branding and user info"""
-    
+
     def __init__(self):
         self.watermark_color = (255, 0, 0, 100)  # Red with transparency
         self.safa_color = (8, 107, 60, 120)  # SAFA Green with transparency
         self.font_size = 24
         self.diagonal_angle = 45
-        
+        self.stamp_padding = 20
+        self.stamp_margin = 50
+
     def create_watermark_text(self, user, download_time=None, unauthorized_warning=True):
         """Create watermark text with user info and warnings"""
         if download_time is None:
             download_time = timezone.now()
-        
+
         watermark_lines = [
             "SOUTH AFRICAN FOOTBALL ASSOCIATION",
             "SAFA GLOBAL SYSTEM",
@@ -38,7 +80,7 @@ class DocumentWatermarker:
             f"Downloaded: {download_time.strftime('%Y-%m-%d %H:%M:%S')}",
             "",
         ]
-        
+
         if unauthorized_warning:
             watermark_lines.extend([
                 "⚠️ CONFIDENTIAL DOCUMENT ⚠️",
@@ -48,122 +90,121 @@ class DocumentWatermarker:
                 "All access is logged and monitored",
                 "Report unauthorized use to: security@safa.net"
             ])
-        
+
         return "\n".join(watermark_lines)
-    
+
+    def build_image_stamp(self, watermark_text):
+        """RGBA stamp: the watermark text on a semi-transparent box, sized to fit"""
+        font = load_font(self.font_size)
+        padding = self.stamp_padding
+        _left, _top, right, bottom = ImageDraw.Draw(Image.new('RGBA', (1, 1))).multiline_textbbox(
+            (0, 0), watermark_text, font=font
+        )
+        stamp = Image.new('RGBA', (right + 2 * padding, bottom + 2 * padding), (0, 0, 0, 128))
+        ImageDraw.Draw(stamp).multiline_text((padding, padding), watermark_text, fill=self.watermark_color, font=font)
+        return stamp
+
     def watermark_image(self, image_path, user, output_path=None):
         """Add watermark to image files (JPG, PNG)"""
         try:
             with Image.open(image_path) as img:
-                # Convert to RGBA for transparency support
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-                
-                # Create watermark overlay
-                overlay = Image.new('RGBA', img.size, (255, 255, 255, 0))
-                draw = ImageDraw.Draw(overlay)
-                
-                # Get watermark text
-                watermark_text = self.create_watermark_text(user)
-                
-                # Try to load a font, fallback to default
-                try:
-                    font = ImageFont.truetype("arial.ttf", self.font_size)
-                except:
-                    font = ImageFont.load_default()
-                
-                # Calculate text positioning
-                text_bbox = draw.textbbox((0, 0), watermark_text, font=font)
-                text_width = text_bbox[2] - text_bbox[0]
-                text_height = text_bbox[3] - text_bbox[1]
-                
-                # Position watermark in bottom right corner
-                x = img.width - text_width - 50
-                y = img.height - text_height - 50
-                
-                # Draw semi-transparent background
-                padding = 20
-                draw.rectangle([
-                    x - padding, y - padding,
-                    x + text_width + padding, y + text_height + padding
-                ], fill=(0, 0, 0, 128))
-                
-                # Draw watermark text
-                draw.multiline_text((x, y), watermark_text, fill=self.watermark_color, font=font)
-                
-                # Composite the watermark onto the original image
-                watermarked = Image.alpha_composite(img, overlay)
-                
+                if img.mode not in ('RGB', 'RGBA'):
+                    has_alpha = img.mode in ('LA', 'PA') or 'transparency' in img.info
+                    img = img.convert('RGBA' if has_alpha else 'RGB')
+
+                stamp = self.build_image_stamp(self.create_watermark_text(user))
+
+                # Bottom right corner; clip the stamp if the image is smaller than it
+                offset = self.stamp_margin - self.stamp_padding
+                left = img.width - stamp.width - offset
+                top = img.height - stamp.height - offset
+                if left < 0 or top < 0:
+                    stamp = stamp.crop((max(-left, 0), max(-top, 0), stamp.width, stamp.height))
+                    left, top = max(left, 0), max(top, 0)
+
+                # Composite the stamped region only
+                if img.mode == 'RGBA':
+                    img.alpha_composite(stamp, dest=(left, top))
+                else:
+                    img.paste(stamp, (left, top), stamp)
+
                 # Save the watermarked image
                 if output_path is None:
                     output_path = image_path
-                
+
                 # Convert back to RGB if saving as JPEG
-                if output_path.lower().endswith('.jpg') or output_path.lower().endswith('.jpeg'):
-                    watermarked = watermarked.convert('RGB')
-                
-                watermarked.save(output_path, quality=95)
+                if output_path.lower().endswith(('.jpg', '.jpeg')) and img.mode != 'RGB':
+                    img = img.convert('RGB')
+
+                img.save(output_path, quality=95)
                 return output_path
-                
+
         except Exception as e:
             print(f"Error watermarking image: {e}")
             return None
-    
+
+    def build_pdf_overlay(self, width, height, watermark_text):
+        """One-page PDF holding the stamp and diagonal banner for pages of this size"""
+        overlay = fitz.open()
+        page = overlay.new_page(width=width, height=height)
+
+        # Watermark text box in bottom right
+        text_rect = fitz.Rect(width - 300, height - 200, width - 20, height - 20)
+        page.draw_rect(text_rect, color=(0, 0, 0), fill=(1, 1, 1), width=1)
+        page.insert_textbox(
+            text_rect,
+            watermark_text,
+            fontsize=10,
+            color=(1, 0, 0),  # Red color
+            align=fitz.TEXT_ALIGN_LEFT
+        )
+
+        # Diagonal banner across the middle of the page
+        center = fitz.Point(width / 2, height / 2)
+        text_width = fitz.get_text_length(DIAGONAL_TEXT, fontsize=20)
+        page.insert_text(
+            fitz.Point(center.x - text_width / 2, center.y),
+            DIAGONAL_TEXT,
+            fontsize=20,
+            color=(0.8, 0.8, 0.8),  # Light gray
+            morph=(center, fitz.Matrix(self.diagonal_angle))
+        )
+        return overlay
+
     def watermark_pdf(self, pdf_path, user, output_path=None):
         """Add watermark to PDF files"""
         try:
             doc = fitz.open(pdf_path)
             watermark_text = self.create_watermark_text(user)
-            
+
+            # One overlay per page size, shown on each page by reference
+            overlays = {}
             for page in doc:
-                # Get page dimensions
                 rect = page.rect
-                
-                # Create watermark text box in bottom right
-                text_rect = fitz.Rect(
-                    rect.width - 300, rect.height - 200,
-                    rect.width - 20, rect.height - 20
-                )
-                
-                # Add semi-transparent background rectangle
-                page.draw_rect(text_rect, color=(0, 0, 0), fill=(1, 1, 1), width=1)
-                
-                # Add watermark text
-                page.insert_textbox(
-                    text_rect,
-                    watermark_text,
-                    fontsize=10,
-                    color=(1, 0, 0),  # Red color
-                    align=fitz.TEXT_ALIGN_LEFT
-                )
-                
-                # Add diagonal watermark across the page
-                diagonal_rect = fitz.Rect(50, rect.height/2 - 50, rect.width - 50, rect.height/2 + 50)
-                page.insert_textbox(
-                    diagonal_rect,
-                    "SAFA CONFIDENTIAL - UNAUTHORIZED DISTRIBUTION PROHIBITED",
-                    fontsize=20,
-                    color=(0.8, 0.8, 0.8),  # Light gray
-                    align=fitz.TEXT_ALIGN_CENTER,
-                    rotate=45
-                )
-            
+                size = (round(rect.width, 2), round(rect.height, 2))
+                if size not in overlays:
+                    overlays[size] = self.build_pdf_overlay(rect.width, rect.height, watermark_text)
+                page.show_pdf_page(rect, overlays[size], 0, overlay=True)
+
             # Save watermarked PDF
-            if output_path is None:
+            if output_path is None or output_path == pdf_path:
                 output_path = pdf_path
-                
-            doc.save(output_path)
+                doc.save(pdf_path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+            else:
+                doc.save(output_path, garbage=1, deflate=True)
             doc.close()
+            for overlay in overlays.values():
+                overlay.close()
             return output_path
-            
+
         except Exception as e:
             print(f"Error watermarking PDF: {e}")
             return None
-    
+
     def watermark_document(self, file_path, user, output_path=None):
         """Watermark any supported document type"""
         file_ext = os.path.splitext(file_path)[1].lower()
-        
+
         if file_ext in ['.jpg', '.jpeg', '.png']:
             return self.watermark_image(file_path, user, output_path)
         elif file_ext == '.pdf':
@@ -171,44 +212,33 @@ class DocumentWatermarker:
         else:
             print(f"Unsupported file type for watermarking: {file_ext}")
             return None
-    
+
+    def submit(self, file_path, user, output_path=None):
+        """Run watermark_document in the render pool; returns a Future of its result"""
+        return render_pool().submit(self.watermark_document, file_path, user, output_path)
+
     def create_watermarked_copy(self, original_file, user):
         """Create a watermarked copy of a Django FileField file"""
+        suffix = os.path.splitext(original_file.name)[1]
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(original_file.name)[1]) as temp_file:
-                # Copy original file content to temp file
-                for chunk in original_file.chunks():
-                    temp_file.write(chunk)
-                temp_file.flush()
-                
-                # Create output path for watermarked version
-                watermarked_path = temp_file.name + '_watermarked' + os.path.splitext(original_file.name)[1]
-                
-                # Apply watermark
-                result = self.watermark_document(temp_file.name, user, watermarked_path)
-                
-                if result:
-                    # Read watermarked file
-                    with open(watermarked_path, 'rb') as f:
-                        watermarked_content = f.read()
-                    
-                    # Clean up temporary files
-                    os.unlink(temp_file.name)
-                    os.unlink(watermarked_path)
-                    
-                    return watermarked_content
-                else:
-                    # Clean up and return original if watermarking failed
-                    os.unlink(temp_file.name)
+            # The watermarkers work on paths, so stage the upload in a temporary file
+            with tempfile.TemporaryDirectory() as workdir:
+                source_path = os.path.join(workdir, 'original' + suffix)
+                watermarked_path = os.path.join(workdir, 'watermarked' + suffix)
+                with open(source_path, 'wb') as temp_file:
                     original_file.seek(0)
-                    return original_file.read()
-                    
+                    shutil.copyfileobj(original_file, temp_file)
+
+                if self.submit(source_path, user, watermarked_path).result():
+                    with open(watermarked_path, 'rb') as f:
+                        return f.read()
+
         except Exception as e:
             print(f"Error creating watermarked copy: {e}")
-            # Return original file if watermarking fails
-            original_file.seek(0)
-            return original_file.read()
+
+        # Return original file if watermarking fails
+        original_file.seek(0)
+        return original_file.read()
 
 
 # Utility function for easy access
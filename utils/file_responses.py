@@ -0,0 +1,96 @@
+# utils/file_responses.py
+"""
+FileResponse with HTTP Range support.
+
+Django's FileResponse always sends the whole file. ranged_file_response()
+honours a single "bytes=" range (start-end, start- or -suffix) with a 206
+Partial Content response that streams only that slice of the open file,
+answers an unsatisfiable range with 416, and advertises Accept-Ranges on
+full responses. Multiple ranges are not supported; the whole file is sent.
+
+Usage:
+    return ranged_file_response(request, path, content_type='application/pdf')
+"""
+import os
+import re
+
+from django.http import FileResponse, HttpResponse
+from django.utils.http import http_date
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single-range Range header, None to send the
+    whole file, or False if the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if not length:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+class FileSlice:
+    """Read-only view of length bytes of an open file, from its current position"""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def ranged_file_response(request, path, content_type=None, filename='', as_attachment=False):
+    """Stream the file at path, or the slice the request's Range header asks for"""
+    stat = os.stat(path)
+    size = stat.st_size
+    byte_range = parse_range(request.headers.get('Range'), size) if request.method == 'GET' else None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = open(path, 'rb')
+    filename = filename or os.path.basename(path)
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type, filename=filename, as_attachment=as_attachment)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(
+            FileSlice(file, end - start + 1),
+            content_type=content_type or 'application/octet-stream',
+            filename=filename,
+            as_attachment=as_attachment,
+            status=206,
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
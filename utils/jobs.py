@@ -0,0 +1,359 @@
+"""
+Background jobs on django-tasks.
+
+Tasks are declared with django_tasks' ``@task`` decorator and enqueued with
+``task.enqueue(...)``, or ``task.enqueue_for(user, ...)`` to record who asked
+for the job so they can poll it. The JobBackend configured in settings.TASKS
+stores every enqueue as a BackgroundJob row, and ``manage.py run_jobs``
+workers claim ready rows, run them and record the outcome. A job that raises
+is retried with exponential backoff until its queue's max_attempts is used up.
+
+Queues are configured in settings.TASKS['default']['QUEUES'], e.g.
+
+    'email': {'concurrency': 4, 'max_attempts': 5}
+
+* concurrency - how many jobs of the queue may run at once across all workers;
+* max_attempts - runs before a failing job is marked FAILED;
+* retry_backoff / max_retry_delay - seconds before the first retry (doubled
+  for each further one) and the cap on that delay;
+* timeout - seconds a job may stay RUNNING before its worker is presumed dead
+  and the job is requeued.
+
+queue_stats() reports depth and latency per queue for monitoring (the
+job_queue_stats command and the /jobs/stats/ endpoint).
+"""
+import logging
+import os
+import random
+import socket
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import close_old_connections
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Min, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from django_tasks import ResultStatus, Task, tasks
+from django_tasks.backends.base import BaseTaskBackend
+from django_tasks.exceptions import ResultDoesNotExist
+from django_tasks.task import TaskResult
+from django_tasks.utils import json_normalize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_OPTIONS = {
+    'concurrency': 1,
+    'max_attempts': 3,
+    'retry_backoff': 30,
+    'max_retry_delay': 3600,
+    'timeout': 1800,
+}
+
+# Ready jobs a worker tries to claim per poll before giving up to other workers
+CLAIM_CANDIDATES = 10
+# Finished jobs are kept this long for status polling and monitoring
+JOB_RETENTION = timedelta(days=7)
+PRUNE_INTERVAL = timedelta(hours=1)
+
+
+@dataclass
+class JobTask(Task):
+    """A django-tasks Task that can record the user a job was enqueued for"""
+
+    def enqueue_for(self, user, *args, **kwargs):
+        return self.get_backend().enqueue(self, args, kwargs, requested_by=user)
+
+
+@dataclass
+class JobResult(TaskResult):
+    """TaskResult backed by a BackgroundJob row"""
+    job: Any = None
+
+    def refresh(self):
+        self.job.refresh_from_db()
+        self.status = ResultStatus[self.job.status]
+        self._result = self.job.result
+
+
+def load_task(job):
+    task = import_string(job.task_path)
+    if not isinstance(task, Task):
+        raise ImproperlyConfigured(f"{job.task_path} is not a task")
+    return task
+
+
+def job_result(job, task=None):
+    result = JobResult(
+        task=task or load_task(job),
+        id=str(job.pk),
+        status=ResultStatus[job.status],
+        args=job.args_kwargs.get('args', []),
+        kwargs=job.args_kwargs.get('kwargs', {}),
+        backend=job.backend_name,
+        job=job,
+    )
+    result._result = job.result
+    return result
+
+
+class JobBackend(BaseTaskBackend):
+    """django-tasks backend that queues tasks as BackgroundJob rows"""
+    task_class = JobTask
+    supports_defer = True
+    supports_get_result = True
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.queues = options.get('QUEUES', {})
+
+    def queue_options(self, queue_name):
+        return {**DEFAULT_QUEUE_OPTIONS, **self.queues.get(queue_name, {})}
+
+    def enqueue(self, task, args, kwargs, requested_by=None):
+        from .models import BackgroundJob
+
+        self.validate_task(task)
+        if requested_by is not None and not requested_by.is_authenticated:
+            requested_by = None
+        job = BackgroundJob.objects.create(
+            task_path=task.module_path,
+            queue_name=task.queue_name,
+            backend_name=self.alias,
+            priority=task.priority,
+            args_kwargs=json_normalize({'args': args, 'kwargs': kwargs}),
+            run_after=task.run_after,
+            max_attempts=self.queue_options(task.queue_name)['max_attempts'],
+            requested_by=requested_by,
+        )
+        return job_result(job, task)
+
+    def get_result(self, result_id):
+        from .models import BackgroundJob
+
+        try:
+            return job_result(BackgroundJob.objects.get(pk=result_id))
+        except (BackgroundJob.DoesNotExist, ValidationError) as e:
+            raise ResultDoesNotExist(result_id) from e
+
+    def check(self, **kwargs):
+        return []
+
+
+def retry_delay(options, attempts):
+    """Backoff before the next run of a job that has failed `attempts` times"""
+    delay = min(options['retry_backoff'] * 2 ** (attempts - 1), options['max_retry_delay'])
+    # Up to 10% jitter so jobs that failed together do not retry together
+    return timedelta(seconds=delay * random.uniform(1, 1.1))
+
+
+# ----------------------------------------------------------------------
+# Worker
+# ----------------------------------------------------------------------
+
+class Worker:
+    """Claims and runs ready jobs from the given queues ('*' for all)"""
+
+    def __init__(self, backend_name='default', queue_names=('*',), name=None):
+        self.backend_name = backend_name
+        self.backend = tasks[backend_name]
+        self.queue_names = None if '*' in queue_names else list(queue_names)
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.running = True
+        self.last_pruned = None
+
+    def jobs(self):
+        from .models import BackgroundJob
+
+        jobs = BackgroundJob.objects.filter(backend_name=self.backend_name)
+        if self.queue_names is not None:
+            jobs = jobs.filter(queue_name__in=self.queue_names)
+        return jobs
+
+    def running_counts(self):
+        from .models import BackgroundJob
+
+        rows = (
+            self.jobs().filter(status=BackgroundJob.STATUS_RUNNING)
+            .values('queue_name').annotate(count=Count('pk')).order_by()
+        )
+        return {row['queue_name']: row['count'] for row in rows}
+
+    def full_queues(self):
+        return [
+            queue_name for queue_name, count in self.running_counts().items()
+            if count >= self.backend.queue_options(queue_name)['concurrency']
+        ]
+
+    def claim(self):
+        """Mark the next ready job RUNNING for this worker and return it, or None"""
+        from .models import BackgroundJob
+
+        now = timezone.now()
+        ready = (
+            self.jobs().filter(status=BackgroundJob.STATUS_NEW)
+            .filter(Q(run_after__isnull=True) | Q(run_after__lte=now))
+            .exclude(queue_name__in=self.full_queues())
+            .order_by('-priority', 'enqueued_at')
+        )
+        for job_id, queue_name in ready.values_list('pk', 'queue_name')[:CLAIM_CANDIDATES]:
+            # The status condition makes the claim atomic between workers
+            claimed = BackgroundJob.objects.filter(pk=job_id, status=BackgroundJob.STATUS_NEW).update(
+                status=BackgroundJob.STATUS_RUNNING,
+                started_at=now,
+                attempts=F('attempts') + 1,
+                worker=self.name,
+            )
+            if not claimed:
+                continue
+            if self.running_counts().get(queue_name, 0) > self.backend.queue_options(queue_name)['concurrency']:
+                # Another worker filled the queue between the check and the claim
+                BackgroundJob.objects.filter(pk=job_id).update(
+                    status=BackgroundJob.STATUS_NEW,
+                    started_at=None,
+                    attempts=F('attempts') - 1,
+                    worker='',
+                )
+                continue
+            return BackgroundJob.objects.get(pk=job_id)
+        return None
+
+    def execute(self, job):
+        """Run a claimed job and record its result, retry or failure"""
+        from .models import BackgroundJob
+
+        options = self.backend.queue_options(job.queue_name)
+        try:
+            task = load_task(job)
+            value = task.call(*job.args_kwargs.get('args', []), **job.args_kwargs.get('kwargs', {}))
+            job.result = json_normalize(value)
+            job.status = BackgroundJob.STATUS_COMPLETE
+            job.error = ''
+            job.finished_at = timezone.now()
+        except Exception as e:
+            logger.exception(f"Job {job.pk} ({job.task_path}) failed on attempt {job.attempts}")
+            job.error = f'{type(e).__name__}: {e}'
+            if job.attempts < job.max_attempts:
+                job.status = BackgroundJob.STATUS_NEW
+                job.run_after = timezone.now() + retry_delay(options, job.attempts)
+            else:
+                job.status = BackgroundJob.STATUS_FAILED
+                job.finished_at = timezone.now()
+        job.save(update_fields=['result', 'status', 'error', 'run_after', 'finished_at'])
+        return job
+
+    def requeue_stale(self):
+        """Requeue (or fail) jobs whose worker stopped while running them"""
+        from .models import BackgroundJob
+
+        now = timezone.now()
+        requeued = 0
+        for queue_name in self.running_counts():
+            timeout = self.backend.queue_options(queue_name)['timeout']
+            stale = self.jobs().filter(
+                status=BackgroundJob.STATUS_RUNNING,
+                queue_name=queue_name,
+                started_at__lt=now - timedelta(seconds=timeout)
+            )
+            error = f'Worker stopped responding after {timeout}s'
+            requeued += stale.filter(attempts__lt=F('max_attempts')).update(
+                status=BackgroundJob.STATUS_NEW, run_after=now, error=error
+            )
+            stale.update(status=BackgroundJob.STATUS_FAILED, finished_at=now, error=error)
+        return requeued
+
+    def prune(self):
+        """Delete finished jobs older than JOB_RETENTION"""
+        from .models import BackgroundJob
+
+        self.last_pruned = timezone.now()
+        deleted, _ = self.jobs().filter(
+            status__in=[BackgroundJob.STATUS_COMPLETE, BackgroundJob.STATUS_FAILED],
+            finished_at__lt=self.last_pruned - JOB_RETENTION
+        ).delete()
+        return deleted
+
+    def run_once(self):
+        """Run one ready job; returns it, or None if nothing was ready"""
+        job = self.claim()
+        if job is not None:
+            self.execute(job)
+        return job
+
+    def run(self, interval=1.0, batch=False):
+        """Process jobs until stopped (or, in batch mode, until none are ready)"""
+        logger.info(f"Worker {self.name} started for queues {self.queue_names or '*'}")
+        while self.running:
+            close_old_connections()
+            if self.last_pruned is None or timezone.now() - self.last_pruned > PRUNE_INTERVAL:
+                self.requeue_stale()
+                self.prune()
+            if self.run_once() is None:
+                if batch:
+                    return
+                time.sleep(interval)
+
+
+# ----------------------------------------------------------------------
+# Monitoring
+# ----------------------------------------------------------------------
+
+def queue_stats(backend_name='default', window=timedelta(hours=1)):
+    """
+    Per-queue depth and latency: ready, scheduled (waiting for a retry or
+    run_after), running, completed/failed within `window`, the age of the
+    oldest ready job and the average wait from eligible to started within
+    `window`, in seconds.
+    """
+    from .models import BackgroundJob
+
+    backend = tasks[backend_name]
+    now = timezone.now()
+    since = now - window
+    eligible_at = Coalesce('run_after', 'enqueued_at')
+    is_ready = Q(status=BackgroundJob.STATUS_NEW) & (Q(run_after__isnull=True) | Q(run_after__lte=now))
+
+    rows = (
+        BackgroundJob.objects.filter(backend_name=backend_name)
+        .filter(Q(status__in=[BackgroundJob.STATUS_NEW, BackgroundJob.STATUS_RUNNING]) | Q(finished_at__gte=since))
+        .values('queue_name')
+        .annotate(
+            ready=Count('pk', filter=is_ready),
+            scheduled=Count('pk', filter=Q(status=BackgroundJob.STATUS_NEW, run_after__gt=now)),
+            running=Count('pk', filter=Q(status=BackgroundJob.STATUS_RUNNING)),
+            completed=Count('pk', filter=Q(status=BackgroundJob.STATUS_COMPLETE)),
+            failed=Count('pk', filter=Q(status=BackgroundJob.STATUS_FAILED)),
+            oldest_ready=Min(eligible_at, filter=is_ready),
+        )
+        .order_by('queue_name')
+    )
+    waits = (
+        BackgroundJob.objects.filter(backend_name=backend_name, started_at__gte=since)
+        .values('queue_name')
+        .annotate(wait=Avg(ExpressionWrapper(F('started_at') - eligible_at, output_field=DurationField())))
+        .order_by()
+    )
+    waits = {row['queue_name']: row['wait'] for row in waits}
+
+    stats = {}
+    for queue_name in backend.queues:
+        stats[queue_name] = {
+            'queue': queue_name, 'ready': 0, 'scheduled': 0, 'running': 0,
+            'completed': 0, 'failed': 0, 'oldest_ready_age': None,
+        }
+    for row in rows:
+        queue_name = row.pop('queue_name')
+        oldest = row.pop('oldest_ready')
+        stats[queue_name] = {
+            'queue': queue_name,
+            **row,
+            'oldest_ready_age': round((now - oldest).total_seconds(), 1) if oldest else None,
+        }
+    for queue_name, entry in stats.items():
+        wait = waits.get(queue_name)
+        entry['avg_wait'] = round(wait.total_seconds(), 1) if wait is not None else None
+        entry['concurrency'] = backend.queue_options(queue_name)['concurrency']
+    return list(stats.values())
@@ -0,0 +1,136 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from accounts.models import CustomUser
+from geography.models import Club, Country, LocalFootballAssociation, NationalFederation, Province, Region
+from membership.models import ClubMemberQuota, Member, SAFASeasonConfig
+from utils.bulk import bulk_operation
+
+
+class BenchmarkRollback(Exception):
+    """Raised to discard the benchmark rows"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare creating members and user accounts row by row with per-row signal side effects '
+        'against the same inserts inside bulk_operation() (all rows rolled back)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=500,
+            help='Members and users created per run'
+        )
+        parser.add_argument(
+            '--clubs',
+            type=int,
+            default=10,
+            help='Clubs the members are spread over'
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        if rows < 1 or options['clubs'] < 1:
+            raise CommandError('--rows and --clubs must be positive')
+
+        self.stdout.write(f"{'rows':>6} {'mode':<10} {'queries':>8} {'ms':>10} {'ms/row':>8}")
+        for label, create in (('members', self.create_members), ('users', self.create_users)):
+            for bulk in (False, True):
+                try:
+                    with transaction.atomic():
+                        self.setup(options['clubs'])
+                        queries, elapsed = self.measure(lambda: create(rows), bulk)
+                        raise BenchmarkRollback
+                except BenchmarkRollback:
+                    pass
+                mode = f"{label}{' bulk' if bulk else ''}"
+                self.stdout.write(
+                    f'{rows:>6} {mode:<10} {queries:>8} {elapsed:>10.1f} {elapsed / rows:>8.2f}'
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            'Benchmark completed (all rows rolled back). Bulk query counts include the deferred effects.'
+        ))
+
+    def setup(self, club_count):
+        today = date.today()
+        admin = CustomUser.objects.create_user(
+            email='bulk-benchmark@example.com', password=None, first_name='Bulk', last_name='Benchmark'
+        )
+        SAFASeasonConfig.objects.filter(is_active=True).update(is_active=False)
+        self.season = SAFASeasonConfig.objects.create(
+            season_year=9999,
+            season_start_date=today - timedelta(days=30),
+            season_end_date=today + timedelta(days=300),
+            organization_registration_start=today - timedelta(days=30),
+            organization_registration_end=today + timedelta(days=30),
+            member_registration_start=today - timedelta(days=30),
+            member_registration_end=today + timedelta(days=300),
+            is_active=True,
+            created_by=admin
+        )
+        country = Country.objects.create(name='Benchmark Country', code='BMK')
+        self.federation = NationalFederation.objects.create(name='Benchmark Federation', country=country)
+        province = Province.objects.create(name='Benchmark Province', national_federation=self.federation)
+        region = Region.objects.create(name='Benchmark Region', province=province)
+        lfa = LocalFootballAssociation.objects.create(name='Benchmark LFA', region=region)
+        self.clubs = [
+            Club.objects.create(name=f'Benchmark FC {number}', localfootballassociation=lfa)
+            for number in range(club_count)
+        ]
+        # Room for every benchmark member, so the row-by-row run is not stopped by quota checks
+        ClubMemberQuota.objects.bulk_create([
+            ClubMemberQuota(
+                club=club, season_config=self.season,
+                max_senior_players=100000, max_junior_players=100000, max_officials=100000
+            )
+            for club in self.clubs
+        ])
+
+    def measure(self, func, bulk):
+        """(queries, milliseconds) for func, inside bulk_operation() if bulk"""
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            if bulk:
+                with bulk_operation():
+                    func()
+            else:
+                func()
+        return queries, (time.perf_counter() - started) * 1000
+
+    def create_members(self, rows):
+        for number in range(rows):
+            Member.objects.create(
+                first_name='Bench',
+                last_name=f'Member{number}',
+                email=f'bench.member.{number}@example.com',
+                role='OFFICIAL' if number % 5 == 0 else 'PLAYER',
+                status='ACTIVE',
+                date_of_birth=date(1990 + number % 20, 1, 1),
+                current_club=self.clubs[number % len(self.clubs)],
+                current_season=self.season,
+                national_federation=self.federation,
+            )
+
+    def create_users(self, rows):
+        for number in range(rows):
+            CustomUser.objects.create_user(
+                email=f'bench.user.{number}@example.com',
+                password=None,
+                first_name='Bench',
+                last_name=f'User{number}',
+                membership_status='ACTIVE',
+            )
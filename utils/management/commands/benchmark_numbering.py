@@ -0,0 +1,91 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test.utils import CaptureQueriesContext
+
+from membership.models import Invoice
+
+
+class BenchmarkRollback(Exception):
+    """Raised to discard the benchmark rows"""
+
+
+class Command(BaseCommand):
+    help = 'Compare invoice number allocation cost: legacy exists() probing vs the counter table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='10,100,1000',
+            help='Comma separated numbers of invoices already issued for the same base number'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Allocations measured per size'
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        repeat = options['repeat']
+
+        self.stdout.write(f"{'issued':>8} {'legacy q':>9} {'legacy ms':>10} {'counter q':>10} {'counter ms':>11}")
+        for size in sizes:
+            try:
+                with transaction.atomic():
+                    row = self.measure(size, repeat)
+                    raise BenchmarkRollback
+            except BenchmarkRollback:
+                pass
+            self.stdout.write(
+                f"{size:>8} {row['legacy_queries']:>9} {row['legacy_ms']:>10.2f} "
+                f"{row['counter_queries']:>10} {row['counter_ms']:>11.2f}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            'Benchmark completed (all rows rolled back). Counter cost should stay flat as "issued" grows.'
+        ))
+
+    def measure(self, size, repeat):
+        safa_id = 'BENCH'
+        base = Invoice.get_invoice_number_base(safa_id)
+        Invoice.objects.bulk_create([
+            Invoice(invoice_number=Invoice.format_invoice_number(base, sequence), invoice_type='RENEWAL')
+            for sequence in range(1, size + 1)
+        ], batch_size=1000)
+        # Seed the counter outside the timed section, as it would be after first use
+        Invoice.allocate_invoice_numbers([safa_id])
+
+        legacy = self.time_calls(lambda: self.legacy_invoice_number(base), repeat)
+        counter = self.time_calls(lambda: Invoice.allocate_invoice_numbers([safa_id]), repeat)
+        return {
+            'legacy_queries': legacy[0], 'legacy_ms': legacy[1],
+            'counter_queries': counter[0], 'counter_ms': counter[1],
+        }
+
+    def time_calls(self, func, repeat):
+        """(queries for one call, average milliseconds per call)"""
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        elapsed = time.perf_counter() - started
+        return len(queries), elapsed * 1000 / repeat
+
+    @staticmethod
+    def legacy_invoice_number(base_invoice_number):
+        """The previous allocation loop: one exists() per suffix already taken"""
+        counter = 0
+        while True:
+            if counter == 0:
+                invoice_number = base_invoice_number
+            else:
+                invoice_number = f"{base_invoice_number}-{counter:02d}"
+
+            if not Invoice.objects.filter(invoice_number=invoice_number).exists():
+                return invoice_number
+            counter += 1
@@ -0,0 +1,151 @@
+import os
+import tempfile
+import time
+
+import fitz
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageDraw, ImageFont
+
+from accounts.models import CustomUser
+from utils.document_watermark import DocumentWatermarker, render_pool
+
+
+class Command(BaseCommand):
+    help = 'Compare watermark rendering: legacy full-image/per-page rendering vs the current engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scan-mb',
+            type=float,
+            default=10,
+            help='Approximate size of the generated JPEG scan in megabytes (default 10)'
+        )
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=50,
+            help='Pages in the generated PDF (default 50)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Renders measured per case'
+        )
+
+    def handle(self, *args, **options):
+        user = CustomUser(first_name='Bench', last_name='Mark', email='benchmark@example.com', role='ADMIN_NATIONAL')
+        watermarker = DocumentWatermarker()
+        repeat = options['repeat']
+
+        with tempfile.TemporaryDirectory() as workdir:
+            scan = os.path.join(workdir, 'scan.jpg')
+            self.make_scan(scan, options['scan_mb'] * 1000 * 1000)
+            pdf = os.path.join(workdir, 'document.pdf')
+            self.make_pdf(pdf, options['pages'])
+            self.stdout.write(
+                f"Scan: {os.path.getsize(scan) / 1e6:.1f} MB; PDF: {options['pages']} pages, "
+                f"{os.path.getsize(pdf) / 1e3:.0f} KB"
+            )
+
+            self.stdout.write(f"{'case':<22} {'legacy ms':>10} {'engine ms':>10} {'speedup':>8} {'legacy KB':>10} {'engine KB':>10}")
+            text = watermarker.create_watermark_text(user)
+            for case, source, legacy, engine in [
+                ('10 MB scan', scan, lambda out: self.legacy_image(scan, text, out),
+                 lambda out: watermarker.watermark_image(scan, user, out)),
+                (f"{options['pages']}-page PDF", pdf, lambda out: self.legacy_pdf(pdf, text, out),
+                 lambda out: watermarker.watermark_pdf(pdf, user, out)),
+            ]:
+                extension = os.path.splitext(source)[1]
+                legacy_out = os.path.join(workdir, 'legacy' + extension)
+                engine_out = os.path.join(workdir, 'engine' + extension)
+                legacy_ms = self.time_calls(lambda: legacy(legacy_out), repeat)
+                engine_ms = self.time_calls(lambda: engine(engine_out), repeat)
+                self.stdout.write(
+                    f"{case:<22} {legacy_ms:>10.1f} {engine_ms:>10.1f} {legacy_ms / engine_ms:>7.1f}x "
+                    f"{os.path.getsize(legacy_out) / 1e3:>10.0f} {os.path.getsize(engine_out) / 1e3:>10.0f}"
+                )
+
+            # Four simultaneous scan downloads: one after another vs the render pool
+            outputs = [os.path.join(workdir, f'pool{number}.jpg') for number in range(4)]
+            serial_ms = self.time_calls(
+                lambda: [watermarker.watermark_image(scan, user, out) for out in outputs], 1
+            )
+            pool_ms = self.time_calls(
+                lambda: [future.result() for future in [watermarker.submit(scan, user, out) for out in outputs]], 1
+            )
+            self.stdout.write(
+                f"4 scans: {serial_ms:.0f} ms serial, {pool_ms:.0f} ms in the render pool "
+                f"({render_pool()._max_workers} threads)"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completed.'))
+
+    def time_calls(self, func, repeat):
+        """Average milliseconds per call, after one warm-up call"""
+        func()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started) * 1000 / repeat
+
+    @staticmethod
+    def make_scan(path, target_bytes):
+        """A4 at 300 dpi: a blurred page blended with noise until the JPEG reaches target_bytes"""
+        width, height = 2480, 3508
+        page = Image.frombytes('L', (width // 4, height // 4), os.urandom(width * height // 16))
+        page = page.resize((width, height)).convert('RGB')
+        noise = Image.frombytes('RGB', (width, height), os.urandom(width * height * 3))
+        for alpha in (0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0):
+            Image.blend(page, noise, alpha).save(path, quality=95)
+            if os.path.getsize(path) >= target_bytes:
+                return
+
+    @staticmethod
+    def make_pdf(path, pages):
+        doc = fitz.open()
+        for number in range(pages):
+            page = doc.new_page()
+            page.insert_textbox(
+                fitz.Rect(50, 50, page.rect.width - 50, page.rect.height - 50),
+                f"Page {number + 1}\n" + "Registration document text. " * 120,
+                fontsize=11
+            )
+        doc.save(path)
+        doc.close()
+
+    @staticmethod
+    def legacy_image(image_path, watermark_text, output_path):
+        """Previous approach: font loaded per call, full-size overlay composited over the whole image"""
+        with Image.open(image_path) as img:
+            if img.mode != 'RGBA':
+                img = img.convert('RGBA')
+            overlay = Image.new('RGBA', img.size, (255, 255, 255, 0))
+            draw = ImageDraw.Draw(overlay)
+            try:
+                font = ImageFont.truetype("arial.ttf", 24)
+            except OSError:
+                font = ImageFont.load_default()
+            text_bbox = draw.textbbox((0, 0), watermark_text, font=font)
+            x = img.width - (text_bbox[2] - text_bbox[0]) - 50
+            y = img.height - (text_bbox[3] - text_bbox[1]) - 50
+            draw.rectangle([x - 20, y - 20, img.width - 30, img.height - 30], fill=(0, 0, 0, 128))
+            draw.multiline_text((x, y), watermark_text, fill=(255, 0, 0, 100), font=font)
+            Image.alpha_composite(img, overlay).convert('RGB').save(output_path, quality=95)
+
+    @staticmethod
+    def legacy_pdf(pdf_path, watermark_text, output_path):
+        """Previous approach: stamp and diagonal text inserted again on every page"""
+        doc = fitz.open(pdf_path)
+        for page in doc:
+            rect = page.rect
+            text_rect = fitz.Rect(rect.width - 300, rect.height - 200, rect.width - 20, rect.height - 20)
+            page.draw_rect(text_rect, color=(0, 0, 0), fill=(1, 1, 1), width=1)
+            page.insert_textbox(text_rect, watermark_text, fontsize=10, color=(1, 0, 0))
+            center = fitz.Point(rect.width / 2, rect.height / 2)
+            page.insert_text(
+                fitz.Point(50, center.y), "SAFA CONFIDENTIAL - UNAUTHORIZED DISTRIBUTION PROHIBITED",
+                fontsize=20, color=(0.8, 0.8, 0.8), morph=(center, fitz.Matrix(45))
+            )
+        doc.save(output_path)
+        doc.close()
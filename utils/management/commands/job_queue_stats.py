@@ -0,0 +1,42 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from utils.jobs import queue_stats
+
+
+class Command(BaseCommand):
+    help = 'Show background job queue depth and latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutes',
+            type=int,
+            default=60,
+            help='Window for completed/failed counts and average wait'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print machine-readable JSON (for monitoring agents)'
+        )
+
+    def handle(self, *args, **options):
+        stats = queue_stats(window=timedelta(minutes=options['minutes']))
+        if options['json']:
+            self.stdout.write(json.dumps(stats))
+            return
+
+        self.stdout.write(
+            f"{'queue':<14} {'ready':>6} {'sched':>6} {'run':>4}/{'max':<4} {'done':>6} {'failed':>6} "
+            f"{'oldest s':>9} {'wait s':>8}"
+        )
+        for entry in stats:
+            oldest = '' if entry['oldest_ready_age'] is None else entry['oldest_ready_age']
+            wait = '' if entry['avg_wait'] is None else entry['avg_wait']
+            self.stdout.write(
+                f"{entry['queue']:<14} {entry['ready']:>6} {entry['scheduled']:>6} "
+                f"{entry['running']:>4}/{entry['concurrency']:<4} {entry['completed']:>6} {entry['failed']:>6} "
+                f"{oldest:>9} {wait:>8}"
+            )
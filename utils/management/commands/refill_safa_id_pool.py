@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from utils.safa_ids import POOL_TARGET_SIZE, refill_pool
+
+
+class Command(BaseCommand):
+    help = 'Top up the pool of pre-generated SAFA IDs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            type=int,
+            default=POOL_TARGET_SIZE,
+            help=f'Number of available IDs to keep in the pool (default {POOL_TARGET_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        available = refill_pool(target=options['target'])
+        self.stdout.write(self.style.SUCCESS(f'SAFA ID pool refilled. IDs available: {available}'))
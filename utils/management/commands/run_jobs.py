@@ -0,0 +1,60 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django_tasks import tasks
+from django_tasks.exceptions import InvalidTaskBackendError
+
+from utils.jobs import JobBackend, Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a background job worker. Each worker runs one job at a time; start several '
+        'to run jobs in parallel (per-queue concurrency limits still apply).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queue',
+            default='*',
+            help="Comma-separated queues to process, or '*' for all (default)"
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls when no job is ready'
+        )
+        parser.add_argument(
+            '--batch',
+            action='store_true',
+            help='Run every ready job, then exit'
+        )
+        parser.add_argument(
+            '--backend',
+            default='default',
+            help='Task backend alias'
+        )
+
+    def handle(self, *args, **options):
+        if options['interval'] <= 0:
+            raise CommandError('--interval must be positive')
+        try:
+            backend = tasks[options['backend']]
+        except InvalidTaskBackendError as e:
+            raise CommandError(str(e))
+        if not isinstance(backend, JobBackend):
+            raise CommandError(f"Backend '{options['backend']}' does not queue jobs in the database")
+
+        worker = Worker(options['backend'], options['queue'].split(','))
+
+        def stop(signum, frame):
+            # Finish the running job, then exit
+            worker.running = False
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        self.stdout.write(f'Worker {worker.name} processing queues: {options["queue"]}')
+        worker.run(interval=options['interval'], batch=options['batch'])
+        self.stdout.write(self.style.SUCCESS(f'Worker {worker.name} stopped'))
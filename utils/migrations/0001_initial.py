@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-16 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=150, unique=True, verbose_name='Key')),
+                ('value', models.PositiveBigIntegerField(default=0, verbose_name='Last Value')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Document Counter',
+                'verbose_name_plural': 'Document Counters',
+                'ordering': ['key'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-16 19:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('utils', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SAFAIdPool',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('safa_id', models.CharField(max_length=5, unique=True, verbose_name='SAFA ID')),
+                ('is_claimed', models.BooleanField(db_index=True, default=False, verbose_name='Claimed')),
+                ('claimed_by', models.CharField(blank=True, max_length=100, verbose_name='Claimed By')),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'SAFA ID Pool Entry',
+                'verbose_name_plural': 'SAFA ID Pool',
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:12
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('utils', '0002_safaidpool'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('task_path', models.CharField(max_length=255, verbose_name='Task')),
+                ('queue_name', models.CharField(default='default', max_length=50, verbose_name='Queue')),
+                ('backend_name', models.CharField(default='default', max_length=50, verbose_name='Backend')),
+                ('priority', models.PositiveSmallIntegerField(default=0, verbose_name='Priority')),
+                ('args_kwargs', models.JSONField(default=dict, verbose_name='Arguments')),
+                ('status', models.CharField(choices=[('NEW', 'Queued'), ('RUNNING', 'Running'), ('FAILED', 'Failed'), ('COMPLETE', 'Complete')], default='NEW', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('max_attempts', models.PositiveIntegerField(default=3, verbose_name='Max Attempts')),
+                ('run_after', models.DateTimeField(blank=True, null=True, verbose_name='Run After')),
+                ('enqueued_at', models.DateTimeField(auto_now_add=True, verbose_name='Enqueued At')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Result')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='background_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Background Job',
+                'verbose_name_plural': 'Background Jobs',
+                'ordering': ['-enqueued_at'],
+                'indexes': [models.Index(fields=['status', 'queue_name', 'run_after'], name='utils_backg_status_dd8f2d_idx'), models.Index(fields=['queue_name', 'started_at'], name='utils_backg_queue_n_01944e_idx')],
+            },
+        ),
+    ]
@@ -1,8 +1,9 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 from django.utils.html import format_html
 from django.templatetags.static import static
-import random
-import string
 
 class ModelWithLogo(models.Model):
     """
@@ -40,39 +41,108 @@ class SAFAIdentifiableMixin(models.Model):
         abstract = True
     
     @staticmethod
-    def generate_unique_safa_id():
-        """Generate a random 5-character alphanumeric SAFA ID that is unique across all models"""
-        from django.apps import apps
-        
-        # Get all models that use SAFAIdentifiableMixin
-        safa_models = []
-        for app_config in apps.get_app_configs():
-            for model in app_config.get_models():
-                if issubclass(model, SAFAIdentifiableMixin) and model._meta.abstract is False:
-                    safa_models.append(model)
-        
-        # Character set for the ID
-        chars = string.ascii_uppercase + string.digits
-        
-        # Try up to 100 times to generate a unique ID
-        for _ in range(100):
-            # Generate a random 5-character string
-            safa_id = ''.join(random.choice(chars) for _ in range(5))
-            
-            # Check if this ID already exists in any model that uses the mixin
-            exists = False
-            for model in safa_models:
-                if model.objects.filter(safa_id=safa_id).exists():
-                    exists = True
-                    break
-            
-            if not exists:
-                return safa_id
-        
-        raise ValueError("Could not generate a unique SAFA ID after multiple attempts")
+    def generate_unique_safa_id(claimed_by=''):
+        """Claim a SAFA ID from the shared pool (unique across all models that use one)"""
+        from .safa_ids import claim_safa_id
+        return claim_safa_id(claimed_by)
     
     def save(self, *args, **kwargs):
         # Generate SAFA ID if not already set
         if not self.safa_id:
-            self.safa_id = self.generate_unique_safa_id()
-        super().save(*args, **kwargs)
\ No newline at end of file
+            self.safa_id = self.generate_unique_safa_id(self._meta.label)
+        super().save(*args, **kwargs)
+
+
+class DocumentCounter(models.Model):
+    """
+    Last number handed out for a numbering prefix (invoice base, ticket year, ...).
+    Incremented in place by utils.numbering so allocation never has to count or
+    probe the numbered table.
+    """
+    key = models.CharField('Key', max_length=150, unique=True)
+    value = models.PositiveBigIntegerField('Last Value', default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Document Counter'
+        verbose_name_plural = 'Document Counters'
+        ordering = ['key']
+
+    def __str__(self):
+        return f"{self.key}: {self.value}"
+
+
+class SAFAIdPool(models.Model):
+    """
+    Pre-generated SAFA IDs that are not used by any model yet. IDs are claimed
+    from here by utils.safa_ids instead of probing random candidates.
+    """
+    safa_id = models.CharField('SAFA ID', max_length=5, unique=True)
+    is_claimed = models.BooleanField('Claimed', default=False, db_index=True)
+    claimed_by = models.CharField('Claimed By', max_length=100, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'SAFA ID Pool Entry'
+        verbose_name_plural = 'SAFA ID Pool'
+
+    def __str__(self):
+        return f"{self.safa_id} ({'claimed' if self.is_claimed else 'available'})"
+
+
+class BackgroundJob(models.Model):
+    """
+    One run of a background task enqueued through utils.jobs. The row is the
+    queue entry, the retry state and the status record the UI polls.
+    """
+    STATUS_NEW = 'NEW'
+    STATUS_RUNNING = 'RUNNING'
+    STATUS_FAILED = 'FAILED'
+    STATUS_COMPLETE = 'COMPLETE'
+    STATUS_CHOICES = (
+        (STATUS_NEW, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_COMPLETE, 'Complete'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task_path = models.CharField('Task', max_length=255)
+    queue_name = models.CharField('Queue', max_length=50, default='default')
+    backend_name = models.CharField('Backend', max_length=50, default='default')
+    priority = models.PositiveSmallIntegerField('Priority', default=0)
+    args_kwargs = models.JSONField('Arguments', default=dict)
+    status = models.CharField('Status', max_length=10, choices=STATUS_CHOICES, default=STATUS_NEW)
+    attempts = models.PositiveIntegerField('Attempts', default=0)
+    max_attempts = models.PositiveIntegerField('Max Attempts', default=3)
+    run_after = models.DateTimeField('Run After', null=True, blank=True)
+    enqueued_at = models.DateTimeField('Enqueued At', auto_now_add=True)
+    started_at = models.DateTimeField('Started At', null=True, blank=True)
+    finished_at = models.DateTimeField('Finished At', null=True, blank=True)
+    worker = models.CharField('Worker', max_length=100, blank=True)
+    result = models.JSONField('Result', null=True, blank=True)
+    error = models.TextField('Error', blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='background_jobs'
+    )
+
+    class Meta:
+        verbose_name = 'Background Job'
+        verbose_name_plural = 'Background Jobs'
+        ordering = ['-enqueued_at']
+        indexes = [
+            models.Index(fields=['status', 'queue_name', 'run_after']),
+            models.Index(fields=['queue_name', 'started_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.task_path} [{self.queue_name}] {self.status}"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_COMPLETE, self.STATUS_FAILED)
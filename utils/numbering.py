@@ -0,0 +1,121 @@
+"""
+Shared document numbering service.
+
+Numbers are handed out from DocumentCounter rows, one per prefix, with a single
+UPDATE ... SET value = value + n. The row lock taken by the UPDATE serialises
+concurrent writers for that prefix only, and the cost of an allocation does not
+depend on how many documents already exist.
+
+A counter is seeded the first time its prefix is used, via a ``seed`` callable
+that returns the highest number already issued, so existing number sequences
+carry on where they left off.
+
+Note: when called inside an outer transaction the counter row stays locked
+until that transaction commits, so keep numbering close to the final save.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from .models import DocumentCounter
+
+
+def seed_from_max(queryset, field, prefix):
+    """
+    Highest integer suffix already used for ``prefix`` in ``queryset``.
+
+    Suffixes are compared as numbers: longer values sort first, so a suffix
+    that has outgrown its zero padding still counts as the highest.
+    """
+    issued = (
+        queryset.filter(**{f'{field}__startswith': prefix})
+        .annotate(number_length=Length(field))
+        .order_by('-number_length', f'-{field}')
+        .values_list(field, flat=True)
+    )
+    for value in issued.iterator(chunk_size=100):
+        suffix = value[len(prefix):]
+        if suffix.isdigit():
+            return int(suffix)
+    return 0
+
+
+def discard_counters(prefix, before):
+    """
+    Delete the counters for ``prefix`` whose keys sort before ``before``.
+
+    For per-day prefixes that are never numbered again; a discarded counter
+    that is used after all is seeded again like a new one.
+    """
+    return DocumentCounter.objects.filter(key__startswith=prefix, key__lt=before).delete()[0]
+
+
+def _increment(keys, count):
+    return DocumentCounter.objects.filter(key__in=keys).update(
+        value=F('value') + count,
+        updated_at=timezone.now()
+    )
+
+
+def reserve(key, count=1, seed=None):
+    """
+    Reserve ``count`` consecutive numbers for ``key`` and return them as a range.
+
+    Bulk jobs should reserve a block once instead of calling next_number() per row.
+    """
+    if count < 1:
+        raise ValueError("count must be at least 1")
+
+    with transaction.atomic():
+        if not _increment([key], count):
+            start = seed() if seed else 0
+            try:
+                with transaction.atomic():
+                    DocumentCounter.objects.create(key=key, value=start + count)
+            except IntegrityError:
+                # Another writer created the counter first
+                _increment([key], count)
+        value = DocumentCounter.objects.filter(key=key).values_list('value', flat=True).get()
+
+    return range(value - count + 1, value + 1)
+
+
+def next_number(key, seed=None):
+    """Next number for ``key``"""
+    return reserve(key, 1, seed)[0]
+
+
+def reserve_many(counts, seed=None):
+    """
+    Reserve numbers for several keys at once, in a constant number of queries.
+
+    ``counts`` maps key -> how many numbers to reserve. ``seed`` receives the
+    keys that have no counter yet and returns {key: highest number already
+    issued}. Returns {key: range}.
+    """
+    counts = {key: count for key, count in counts.items() if count > 0}
+    if not counts:
+        return {}
+
+    with transaction.atomic():
+        existing = set(
+            DocumentCounter.objects.filter(key__in=counts).values_list('key', flat=True)
+        )
+        missing = [key for key in counts if key not in existing]
+        if missing:
+            starts = seed(missing) if seed else {}
+            DocumentCounter.objects.bulk_create(
+                [DocumentCounter(key=key, value=starts.get(key, 0)) for key in missing],
+                ignore_conflicts=True
+            )
+
+        by_count = {}
+        for key, count in counts.items():
+            by_count.setdefault(count, []).append(key)
+        for count, keys in by_count.items():
+            _increment(keys, count)
+
+        values = dict(DocumentCounter.objects.filter(key__in=counts).values_list('key', 'value'))
+
+    return {key: range(values[key] - count + 1, values[key] + 1) for key, count in counts.items()}
@@ -0,0 +1,44 @@
+"""
+Running totals for batch runs (member imports, age transitions, invoice PDF
+pre-rendering).
+
+RunStats counts processed items and times the run. Subclasses list their
+extra counters in ``counters`` and extend as_dict() with anything else they
+report:
+
+    class ImportStats(RunStats):
+        counters = ('created', 'invalid')
+
+    stats = ImportStats()
+    stats.processed += 1
+    stats.created += 1
+    stats.as_dict()   # {'processed': 1, 'created': 1, 'invalid': 0, 'elapsed': 0.01}
+"""
+import time
+
+
+class RunStats:
+    """Items processed, extra counters and elapsed time for one run"""
+    counters = ()
+
+    def __init__(self):
+        self.processed = 0
+        for name in self.counters:
+            setattr(self, name, 0)
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        """Items processed per second"""
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            'processed': self.processed,
+            **{name: getattr(self, name) for name in self.counters},
+            'elapsed': round(self.elapsed, 2),
+        }
@@ -0,0 +1,188 @@
+"""
+Central SAFA ID allocator.
+
+SAFA IDs are 5-character A-Z/0-9 codes shared by users, members, clubs and the
+geography models. Instead of each model probing random candidates against its
+own table, IDs are pre-generated into SAFAIdPool (checked once against every
+table that stores a SAFA ID) and claimed atomically from there.
+
+The pool is topped up in a background thread when it runs low, and can be
+filled ahead of time with ``manage.py refill_safa_id_pool``.
+"""
+import logging
+import random
+import string
+import threading
+from functools import lru_cache
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import SAFAIdPool
+
+logger = logging.getLogger(__name__)
+
+SAFA_ID_CHARS = string.ascii_uppercase + string.digits
+SAFA_ID_LENGTH = 5
+SAFA_ID_SPACE = len(SAFA_ID_CHARS) ** SAFA_ID_LENGTH
+
+# Refill in the background once fewer than this many IDs are available
+POOL_LOW_WATER = 500
+# Number of available IDs a refill tops the pool up to
+POOL_TARGET_SIZE = 5000
+
+_refill_lock = threading.Lock()
+
+
+class SAFAIdPoolExhausted(Exception):
+    """Raised when no unused SAFA IDs can be generated"""
+
+
+class _ClaimConflict(Exception):
+    """Another writer claimed some of the selected rows first"""
+
+
+@lru_cache(maxsize=None)
+def get_safa_id_models():
+    """Models with a 5-character safa_id column (the shared SAFA ID space)"""
+    safa_id_models = []
+    for model in apps.get_models():
+        if model is SAFAIdPool or model._meta.proxy:
+            continue
+        try:
+            field = model._meta.get_field('safa_id')
+        except Exception:
+            continue
+        if getattr(field, 'max_length', None) == SAFA_ID_LENGTH and field.concrete:
+            safa_id_models.append(model)
+    return safa_id_models
+
+
+def get_used_safa_ids(candidates):
+    """The subset of candidates already stored on a model or in the pool"""
+    candidates = list(candidates)
+    used = set(SAFAIdPool.objects.filter(safa_id__in=candidates).values_list('safa_id', flat=True))
+    for model in get_safa_id_models():
+        used.update(model.objects.filter(safa_id__in=candidates).values_list('safa_id', flat=True))
+    return used
+
+
+def random_safa_id():
+    return ''.join(random.choices(SAFA_ID_CHARS, k=SAFA_ID_LENGTH))
+
+
+def refill_pool(target=POOL_TARGET_SIZE, batch_size=2000, max_batches=50):
+    """
+    Top the pool up to ``target`` available IDs. Returns the number of IDs
+    available afterwards.
+    """
+    available = SAFAIdPool.objects.filter(is_claimed=False).count()
+    for _ in range(max_batches):
+        needed = target - available
+        if needed <= 0:
+            break
+        candidates = {random_safa_id() for _ in range(min(needed, batch_size))}
+        fresh = candidates - get_used_safa_ids(candidates)
+        # ignore_conflicts hands back every object, inserted or not, so count
+        # the pool again rather than trusting the result
+        SAFAIdPool.objects.bulk_create(
+            [SAFAIdPool(safa_id=safa_id) for safa_id in fresh],
+            ignore_conflicts=True
+        )
+        available = SAFAIdPool.objects.filter(is_claimed=False).count()
+    return available
+
+
+def _refill_in_background():
+    try:
+        refill_pool()
+    except Exception:
+        logger.exception("SAFA ID pool refill failed")
+    finally:
+        connection.close()
+        _refill_lock.release()
+
+
+def schedule_pool_refill():
+    """Start a background refill after commit if the pool is running low"""
+    running_low = not SAFAIdPool.objects.filter(is_claimed=False).order_by('pk')[
+        POOL_LOW_WATER:POOL_LOW_WATER + 1
+    ].exists()
+    if not running_low:
+        return
+
+    def start():
+        # Only one refill per process at a time
+        if not _refill_lock.acquire(blocking=False):
+            return
+        thread = threading.Thread(target=_refill_in_background)
+        thread.daemon = True
+        thread.start()
+
+    transaction.on_commit(start)
+
+
+def claim_safa_ids(count, claimed_by=''):
+    """
+    Atomically claim ``count`` unused SAFA IDs (bulk imports claim all theirs at once).
+    """
+    if count < 1:
+        return []
+
+    for _ in range(5):
+        try:
+            with transaction.atomic():
+                queryset = SAFAIdPool.objects.filter(is_claimed=False).order_by('pk')
+                if connection.features.has_select_for_update_skip_locked:
+                    queryset = queryset.select_for_update(skip_locked=True)
+                rows = list(queryset.values_list('pk', 'safa_id')[:count])
+
+                if len(rows) == count:
+                    updated = SAFAIdPool.objects.filter(
+                        pk__in=[pk for pk, _safa_id in rows],
+                        is_claimed=False
+                    ).update(is_claimed=True, claimed_by=claimed_by[:100], claimed_at=timezone.now())
+                    if updated != count:
+                        raise _ClaimConflict
+                    schedule_pool_refill()
+                    return [safa_id for _pk, safa_id in rows]
+        except _ClaimConflict:
+            continue
+
+        # Not enough IDs ready: refill synchronously before trying again
+        refill_pool(target=count + POOL_TARGET_SIZE)
+
+    raise SAFAIdPoolExhausted(f"Could not claim {count} SAFA IDs from the pool")
+
+
+def claim_safa_id(claimed_by=''):
+    """Claim a single unused SAFA ID"""
+    return claim_safa_ids(1, claimed_by)[0]
+
+
+def mark_safa_id_used(safa_id, claimed_by=''):
+    """Take a manually entered SAFA ID out of the pool so it is never handed out again"""
+    if safa_id:
+        SAFAIdPool.objects.filter(safa_id=safa_id, is_claimed=False).update(
+            is_claimed=True, claimed_by=claimed_by[:100], claimed_at=timezone.now()
+        )
+
+
+def get_safa_id_space_usage():
+    """ID space usage for the coverage report"""
+    used = set()
+    for model in get_safa_id_models():
+        used.update(
+            model.objects.exclude(safa_id__isnull=True).exclude(safa_id='')
+            .values_list('safa_id', flat=True).iterator(chunk_size=10000)
+        )
+    available = SAFAIdPool.objects.filter(is_claimed=False).count()
+    claimed = SAFAIdPool.objects.filter(is_claimed=True).count()
+    return {
+        'space': SAFA_ID_SPACE,
+        'assigned': len(used),
+        'pool_available': available,
+        'pool_claimed': claimed,
+        'used_fraction': (len(used) + available) / SAFA_ID_SPACE,
+    }
@@ -0,0 +1,18 @@
+"""
+The cache shared by every worker process.
+
+Process-local caches (the season/fee cache, the token cache, the geography
+snapshot) keep their version keys here so a change made in one process is seen
+by the others. The alias is settings.SEASON_CACHE_ALIAS ('shared' by default);
+without it the default cache is used.
+"""
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+
+
+def get_shared_cache():
+    """Cache shared by all worker processes (falls back to the default cache)"""
+    try:
+        return caches[getattr(settings, 'SEASON_CACHE_ALIAS', 'shared')]
+    except InvalidCacheBackendError:
+        return caches['default']
@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+
+import fitz
+from django.test import SimpleTestCase
+from PIL import Image
+
+from accounts.models import CustomUser
+from .document_watermark import DocumentWatermarker
+
+
+class DocumentWatermarkTests(SimpleTestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        self.user = CustomUser(first_name='Water', last_name='Mark', email='watermark@example.com')
+        self.watermarker = DocumentWatermarker()
+
+    def path(self, name):
+        return os.path.join(self.workdir, name)
+
+    def test_image_is_stamped_in_the_corner_only(self):
+        Image.new('RGB', (1200, 900), (255, 255, 255)).save(self.path('scan.png'))
+        output = self.watermarker.watermark_image(self.path('scan.png'), self.user, self.path('out.png'))
+        with Image.open(output) as image:
+            self.assertEqual((image.mode, image.size), ('RGB', (1200, 900)))
+            self.assertEqual(image.getpixel((10, 10)), (255, 255, 255))
+            self.assertNotEqual(image.getpixel((1200 - 40, 900 - 40)), (255, 255, 255))
+
+    def test_pdf_pages_share_one_overlay(self):
+        doc = fitz.open()
+        for _ in range(3):
+            doc.new_page()
+        doc.new_page(width=842, height=595)
+        doc.save(self.path('document.pdf'))
+        doc.close()
+
+        output = self.watermarker.watermark_pdf(self.path('document.pdf'), self.user, self.path('out.pdf'))
+        with fitz.open(output) as doc:
+            shared = [
+                {xref for xref, name, *_rest in page.get_xobjects() if name == 'fullpage'}
+                for page in doc
+            ]
+            self.assertIn('SAFA CONFIDENTIAL', doc[0].get_text())
+        self.assertEqual(shared[0], shared[1])
+        self.assertEqual(shared[1], shared[2])
+        self.assertNotEqual(shared[0], shared[3])  # other page size, other overlay
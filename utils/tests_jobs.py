@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from django_tasks import task
+
+from .jobs import Worker, queue_stats
+from .models import BackgroundJob
+
+
+@task()
+def add(a, b):
+    return a + b
+
+
+@task(queue_name='email')
+def always_fail():
+    raise RuntimeError('mail server down')
+
+
+class BackgroundJobTests(TestCase):
+
+    def test_enqueue_stores_job_and_worker_runs_it(self):
+        result = add.enqueue(2, 3)
+        job = BackgroundJob.objects.get(pk=result.id)
+        self.assertEqual(job.status, BackgroundJob.STATUS_NEW)
+        self.assertEqual(job.args_kwargs, {'args': [2, 3], 'kwargs': {}})
+
+        self.assertEqual(Worker().run_once().pk, job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_COMPLETE)
+        self.assertEqual(job.result, 5)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNone(Worker().run_once())
+
+    def test_failing_job_is_retried_with_backoff_then_failed(self):
+        result = always_fail.enqueue()
+        worker = Worker()
+        max_attempts = worker.backend.queue_options('email')['max_attempts']
+
+        with self.assertLogs('utils.jobs', 'ERROR'):
+            worker.run_once()
+        job = BackgroundJob.objects.get(pk=result.id)
+        self.assertEqual(job.status, BackgroundJob.STATUS_NEW)
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIn('mail server down', job.error)
+        # Not ready again until the backoff has passed
+        self.assertIsNone(worker.run_once())
+
+        for _ in range(max_attempts - 1):
+            BackgroundJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            with self.assertLogs('utils.jobs', 'ERROR'):
+                worker.run_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_FAILED)
+        self.assertEqual(job.attempts, max_attempts)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_queue_concurrency_limits_claims(self):
+        worker = Worker()
+        limit = worker.backend.queue_options('default')['concurrency']
+        for _ in range(limit + 1):
+            add.enqueue(1, 1)
+        for _ in range(limit):
+            self.assertIsNotNone(worker.claim())
+        self.assertIsNone(worker.claim())
+
+    def test_stale_running_job_is_requeued(self):
+        add.enqueue(1, 1)
+        worker = Worker()
+        job = worker.claim()
+        BackgroundJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(worker.requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_NEW)
+
+    def test_queue_stats(self):
+        add.enqueue(1, 2)
+        add.enqueue(3, 4)
+        BackgroundJob.objects.update(enqueued_at=timezone.now() - timedelta(seconds=30))
+        Worker().run_once()
+
+        stats = {entry['queue']: entry for entry in queue_stats()}
+        self.assertEqual(stats['default']['ready'], 1)
+        self.assertEqual(stats['default']['completed'], 1)
+        self.assertGreaterEqual(stats['default']['oldest_ready_age'], 30)
+        self.assertGreaterEqual(stats['default']['avg_wait'], 30)
+        self.assertEqual(stats['email']['ready'], 0)
@@ -0,0 +1,64 @@
+from django.test import TestCase
+
+from membership.models import Invoice
+from .models import DocumentCounter
+from .numbering import next_number, reserve, reserve_many, seed_from_max
+
+
+class DocumentNumberingTests(TestCase):
+
+    def test_counter_is_seeded_once_then_incremented(self):
+        seed_calls = []
+
+        def seed():
+            seed_calls.append(True)
+            return 41
+
+        self.assertEqual(next_number('test:seeded', seed=seed), 42)
+        self.assertEqual(next_number('test:seeded', seed=seed), 43)
+        self.assertEqual(len(seed_calls), 1)
+
+    def test_block_reservation_is_contiguous(self):
+        next_number('test:block')
+        self.assertEqual(list(reserve('test:block', 3)), [2, 3, 4])
+        self.assertEqual(next_number('test:block'), 5)
+
+    def test_reserve_many_uses_constant_queries(self):
+        with self.assertNumQueries(6):
+            numbers = reserve_many({f'test:many:{i}': 2 for i in range(50)})
+        self.assertEqual(list(numbers['test:many:7']), [1, 2])
+        self.assertEqual(DocumentCounter.objects.filter(key__startswith='test:many:').count(), 50)
+
+    def test_invoice_numbers_keep_format_and_continue_existing_sequence(self):
+        base = Invoice.get_invoice_number_base('ABC12')
+        # Invoices issued before the counter existed
+        Invoice.objects.create(invoice_number=base, invoice_type='RENEWAL')
+        Invoice.objects.create(invoice_number=f"{base}-01", invoice_type='RENEWAL')
+
+        self.assertEqual(
+            Invoice.allocate_invoice_numbers(['ABC12', None, 'ABC12', None]),
+            [f"{base}-02", Invoice.get_invoice_number_base(None), f"{base}-03",
+             f"{Invoice.get_invoice_number_base(None)}-01"]
+        )
+
+        invoice = Invoice(invoice_type='RENEWAL')
+        self.assertEqual(invoice.generate_invoice_number(), Invoice.get_invoice_number_base(None) + '-02')
+
+    def test_seeds_compare_suffixes_as_numbers(self):
+        for number in ('TEST-0099', 'TEST-10000', 'TEST-9999'):
+            Invoice.objects.create(invoice_number=number, invoice_type='RENEWAL')
+        self.assertEqual(seed_from_max(Invoice.objects.all(), 'invoice_number', 'TEST-'), 10000)
+
+        base = Invoice.get_invoice_number_base('XYZ98')
+        Invoice.objects.create(invoice_number=f"{base}-99", invoice_type='RENEWAL')
+        Invoice.objects.create(invoice_number=f"{base}-100", invoice_type='RENEWAL')
+        self.assertEqual(Invoice.allocate_invoice_numbers(['XYZ98']), [f"{base}-101"])
+
+    def test_old_invoice_counters_are_discarded(self):
+        DocumentCounter.objects.create(key='invoice:MEM-20000101/ABC12', value=3)
+        DocumentCounter.objects.create(key='test:kept', value=3)
+        Invoice.allocate_invoice_numbers(['ABC12'])
+        self.assertEqual(
+            set(DocumentCounter.objects.values_list('key', flat=True)),
+            {'test:kept', f"invoice:{Invoice.get_invoice_number_base('ABC12')}"}
+        )
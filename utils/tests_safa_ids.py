@@ -0,0 +1,37 @@
+from django.test import TestCase
+
+from geography.models import Country, NationalFederation
+from .models import SAFAIdPool
+from .safa_ids import claim_safa_id, claim_safa_ids, get_used_safa_ids, mark_safa_id_used, refill_pool
+
+
+class SAFAIdPoolTests(TestCase):
+
+    def test_refill_skips_ids_already_in_use(self):
+        country = Country.objects.create(name='South Africa', code='RSA')
+        federation = NationalFederation.objects.create(name='SAFA', country=country, safa_id='TAKEN')
+
+        self.assertIn('TAKEN', get_used_safa_ids(['TAKEN', 'FREE1']))
+        self.assertEqual(refill_pool(target=200), 200)
+        self.assertEqual(SAFAIdPool.objects.filter(is_claimed=False).count(), 200)
+        self.assertFalse(SAFAIdPool.objects.filter(safa_id=federation.safa_id).exists())
+
+    def test_bulk_claim_is_unique_and_constant_cost(self):
+        refill_pool(target=300)
+        with self.assertNumQueries(5):
+            claimed = claim_safa_ids(250, 'test')
+        self.assertEqual(len(set(claimed)), 250)
+        self.assertEqual(SAFAIdPool.objects.filter(is_claimed=True, claimed_by='test').count(), 250)
+        self.assertNotIn(claim_safa_id(), claimed)
+
+    def test_claim_refills_an_empty_pool(self):
+        safa_id = claim_safa_id()
+        self.assertEqual(len(safa_id), 5)
+        self.assertTrue(SAFAIdPool.objects.get(safa_id=safa_id).is_claimed)
+
+    def test_manually_entered_id_leaves_the_pool(self):
+        refill_pool(target=10)
+        entry = SAFAIdPool.objects.first()
+        mark_safa_id_used(entry.safa_id, 'accounts.CustomUser')
+        entry.refresh_from_db()
+        self.assertTrue(entry.is_claimed)
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'jobs'
+
+urlpatterns = [
+    path('stats/', views.job_queue_stats, name='queue_stats'),
+    path('<uuid:job_id>/', views.job_status, name='job_status'),
+]
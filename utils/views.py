@@ -0,0 +1,43 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+
+from .jobs import queue_stats
+from .models import BackgroundJob
+
+
+def job_status_data(job):
+    """What the UI polls for a background job"""
+    data = {
+        'id': str(job.pk),
+        'task': job.task_path.rsplit('.', 1)[-1],
+        'queue': job.queue_name,
+        'status': job.status,
+        'finished': job.is_finished,
+        'attempts': job.attempts,
+        'max_attempts': job.max_attempts,
+        'enqueued_at': job.enqueued_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'result': job.result if job.status == BackgroundJob.STATUS_COMPLETE else None,
+        'error': job.error or None,
+    }
+    if job.status == BackgroundJob.STATUS_NEW and job.run_after:
+        data['retry_at'] = job.run_after.isoformat()
+    return data
+
+
+@login_required
+def job_status(request, job_id):
+    """Status of a job, for the user who enqueued it or staff"""
+    job = get_object_or_404(BackgroundJob, pk=job_id)
+    if not request.user.is_staff and job.requested_by_id != request.user.pk:
+        raise Http404
+    return JsonResponse(job_status_data(job))
+
+
+@staff_member_required
+def job_queue_stats(request):
+    """Queue depth and latency for monitoring"""
+    return JsonResponse({'queues': queue_stats()})